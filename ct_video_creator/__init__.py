@@ -2,20 +2,32 @@
 AI Video Creator Package
 """
 
-from .video_creator import (
-    create_background_music_recipe,
-    create_background_music_assets,
-    create_assemble_video_recipe,
-    create_sub_video_recipes,
-    create_sub_videos_assets,
-    create_narrator_assets,
-    create_narrator_recipe,
-    create_images_assets,
-    create_image_recipe,
-    clean_unused_assets,
-    assemble_video,
+from .utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".video_creator": [
+            "create_background_music_recipe",
+            "create_background_music_assets",
+            "create_assemble_video_recipe",
+            "create_sub_video_recipes",
+            "create_sub_videos_assets",
+            "create_narrator_assets",
+            "create_narrator_recipe",
+            "create_images_assets",
+            "create_image_recipe",
+            "clean_unused_assets",
+            "collect_garbage",
+            "assemble_video",
+            "run_chapter",
+        ],
+        ".batch_runner": ["BatchChapter", "load_batch_manifest", "run_batch"],
+        ".utils.aspect_ratios": ["AspectRatios"],
+        ".utils.asset_index": ["AssetIndex"],
+        ".utils.garbage_collector": ["GarbageCollector"],
+    },
 )
-from .utils import AspectRatios
 
 __all__ = [
     "create_background_music_recipe",
@@ -28,6 +40,13 @@ __all__ = [
     "create_images_assets",
     "create_image_recipe",
     "clean_unused_assets",
+    "collect_garbage",
     "assemble_video",
+    "run_chapter",
+    "load_batch_manifest",
+    "BatchChapter",
+    "run_batch",
     "AspectRatios",
+    "AssetIndex",
+    "GarbageCollector",
 ]
@@ -0,0 +1,214 @@
+"""
+Batch runner creating many chapters in one process.
+
+Chapters listed in a JSON manifest share one task graph, so the stages of different chapters interleave and
+every backend stays busy. Running in one process keeps the HTTP sessions of the generation services, the
+ComfyUI upload registry and the probe cache warm between chapters. Finished stages are written to a
+checkpoint file, so an interrupted batch resumes where it stopped.
+
+Manifest format:
+
+    {
+        "user_folder": ".",
+        "chapters": [
+            {"story_name": "simple_story", "chapter_index": 0},
+            {"story_name": "simple_story", "chapter_index": 1, "aspect_ratio": "RATIO_9_16", "single_render": true}
+        ]
+    }
+"""
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+from ct_logging import logger
+
+from .environment_variables import JSON_WRITE_DELAY_SECONDS
+from .utils import AspectRatios, get_json_store
+from .utils.task_graph import TaskGraph
+from .video_creator import DEFAULT_STAGE_LIMITS, add_chapter_stages
+
+
+class BatchChapter:
+    """A chapter to create as part of a batch."""
+
+    def __init__(
+        self,
+        user_folder: Path,
+        story_name: str,
+        chapter_index: int,
+        aspect_ratio: AspectRatios = AspectRatios.RATIO_16_9,
+        single_render: bool = False,
+    ):
+        """Initialize a batch chapter."""
+        self.user_folder = Path(user_folder)
+        self.story_name = story_name
+        self.chapter_index = chapter_index
+        self.aspect_ratio = aspect_ratio
+        self.single_render = single_render
+
+    @property
+    def chapter_id(self) -> str:
+        """Identifier of the chapter in task names and in the checkpoint."""
+        return f"{self.story_name}/chapter_{self.chapter_index + 1:03}"
+
+
+def load_batch_manifest(manifest_path: Path) -> list[BatchChapter]:
+    """
+    Load the chapters of a batch manifest.
+
+    Relative user folders are resolved against the manifest folder.
+
+    :raises ValueError: If the manifest is invalid or lists a chapter twice
+    """
+    manifest_path = Path(manifest_path)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (json.JSONDecodeError, OSError) as e:
+        raise ValueError(f"Failed to read batch manifest {manifest_path}: {e}") from e
+
+    user_folder = manifest_path.parent / data.get("user_folder", ".")
+    chapters = []
+    for entry in data.get("chapters", []):
+        try:
+            chapter = BatchChapter(
+                user_folder=manifest_path.parent / entry["user_folder"] if "user_folder" in entry else user_folder,
+                story_name=str(entry["story_name"]),
+                chapter_index=int(entry["chapter_index"]),
+                aspect_ratio=AspectRatios[entry.get("aspect_ratio", "RATIO_16_9")],
+                single_render=bool(entry.get("single_render", False)),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid chapter entry in batch manifest: {entry}") from e
+        chapters.append(chapter)
+
+    chapter_ids = [chapter.chapter_id for chapter in chapters]
+    duplicates = sorted({chapter_id for chapter_id in chapter_ids if chapter_ids.count(chapter_id) > 1})
+    if duplicates:
+        raise ValueError(f"Chapters listed more than once in batch manifest: {', '.join(duplicates)}")
+
+    return chapters
+
+
+class BatchCheckpoint:
+    """Finished stages per chapter, persisted after every stage."""
+
+    def __init__(self, checkpoint_path: Path):
+        """Load the checkpoint file if it exists."""
+        self.checkpoint_path = Path(checkpoint_path)
+        self._lock = threading.Lock()
+        self._completed: dict[str, list[str]] = {}
+
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+                self._completed = json.load(file).get("completed", {})
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable batch checkpoint {self.checkpoint_path.name}: {e}")
+
+    def completed_stages(self, chapter_id: str) -> set[str]:
+        """Return the finished stages of a chapter."""
+        with self._lock:
+            return set(self._completed.get(chapter_id, []))
+
+    def mark_done(self, chapter_id: str, stage: str) -> None:
+        """Record a finished stage and write the checkpoint file."""
+        with self._lock:
+            stages = self._completed.setdefault(chapter_id, [])
+            if stage not in stages:
+                stages.append(stage)
+            data = {"completed": self._completed}
+
+            temp_path = self.checkpoint_path.with_name(f"{self.checkpoint_path.name}.tmp")
+            try:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(data, file, indent=4)
+                os.replace(temp_path, self.checkpoint_path)
+            except OSError as e:
+                logger.warning(f"Failed to save batch checkpoint {self.checkpoint_path.name}: {e}")
+
+
+def run_batch(
+    chapters: list[BatchChapter],
+    checkpoint_path: Path,
+    stage_limits: dict[str, int] | None = None,
+    clean_assets: bool = True,
+) -> dict[str, dict[str, str]]:
+    """
+    Create all chapters of a batch, resuming from the checkpoint.
+
+    A failing chapter does not stop the others; its remaining stages are reported as skipped.
+
+    :param chapters: Chapters to create, in priority order
+    :param checkpoint_path: File recording the finished stages
+    :param stage_limits: Number of stages running at the same time per backend (default: DEFAULT_STAGE_LIMITS)
+    :param clean_assets: Remove unused assets of each chapter once its video is assembled
+    :return: Status of each stage, per chapter
+    """
+    checkpoint = BatchCheckpoint(checkpoint_path)
+    graph = TaskGraph({**DEFAULT_STAGE_LIMITS, **(stage_limits or {})})
+
+    for chapter in chapters:
+        chapter_id = chapter.chapter_id
+        completed_stages = checkpoint.completed_stages(chapter_id)
+        if completed_stages:
+            logger.info(f"Resuming {chapter_id}: {len(completed_stages)} stages already done")
+
+        add_chapter_stages(
+            graph,
+            chapter.user_folder,
+            chapter.story_name,
+            chapter.chapter_index,
+            aspect_ratio=chapter.aspect_ratio,
+            single_render=chapter.single_render,
+            clean_assets=clean_assets,
+            prefix=f"{chapter_id}:",
+            completed_stages=completed_stages,
+            on_stage_done=lambda stage, chapter_id=chapter_id: checkpoint.mark_done(chapter_id, stage),
+        )
+
+    logger.info(f"Running batch of {len(chapters)} chapters")
+    with get_json_store().coalesced_writes(JSON_WRITE_DELAY_SECONDS):
+        statuses = graph.run(raise_on_failure=False)
+
+    results: dict[str, dict[str, str]] = {chapter.chapter_id: {} for chapter in chapters}
+    for task_name, status in statuses.items():
+        chapter_id, stage = task_name.rsplit(":", 1)
+        results[chapter_id][stage] = status
+
+    failed = [chapter_id for chapter_id, stages in results.items() if TaskGraph.FAILED in stages.values()]
+    if failed:
+        logger.error(f"Batch finished with failed chapters: {', '.join(failed)}")
+    else:
+        logger.info("Batch finished successfully")
+
+    return results
+
+
+def main():
+    """Run the chapters of a batch manifest."""
+    parser = argparse.ArgumentParser(description="Create the chapters listed in a batch manifest.")
+    parser.add_argument("manifest", type=Path, help="Batch manifest JSON file")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Checkpoint file (default: <manifest>.checkpoint.json next to the manifest)",
+    )
+    parser.add_argument("--keep-unused-assets", action="store_true", help="Do not clean unused assets")
+    arguments = parser.parse_args()
+
+    checkpoint_path = arguments.checkpoint or arguments.manifest.with_suffix(".checkpoint.json")
+    run_batch(
+        load_batch_manifest(arguments.manifest),
+        checkpoint_path,
+        clean_assets=not arguments.keep_unused_assets,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Automation utilities for ComfyUI."""
 
+from .comfyui_async_client import AsyncComfyUIClient
 from .comfyui_requests import ComfyUIRequests
+from .comfyui_scheduler import ComfyUIJob, ComfyUIJobScheduler
 
 from .comfyui_text_workflows import (
     FlorentI2TWorkflow,
@@ -15,7 +17,10 @@ from .comfyui_video_workflows import (
 )
 
 __all__ = [
+    "AsyncComfyUIClient",
     "ComfyUIRequests",
+    "ComfyUIJob",
+    "ComfyUIJobScheduler",
     "FluxWorkflow",
     "WanI2VWorkflow",
     "WanT2VWorkflow",
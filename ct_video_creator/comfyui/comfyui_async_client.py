@@ -0,0 +1,221 @@
+"""
+Asyncio ComfyUI client that waits for prompts through the ComfyUI WebSocket event channel.
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from ct_logging import logger
+
+from ct_video_creator.environment_variables import COMFYUI_URL
+
+try:
+    import websockets
+    from websockets.exceptions import WebSocketException
+except ImportError:  # pragma: no cover - depends on the installed extras
+    websockets = None
+    WebSocketException = OSError
+
+if TYPE_CHECKING:
+    from .comfyui_requests import ComfyUIRequests
+
+
+def websocket_available() -> bool:
+    """Return True if the websockets package is installed."""
+    return websockets is not None
+
+
+def _websocket_url(base_url: str, client_id: str) -> str:
+    """Build the ComfyUI WebSocket URL for a client id from the HTTP base URL."""
+    if base_url.startswith("https://"):
+        ws_base = "wss://" + base_url[len("https://") :]
+    elif base_url.startswith("http://"):
+        ws_base = "ws://" + base_url[len("http://") :]
+    else:
+        ws_base = base_url
+    return f"{ws_base.rstrip('/')}/ws?clientId={client_id}"
+
+
+class AsyncComfyUIClient:
+    """
+    Asyncio ComfyUI client.
+
+    Completion of a prompt is detected from the `executing`/`execution_success` events sent on
+    `/ws?clientId=`, and only `/history/{prompt_id}` is fetched afterwards. HTTP calls go through the
+    synchronous ComfyUIRequests instance, so retries and session handling stay in one place.
+    """
+
+    MAX_REMEMBERED_PROMPTS = 256
+
+    def __init__(
+        self,
+        requests: "ComfyUIRequests",
+        base_url: str = COMFYUI_URL,
+        history_check_interval: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
+        """
+        Initialize the async client.
+
+        :param requests: Synchronous client used for HTTP calls; its client_id is used for the WebSocket
+        :param base_url: ComfyUI HTTP base URL
+        :param history_check_interval: Seconds between /history/{prompt_id} checks while waiting for events,
+            a safety net for events missed during a reconnect
+        :param connect_timeout: Seconds to wait for the WebSocket connection
+        """
+        self._requests = requests
+        self.client_id = requests.client_id
+        self._url = _websocket_url(base_url, self.client_id)
+        self.history_check_interval = history_check_interval
+        self.connect_timeout = connect_timeout
+
+        self._connection = None
+        self._listener: asyncio.Task | None = None
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self._finished: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the WebSocket listener is running."""
+        return self._listener is not None and not self._listener.done()
+
+    async def connect(self) -> None:
+        """
+        Open the WebSocket connection and start listening for events.
+
+        :raises RuntimeError: If the websockets package is not installed
+        """
+        if self.connected:
+            return
+        if not websocket_available():
+            raise RuntimeError("The websockets package is required for the async ComfyUI client")
+
+        self._connection = await asyncio.wait_for(
+            websockets.connect(self._url, max_size=None), timeout=self.connect_timeout
+        )
+        self._listener = asyncio.create_task(self._listen())
+        logger.debug(f"Connected to ComfyUI WebSocket as client {self.client_id}")
+
+    async def close(self) -> None:
+        """Stop listening and close the WebSocket connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, WebSocketException, OSError):
+                pass
+            self._listener = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def __aenter__(self) -> "AsyncComfyUIClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _listen(self) -> None:
+        """Read events until the connection closes and resolve the waiters of finished prompts."""
+        try:
+            async for message in self._connection:
+                if isinstance(message, bytes):
+                    # Binary messages are preview images
+                    continue
+                try:
+                    event = json.loads(message)
+                except json.JSONDecodeError:
+                    continue
+                self._handle_event(event)
+        except (WebSocketException, OSError) as e:
+            logger.warning(f"ComfyUI WebSocket closed: {e}")
+
+    def _handle_event(self, event: dict) -> None:
+        """Record a finished prompt from an event and wake up anyone waiting for it."""
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return
+
+        if event_type in ("execution_error", "execution_interrupted"):
+            logger.error(f"ComfyUI prompt {prompt_id} failed with {event_type}")
+            return
+
+        # ComfyUI sends "executing" with no node once the prompt is done and its history is stored
+        if event_type != "executing" or data.get("node") is not None:
+            return
+
+        self._finished[prompt_id] = event_type
+        self._finished.move_to_end(prompt_id)
+        while len(self._finished) > self.MAX_REMEMBERED_PROMPTS:
+            self._finished.popitem(last=False)
+
+        for future in self._waiters.pop(prompt_id, []):
+            if not future.done():
+                future.set_result(event_type)
+
+    async def get_history_entry(self, prompt_id: str) -> dict:
+        """Fetch the history entry of a single prompt, or an empty dict if it is not finished."""
+        return await asyncio.to_thread(self._requests.get_history_entry, prompt_id)
+
+    async def submit_prompt(self, workflow_json: dict) -> str:
+        """Queue a workflow on ComfyUI and return its prompt_id."""
+        response = await asyncio.to_thread(self._requests.comfyui_send_prompt, workflow_json)
+        return response.json()["prompt_id"]
+
+    async def wait_for_prompt(self, prompt_id: str, timeout: float | None = None) -> dict:
+        """
+        Wait until a prompt finishes and return its history entry.
+
+        The history is checked once right after connecting, so prompts that finished before the
+        connection was opened are not missed.
+
+        :param prompt_id: Prompt to wait for
+        :param timeout: Maximum number of seconds to wait (None = no limit)
+        :raises TimeoutError: If the prompt does not finish within timeout
+        """
+        await self.connect()
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while True:
+            entry = await self.get_history_entry(prompt_id)
+            if entry:
+                return entry
+
+            wait_time = self.history_check_interval
+            if prompt_id in self._finished:
+                # Finished while the history was being fetched; give ComfyUI a moment to expose it
+                wait_time = 0.5
+            elif not self.connected:
+                # Without events, fall back to polling the prompt history
+                wait_time = min(wait_time, max(1.0, self._requests.retry_delay))
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"ComfyUI prompt {prompt_id} did not finish within {timeout}s")
+                wait_time = min(wait_time, remaining)
+
+            future = loop.create_future()
+            self._waiters.setdefault(prompt_id, []).append(future)
+            try:
+                await asyncio.wait_for(future, timeout=wait_time)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                waiters = self._waiters.get(prompt_id, [])
+                if future in waiters:
+                    waiters.remove(future)
+                if not waiters:
+                    self._waiters.pop(prompt_id, None)
+
+    async def run_prompt(self, workflow_json: dict, timeout: float | None = None) -> tuple[str, dict]:
+        """Queue a workflow, wait for it to finish and return its prompt_id and history entry."""
+        await self.connect()
+        prompt_id = await self.submit_prompt(workflow_json)
+        return prompt_id, await self.wait_for_prompt(prompt_id, timeout=timeout)
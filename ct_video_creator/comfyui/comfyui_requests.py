@@ -2,18 +2,27 @@
 ComfyuiRequest is a class that handles HTTP requests to the ComfyUI API.
 """
 
+import asyncio
 import os
+import shutil
+import threading
 import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import requests
-from ct_video_creator.environment_variables import COMFYUI_OUTPUT_FOLDER, COMFYUI_URL
+from ct_video_creator.environment_variables import COMFYUI_INPUT_FOLDER, COMFYUI_OUTPUT_FOLDER, COMFYUI_URL
 from ct_logging import logger
 from requests import Response, Session
 from requests.exceptions import RequestException
 
+from ct_video_creator.utils import file_digest, link_file
+
+from .comfyui_async_client import AsyncComfyUIClient, WebSocketException, websocket_available
 from .comfyui_workflow import IComfyUIWorkflow
 
 
@@ -23,6 +32,13 @@ class ComfyUIRequests:
     """
 
     DEFAULT_CLEANUP_DELAY_SECONDS = 5
+    DEFAULT_MAX_QUEUED_PROMPTS = 4
+    DEFAULT_DOWNLOAD_WORKERS = 4
+    DOWNLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+
+    # Shared by all instances: content digest -> file name known to exist in the ComfyUI input folder
+    _uploaded_files: dict[str, str] = {}
+    _upload_lock = threading.Lock()
 
     def __init__(self, retries: int = 5, retry_delay: int = 1) -> None:
         """
@@ -33,6 +49,10 @@ class ComfyUIRequests:
         self._delay_between_requests = self.retry_delay
         self._cleanup_delay_seconds = self.DEFAULT_CLEANUP_DELAY_SECONDS
         self.session: Session = requests.Session()
+        # Identifies this client on the ComfyUI WebSocket so completion events for our prompts reach us
+        self.client_id = uuid.uuid4().hex
+        self.use_websocket = True
+        self.download_workers = self.DEFAULT_DOWNLOAD_WORKERS
 
     def _send_get_request(
         self,
@@ -40,6 +60,7 @@ class ComfyUIRequests:
         params: dict[str, Any] | None = None,
         stream: bool = False,
         timeout: float | tuple[float, float] = 10.0,
+        headers: dict[str, str] | None = None,
     ) -> Response:
         """
         Send a GET request using the configured session with simple retries.
@@ -53,6 +74,7 @@ class ComfyUIRequests:
                     params=params,
                     stream=stream,
                     timeout=timeout,
+                    headers=headers,
                 )
                 response.raise_for_status()
                 return response
@@ -151,7 +173,7 @@ class ComfyUIRequests:
             raise ValueError("The prompt must be a dictionary.")
 
         url = f"{COMFYUI_URL}/prompt"
-        prompt = {"prompt": json}
+        prompt = {"prompt": json, "client_id": self.client_id}
 
         return self._send_post_request(url=url, json=prompt, timeout=timeout)
 
@@ -186,20 +208,34 @@ class ComfyUIRequests:
         """
         Wait for ComfyUI to complete processing the current request.
 
+        Completion is detected from ComfyUI WebSocket events when available; otherwise the history
+        entry of this prompt is polled.
+
         :param prompt_id: The ID of the prompt to check
-        :param check_interval: Seconds between queue checks
+        :param check_interval: Seconds between history checks when polling
         :return: Processing time in seconds
         """
         start_time = datetime.now()
 
-        while True:
-            history = self.get_history()
-            if prompt_id in history:
-                break
+        if self.use_websocket and websocket_available():
+            try:
+                asyncio.run(self._wait_for_completion_async(prompt_id))
+                return (datetime.now() - start_time).seconds
+            except (OSError, WebSocketException, RuntimeError, asyncio.TimeoutError) as e:
+                logger.warning(f"ComfyUI WebSocket unavailable, polling history instead: {e}")
+
+        while not self.get_history_entry(prompt_id):
             time.sleep(check_interval)
 
         return (datetime.now() - start_time).seconds
 
+    async def _wait_for_completion_async(self, prompt_id: str) -> dict:
+        """
+        Wait for a prompt through the ComfyUI WebSocket and return its history entry.
+        """
+        async with AsyncComfyUIClient(self) as client:
+            return await client.wait_for_prompt(prompt_id)
+
     def _send_clean_memory_request(self):
         """
         Send a request to clean memory in ComfyUI.
@@ -215,6 +251,12 @@ class ComfyUIRequests:
         except RequestException as e:
             logger.error("Error occurred while cleaning memory in ComfyUI: {}", e)
 
+    def free_memory(self) -> None:
+        """
+        Unload models and free memory in ComfyUI.
+        """
+        self._send_clean_memory_request()
+
     def _comfyui_get_history_output_name(self, history_entry_dict: dict) -> list[str]:
         """
         Get the output names from a history entry dictionary.
@@ -277,7 +319,7 @@ class ComfyUIRequests:
                     display_summary,
                 )
 
-                history_entry = self.get_last_history_entry()
+                history_entry = self.get_history_entry(prompt_id)
                 if history_entry:
                     self._check_for_output_success(history_entry)
                     return self._get_output_paths(history_entry)
@@ -305,77 +347,322 @@ class ComfyUIRequests:
 
         return []
 
+    def _input_file_exists(self, file_name: str) -> bool:
+        """
+        Check whether a file is already in the ComfyUI input folder, directly when the folder is local
+        and through /view otherwise.
+        """
+        input_folder = Path(COMFYUI_INPUT_FOLDER)
+        if input_folder.is_dir():
+            return (input_folder / file_name).is_file()
+
+        params = {"filename": file_name, "subfolder": "", "type": "input"}
+        try:
+            response = self.session.head(f"{COMFYUI_URL}/view", params=params, timeout=10)
+            return response.status_code == 200
+        except RequestException:
+            return False
+
+    def _place_local_input(self, file_path: Path, file_name: str) -> bool:
+        """
+        Place a file directly in the ComfyUI input folder when it is reachable on this machine.
+        Hard links and reflinks are used when possible, a copy otherwise.
+        """
+        input_folder = Path(COMFYUI_INPUT_FOLDER)
+        if not input_folder.is_dir():
+            return False
+
+        target = input_folder / file_name
+        try:
+            method = link_file(file_path, target)
+            if method is None:
+                tmp_target = target.with_name(f".{file_name}.{os.getpid()}.copy")
+                shutil.copyfile(file_path, tmp_target)
+                os.replace(tmp_target, target)
+                method = "copy"
+        except OSError as e:
+            logger.warning(f"Failed to place {file_path.name} in the ComfyUI input folder: {e}")
+            return False
+
+        logger.debug(f"Placed {file_path.name} in the ComfyUI input folder as {file_name} ({method})")
+        return True
+
     def upload_file(self, file_path: Path) -> Path:
         """
         Upload a file to ComfyUI.
 
+        Files are stored under a content-addressed name, so a file whose content is already in the
+        ComfyUI input folder is not uploaded again. When the input folder is local, the file is
+        linked or copied into it instead of being sent over HTTP.
+
         :param file_path: Path to the file to upload
+        :return: Name of the file in the ComfyUI input folder
         """
+        file_path = Path(file_path)
         try:
-            url = f"{COMFYUI_URL}/upload/image"
-            params = {"type": "input", "overwrite": "true"}
+            digest = file_digest(file_path)
+        except OSError as e:
+            logger.error(f"Failed to upload file {file_path}: {e}")
+            return Path(file_path.name)
 
-            with open(file_path, "rb") as file:
-                files = {"image": file}
-                self._send_post_request(url=url, params=params, files=files, timeout=30)
+        with self._upload_lock:
+            known_name = self._uploaded_files.get(digest)
+        if known_name:
+            logger.debug(f"File already uploaded as {known_name}: {file_path}")
+            return Path(known_name)
 
-            logger.debug(f"File uploaded successfully: {file_path}")
-        except (RequestException, OSError, IOError) as e:
-            logger.error(f"Failed to upload file {file_path}: {e}")
+        file_name = f"{file_path.stem}_{digest[:16]}{file_path.suffix}"
+
+        if self._input_file_exists(file_name) or self._place_local_input(file_path, file_name):
+            logger.debug(f"File available in ComfyUI input folder as {file_name}: {file_path}")
+        else:
+            try:
+                url = f"{COMFYUI_URL}/upload/image"
+                params = {"type": "input", "overwrite": "true"}
+
+                with open(file_path, "rb") as file:
+                    files = {"image": (file_name, file)}
+                    self._send_post_request(url=url, params=params, files=files, timeout=30)
+
+                logger.debug(f"File uploaded successfully: {file_path}")
+            except (RequestException, OSError, IOError) as e:
+                logger.error(f"Failed to upload file {file_path}: {e}")
+                return Path(file_name)
+
+        with self._upload_lock:
+            self._uploaded_files[digest] = file_name
+
+        return Path(file_name)
+
+    def _place_local_output(self, file_path: Path, out_path: Path) -> bool:
+        """
+        Place an output file that is reachable on this machine without downloading it.
+
+        :param file_path: Output file path as reported by ComfyUI
+        :param out_path: Destination file path
+        :return: True if the file was linked or moved to out_path
+        """
+        source = file_path if file_path.is_absolute() else Path(COMFYUI_OUTPUT_FOLDER) / file_path.name
+        if not source.is_file():
+            return False
+
+        method = link_file(source, out_path, allow_move=True)
+        if method is None:
+            return False
+
+        logger.debug(f"Placed {source.name} in {out_path.parent} ({method})")
+        return True
+
+    def _download_file(self, file_name: str, out_path: Path) -> Path:
+        """
+        Download an output file over HTTP, resuming interrupted transfers with Range requests.
+
+        :param file_name: Output file name on ComfyUI
+        :param out_path: Destination file path
+        :return: The downloaded file path
+        :raises RequestException: If the download keeps failing after all retries
+        """
+        params = {
+            "filename": file_name,
+            "subfolder": "",
+            "type": "output",
+        }
+        part_path = out_path.with_name(f"{out_path.name}.part")
+        part_path.unlink(missing_ok=True)
+        expected_size: int | None = None
+
+        for attempt in range(1, self.retries + 1):
+            written = part_path.stat().st_size if part_path.exists() else 0
+            if expected_size is not None and written >= expected_size:
+                break
 
-        return Path(file_path.name)
+            headers = {"Range": f"bytes={written}-"} if written else None
+            try:
+                response = self._send_get_request(
+                    f"{COMFYUI_URL}/view", params=params, stream=True, timeout=120, headers=headers
+                )
+                if written and response.status_code != 206:
+                    # The server ignored the range, start over
+                    written = 0
+                if not written and response.headers.get("Content-Length"):
+                    expected_size = int(response.headers["Content-Length"])
+
+                with open(part_path, "ab" if written else "wb") as file_handler:
+                    for chunk in response.iter_content(self.DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            file_handler.write(chunk)
+
+                if expected_size is None or part_path.stat().st_size >= expected_size:
+                    break
+                logger.warning(f"Download of {file_name} ended early, resuming (attempt {attempt}/{self.retries})")
+            except RequestException as exc:
+                if attempt >= self.retries:
+                    part_path.unlink(missing_ok=True)
+                    raise
+                logger.warning(
+                    f"Download of {file_name} interrupted, resuming (attempt {attempt}/{self.retries}): {exc}"
+                )
+                time.sleep(self.retry_delay)
+        else:
+            part_path.unlink(missing_ok=True)
+            raise RequestException(f"Download of {file_name} is incomplete after {self.retries} attempts")
+
+        os.replace(part_path, out_path)
+        return out_path
 
     def download_all_files(self, files_to_download: list[Path], output_folder: Path) -> list[Path]:
         """
         Download all specified files from ComfyUI.
 
+        Files that are reachable on this machine (COMFYUI_OUTPUT_FOLDER is local or a shared mount) are
+        hard-linked, reflinked or moved instead. The others are downloaded concurrently.
+
         :param files_to_download: List of file paths to download
         :param output_folder: Folder to save downloaded files
-        :return: List of paths to downloaded files
-        """
-        output_paths: list[Path] = []
-        for file_handler in files_to_download:
-            params = {
-                "filename": file_handler.name,
-                "subfolder": "",
-                "type": "output",
-            }
-            try:
-                response = self._send_get_request(f"{COMFYUI_URL}/view", params=params, stream=True, timeout=120)
-                response.raise_for_status()
-                output_folder.mkdir(parents=True, exist_ok=True)
-                out_path = output_folder / file_handler.name
-                with open(out_path, "wb") as file_handler:
-                    for chunk in response.iter_content(2 * 1024 * 1024):
-                        if chunk:
-                            file_handler.write(chunk)
-                output_paths.append(out_path)
-            except RequestException as e:
-                logger.warning(f"Failed to download file {file_handler.name}: {e}")
+        :return: List of paths to downloaded files, in the order of files_to_download
+        """
+        if not files_to_download:
+            return []
+
+        output_folder.mkdir(parents=True, exist_ok=True)
+
+        results: dict[int, Path] = {}
+        remote_files: list[tuple[int, Path]] = []
+        for index, file_path in enumerate(files_to_download):
+            file_path = Path(file_path)
+            out_path = output_folder / file_path.name
+            if self._place_local_output(file_path, out_path):
+                results[index] = out_path
+            else:
+                remote_files.append((index, file_path))
+
+        if remote_files:
+            max_workers = max(1, min(self.download_workers, len(remote_files)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="comfyui-download") as executor:
+                futures = {}
+                for index, file_path in remote_files:
+                    future = executor.submit(self._download_file, file_path.name, output_folder / file_path.name)
+                    futures[future] = (index, file_path)
+                for future in as_completed(futures):
+                    index, file_path = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except (RequestException, OSError) as e:
+                        logger.warning(f"Failed to download file {file_path.name}: {e}")
+
+        return [results[index] for index in sorted(results)]
+
+    def send_prompts_pipelined(
+        self,
+        req_list: list[IComfyUIWorkflow],
+        output_dir: Path,
+        max_queued: int = DEFAULT_MAX_QUEUED_PROMPTS,
+    ) -> list[list[Path]]:
+        """
+        Process workflows keeping up to max_queued prompts in the ComfyUI queue.
 
-        return output_paths
+        Prompts finish in submission order, so the oldest one is always waited for first and its outputs
+        are downloaded as soon as it finishes. Memory is only freed when the next workflow loads a
+        different model family; before that, the queue is drained so the models are not in use. Memory
+        is not freed after the last workflow.
 
-    def ensure_send_all_prompts(self, req_list: list[IComfyUIWorkflow], output_dir: Path) -> list[Path]:
+        :param req_list: List of workflows to process
+        :param output_dir: Folder to save downloaded files
+        :param max_queued: Maximum number of prompts queued on ComfyUI at once
+        :return: Downloaded files of each workflow, in workflow order (empty for failed workflows)
+        """
+        max_queued = max(1, max_queued)
+        attempts = [0] * len(req_list)
+        results: dict[int, list[Path]] = {}
+        pending: deque[int] = deque(range(len(req_list)))
+        in_flight: deque[tuple[int, str]] = deque()
+        current_family: str | None = None
+
+        while pending or in_flight:
+            while pending and len(in_flight) < max_queued:
+                index = pending[0]
+                workflow = req_list[index]
+                family = workflow.get_model_family()
+                if family != current_family:
+                    if in_flight:
+                        break
+                    if current_family is not None:
+                        logger.info(f"Model family changed to {family}, freeing ComfyUI memory")
+                        self._send_clean_memory_request()
+                    current_family = family
+
+                pending.popleft()
+                attempts[index] += 1
+                _, display_summary = self._create_workflow_summary(workflow)
+                try:
+                    prompt_id = self._submit_single_prompt(workflow).json()["prompt_id"]
+                    in_flight.append((index, prompt_id))
+                    logger.info(f"Queued request {index + 1}/{len(req_list)} as {prompt_id}: {display_summary}")
+                except RequestException as exc:
+                    logger.error(f"Failed to queue request {display_summary} (attempt {attempts[index]}): {exc}")
+                    if attempts[index] < self.retries:
+                        pending.appendleft(index)
+                        time.sleep(self.retry_delay)
+
+            if not in_flight:
+                continue
+
+            index, prompt_id = in_flight.popleft()
+            _, display_summary = self._create_workflow_summary(req_list[index])
+            try:
+                processing_time = self._wait_for_completion(prompt_id)
+                history_entry = self.get_history_entry(prompt_id)
+                if not history_entry:
+                    raise RuntimeError(f"No history entry found for prompt {prompt_id}")
+                self._check_for_output_success(history_entry)
+
+                output_paths = [Path(p) for p in self._get_output_paths(history_entry)]
+                results[index] = self.download_all_files(output_paths, output_folder=output_dir)
+                logger.info(f"Request finished after {processing_time}s: {display_summary}")
+            except (RuntimeError, RequestException) as err:
+                logger.error(f"Request {display_summary} failed (attempt {attempts[index]}/{self.retries}): {err}")
+                if attempts[index] < self.retries:
+                    pending.appendleft(index)
+
+        return [results.get(index, []) for index in range(len(req_list))]
+
+    def ensure_send_all_prompts(
+        self,
+        req_list: list[IComfyUIWorkflow],
+        output_dir: Path,
+        pipelined: bool = False,
+        max_queued: int = DEFAULT_MAX_QUEUED_PROMPTS,
+    ) -> list[Path]:
         """
         Send all prompts in the list to ComfyUI and wait for them to finish.
 
         :param req_list: List of workflows to process
+        :param output_dir: Folder to save downloaded files
+        :param pipelined: Keep up to max_queued prompts queued on ComfyUI instead of running them one by one
+            and only free memory when the model family changes
+        :param max_queued: Maximum number of prompts queued at once in pipelined mode
         :return: List of output file paths for successful requests
         """
         logger.info(f"Sending {len(req_list)} requests to ComfyUI...")
 
-        output_image_paths: list[str] = []
+        if pipelined:
+            results = self.send_prompts_pipelined(req_list, output_dir, max_queued)
+            downloaded_files = [path for paths in results for path in paths]
+            if req_list:
+                self._send_clean_memory_request()
+        else:
+            output_image_paths: list[str] = []
 
-        for index, workflow in enumerate(req_list, 1):
-            logger.info(f"Processing request {index}/{len(req_list)}")
-            output_paths = self._process_single_workflow(workflow)
-            output_image_paths.extend(output_paths)
-            if self._delay_between_requests > 0:
-                time.sleep(self._delay_between_requests)
+            for index, workflow in enumerate(req_list, 1):
+                logger.info(f"Processing request {index}/{len(req_list)}")
+                output_paths = self._process_single_workflow(workflow)
+                output_image_paths.extend(output_paths)
+                if self._delay_between_requests > 0:
+                    time.sleep(self._delay_between_requests)
 
-        logger.info("Finished processing all ComfyUI requests.")
+            downloaded_files = self.download_all_files([Path(p) for p in output_image_paths], output_folder=output_dir)
 
-        downloaded_files = self.download_all_files([Path(p) for p in output_image_paths], output_folder=output_dir)
+        logger.info("Finished processing all ComfyUI requests.")
 
         if len(downloaded_files) < len(req_list):
             logger.error("No files were downloaded from ComfyUI.")
@@ -406,6 +693,20 @@ class ComfyUIRequests:
             logger.error(f"Failed to fetch history: {exc}")
             return {}
 
+    def get_history_entry(self, prompt_id: str) -> dict:
+        """
+        Get the history entry of a single prompt from ComfyUI.
+
+        :param prompt_id: The ID of the prompt
+        :return: The history entry, or an empty dict if the prompt has not finished
+        """
+        try:
+            response = self._send_get_request(f"{COMFYUI_URL}/history/{prompt_id}", timeout=10)
+            return response.json().get(prompt_id, {})
+        except RequestException as exc:
+            logger.error(f"Failed to fetch history of prompt {prompt_id}: {exc}")
+            return {}
+
     def get_last_history_entry(self) -> dict:
         """
         Get the last history entry from ComfyUI.
@@ -0,0 +1,200 @@
+"""
+Scheduler that orders ComfyUI workflow jobs to minimise model swaps while respecting dependencies.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+from ct_logging import logger
+
+from .comfyui_requests import ComfyUIRequests
+from .comfyui_workflow import IComfyUIWorkflow
+
+WorkflowFactory = Callable[[dict[str, list[Path]]], IComfyUIWorkflow]
+
+
+class ComfyUIJob:
+    """A workflow to run on ComfyUI, optionally built from the outputs of the jobs it depends on."""
+
+    def __init__(
+        self,
+        job_id: str,
+        workflow: IComfyUIWorkflow | WorkflowFactory,
+        output_dir: Path,
+        depends_on: list[str] | None = None,
+        model_family: str | None = None,
+    ):
+        """
+        Initialize a job.
+
+        :param job_id: Unique job identifier
+        :param workflow: Workflow to run, or a callable building it from the outputs of depends_on
+            (a dict of job_id to downloaded files)
+        :param output_dir: Folder where the job outputs are downloaded
+        :param depends_on: Jobs that must finish successfully before this one runs
+        :param model_family: Model family of the workflow; required when workflow is a callable
+        :raises ValueError: If the model family cannot be determined
+        """
+        if model_family is None:
+            if not isinstance(workflow, IComfyUIWorkflow):
+                raise ValueError(f"Job {job_id} needs a model_family when its workflow is built lazily")
+            model_family = workflow.get_model_family()
+
+        self.job_id = job_id
+        self.workflow = workflow
+        self.output_dir = Path(output_dir)
+        self.depends_on = list(depends_on or [])
+        self.model_family = model_family
+
+    def build_workflow(self, dependency_outputs: dict[str, list[Path]]) -> IComfyUIWorkflow:
+        """Return the workflow of this job, building it from the dependency outputs if needed."""
+        if isinstance(self.workflow, IComfyUIWorkflow):
+            return self.workflow
+        return self.workflow(dependency_outputs)
+
+
+def _count_swaps(families: list[str]) -> int:
+    """Count the model family changes in an execution order."""
+    return sum(1 for previous, current in zip(families, families[1:]) if previous != current)
+
+
+class ComfyUIJobScheduler:
+    """
+    Run a batch of ComfyUI jobs grouped by model family.
+
+    Jobs whose dependencies are satisfied run in batches of the same model family. The current family
+    keeps running while it has ready jobs; otherwise the family with the most ready jobs is loaded next.
+    Each batch is sent pipelined once the batches it depends on have finished, and memory is freed only
+    when the next batch uses a different family.
+    """
+
+    def __init__(
+        self,
+        requests: ComfyUIRequests | None = None,
+        max_queued: int = ComfyUIRequests.DEFAULT_MAX_QUEUED_PROMPTS,
+    ):
+        """
+        Initialize the scheduler.
+
+        :param requests: ComfyUI client used to run the jobs
+        :param max_queued: Maximum number of prompts queued on ComfyUI at once
+        """
+        self._requests = requests or ComfyUIRequests()
+        self.max_queued = max_queued
+        self._jobs: dict[str, ComfyUIJob] = {}
+
+        self.results: dict[str, list[Path]] = {}
+        self.failed_jobs: list[str] = []
+        self.swaps_avoided = 0
+
+    def add_job(self, job: ComfyUIJob) -> None:
+        """
+        Add a job. Jobs should be added in the order they would run without the scheduler.
+
+        :raises ValueError: If a job with the same id was already added
+        """
+        if job.job_id in self._jobs:
+            raise ValueError(f"Duplicate job id: {job.job_id}")
+        self._jobs[job.job_id] = job
+
+    def plan(self) -> list[list[ComfyUIJob]]:
+        """
+        Return the execution order as batches of jobs sharing a model family.
+
+        A batch only holds jobs whose dependencies are in earlier batches, so a chain of jobs of the same
+        family (e.g. WAN I2V segments continuing each other) becomes consecutive batches of that family.
+
+        :raises ValueError: If a dependency is unknown or the dependencies form a cycle
+        """
+        for job in self._jobs.values():
+            unknown = [dependency for dependency in job.depends_on if dependency not in self._jobs]
+            if unknown:
+                raise ValueError(f"Job {job.job_id} depends on unknown jobs: {', '.join(unknown)}")
+
+        remaining = list(self._jobs.values())
+        done: set[str] = set()
+        current_family: str | None = None
+        batches: list[list[ComfyUIJob]] = []
+
+        while remaining:
+            ready = [job for job in remaining if done.issuperset(job.depends_on)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between jobs: {', '.join(job.job_id for job in remaining)}")
+
+            if not any(job.model_family == current_family for job in ready):
+                family_counts = Counter(job.model_family for job in ready)
+                # max() keeps the first family in job order on ties
+                current_family = max(family_counts, key=family_counts.get)
+
+            batch = [job for job in ready if job.model_family == current_family]
+            batches.append(batch)
+
+            done.update(job.job_id for job in batch)
+            remaining = [job for job in remaining if job.job_id not in done]
+
+        return batches
+
+    def run(self) -> dict[str, list[Path]]:
+        """
+        Run all jobs and return the downloaded files of each successful job.
+
+        Jobs that fail, and every job depending on them, are listed in failed_jobs.
+        """
+        batches = self.plan()
+
+        naive_swaps = _count_swaps([job.model_family for job in self._jobs.values()])
+        planned_swaps = _count_swaps([batch[0].model_family for batch in batches])
+        self.swaps_avoided = max(0, naive_swaps - planned_swaps)
+        logger.info(
+            f"Scheduling {len(self._jobs)} ComfyUI jobs in {len(batches)} batches: {planned_swaps} model swaps "
+            f"instead of {naive_swaps} ({self.swaps_avoided} avoided)"
+        )
+
+        self.results = {}
+        self.failed_jobs = []
+
+        for batch_index, batch in enumerate(batches):
+            if batch_index > 0 and batch[0].model_family != batches[batch_index - 1][0].model_family:
+                self._requests.free_memory()
+            self._run_batch(batch)
+
+        if batches:
+            self._requests.free_memory()
+
+        if self.failed_jobs:
+            logger.error(f"{len(self.failed_jobs)} ComfyUI jobs failed: {', '.join(self.failed_jobs)}")
+
+        return self.results
+
+    def _run_batch(self, batch: list[ComfyUIJob]) -> None:
+        """Run a batch of jobs of the same model family."""
+        runnable: list[tuple[ComfyUIJob, IComfyUIWorkflow]] = []
+        for job in batch:
+            failed_dependencies = [dependency for dependency in job.depends_on if dependency in self.failed_jobs]
+            if failed_dependencies:
+                logger.warning(f"Skipping job {job.job_id}: dependencies failed ({', '.join(failed_dependencies)})")
+                self.failed_jobs.append(job.job_id)
+                continue
+
+            dependency_outputs = {dependency: self.results[dependency] for dependency in job.depends_on}
+            try:
+                runnable.append((job, job.build_workflow(dependency_outputs)))
+            except (ValueError, RuntimeError, OSError) as e:
+                logger.error(f"Failed to build workflow for job {job.job_id}: {e}")
+                self.failed_jobs.append(job.job_id)
+
+        # Jobs of a batch may download to different folders; each folder is sent pipelined on its own
+        by_output_dir: dict[Path, list[tuple[ComfyUIJob, IComfyUIWorkflow]]] = {}
+        for job, workflow in runnable:
+            by_output_dir.setdefault(job.output_dir, []).append((job, workflow))
+
+        for output_dir, jobs in by_output_dir.items():
+            outputs = self._requests.send_prompts_pipelined(
+                [workflow for _, workflow in jobs], output_dir, max_queued=self.max_queued
+            )
+            for (job, _), job_outputs in zip(jobs, outputs):
+                if job_outputs:
+                    self.results[job.job_id] = job_outputs
+                else:
+                    self.failed_jobs.append(job.job_id)
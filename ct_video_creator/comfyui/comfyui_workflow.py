@@ -37,12 +37,21 @@ class IComfyUIWorkflow(ABC):
         Get the JSON configuration.
         """
 
+    def get_model_family(self) -> str:
+        """
+        Get a key identifying the models this workflow loads. Consecutive workflows with the same
+        key can run without freeing ComfyUI memory in between.
+        """
+        return type(self).__name__
+
 
 class ComfyUIWorkflowBase(IComfyUIWorkflow):
     """
     Base class for ComfyUI
     """
 
+    MODEL_FILE_EXTENSIONS = (".safetensors", ".gguf", ".ckpt", ".pth", ".pt", ".bin")
+
     def __init__(self, base_workflow: str):
         """
         Initialize the ComfyUIWorkflowBase class.
@@ -154,6 +163,25 @@ class ComfyUIWorkflowBase(IComfyUIWorkflow):
         """
         return self.workflow
 
+    @override
+    def get_model_family(self) -> str:
+        """
+        Get a key built from the model files loaded by the workflow.
+
+        LoRAs are ignored because they are small and swapping them does not require freeing memory.
+        """
+        model_files = set()
+        for node in self.workflow.values():
+            for key, value in node.get("inputs", {}).items():
+                if "lora" in key or not isinstance(value, str):
+                    continue
+                if value.lower().endswith(self.MODEL_FILE_EXTENSIONS):
+                    model_files.add(value)
+
+        if not model_files:
+            return type(self).__name__
+        return "|".join(sorted(model_files))
+
     def _set_output_filename(self, output_filename_node_index: int, filename: str) -> None:
         """
         Set the output filename for the generated file.
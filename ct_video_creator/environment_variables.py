@@ -3,13 +3,15 @@ Environment variables for ComfyUI automation module.
 """
 
 import os
-from ct_llm import GPT_4oMini_LLM
 from dotenv import load_dotenv
 
 load_dotenv()
 
-DESCRIPTION_GENERATION_LLM_MODEL = GPT_4oMini_LLM
-BACKGROUND_MUSIC_PROMPT_LLM_MODEL = GPT_4oMini_LLM
+# LLM model classes, resolved by __getattr__ so that reading the other settings does not import ct_llm
+_LLM_MODELS = {
+    "DESCRIPTION_GENERATION_LLM_MODEL": "GPT_4oMini_LLM",
+    "BACKGROUND_MUSIC_PROMPT_LLM_MODEL": "GPT_4oMini_LLM",
+}
 
 DEFAULT_ASSETS_FOLDER = os.getenv("DEFAULT_ASSETS_FOLDER", "")
 if not DEFAULT_ASSETS_FOLDER:
@@ -26,5 +28,38 @@ if not COMFYUI_OUTPUT_FOLDER:
 COMFYUI_URL = os.getenv("COMFYUI_URL", "http://127.0.0.1:8188")
 
 TTS_SERVER_URL = os.getenv("TTS_SERVER_URL", "http://127.0.0.1:8189")
+# Number of requests the TTS server can process at the same time
+TTS_SERVER_WORKERS = int(os.getenv("TTS_SERVER_WORKERS", "1"))
+# Number of narrator lines sent per request to the batch TTS endpoint (1 = one request per line)
+TTS_BATCH_SIZE = int(os.getenv("TTS_BATCH_SIZE", "1"))
 
 TTM_SERVER_URL = os.getenv("TTM_SERVER_URL", "http://127.0.0.1:8190")
+# Number of requests the TTM server can process at the same time
+TTM_SERVER_WORKERS = int(os.getenv("TTM_SERVER_WORKERS", "1"))
+
+# Seconds during which the recipe and asset JSON saves of a chapter run are coalesced into one write (0 = write-through)
+JSON_WRITE_DELAY_SECONDS = float(os.getenv("JSON_WRITE_DELAY_SECONDS", "0.5"))
+
+# Whisper model used for subtitles, kept loaded between chapters until it stays unused for the idle timeout
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "medium")
+# Torch device of the Whisper model, e.g. "cuda" or "cpu" (empty = default of the backend)
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "")
+# faster-whisper compute type, e.g. "int8" on CPU-only hosts (empty = openai-whisper backend)
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "")
+WHISPER_IDLE_TIMEOUT_SECONDS = float(os.getenv("WHISPER_IDLE_TIMEOUT_SECONDS", "300"))
+
+# Temporary render folders left by interrupted runs are removed by the garbage collector once unused for this long
+GC_TEMP_MAX_AGE_SECONDS = float(os.getenv("GC_TEMP_MAX_AGE_SECONDS", "86400"))
+# Temporary render folders larger than this are removed sooner, once briefly unused (0 = no size limit)
+GC_TEMP_MAX_BYTES = int(os.getenv("GC_TEMP_MAX_BYTES", "0"))
+
+
+def __getattr__(name: str):
+    """Import the LLM model classes on first access."""
+    if name not in _LLM_MODELS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import ct_llm  # pylint: disable=import-outside-toplevel
+
+    model = getattr(ct_llm, _LLM_MODELS[name])
+    globals()[name] = model
+    return model
@@ -1,33 +1,31 @@
 """This module initializes the image generator for Flux AI."""
 
-from .image_generator import (
-    FluxAIImageGenerator,
-    FluxImageRecipe,
-    IImageGenerator,
-    ImageRecipeBase,
-)
-from .video_generator import (
-    IVideoGenerator,
-    VideoRecipeBase,
-    WanRecipeBase,
-    WanI2VRecipe,
-    WanT2VRecipe,
-    WanGenerator,
-)
-from .audio_generator import (
-    ZonosTTSAudioGenerator,
-    ZonosTTSRecipe,
-    IAudioGenerator,
-    AudioRecipeBase,
-)
-from .background_music_generator import (
-    IBackgroundMusicGenerator,
-    MusicGenGenerator,
-    MusicGenRecipe,
-)
+from ct_video_creator.utils.lazy_imports import lazy_attributes
 
-from .description_generator import SceneScriptGenerator, FlorenceGenerator
-from .subtitle_generator import SubtitleGenerator
+# The description and subtitle generators import the LLM client and Whisper, so every generator is only
+# imported when first used
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".image_generator": ["FluxAIImageGenerator", "FluxImageRecipe", "IImageGenerator", "ImageRecipeBase"],
+        ".video_generator": [
+            "IVideoGenerator",
+            "VideoRecipeBase",
+            "WanRecipeBase",
+            "WanI2VRecipe",
+            "WanT2VRecipe",
+            "WanGenerator",
+        ],
+        ".audio_generator": ["ZonosTTSAudioGenerator", "ZonosTTSRecipe", "IAudioGenerator", "AudioRecipeBase"],
+        ".tts_cache": ["TTSCache"],
+        ".transcription_cache": ["TranscriptionCache"],
+        ".service_client": ["ServiceClient", "get_service_client"],
+        ".background_music_generator": ["IBackgroundMusicGenerator", "MusicGenGenerator", "MusicGenRecipe"],
+        ".description_generator": ["SceneScriptGenerator", "FlorenceGenerator"],
+        ".subtitle_generator": ["SubtitleGenerator"],
+        ".whisper_service": ["WhisperService", "get_whisper_service"],
+    },
+)
 
 __all__ = [
     "IBackgroundMusicGenerator",
@@ -35,6 +33,8 @@ __all__ = [
     "FluxAIImageGenerator",
     "SceneScriptGenerator",
     "SubtitleGenerator",
+    "WhisperService",
+    "get_whisper_service",
     "FlorenceGenerator",
     "MusicGenGenerator",
     "FluxImageRecipe",
@@ -46,6 +46,10 @@ __all__ = [
     "AudioRecipeBase",
     "MusicGenRecipe",
     "ZonosTTSRecipe",
+    "TTSCache",
+    "TranscriptionCache",
+    "ServiceClient",
+    "get_service_client",
     "WanRecipeBase",
     "WanI2VRecipe",
     "WanT2VRecipe",
@@ -2,16 +2,74 @@
 Audio Generation Module
 """
 
+import email.parser
+import email.policy
+import json
+import os
 import random
+import shutil
+import tempfile
+import zipfile
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
-import time
-import requests
 
+from ct_logging import logger
 from ct_video_creator.environment_variables import COMFYUI_OUTPUT_FOLDER, TTS_SERVER_URL
 
 from typing_extensions import override
 
+from .service_client import get_service_client
+from .tts_cache import TTSCache
+
+
+@lru_cache(maxsize=8)
+def _read_reference_audio(path: str, size: int, mtime_ns: int) -> bytes:  # pylint: disable=unused-argument
+    """Read a reference voice file. Size and mtime are part of the cache key so edited files are read again."""
+    with open(path, "rb") as audio_file:
+        return audio_file.read()
+
+
+def load_reference_audio(path: str | Path) -> bytes:
+    """Return the content of a reference voice file, reading it from disk only when it changed."""
+    stat = os.stat(path)
+    return _read_reference_audio(str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def _write_zip_members(archive_file, output_file_paths: list[Path]) -> None:
+    """
+    Extract the files of a ZIP archive, in archive order, to output_file_paths.
+
+    :raises RuntimeError: If the archive is invalid or does not hold one file per output path
+    """
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            if len(members) != len(output_file_paths):
+                raise RuntimeError(
+                    f"Expected {len(output_file_paths)} audio files in batch response, got {len(members)}"
+                )
+            for info, output_file_path in zip(members, output_file_paths):
+                with archive.open(info) as source, open(output_file_path, "wb") as target:
+                    shutil.copyfileobj(source, target)
+    except zipfile.BadZipFile as e:
+        raise RuntimeError(f"Invalid batch response: {e}") from e
+
+
+def _write_multipart_parts(body_file, content_type: str, output_file_paths: list[Path]) -> None:
+    """
+    Write the parts of a multipart response, in order, to output_file_paths.
+
+    :raises RuntimeError: If the response does not hold one part per output path
+    """
+    header = f"Content-Type: {content_type}\r\n\r\n".encode("latin-1")
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body_file.read())
+    parts = list(message.iter_parts()) if message.is_multipart() else []
+    if len(parts) != len(output_file_paths):
+        raise RuntimeError(f"Expected {len(output_file_paths)} audio files in batch response, got {len(parts)}")
+    for part, output_file_path in zip(parts, output_file_paths):
+        Path(output_file_path).write_bytes(part.get_payload(decode=True) or b"")
+
 
 class AudioRecipeBase:
     """Base class for audio recipes."""
@@ -34,6 +92,9 @@ class IAudioGenerator(ABC):
     An interface for audio generation classes.
     """
 
+    # Cache of previously generated audio, checked before calling the server when set
+    cache: TTSCache | None = None
+
     @abstractmethod
     def text_to_speech(self, text_list: list[str], output_file_path: Path) -> Path:
         """
@@ -60,6 +121,27 @@ class IAudioGenerator(ABC):
         :param text: The text to play as audio.
         """
 
+    def clone_text_to_speech_batch(
+        self, recipes: list[AudioRecipeBase], output_file_paths: list[Path]
+    ) -> list[Path | None]:
+        """
+        Convert several recipes to audio files.
+
+        Generators without a batch endpoint synthesize the recipes one by one.
+
+        :param recipes: Recipes to synthesize.
+        :param output_file_paths: Output file of each recipe.
+        :return: The saved file of each recipe, or None for the recipes that failed.
+        """
+        outputs: list[Path | None] = []
+        for recipe, output_file_path in zip(recipes, output_file_paths):
+            try:
+                outputs.append(self.clone_text_to_speech(recipe, output_file_path))
+            except (IOError, OSError, RuntimeError) as e:
+                logger.error(f"Failed to generate {Path(output_file_path).name}: {e}")
+                outputs.append(None)
+        return outputs
+
     def get_output_directory(self) -> str:
         """
         Get the output directory for generated audio files.
@@ -75,32 +157,31 @@ class ZonosTTSAudioGenerator(IAudioGenerator):
     """
 
     MAXIMUM_GENERATION_TIME = 60 * 30  # 30 minutes
+    # Status codes meaning the server has no batch endpoint
+    BATCH_UNSUPPORTED_STATUS_CODES = (404, 405, 501)
+    # Batch responses larger than this are buffered on disk instead of in memory
+    BATCH_SPOOL_MAX_BYTES = 64 * 1024 * 1024
 
-    def __init__(self):
+    def __init__(self, cache: TTSCache | None = None):
         """
         Initialize the ZonosTTSAudioGenerator class.
+
+        :param cache: Optional cache of previously generated audio, checked before calling the server
         """
         self.endpoint = f"{TTS_SERVER_URL}"
         self.tts_endpoint = f"{self.endpoint}/tts"
+        self.cache = cache
+        self._client = get_service_client(self.endpoint)
+        self._batch_supported = True
 
         self._wait_for_service_ready()
 
     def _wait_for_service_ready(self, check_interval: int = 5):
         """
-        Wait until the Text-to-Music service is ready to accept requests.
+        Wait until the Text-to-Speech service is ready to accept requests.
+        The result is shared by all generators and cached for a short time.
         """
-        max_tries = (5 * 60) / check_interval  # Wait up to 5 minutes
-        tries = 0
-        while tries < max_tries:
-            try:
-                response = requests.get(f"{self.endpoint}/health", timeout=10)
-                if response.ok:
-                    return
-            except requests.RequestException:
-                print("Waiting for Text-to-Music service to be ready...")
-                time.sleep(check_interval)
-            finally:
-                tries += 1
+        self._client.wait_until_ready(check_interval=check_interval)
 
     @override
     def text_to_speech(self, text_list: list[str], output_file_path: Path) -> Path:
@@ -116,8 +197,135 @@ class ZonosTTSAudioGenerator(IAudioGenerator):
         """
         if not isinstance(recipe, ZonosTTSRecipe):
             raise TypeError(f"Expected ZonosTTSRecipe, got {type(recipe).__name__}")
-        
-        data = {
+
+        output_file_path = Path(output_file_path)
+        cache_key = self._cache_key(recipe)
+        if cache_key and self.cache.get(cache_key, output_file_path):
+            return output_file_path
+
+        response = self._client.post(
+            "tts",
+            data=self._request_data(recipe),
+            files=self._reference_audio_files(recipe.clone_voice_path),
+            stream=True,
+            timeout=self.MAXIMUM_GENERATION_TIME,
+        )
+
+        if response.status_code == 200:
+            with open(output_file_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+            if cache_key:
+                self.cache.put(cache_key, output_file_path)
+            return Path(output_file_path)  # Return the saved file path
+        else:
+            error_msg = f"Error: {response.status_code} - {response.text}"
+            print(error_msg)
+            raise RuntimeError(error_msg)
+
+    @override
+    def clone_text_to_speech_batch(
+        self, recipes: list[AudioRecipeBase], output_file_paths: list[Path]
+    ) -> list[Path | None]:
+        """
+        Synthesize several recipes with one request per reference voice.
+
+        Cached recipes are not sent. The remaining ones are grouped by reference voice, and each group is
+        posted to /tts/batch with the voice uploaded once. The server answers with a ZIP archive or a
+        multipart response holding one audio file per text, in request order. Servers without the batch
+        endpoint are detected on the first call, and later calls synthesize the recipes one by one. A voice
+        group whose batch request fails is synthesized one by one as well.
+
+        :return: The saved file of each recipe, or None for the recipes that failed
+        """
+        for recipe in recipes:
+            if not isinstance(recipe, ZonosTTSRecipe):
+                raise TypeError(f"Expected ZonosTTSRecipe, got {type(recipe).__name__}")
+
+        output_file_paths = [Path(path) for path in output_file_paths]
+        outputs: list[Path | None] = [None] * len(recipes)
+        cache_keys: list[str | None] = [None] * len(recipes)
+        by_voice: dict[str, list[int]] = {}
+        for index, (recipe, output_file_path) in enumerate(zip(recipes, output_file_paths)):
+            cache_keys[index] = self._cache_key(recipe)
+            if cache_keys[index] and self.cache.get(cache_keys[index], output_file_path):
+                outputs[index] = output_file_path
+            else:
+                by_voice.setdefault(recipe.clone_voice_path, []).append(index)
+
+        for voice_path, indexes in by_voice.items():
+            group_recipes = [recipes[index] for index in indexes]
+            group_paths = [output_file_paths[index] for index in indexes]
+            if len(indexes) == 1 or not self._batch_supported:
+                group_outputs = super().clone_text_to_speech_batch(group_recipes, group_paths)
+            else:
+                try:
+                    group_outputs = self._post_batch(voice_path, group_recipes, group_paths)
+                except (OSError, RuntimeError) as e:
+                    # Only this voice group is retried one by one, the other groups and cache hits are kept
+                    logger.warning(f"Batch request for {len(indexes)} texts failed, sending them one by one: {e}")
+                    group_outputs = None
+                if group_outputs is None:
+                    group_outputs = super().clone_text_to_speech_batch(group_recipes, group_paths)
+                else:
+                    for index, output_file_path in zip(indexes, group_outputs):
+                        if cache_keys[index]:
+                            self.cache.put(cache_keys[index], output_file_path)
+
+            for index, output_file_path in zip(indexes, group_outputs):
+                outputs[index] = output_file_path
+
+        return outputs
+
+    def _post_batch(self, voice_path: str, recipes: list["ZonosTTSRecipe"], output_file_paths: list[Path]):
+        """
+        Post a batch of recipes sharing a reference voice.
+
+        :return: The saved files, or None if the server has no batch endpoint
+        :raises RuntimeError: If the request fails or the response does not hold one file per recipe
+        """
+        response = self._client.post(
+            "tts/batch",
+            data={"items": json.dumps([self._request_data(recipe) for recipe in recipes])},
+            files=self._reference_audio_files(voice_path),
+            stream=True,
+            timeout=self.MAXIMUM_GENERATION_TIME,
+        )
+
+        if response.status_code in self.BATCH_UNSUPPORTED_STATUS_CODES:
+            logger.info(f"TTS server has no batch endpoint ({response.status_code}), sending texts one by one")
+            self._batch_supported = False
+            return None
+        if response.status_code != 200:
+            raise RuntimeError(f"Error: {response.status_code} - {response.text}")
+
+        content_type = response.headers.get("Content-Type", "")
+        with tempfile.SpooledTemporaryFile(max_size=self.BATCH_SPOOL_MAX_BYTES) as body:
+            for chunk in response.iter_content(chunk_size=65536):
+                body.write(chunk)
+            body.seek(0)
+
+            if content_type.startswith("multipart/"):
+                _write_multipart_parts(body, content_type, output_file_paths)
+            else:
+                _write_zip_members(body, output_file_paths)
+
+        logger.debug(f"Generated {len(recipes)} narrator lines in one batch request")
+        return output_file_paths
+
+    def _cache_key(self, recipe: "ZonosTTSRecipe") -> str | None:
+        """Return the cache key of a recipe, or None if caching is disabled or the voice is unreadable."""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.fingerprint(recipe.to_dict(), recipe.clone_voice_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _request_data(recipe: "ZonosTTSRecipe") -> dict:
+        """Return the synthesis parameters of a recipe as sent to the server."""
+        return {
             "text": recipe.prompt,
             "seed": recipe.seed,
             "happiness": recipe.happiness,
@@ -132,26 +340,10 @@ class ZonosTTSAudioGenerator(IAudioGenerator):
             "speaking_rate": recipe.speaking_rate,
         }
 
-        with open(recipe.clone_voice_path, "rb") as audio_file:
-            files = {"reference_audio_file": audio_file}
-
-            response = requests.post(
-                self.tts_endpoint,
-                data=data,
-                files=files,
-                stream=True,
-                timeout=self.MAXIMUM_GENERATION_TIME,
-            )
-
-            if response.status_code == 200:
-                with open(output_file_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                return Path(output_file_path)  # Return the saved file path
-            else:
-                error_msg = f"Error: {response.status_code} - {response.text}"
-                print(error_msg)
-                raise RuntimeError(error_msg)
+    @staticmethod
+    def _reference_audio_files(voice_path: str) -> dict:
+        """Return the multipart file field holding a reference voice."""
+        return {"reference_audio_file": (Path(voice_path).name, load_reference_audio(voice_path))}
 
     @override
     def play(self, text: str) -> None:
@@ -2,19 +2,23 @@
 Audio Generation Module
 """
 
+import os
 import random
+import shutil
 import tempfile
-import requests
-import time
 
-from zipfile import ZipFile
+from zipfile import BadZipFile, ZipFile
 from pathlib import Path
 from abc import ABC, abstractmethod
 
+from ct_logging import logger
 from ct_video_creator.environment_variables import TTM_SERVER_URL
 
 from typing_extensions import override
 
+from .service_client import get_service_client
+from .tts_cache import TTSCache
+
 
 class BackgroundMusicRecipeBase:
     """Base class for audio recipes."""
@@ -37,6 +41,9 @@ class IBackgroundMusicGenerator(ABC):
     An interface for audio generation classes.
     """
 
+    # Cache of previously generated music, checked before calling the server when set
+    cache: TTSCache | None = None
+
     @abstractmethod
     def text_to_music(self, recipe: "MusicGenRecipe", output_folder: Path) -> Path:
         """
@@ -55,32 +62,28 @@ class MusicGenGenerator(IBackgroundMusicGenerator):
 
     MAXIMUM_GENERATION_TIME = 60 * 5  # 5 minutes
     DEFAULT_VIDEO_DURATION_SECONDS = 30  # seconds
+    # ZIP responses larger than this are buffered on disk instead of in memory
+    RESPONSE_SPOOL_MAX_BYTES = 64 * 1024 * 1024
 
-    def __init__(self):
+    def __init__(self, cache: TTSCache | None = None):
         """
         Initialize the MusicGenGenerator class.
+
+        :param cache: Optional cache of previously generated music, checked before calling the server
         """
+        self.cache = cache
         self.endpoint = f"{TTM_SERVER_URL}"
         self.ttm_endpoint = f"{self.endpoint}/ttm"
+        self._client = get_service_client(self.endpoint)
 
         self._wait_for_service_ready()
 
     def _wait_for_service_ready(self, check_interval: int = 5):
         """
         Wait until the Text-to-Music service is ready to accept requests.
+        The result is shared by all generators and cached for a short time.
         """
-        max_tries = (5 * 60) / check_interval  # Wait up to 5 minutes
-        tries = 0
-        while tries < max_tries:
-            try:
-                response = requests.get(f"{self.endpoint}/health", timeout=10)
-                if response.ok:
-                    return
-            except requests.RequestException:
-                print("Waiting for Text-to-Music service to be ready...")
-                time.sleep(check_interval)
-            finally:
-                tries += 1
+        self._client.wait_until_ready(check_interval=check_interval)
 
     @override
     def text_to_music(self, recipe: "MusicGenRecipe", output_folder: Path) -> Path:
@@ -94,32 +97,68 @@ class MusicGenGenerator(IBackgroundMusicGenerator):
 
         data = {"prompt": recipe.prompt, "seed": recipe.seed, "seconds": self.DEFAULT_VIDEO_DURATION_SECONDS}
 
-        response = requests.post(
-            self.ttm_endpoint,
+        # The mood is not sent to the server, so only the generation parameters are part of the key
+        key = TTSCache.fingerprint(data, None)
+        output_stem = f"musicgen_{key[:16]}"
+        entry = self.cache.find(key) if self.cache is not None else None
+        if entry and self.cache.get(key, Path(output_folder) / f"{output_stem}{entry.suffix}"):
+            logger.info(f"Using cached background music for prompt: {recipe.prompt[:60]}")
+            return Path(output_folder) / f"{output_stem}{entry.suffix}"
+
+        response = self._client.post(
+            "ttm",
             data=data,
             stream=True,
             timeout=self.MAXIMUM_GENERATION_TIME,
         )
 
         if response.status_code == 200:
-            with tempfile.NamedTemporaryFile(suffix=".zip", prefix="musicgen_") as temp_zip:
-                for chunk in response.iter_content(chunk_size=8192):
-                    temp_zip.write(chunk)
-                temp_zip.flush()
-                temp_zip_path = Path(temp_zip.name)
-
-                extracted_files = []
-                with ZipFile(temp_zip_path, "r") as zipf:
-                    extracted_files = zipf.namelist()
-                    zipf.extractall(output_folder)
-
-                print(f"Music files extracted to {output_folder}")
-            return Path(output_folder) / extracted_files[0]
+            extracted_files = self._extract_response(response, Path(output_folder), output_stem)
+            print(f"Music files extracted to {output_folder}")
+            if self.cache is not None:
+                self.cache.put(key, extracted_files[0])
+            return extracted_files[0]
         else:
             error_msg = f"Error: {response.status_code} - {response.text}"
             print(error_msg)
             raise RuntimeError(error_msg)
 
+    def _extract_response(self, response, output_folder: Path, output_stem: str) -> list[Path]:
+        """
+        Extract the music files of a ZIP response into output_folder.
+
+        The body is buffered in a spooled temporary file, in memory unless it is very large, and each member is
+        copied to a temporary name next to its final path before being renamed, so readers never see partial files.
+        Files are named after output_stem, which is unique per prompt and seed, so concurrent generations never
+        overwrite each other.
+
+        :raises RuntimeError: If the response is not a valid ZIP archive or holds no files
+        """
+        extracted_files = []
+        with tempfile.SpooledTemporaryFile(max_size=self.RESPONSE_SPOOL_MAX_BYTES) as body:
+            for chunk in response.iter_content(chunk_size=65536):
+                body.write(chunk)
+            body.seek(0)
+
+            try:
+                with ZipFile(body) as zipf:
+                    members = [info for info in zipf.infolist() if not info.is_dir()]
+                    for index, info in enumerate(members):
+                        suffix = Path(info.filename).suffix
+                        name = f"{output_stem}{suffix}" if index == 0 else f"{output_stem}_{index}{suffix}"
+                        output_file_path = output_folder / name
+                        tmp_file_path = output_file_path.with_name(f".{output_file_path.name}.{os.getpid()}.part")
+                        with zipf.open(info) as source, open(tmp_file_path, "wb") as target:
+                            shutil.copyfileobj(source, target)
+                        os.replace(tmp_file_path, output_file_path)
+                        extracted_files.append(output_file_path)
+            except BadZipFile as e:
+                raise RuntimeError(f"Invalid music response: {e}") from e
+
+        if not extracted_files:
+            raise RuntimeError("Music response holds no files")
+        return extracted_files
+
 
 class MusicGenRecipe(BackgroundMusicRecipeBase):
     """Music generation recipe for creating music from text prompts."""
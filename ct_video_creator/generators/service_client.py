@@ -0,0 +1,125 @@
+"""
+Process-wide HTTP clients for the generation services (TTS, TTM).
+"""
+
+import threading
+import time
+
+import requests
+from ct_logging import logger
+from requests.adapters import HTTPAdapter
+
+
+class ServiceClient:
+    """
+    Keep-alive session and cached readiness state for one service URL.
+
+    All generator instances talking to the same service share one client, so connections are reused
+    and the health check only runs again once its result is older than ready_ttl.
+    """
+
+    DEFAULT_POOL_SIZE = 8
+    DEFAULT_READY_TTL_SECONDS = 60.0
+    DEFAULT_READY_TIMEOUT_SECONDS = 5 * 60
+    HEALTH_CHECK_INTERVAL_SECONDS = 5
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        ready_ttl: float = DEFAULT_READY_TTL_SECONDS,
+    ):
+        """
+        Initialize the client.
+
+        :param base_url: Service base URL
+        :param pool_size: Maximum number of kept-alive connections to the service
+        :param ready_ttl: Seconds a successful health check stays valid
+        """
+        self.base_url = base_url.rstrip("/")
+        self.ready_ttl = ready_ttl
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._ready_until = 0.0
+        self._ready_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        """Return the full URL of a service path."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def is_ready_cached(self) -> bool:
+        """Whether a recent health check succeeded."""
+        return time.monotonic() < self._ready_until
+
+    def mark_unready(self) -> None:
+        """Forget the cached health check, e.g. after a connection error."""
+        self._ready_until = 0.0
+
+    def wait_until_ready(
+        self,
+        timeout: float = DEFAULT_READY_TIMEOUT_SECONDS,
+        check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+    ) -> bool:
+        """
+        Wait until the service health endpoint answers.
+
+        Only one thread probes at a time; the others wait and reuse its result.
+
+        :param timeout: Maximum number of seconds to wait
+        :param check_interval: Seconds between health checks
+        :return: True if the service is ready, False if it did not answer in time
+        """
+        if self.is_ready_cached():
+            return True
+
+        with self._ready_lock:
+            if self.is_ready_cached():
+                return True
+
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    response = self.session.get(self.url("health"), timeout=10)
+                    if response.ok:
+                        self._ready_until = time.monotonic() + self.ready_ttl
+                        return True
+                except requests.RequestException:
+                    pass
+
+                if time.monotonic() + check_interval > deadline:
+                    logger.warning(f"Service {self.base_url} is not ready after {timeout}s")
+                    return False
+
+                logger.info(f"Waiting for service {self.base_url} to be ready...")
+                time.sleep(check_interval)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        """
+        Send a POST request through the pooled session.
+
+        :raises requests.RequestException: If the request fails
+        """
+        try:
+            return self.session.post(self.url(path), **kwargs)
+        except requests.ConnectionError:
+            self.mark_unready()
+            raise
+
+
+_clients: dict[str, ServiceClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_service_client(base_url: str) -> ServiceClient:
+    """Return the shared client of a service URL, creating it on first use."""
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = ServiceClient(key)
+            _clients[key] = client
+        return client
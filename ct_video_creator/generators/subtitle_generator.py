@@ -2,46 +2,44 @@
 Subtitle Generation Module
 """
 
+import copy
 from pathlib import Path
-import stable_whisper
+from typing import Any, Callable
+
 from ct_logging import logger
 from ct_video_creator.utils import SubtitleAlignment, SubtitlePosition
 
+from .transcription_cache import TranscriptionCache
+from .whisper_service import get_whisper_service
+
+# Options of the Whisper transcriptions and alignments, also part of the transcription cache keys
+TRANSCRIBE_OPTIONS = {"vad": True}
+ALIGN_OPTIONS: dict = {}
+
+# Mean word probability below which an alignment with the known text is replaced by a transcription
+MIN_ALIGNMENT_CONFIDENCE = 0.5
+
 
 class SubtitleGenerator:
     """
     A class to generate subtitles from video files and add them to videos.
     """
 
-    def __init__(self, model_size: str = "medium"):
+    def __init__(self, model_size: str | None = None, device: str | None = None, compute_type: str | None = None):
         """
         Initialize the SubtitleGenerator class.
 
-        :param model_size: Size of the Whisper model to use (tiny, base, small, medium, large)
-        """
-        logger.info(f"Initializing SubtitleGenerator with model size: {model_size}")
-        self.model_size = model_size
-        self._model = None
-
-    def _load_model(self):
-        """Load the Whisper model if not already loaded."""
-        if self._model is None:
-            logger.info(f"Loading Whisper model: {self.model_size}")
-            self._model = stable_whisper.load_model(self.model_size)
-            logger.info("Whisper model loaded successfully")
-        else:
-            logger.debug("Whisper model already loaded, reusing existing model")
-        return self._model
-
-    def _unload_model(self):
-        """Unload the Whisper model to free up resources."""
-        if self._model is not None:
-            logger.info("Unloading Whisper model to free up resources")
-            del self._model
-            self._model = None
-            logger.info("Whisper model unloaded successfully")
-        else:
-            logger.debug("No Whisper model loaded to unload")
+        The Whisper model is shared with every other generator using the same settings and stays loaded between
+        calls, see WhisperService.
+
+        :param model_size: Size of the Whisper model to use (tiny, base, small, medium, large), None for the
+            WHISPER_MODEL_SIZE setting
+        :param device: Torch device of the model, None for the WHISPER_DEVICE setting
+        :param compute_type: faster-whisper compute type (e.g. int8 on CPU), None for the WHISPER_COMPUTE_TYPE setting
+        """
+        self._whisper_service = get_whisper_service(model_size, device, compute_type)
+        self.model_size = self._whisper_service.model_size
+        logger.info(f"Initializing SubtitleGenerator with model size: {self.model_size}")
 
     def _format_timestamp(self, seconds: float) -> str:
         """
@@ -76,30 +74,9 @@ class SubtitleGenerator:
 
         logger.info(f"SRT file written successfully: {output_path.name}")
 
-    def generate_subtitles_from_audio(
-        self,
-        video_path: Path,
-        word_level: bool = False,
-        segment_level: bool = True,
-        font_size: int = 24,
-        margin: int = 50,
-        karaoke: bool = True,
-        position: SubtitlePosition = SubtitlePosition.BOTTOM,
-        alignment: SubtitleAlignment = SubtitleAlignment.CENTER,
-    ) -> tuple[Path, Path]:
-        """
-        Generate an ASS subtitle file from the audio track of a video.
-
-        :param video_path: Path to the input video file
-        :param word_level: Whether to use word-level timestamps
-        :param segment_level: Whether to use segment-level timestamps
-        :param font_size: Font size for subtitles
-        :param position: Vertical position (TOP, CENTER, BOTTOM)
-        :param margin: Vertical margin in pixels
-        :param alignment: Horizontal alignment (LEFT, CENTER, RIGHT, JUSTIFIED)
-        :return: tuple[Path, Path] Paths to the generated ASS and SRT files
-        """
-        # Calculate ASS alignment value based on vertical position and horizontal alignment
+    @staticmethod
+    def _ass_alignment(position: SubtitlePosition, alignment: SubtitleAlignment) -> int:
+        """Return the ASS alignment value of a vertical position and a horizontal alignment."""
         # ASS Alignment values (numpad layout):
         # 1=bottom-left, 2=bottom-center, 3=bottom-right
         # 4=middle-left, 5=middle-center, 6=middle-right
@@ -120,22 +97,33 @@ class SubtitleGenerator:
         }
 
         # Calculate final ASS alignment (1-9)
-        ass_alignment = position_row[position] + alignment_col[alignment] + 1
+        return position_row[position] + alignment_col[alignment] + 1
+
+    def _write_subtitle_files(
+        self,
+        result,
+        output_path: Path,
+        word_level: bool,
+        segment_level: bool,
+        font_size: int,
+        margin: int,
+        karaoke: bool,
+        position: SubtitlePosition,
+        alignment: SubtitleAlignment,
+    ) -> tuple[Path, Path]:
+        """
+        Write the ASS and SRT files of a transcription result next to output_path.
 
-        logger.info(f"Generating ASS subtitle file for video: {video_path.name}")
+        :return: tuple[Path, Path] Paths to the generated ASS and SRT files
+        """
+        ass_alignment = self._ass_alignment(position, alignment)
         logger.debug(
             f"Subtitle settings: position={position.value}, margin={margin}, "
             f"font_size={font_size}, alignment={alignment.value}, ass_alignment={ass_alignment}"
         )
-        logger.info(f"Transcribing audio from: {video_path.name}")
-        model = self._load_model()
-
-        logger.info("Starting audio transcription with Whisper")
-        result = model.transcribe(str(video_path), vad=True)
-        logger.info("Transcription completed.")
 
         # Generate ASS with custom styling parameters
-        output_ass_path = video_path.with_suffix(".ass")
+        output_ass_path = output_path.with_suffix(".ass")
         result.to_ass(  # type: ignore[attr-defined]
             str(output_ass_path),
             word_level=word_level,
@@ -147,9 +135,266 @@ class SubtitleGenerator:
         )
 
         # Generate SRT file
-        output_srt_path = video_path.with_suffix(".srt")
-        result.to_srt_vtt(str(output_srt_path), word_level=word_level, segment_level=segment_level)  # type: ignore[attr-defined]
-
-        self._unload_model()
+        output_srt_path = output_path.with_suffix(".srt")
+        result.to_srt_vtt(  # type: ignore[attr-defined]
+            str(output_srt_path), word_level=word_level, segment_level=segment_level
+        )
 
         return output_ass_path, output_srt_path
+
+    def generate_subtitles_from_audio(
+        self,
+        video_path: Path,
+        word_level: bool = False,
+        segment_level: bool = True,
+        font_size: int = 24,
+        margin: int = 50,
+        karaoke: bool = True,
+        position: SubtitlePosition = SubtitlePosition.BOTTOM,
+        alignment: SubtitleAlignment = SubtitleAlignment.CENTER,
+    ) -> tuple[Path, Path]:
+        """
+        Generate an ASS subtitle file from the audio track of a video.
+
+        :param video_path: Path to the input video file
+        :param word_level: Whether to use word-level timestamps
+        :param segment_level: Whether to use segment-level timestamps
+        :param font_size: Font size for subtitles
+        :param position: Vertical position (TOP, CENTER, BOTTOM)
+        :param margin: Vertical margin in pixels
+        :param alignment: Horizontal alignment (LEFT, CENTER, RIGHT, JUSTIFIED)
+        :return: tuple[Path, Path] Paths to the generated ASS and SRT files
+        """
+        return self.generate_subtitles_from_audio_files(
+            [video_path],
+            word_level=word_level,
+            segment_level=segment_level,
+            font_size=font_size,
+            margin=margin,
+            karaoke=karaoke,
+            position=position,
+            alignment=alignment,
+        )[0]
+
+    def generate_subtitles_from_audio_files(
+        self,
+        media_paths: list[Path],
+        word_level: bool = False,
+        segment_level: bool = True,
+        font_size: int = 24,
+        margin: int = 50,
+        karaoke: bool = True,
+        position: SubtitlePosition = SubtitlePosition.BOTTOM,
+        alignment: SubtitleAlignment = SubtitleAlignment.CENTER,
+    ) -> list[tuple[Path, Path]]:
+        """
+        Generate the ASS and SRT subtitle files of several audio or video files in one Whisper batch.
+
+        The parameters are the ones of generate_subtitles_from_audio.
+
+        :return: Paths to the generated ASS and SRT files of each input, in order
+        """
+        logger.info(f"Generating ASS subtitle files for {len(media_paths)} files")
+        logger.info("Starting audio transcription with Whisper")
+        results = self._whisper_service.transcribe_batch(media_paths, **TRANSCRIBE_OPTIONS)
+        logger.info("Transcription completed.")
+
+        return [
+            self._write_subtitle_files(
+                result, Path(media_path), word_level, segment_level, font_size, margin, karaoke, position, alignment
+            )
+            for media_path, result in zip(media_paths, results)
+        ]
+
+    def _cache_settings(self) -> dict:
+        """Return the settings identifying the transcriptions of this generator in a transcription cache."""
+        service = self._whisper_service
+        return {
+            "model_size": service.model_size,
+            "compute_type": service.compute_type,
+            "options": TRANSCRIBE_OPTIONS,
+        }
+
+    @staticmethod
+    def _cached_results(
+        media_paths: list[Path],
+        settings: list[dict],
+        cache: TranscriptionCache | None,
+        compute: Callable[[list[int]], list[Any]],
+    ) -> list[dict | None]:
+        """
+        Return the cached result of each file, computing the missing ones together.
+
+        :param settings: Cache settings of each file
+        :param compute: Called with the indexes of the missing files, returns their stable_whisper results (or None)
+        """
+        keys = [cache.key(path, item) if cache else None for path, item in zip(media_paths, settings)]
+        results: list[dict | None] = [cache.get(key) if cache else None for key in keys]
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            for index, result in zip(missing, compute(missing)):
+                if result is None:
+                    continue
+                results[index] = result.to_dict()
+                if cache:
+                    cache.put(keys[index], results[index])
+
+        return results
+
+    @staticmethod
+    def alignment_confidence(result: dict) -> float:
+        """Return the mean probability of the aligned words, 0 when no word was aligned."""
+        probabilities = [
+            word.get("probability") or 0.0
+            for segment in result.get("segments", [])
+            for word in segment.get("words") or []
+        ]
+        return sum(probabilities) / len(probabilities) if probabilities else 0.0
+
+    def _align_to_dicts(
+        self, media_paths: list[Path], texts: list[str], cache: TranscriptionCache | None
+    ) -> list[dict | None]:
+        """
+        Align known texts with their files, reusing cached alignments.
+
+        :return: The alignment of each file, or None where it failed or its confidence is below
+            MIN_ALIGNMENT_CONFIDENCE
+        """
+        settings = [{**self._cache_settings(), "align_text": text, "options": ALIGN_OPTIONS} for text in texts]
+        results = self._cached_results(
+            media_paths,
+            settings,
+            cache,
+            lambda missing: self._whisper_service.align_batch(
+                [media_paths[index] for index in missing], [texts[index] for index in missing], **ALIGN_OPTIONS
+            ),
+        )
+
+        for index, result in enumerate(results):
+            if result is None:
+                continue
+            confidence = self.alignment_confidence(result)
+            if confidence < MIN_ALIGNMENT_CONFIDENCE:
+                logger.warning(
+                    f"Alignment confidence of {Path(media_paths[index]).name} is {confidence:.2f}, "
+                    "transcribing it instead"
+                )
+                results[index] = None
+
+        return results
+
+    def transcribe_to_dicts(
+        self,
+        media_paths: list[Path],
+        cache: TranscriptionCache | None = None,
+        texts: list[str | None] | None = None,
+    ) -> list[dict]:
+        """
+        Transcribe several files, reusing the cached transcriptions of unchanged files.
+
+        Files with a known text are only aligned with it, which is much cheaper than transcribing them and keeps
+        the spelling of the text. They are transcribed when the alignment fails or its confidence is low. The
+        files missing from the cache are processed together in one Whisper batch.
+
+        :param texts: Spoken text of each file, None where it is unknown
+        :return: The transcription of each file as a stable_whisper result dictionary, in order
+        """
+        texts = texts or [None] * len(media_paths)
+        results: list[dict | None] = [None] * len(media_paths)
+
+        aligned = [index for index, text in enumerate(texts) if text and text.strip()]
+        if aligned:
+            alignments = self._align_to_dicts(
+                [media_paths[index] for index in aligned], [texts[index] for index in aligned], cache
+            )
+            for index, alignment in zip(aligned, alignments):
+                results[index] = alignment
+
+        remaining = [index for index, result in enumerate(results) if result is None]
+        logger.info(f"Aligned {len(media_paths) - len(remaining)} of {len(media_paths)} files, transcribing the others")
+        if remaining:
+            remaining_paths = [media_paths[index] for index in remaining]
+            transcriptions = self._cached_results(
+                remaining_paths,
+                [self._cache_settings()] * len(remaining),
+                cache,
+                lambda missing: self._whisper_service.transcribe_batch(
+                    [remaining_paths[index] for index in missing], **TRANSCRIBE_OPTIONS
+                ),
+            )
+            for index, transcription in zip(remaining, transcriptions):
+                results[index] = transcription
+
+        return results
+
+    @staticmethod
+    def merge_timelines(results: list[dict], offsets: list[float]) -> dict:
+        """
+        Merge transcriptions of consecutive clips into the transcription of the whole timeline.
+
+        :param results: stable_whisper result dictionaries of the clips
+        :param offsets: Start time of each clip in the timeline, in seconds
+        :return: A stable_whisper result dictionary whose segment and word times are relative to the timeline
+        """
+        merged_segments = []
+        for result, offset in zip(results, offsets):
+            for segment in result.get("segments", []):
+                shifted = copy.deepcopy(segment)
+                shifted["id"] = len(merged_segments)
+                shifted["start"] = segment["start"] + offset
+                shifted["end"] = segment["end"] + offset
+                for word in shifted.get("words") or []:
+                    word["start"] += offset
+                    word["end"] += offset
+                merged_segments.append(shifted)
+
+        language = next((result["language"] for result in results if result.get("language")), None)
+        return {
+            "text": "".join(segment.get("text", "") for segment in merged_segments),
+            "segments": merged_segments,
+            "language": language,
+        }
+
+    @staticmethod
+    def _result_from_dict(data: dict) -> Any:
+        """Build a stable_whisper result, able to write ASS and SRT files, from its dictionary."""
+        import stable_whisper  # pylint: disable=import-outside-toplevel
+
+        return stable_whisper.WhisperResult(data)
+
+    def generate_subtitles_from_segments(
+        self,
+        media_paths: list[Path],
+        offsets: list[float],
+        output_path: Path,
+        cache: TranscriptionCache | None = None,
+        texts: list[str | None] | None = None,
+        word_level: bool = False,
+        segment_level: bool = True,
+        font_size: int = 24,
+        margin: int = 50,
+        karaoke: bool = True,
+        position: SubtitlePosition = SubtitlePosition.BOTTOM,
+        alignment: SubtitleAlignment = SubtitleAlignment.CENTER,
+    ) -> tuple[Path, Path]:
+        """
+        Generate the subtitles of a video from the separate audio of its segments.
+
+        Each segment is transcribed on its own, e.g. the clean narrator of a scene instead of the final mix with
+        background music, and the transcriptions are placed on the video timeline at the segment offsets.
+
+        :param media_paths: Audio or video file of each segment
+        :param offsets: Start time of each segment in the video, in seconds
+        :param output_path: Path whose suffix is replaced by .ass and .srt for the subtitle files
+        :param cache: Transcription cache, so only changed segments are transcribed again
+        :param texts: Spoken text of each segment, aligned instead of transcribed (None where it is unknown)
+        :return: tuple[Path, Path] Paths to the generated ASS and SRT files
+        """
+        logger.info(f"Generating subtitles from {len(media_paths)} segments for: {output_path.name}")
+        results = self.transcribe_to_dicts(media_paths, cache, texts)
+        result = self._result_from_dict(self.merge_timelines(results, offsets))
+
+        return self._write_subtitle_files(
+            result, output_path, word_level, segment_level, font_size, margin, karaoke, position, alignment
+        )
@@ -0,0 +1,72 @@
+"""
+Persistent cache of Whisper transcriptions keyed by the audio content.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from ct_logging import logger
+
+from ct_video_creator.utils import file_digest
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of transcription results.
+
+    Each entry is stored as <key>.json in the cache folder, where the key hashes the content of the transcribed
+    file and the transcription settings (model, options). Re-assembling a chapter after editing one scene then
+    only transcribes the narrator of that scene again.
+    """
+
+    def __init__(self, cache_folder: Path):
+        """
+        Initialize the cache.
+
+        :param cache_folder: Folder where the transcription results are stored
+        """
+        self.cache_folder = Path(cache_folder)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(media_path: Path, settings: dict) -> str:
+        """
+        Build the key of a transcription from the file content and the transcription settings.
+
+        :param media_path: Transcribed audio or video file
+        :param settings: Model and transcription options affecting the result
+        """
+        payload = json.dumps({"media": file_digest(media_path), "settings": settings}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Return the cache file path of an entry."""
+        return self.cache_folder / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result of a key, or None on a miss."""
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as file:
+                result = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a transcription result."""
+        entry = self._entry_path(key)
+        tmp_entry = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_folder.mkdir(parents=True, exist_ok=True)
+            with open(tmp_entry, "w", encoding="utf-8") as file:
+                json.dump(result, file, ensure_ascii=False)
+            os.replace(tmp_entry, entry)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to store transcription {key[:12]} in the cache: {e}")
+            tmp_entry.unlink(missing_ok=True)
@@ -0,0 +1,126 @@
+"""
+Persistent cache of generated TTS audio keyed by the recipe fingerprint.
+
+The same cache is used for generated background music, with no reference voice in the fingerprint.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from ct_logging import logger
+
+from ct_video_creator.utils import file_digest, link_file
+
+
+class TTSCache:
+    """
+    Content-addressed cache of TTS results.
+
+    Each entry is stored as <fingerprint><suffix> in the cache folder, where the fingerprint hashes the
+    recipe parameters and the content of the reference voice. The modification time of an entry is
+    refreshed on every hit and the least recently used entries are evicted once the folder exceeds
+    max_bytes. Keeping the state on the filesystem lets several processes share the same cache.
+    Entries are copies or reflinks, never hard links: the generators rewrite their output files in place,
+    which would otherwise change the entry of the previous recipe.
+    """
+
+    DEFAULT_MAX_BYTES = 2 * 1024**3
+
+    def __init__(self, cache_folder: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        :param cache_folder: Folder where cached audio files are stored
+        :param max_bytes: Maximum total size of the cached files
+        """
+        self.cache_folder = Path(cache_folder)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(recipe_data: dict, voice_path: str | Path | None) -> str:
+        """
+        Build a stable key from the recipe parameters and the reference voice content.
+
+        The voice path itself is left out so that moving the voice file keeps the cache valid.
+
+        :param recipe_data: Recipe parameters, as returned by to_dict()
+        :param voice_path: Reference voice file used for cloning
+        """
+        data = {key: value for key, value in recipe_data.items() if key != "clone_voice_path"}
+        data["clone_voice_digest"] = file_digest(voice_path) if voice_path else None
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        """Return the cache file path of an entry."""
+        return self.cache_folder / f"{key}{suffix}"
+
+    def find(self, key: str) -> Path | None:
+        """Return the cached file of an entry whatever its suffix, or None on a miss."""
+        try:
+            return next((entry for entry in self.cache_folder.glob(f"{key}.*") if entry.is_file()), None)
+        except OSError:
+            return None
+
+    def get(self, key: str, output_file_path: Path) -> Path | None:
+        """
+        Place a cached result at output_file_path.
+
+        :return: output_file_path on a hit, None on a miss
+        """
+        entry = self._entry_path(key, output_file_path.suffix)
+        if not entry.is_file():
+            return None
+
+        try:
+            if link_file(entry, output_file_path, allow_hardlink=False) is None:
+                shutil.copyfile(entry, output_file_path)
+            os.utime(entry)
+        except OSError as e:
+            logger.warning(f"Failed to read TTS cache entry {entry.name}: {e}")
+            return None
+
+        logger.debug(f"TTS cache hit for {output_file_path.name}")
+        return output_file_path
+
+    def put(self, key: str, audio_path: Path) -> None:
+        """Store a generated audio file in the cache and evict old entries if needed."""
+        entry = self._entry_path(key, audio_path.suffix)
+        try:
+            self.cache_folder.mkdir(parents=True, exist_ok=True)
+            if link_file(audio_path, entry, allow_hardlink=False) is None:
+                tmp_entry = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+                shutil.copyfile(audio_path, tmp_entry)
+                os.replace(tmp_entry, entry)
+        except OSError as e:
+            logger.warning(f"Failed to store {audio_path.name} in the TTS cache: {e}")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            try:
+                entries = [(entry, entry.stat()) for entry in self.cache_folder.iterdir() if entry.is_file()]
+            except OSError:
+                return
+
+            total = sum(stat.st_size for _, stat in entries)
+            if total <= self.max_bytes:
+                return
+
+            for entry, stat in sorted(entries, key=lambda item: item[1].st_mtime_ns):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                    total -= stat.st_size
+                    logger.trace(f"Evicted TTS cache entry {entry.name}")
+                except OSError:
+                    continue
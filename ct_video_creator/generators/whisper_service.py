@@ -0,0 +1,228 @@
+"""
+Process-wide Whisper model workers shared by the subtitle generators.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable
+
+from ct_logging import logger
+
+from ct_video_creator.environment_variables import (
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_DEVICE,
+    WHISPER_IDLE_TIMEOUT_SECONDS,
+    WHISPER_MODEL_SIZE,
+)
+
+
+class WhisperService:
+    """
+    Keep one Whisper model loaded and run the jobs submitted to it on a worker thread.
+
+    The model is loaded by the first job and stays loaded while jobs keep coming, so consecutive chapters of a
+    batch run do not pay for loading it again. Jobs queued while the worker is busy are run as one batch, and
+    the model is unloaded once no job arrived for idle_timeout seconds.
+
+    Without a compute type the model is loaded with stable_whisper.load_model (openai-whisper). With one, e.g.
+    "int8" on CPU-only hosts or "float16" on GPUs, it is loaded through faster-whisper.
+    """
+
+    def __init__(
+        self,
+        model_size: str = WHISPER_MODEL_SIZE,
+        device: str | None = WHISPER_DEVICE or None,
+        compute_type: str | None = WHISPER_COMPUTE_TYPE or None,
+        idle_timeout: float = WHISPER_IDLE_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize the service.
+
+        :param model_size: Whisper model (tiny, base, small, medium, large, ...)
+        :param device: Torch device, e.g. "cuda" or "cpu" (None picks the default of the backend)
+        :param compute_type: faster-whisper compute type, e.g. "int8" (None uses openai-whisper)
+        :param idle_timeout: Seconds without jobs after which the model is unloaded
+        """
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.idle_timeout = idle_timeout
+
+        self.model_loads = 0
+        self.batches = 0
+
+        self._model = None
+        self._jobs: queue.Queue[tuple[Callable[[Any], Any], Future]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    def _load_model(self) -> Any:
+        """Load the Whisper model with the configured backend."""
+        # Imported here since importing stable_whisper loads torch
+        import stable_whisper  # pylint: disable=import-outside-toplevel
+
+        if self.compute_type:
+            return stable_whisper.load_faster_whisper(
+                self.model_size, device=self.device or "auto", compute_type=self.compute_type
+            )
+        return stable_whisper.load_model(self.model_size, device=self.device)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the model is currently loaded."""
+        return self._model is not None
+
+    def submit(self, job: Callable[[Any], Any]) -> Future:
+        """
+        Queue a job receiving the loaded model.
+
+        :param job: Callable run on the worker thread with the model as its only argument
+        :return: Future of the value returned by the job
+        """
+        future: Future = Future()
+        with self._worker_lock:
+            self._jobs.put((job, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name="whisper-service", daemon=True)
+                self._worker.start()
+        return future
+
+    def transcribe(self, audio_path: Path, **options) -> Any:
+        """
+        Transcribe an audio or video file.
+
+        :param options: Keyword arguments of the stable_whisper transcribe function, e.g. vad=True
+        :return: The stable_whisper WhisperResult
+        """
+        return self.transcribe_batch([audio_path], **options)[0]
+
+    def transcribe_batch(self, audio_paths: list[Path], **options) -> list[Any]:
+        """
+        Transcribe several files with one model load.
+
+        :param options: Keyword arguments of the stable_whisper transcribe function, e.g. vad=True
+        :return: The stable_whisper WhisperResult of each file, in order
+        :raises Exception: The first error raised by a transcription
+        """
+        futures = [
+            self.submit(lambda model, path=audio_path: self._transcribe(model, path, options))
+            for audio_path in audio_paths
+        ]
+        return [future.result() for future in futures]
+
+    def align_batch(self, audio_paths: list[Path], texts: list[str], **options) -> list[Any]:
+        """
+        Time known texts against audio files with one model load, without decoding the speech.
+
+        :param options: Keyword arguments of the stable_whisper align function, e.g. language="en"
+        :return: The stable_whisper WhisperResult of each file, or None where the alignment failed, in order
+        """
+        futures = [
+            self.submit(lambda model, path=audio_path, text=text: self._align(model, path, text, options))
+            for audio_path, text in zip(audio_paths, texts)
+        ]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _align(model: Any, audio_path: Path, text: str, options: dict) -> Any:
+        """Align a text with one file, returning None if the alignment fails."""
+        logger.info(f"Aligning narrator text with: {Path(audio_path).name}")
+        try:
+            return model.align(str(audio_path), text, **options)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Alignment of {Path(audio_path).name} failed: {e}")
+            return None
+
+    @staticmethod
+    def _transcribe(model: Any, audio_path: Path, options: dict) -> Any:
+        """Transcribe one file with the model of either backend."""
+        logger.info(f"Transcribing audio from: {Path(audio_path).name}")
+        # faster-whisper models expose the stable-ts transcription as transcribe_stable
+        transcribe = getattr(model, "transcribe_stable", None) or model.transcribe
+        return transcribe(str(audio_path), **options)
+
+    def _next_batch(self) -> list[tuple[Callable[[Any], Any], Future]]:
+        """Wait for a job, then take every job queued behind it. Return an empty batch after idle_timeout."""
+        try:
+            batch = [self._jobs.get(timeout=self.idle_timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _run_worker(self) -> None:
+        """Run queued jobs until the service stays idle for idle_timeout seconds."""
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                with self._worker_lock:
+                    # A job may have been queued after the timeout, keep the worker for it
+                    if not self._jobs.empty():
+                        continue
+                    self._worker = None
+                    self.unload()
+                    return
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[tuple[Callable[[Any], Any], Future]]) -> None:
+        """Run a batch of jobs with the loaded model."""
+        jobs = [(job, future) for job, future in batch if future.set_running_or_notify_cancel()]
+        if not jobs:
+            return
+
+        if self._model is None:
+            logger.info(f"Loading Whisper model: {self.model_size} (compute type: {self.compute_type or 'default'})")
+            try:
+                self._model = self._load_model()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error(f"Error loading Whisper model {self.model_size}: {e}")
+                for _, future in jobs:
+                    future.set_exception(e)
+                return
+            self.model_loads += 1
+            logger.info("Whisper model loaded successfully")
+
+        self.batches += 1
+        logger.debug(f"Running a batch of {len(jobs)} Whisper jobs")
+        for job, future in jobs:
+            try:
+                future.set_result(job(self._model))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                future.set_exception(e)
+
+    def unload(self) -> None:
+        """Unload the model to free its memory. The next job loads it again."""
+        if self._model is not None:
+            logger.info(f"Unloading Whisper model: {self.model_size}")
+            self._model = None
+
+
+_services: dict[tuple[str, str | None, str | None], WhisperService] = {}
+_services_lock = threading.Lock()
+
+
+def get_whisper_service(
+    model_size: str | None = None, device: str | None = None, compute_type: str | None = None
+) -> WhisperService:
+    """
+    Return the shared service of a model configuration, creating it on first use.
+
+    Arguments left to None use the WHISPER_* environment settings.
+    """
+    key = (
+        model_size or WHISPER_MODEL_SIZE,
+        device or WHISPER_DEVICE or None,
+        compute_type or WHISPER_COMPUTE_TYPE or None,
+    )
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = WhisperService(*key)
+            _services[key] = service
+        return service
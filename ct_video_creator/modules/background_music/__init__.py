@@ -1,11 +1,17 @@
 """AI Video Creator - Background Music Module"""
 
-# Background music components
-from .background_music_recipe import BackgroundMusicRecipe
-from .background_music_assets import BackgroundMusicAssets, BackgroundMusicAsset
-from .background_music_recipe_builder import BackgroundMusicRecipeBuilder
-from .background_music_asset_manager import BackgroundMusicAssetManager
+from ct_video_creator.utils.lazy_imports import lazy_attributes
 
+# Background music components
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".background_music_recipe": ["BackgroundMusicRecipe"],
+        ".background_music_assets": ["BackgroundMusicAssets", "BackgroundMusicAsset"],
+        ".background_music_recipe_builder": ["BackgroundMusicRecipeBuilder"],
+        ".background_music_asset_manager": ["BackgroundMusicAssetManager"],
+    },
+)
 
 __all__ = [
     # Background music classes
@@ -2,8 +2,13 @@
 Background music asset manager for creating background music assets from recipes.
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
 from ct_logging import logger
-from ct_video_creator.generators import IBackgroundMusicGenerator
+from ct_video_creator.environment_variables import TTM_SERVER_WORKERS
+from ct_video_creator.generators import IBackgroundMusicGenerator, TTSCache
 from ct_video_creator.utils import VideoCreatorPaths
 
 from .background_music_assets import BackgroundMusicAssets, BackgroundMusicAsset
@@ -36,6 +41,11 @@ class BackgroundMusicAssetManager:
         self.recipe = BackgroundMusicRecipe(video_creator_paths)
         self.background_music_assets = BackgroundMusicAssets(video_creator_paths)
 
+        # Generators are created once per type and shared by all scenes
+        self._music_generators: dict[type, IBackgroundMusicGenerator] = {}
+        self._music_cache = TTSCache(self._paths.ttm_cache_folder)
+        self._generators_lock = threading.Lock()
+
         # Ensure background_music_assets list has the same size as recipe
         self._synchronize_assets_with_recipe()
         self.background_music_assets.save_assets_to_file()
@@ -54,21 +64,43 @@ class BackgroundMusicAssetManager:
             :recipe_size
         ]
 
+    def _get_music_generator(self, generator_type: type) -> IBackgroundMusicGenerator:
+        """Return the shared generator instance of a type, creating it on first use."""
+        with self._generators_lock:
+            music_generator = self._music_generators.get(generator_type)
+            if music_generator is None:
+                music_generator = generator_type()
+                music_generator.cache = self._music_cache
+                self._music_generators[generator_type] = music_generator
+            return music_generator
+
+    def _generate_music(self, scene_index: int) -> Path:
+        """Generate the music file of a scene's recipe and return its path."""
+        recipe = self.recipe.music_recipes[scene_index]
+        audio_generator = self._get_music_generator(recipe.GENERATOR_TYPE)
+        logger.debug(f"Using audio generator: {type(audio_generator).__name__}")
+        return audio_generator.text_to_music(recipe=recipe, output_folder=self._paths.background_music_asset_folder)
+
+    @staticmethod
+    def _music_key(recipe) -> tuple:
+        """Return the parameters that determine the generated music of a recipe."""
+        return (type(recipe), recipe.prompt, getattr(recipe, "seed", None))
+
+    def _new_asset(self, output_audio: Path) -> BackgroundMusicAsset:
+        """Create an asset with the default settings."""
+        return BackgroundMusicAsset(
+            asset=output_audio, volume=self.DEFAULT_BACKGROUND_MUSIC_VOLUME, skip=self.DEFAULT_SKIP_MUSIC
+        )
+
     def generate_background_music_asset(self, scene_index: int):
         """Generate background music asset for a scene."""
         try:
             recipe = self.recipe.music_recipes[scene_index]
             previous_recipe = self.recipe.music_recipes[scene_index - 1] if scene_index > 0 else None
             if recipe != previous_recipe:
-                audio_generator: IBackgroundMusicGenerator = recipe.GENERATOR_TYPE()
-                output_folder = self._paths.background_music_asset_folder
-                logger.debug(f"Using audio generator: {type(audio_generator).__name__}")
+                output_audio = self._generate_music(scene_index)
 
-                output_audio = audio_generator.text_to_music(recipe=recipe, output_folder=output_folder)
-
-                self.background_music_assets.background_music_assets[scene_index] = BackgroundMusicAsset(
-                    asset=output_audio, volume=self.DEFAULT_BACKGROUND_MUSIC_VOLUME, skip=self.DEFAULT_SKIP_MUSIC
-                )
+                self.background_music_assets.background_music_assets[scene_index] = self._new_asset(output_audio)
                 self.background_music_assets.save_assets_to_file()
                 logger.info(f"Successfully generated background music for scene {scene_index + 1}: {output_audio.name}")
             else:
@@ -81,8 +113,15 @@ class BackgroundMusicAssetManager:
         except (IOError, OSError, RuntimeError) as e:
             logger.error(f"Failed to generate background music for scene {scene_index + 1}: {e}")
 
-    def generate_background_music_assets(self):
-        """Generate all missing background music assets from the recipe."""
+    def generate_background_music_assets(self, max_workers: int | None = None):
+        """
+        Generate all missing background music assets from the recipe.
+
+        Scenes sharing a prompt and seed are generated once: they reuse the music of an existing asset with the
+        same parameters, or share a single generation. Distinct prompts are sent to the TTM server concurrently.
+
+        :param max_workers: Number of prompts generated at the same time. Defaults to TTM_SERVER_WORKERS.
+        """
 
         logger.info("Starting background music asset generation process")
 
@@ -90,7 +129,48 @@ class BackgroundMusicAssetManager:
 
         logger.info(f"Found {len(missing)} scenes missing background music assets")
 
+        assets = self.background_music_assets.background_music_assets
+        existing: dict[tuple, Path] = {}
+        for scene_index, asset in enumerate(assets):
+            if asset is not None and asset.asset is not None and asset.asset.is_file():
+                existing.setdefault(self._music_key(self.recipe.music_recipes[scene_index]), asset.asset)
+
+        pending: dict[tuple, list[int]] = {}
         for scene_index in missing:
-            self.generate_background_music_asset(scene_index)
+            key = self._music_key(self.recipe.music_recipes[scene_index])
+            if key in existing:
+                assets[scene_index] = self._new_asset(existing[key])
+                logger.info(f"Using existing background music asset for scene {scene_index + 1} as recipe is unchanged")
+            else:
+                pending.setdefault(key, []).append(scene_index)
+
+        if len(missing) > sum(len(scene_indexes) for scene_indexes in pending.values()):
+            self.background_music_assets.save_assets_to_file()
+
+        max_workers = max(1, min(len(pending), max_workers if max_workers is not None else TTM_SERVER_WORKERS))
+        if pending:
+            logger.info(f"Generating {len(pending)} distinct background music prompts with {max_workers} workers")
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background_music") as executor:
+            futures = {
+                executor.submit(self._generate_music, scene_indexes[0]): scene_indexes
+                for scene_indexes in pending.values()
+            }
+            for future in as_completed(futures):
+                scene_indexes = futures[future]
+                try:
+                    output_audio = future.result()
+                except (IOError, OSError, RuntimeError) as e:
+                    for scene_index in scene_indexes:
+                        logger.error(f"Failed to generate background music for scene {scene_index + 1}: {e}")
+                    continue
+
+                for scene_index in scene_indexes:
+                    assets[scene_index] = self._new_asset(output_audio)
+                self.background_music_assets.save_assets_to_file()
+                logger.info(
+                    f"Successfully generated background music for scenes "
+                    f"{', '.join(str(index + 1) for index in scene_indexes)}: {output_audio.name}"
+                )
 
         logger.info("Background music asset generation process completed successfully")
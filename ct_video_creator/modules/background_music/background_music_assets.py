@@ -5,7 +5,7 @@ from pathlib import Path
 
 from ct_logging import logger
 from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
-from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old
+from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old, get_json_store
 
 
 class BackgroundMusicAsset:
@@ -59,29 +59,28 @@ class BackgroundMusicAssets:
         """Load assets from JSON file with security validation."""
         try:
             logger.debug(f"Loading background music assets from: {self.asset_file_path.name}")
-            with open(self.asset_file_path, "r", encoding="utf-8") as file:
-                data: dict = json.load(file)
-
-                assets = data.get("background_music_assets", [])
-                ensure_collection_index_exists(self.background_music_assets, len(assets) - 1)
-
-                # Load assets from the "assets" array format
-                for index, asset_dict in enumerate(assets):
-                    asset = asset_dict.get("asset")
-                    assembled_background_music_path = Path(asset) if asset else None
-                    assembled_background_music_path = (
-                        self._paths.unmask_asset_path(assembled_background_music_path)
-                        if assembled_background_music_path
-                        else None
-                    )
-                    volume = asset_dict.get("volume", 0.5)
-                    skip = asset_dict.get("skip", False)
-
-                    self.background_music_assets[index] = BackgroundMusicAsset(
-                        asset=assembled_background_music_path, volume=volume, skip=skip
-                    )
+            data: dict = get_json_store().load(self.asset_file_path)
+
+            assets = data.get("background_music_assets", [])
+            ensure_collection_index_exists(self.background_music_assets, len(assets) - 1)
+
+            # Load assets from the "assets" array format
+            for index, asset_dict in enumerate(assets):
+                asset = asset_dict.get("asset")
+                assembled_background_music_path = Path(asset) if asset else None
+                assembled_background_music_path = (
+                    self._paths.unmask_asset_path(assembled_background_music_path)
+                    if assembled_background_music_path
+                    else None
+                )
+                volume = asset_dict.get("volume", 0.5)
+                skip = asset_dict.get("skip", False)
+
+                self.background_music_assets[index] = BackgroundMusicAsset(
+                    asset=assembled_background_music_path, volume=volume, skip=skip
+                )
 
-                self.save_assets_to_file()
+            self.save_assets_to_file()
 
         except json.JSONDecodeError:
             logger.error(
@@ -103,30 +102,29 @@ class BackgroundMusicAssets:
     def save_assets_to_file(self) -> None:
         """Save the current state of the background music assets to a file with relative paths."""
         try:
-            with open(self.asset_file_path, "w", encoding="utf-8") as file:
-                assets = []
-
-                for index, asset in enumerate(self.background_music_assets, 1):
-
-                    asset_dict = asset.to_dict() if asset is not None else None
-                    if asset_dict:
-                        asset_dict["asset"] = (
-                            str(self._paths.mask_asset_path(asset.asset)) if asset and asset.asset else None
-                        )
-
-                    background_music_asset_data = {
-                        "index": index,
-                        "asset": "",
-                        "volume": 0.0,
-                        "skip": False,
-                    }
-                    if asset_dict:
-                        background_music_asset_data.update(asset_dict)
-
-                    assets.append(background_music_asset_data)
-
-                data = {"background_music_assets": assets}
-                json.dump(data, file, indent=4)
+            assets = []
+
+            for index, asset in enumerate(self.background_music_assets, 1):
+
+                asset_dict = asset.to_dict() if asset is not None else None
+                if asset_dict:
+                    asset_dict["asset"] = (
+                        str(self._paths.mask_asset_path(asset.asset)) if asset and asset.asset else None
+                    )
+
+                background_music_asset_data = {
+                    "index": index,
+                    "asset": "",
+                    "volume": 0.0,
+                    "skip": False,
+                }
+                if asset_dict:
+                    background_music_asset_data.update(asset_dict)
+
+                assets.append(background_music_asset_data)
+
+            data = {"background_music_assets": assets}
+            get_json_store().save(self.asset_file_path, data)
             logger.trace(f"Assets saved with {len(assets)} background music assets.")
         except IOError as e:
             logger.error(f"Error saving background music assets to {self.asset_file_path.name}: {e}")
@@ -7,7 +7,7 @@ from pathlib import Path
 
 from ct_logging import logger
 
-from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old
+from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old, get_json_store
 from ct_video_creator.generators import MusicGenRecipe
 
 
@@ -34,15 +34,14 @@ class BackgroundMusicRecipe:
     def _from_dict(self, file_path: Path) -> None:
         """Load background music recipe from a JSON file."""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                music_recipes = data.get("music_recipes", [])
+            data = get_json_store().load(file_path)
+            music_recipes = data.get("music_recipes", [])
 
-                for item in music_recipes:
-                    self.music_recipes.append(MusicGenRecipe.from_dict(item))
+            for item in music_recipes:
+                self.music_recipes.append(MusicGenRecipe.from_dict(item))
 
-                logger.info(f"Successfully loaded {len(self.music_recipes)} background music recipes")
-                self.save_current_state()
+            logger.info(f"Successfully loaded {len(self.music_recipes)} background music recipes")
+            self.save_current_state()
 
         except FileNotFoundError:
             logger.info(f"Recipe file not found: {file_path.name} - starting with empty recipe")
@@ -86,8 +85,7 @@ class BackgroundMusicRecipe:
             # Ensure parent directory exists
             self.recipe_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.recipe_path, "w", encoding="utf-8") as file:
-                json.dump(self.to_dict(), file, ensure_ascii=False, indent=4)
+            get_json_store().save(self.recipe_path, self.to_dict(), ensure_ascii=False)
         except IOError as e:
             logger.error(f"Error saving background music recipe to {self.recipe_path.name}: {e}")
 
@@ -1,12 +1,17 @@
 """AI Video Creator - Narrator and Image Module"""
 
-# Updated asset manager that uses separate components
-# Separate image components
-from .image_recipe import ImageRecipe
-from .image_assets import ImageAssets
-from .image_recipe_builder import ImageRecipeBuilder
-from .image_asset_manager import ImageAssetManager
+from ct_video_creator.utils.lazy_imports import lazy_attributes
 
+# Separate image components
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".image_recipe": ["ImageRecipe"],
+        ".image_assets": ["ImageAssets"],
+        ".image_recipe_builder": ["ImageRecipeBuilder"],
+        ".image_asset_manager": ["ImageAssetManager"],
+    },
+)
 
 __all__ = [
     # Separate image classes
@@ -6,7 +6,7 @@ import json
 from pathlib import Path
 
 from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
-from ct_video_creator.utils import backup_file_to_old
+from ct_video_creator.utils import backup_file_to_old, get_json_store
 from ct_logging import logger
 
 
@@ -28,8 +28,7 @@ class ImageAssets:
         """Load assets from JSON file with security validation."""
         try:
             logger.debug(f"Loading image assets from: {self.asset_file_path.name}")
-            with open(self.asset_file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
+            data = get_json_store().load(self.asset_file_path)
 
             self.image_assets = []
             for asset_data in data.get("assets", []):
@@ -71,8 +70,7 @@ class ImageAssets:
                     image_assets_data.append({"index": index, "image": str(relative_path)})
 
             data = {"assets": image_assets_data}
-            with open(self.asset_file_path, "w", encoding="utf-8") as file:
-                json.dump(data, file, ensure_ascii=False, indent=4)
+            get_json_store().save(self.asset_file_path, data, ensure_ascii=False)
             logger.trace(f"Image assets saved with {len(image_assets_data)} items")
         except IOError as e:
             logger.error(f"Error saving image assets to {self.asset_file_path.name}: {e}")
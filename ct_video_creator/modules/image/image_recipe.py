@@ -8,7 +8,7 @@ from pathlib import Path
 from ct_logging import logger
 
 from ct_video_creator.generators import FluxImageRecipe
-from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old
+from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old, get_json_store
 
 
 class ImageRecipe:
@@ -33,16 +33,15 @@ class ImageRecipe:
     def _load_from_file(self, file_path: Path) -> None:
         """Load image recipe from a JSON file."""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                self.recipes_data = [self._create_recipe_from_dict(item) for item in data["image_data"]]
+            data = get_json_store().load(file_path)
+            self.recipes_data = [self._create_recipe_from_dict(item) for item in data["image_data"]]
 
-                for image_data in data["image_data"]:
-                    extra_data = image_data.get("extra_data", {})
-                    self.extra_image_data.append(extra_data)
+            for image_data in data["image_data"]:
+                extra_data = image_data.get("extra_data", {})
+                self.extra_image_data.append(extra_data)
 
-                logger.info(f"Successfully loaded {len(self.recipes_data)} image recipes")
-                self.save_current_state()
+            logger.info(f"Successfully loaded {len(self.recipes_data)} image recipes")
+            self.save_current_state()
 
         except FileNotFoundError:
             logger.info(f"Image recipe file not found: {file_path.name} - starting with empty recipe")
@@ -91,8 +90,7 @@ class ImageRecipe:
     def save_current_state(self) -> None:
         """Save the current state of the image recipe to a file."""
         try:
-            with open(self.recipe_path, "w", encoding="utf-8") as file:
-                json.dump(self.to_dict(), file, ensure_ascii=False, indent=4)
+            get_json_store().save(self.recipe_path, self.to_dict(), ensure_ascii=False)
         except IOError as e:
             logger.error(f"Error saving image recipe to {self.recipe_path.name}: {e}")
 
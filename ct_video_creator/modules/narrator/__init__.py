@@ -1,11 +1,17 @@
 """AI Video Creator - Narrator and Image Module"""
 
-# Separate narrator components
-from .narrator_recipe import NarratorRecipe, NarratorRecipeDefaultSettings
-from .narrator_assets import NarratorAssets
-from .narrator_recipe_builder import NarratorRecipeBuilder
-from .narrator_asset_manager import NarratorAssetManager
+from ct_video_creator.utils.lazy_imports import lazy_attributes
 
+# Separate narrator components
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".narrator_recipe": ["NarratorRecipe", "NarratorRecipeDefaultSettings"],
+        ".narrator_assets": ["NarratorAssets"],
+        ".narrator_recipe_builder": ["NarratorRecipeBuilder"],
+        ".narrator_asset_manager": ["NarratorAssetManager"],
+    },
+)
 
 __all__ = [
     # Separate narrator classes
@@ -2,8 +2,14 @@
 Narrator asset builder for creating narrator assets from recipes.
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
 from ct_logging import logger
-from ct_video_creator.generators import IAudioGenerator
+from ct_video_creator.environment_variables import TTS_BATCH_SIZE, TTS_SERVER_WORKERS
+from ct_video_creator.generators import IAudioGenerator, TTSCache
 from ct_video_creator.utils import VideoCreatorPaths
 
 from .narrator_assets import NarratorAssets
@@ -13,6 +19,9 @@ from .narrator_recipe import NarratorRecipe
 class NarratorAssetManager:
     """Class to build narrator assets from recipes."""
 
+    # Minimum number of seconds between asset file writes while generating in parallel
+    SAVE_INTERVAL_SECONDS = 5.0
+
     def __init__(self, video_creator_paths: VideoCreatorPaths):
         """Initialize NarratorAssetBuilder with story folder and chapter index."""
         self._paths = video_creator_paths
@@ -33,6 +42,11 @@ class NarratorAssetManager:
         self.recipe = NarratorRecipe(video_creator_paths)
         self.narrator_assets = NarratorAssets(video_creator_paths)
 
+        # Generators are created once per type and shared by all scenes
+        self._audio_generators: dict[type, IAudioGenerator] = {}
+        self._tts_cache = TTSCache(self._paths.tts_cache_folder)
+        self._generators_lock = threading.Lock()
+
         # Ensure narrator_assets list has the same size as recipe
         self._synchronize_assets_with_recipe()
 
@@ -52,23 +66,68 @@ class NarratorAssetManager:
             f"Narrator asset synchronization completed - narrator assets: {len(self.narrator_assets.narrator_assets)}"
         )
 
+    def _get_audio_generator(self, generator_type: type) -> IAudioGenerator:
+        """Return the shared generator instance of a type, creating it on first use."""
+        with self._generators_lock:
+            audio_generator = self._audio_generators.get(generator_type)
+            if audio_generator is None:
+                audio_generator = generator_type()
+                audio_generator.cache = self._tts_cache
+                self._audio_generators[generator_type] = audio_generator
+            return audio_generator
+
+    def _narrator_output_path(self, scene_index: int) -> Path:
+        """Return the narrator audio file path of a scene."""
+        return self._paths.narrator_asset_folder / f"{self.output_file_prefix}_narrator_{scene_index+1:03}.mp3"
+
+    def _generate_narrator_audio(self, scene_index: int) -> Path:
+        """Generate the narrator audio file of a scene and return its path."""
+        logger.info(f"Generating narrator asset for scene {scene_index + 1}")
+        audio = self.recipe.narrator_data[scene_index]
+        audio_generator = self._get_audio_generator(audio.GENERATOR_TYPE)
+        output_audio_file_path = self._narrator_output_path(scene_index)
+        logger.debug(
+            f"Using audio generator: {type(audio_generator).__name__} for file: {output_audio_file_path.name}"
+        )
+
+        return audio_generator.clone_text_to_speech(
+            recipe=audio,
+            output_file_path=output_audio_file_path,
+        )
+
+    def _generate_narrator_batch(self, scene_indexes: list[int]) -> list[Path | None]:
+        """
+        Generate the narrator audio files of scenes sharing a generator type.
+
+        :return: The audio file of each scene, or None for the scenes that failed
+        """
+        if len(scene_indexes) == 1:
+            return [self._generate_narrator_audio(scene_indexes[0])]
+
+        logger.info(f"Generating narrator assets for scenes {', '.join(str(index + 1) for index in scene_indexes)}")
+        recipes = [self.recipe.narrator_data[scene_index] for scene_index in scene_indexes]
+        audio_generator = self._get_audio_generator(recipes[0].GENERATOR_TYPE)
+        return audio_generator.clone_text_to_speech_batch(
+            recipes=recipes,
+            output_file_paths=[self._narrator_output_path(scene_index) for scene_index in scene_indexes],
+        )
+
+    def _split_into_batches(self, missing: list[int], batch_size: int) -> list[list[int]]:
+        """Split scenes into batches of at most batch_size scenes using the same generator type."""
+        by_generator: dict[object, list[int]] = {}
+        for scene_index in missing:
+            by_generator.setdefault(self.recipe.narrator_data[scene_index].GENERATOR_TYPE, []).append(scene_index)
+
+        return [
+            scene_indexes[start : start + batch_size]
+            for scene_indexes in by_generator.values()
+            for start in range(0, len(scene_indexes), batch_size)
+        ]
+
     def generate_narrator_asset(self, scene_index: int):
         """Generate narrator asset for a scene."""
         try:
-            logger.info(f"Generating narrator asset for scene {scene_index + 1}")
-            audio = self.recipe.narrator_data[scene_index]
-            audio_generator: IAudioGenerator = audio.GENERATOR_TYPE()
-            output_audio_file_path = (
-                self._paths.narrator_asset_folder / f"{self.output_file_prefix}_narrator_{scene_index+1:03}.mp3"
-            )
-            logger.debug(
-                f"Using audio generator: {type(audio_generator).__name__} for file: {output_audio_file_path.name}"
-            )
-
-            output_audio = audio_generator.clone_text_to_speech(
-                recipe=audio,
-                output_file_path=output_audio_file_path,
-            )
+            output_audio = self._generate_narrator_audio(scene_index)
 
             self.narrator_assets.set_scene_narrator(scene_index, output_audio)
             self.narrator_assets.save_assets_to_file()
@@ -77,8 +136,53 @@ class NarratorAssetManager:
         except (IOError, OSError, RuntimeError) as e:
             logger.error(f"Failed to generate narrator for scene {scene_index + 1}: {e}")
 
-    def generate_narrator_assets(self):
-        """Generate all missing narrator assets from the recipe."""
+    def _generate_narrator_assets_parallel(self, missing: list[int], max_workers: int, batch_size: int = 1) -> None:
+        """
+        Generate narrator assets with up to max_workers requests in flight, each holding up to batch_size scenes.
+
+        The asset file is written at most every SAVE_INTERVAL_SECONDS while scenes finish, and once at the end.
+        """
+        last_save = time.monotonic()
+        unsaved = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="narrator") as executor:
+            futures = {
+                executor.submit(self._generate_narrator_batch, scene_indexes): scene_indexes
+                for scene_indexes in self._split_into_batches(missing, batch_size)
+            }
+            for future in as_completed(futures):
+                scene_indexes = futures[future]
+                try:
+                    output_audios = future.result()
+                except (IOError, OSError, RuntimeError) as e:
+                    for scene_index in scene_indexes:
+                        logger.error(f"Failed to generate narrator for scene {scene_index + 1}: {e}")
+                    continue
+
+                for scene_index, output_audio in zip(scene_indexes, output_audios):
+                    if output_audio is None:
+                        logger.error(f"Failed to generate narrator for scene {scene_index + 1}")
+                        continue
+                    self.narrator_assets.set_scene_narrator(scene_index, output_audio)
+                    unsaved += 1
+                    logger.info(f"Successfully generated narrator for scene {scene_index + 1}: {output_audio.name}")
+
+                if time.monotonic() - last_save >= self.SAVE_INTERVAL_SECONDS:
+                    self.narrator_assets.save_assets_to_file()
+                    last_save = time.monotonic()
+                    unsaved = 0
+
+        if unsaved:
+            self.narrator_assets.save_assets_to_file()
+
+    def generate_narrator_assets(self, max_workers: int | None = None, batch_size: int | None = None):
+        """
+        Generate all missing narrator assets from the recipe.
+
+        :param max_workers: Number of requests sent at the same time. Defaults to TTS_SERVER_WORKERS, so
+            the TTS server is never sent more requests than it can process at once.
+        :param batch_size: Number of scenes synthesized per request. Defaults to TTS_BATCH_SIZE.
+        """
 
         logger.info("Starting narrator asset generation process")
 
@@ -86,8 +190,15 @@ class NarratorAssetManager:
 
         logger.info(f"Found {len(missing)} scenes missing narrator assets")
 
-        for scene_index in missing:
-            logger.info(f"Processing narrator for scene {scene_index + 1}...")
-            self.generate_narrator_asset(scene_index)
+        max_workers = max(1, max_workers if max_workers is not None else TTS_SERVER_WORKERS)
+        batch_size = max(1, batch_size if batch_size is not None else TTS_BATCH_SIZE)
+
+        if (max_workers > 1 or batch_size > 1) and len(missing) > 1:
+            logger.info(f"Generating narrators with {max_workers} requests of up to {batch_size} scenes in flight")
+            self._generate_narrator_assets_parallel(missing, max_workers, batch_size)
+        else:
+            for scene_index in missing:
+                logger.info(f"Processing narrator for scene {scene_index + 1}...")
+                self.generate_narrator_asset(scene_index)
 
         logger.info("Narrator asset generation process completed successfully")
\ No newline at end of file
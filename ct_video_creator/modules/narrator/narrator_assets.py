@@ -5,7 +5,7 @@ Narrator assets for managing narrator-specific asset data and persistence.
 import json
 from pathlib import Path
 
-from ct_video_creator.utils import VideoCreatorPaths, ensure_collection_index_exists, backup_file_to_old
+from ct_video_creator.utils import VideoCreatorPaths, ensure_collection_index_exists, backup_file_to_old, get_json_store
 from ct_logging import logger
 
 
@@ -26,8 +26,7 @@ class NarratorAssets:
         """Load assets from JSON file with security validation."""
         try:
             logger.debug(f"Loading narrator assets from: {self._asset_file_path.name}")
-            with open(self._asset_file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
+            data = get_json_store().load(self._asset_file_path)
 
             self.narrator_assets = []
             for asset_data in data.get("assets", []):
@@ -69,8 +68,7 @@ class NarratorAssets:
                     narrator_assets_data.append({"index": index, "narrator": str(relative_path)})
 
             data = {"assets": narrator_assets_data}
-            with open(self._asset_file_path, "w", encoding="utf-8") as file:
-                json.dump(data, file, ensure_ascii=False, indent=4)
+            get_json_store().save(self._asset_file_path, data, ensure_ascii=False)
             logger.trace(f"Narrator assets saved with {len(narrator_assets_data)} items")
         except IOError as e:
             logger.error(f"Error saving narrator assets to {self._asset_file_path.name}: {e}")
@@ -7,7 +7,7 @@ from pathlib import Path
 
 from ct_logging import logger
 
-from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old
+from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old, get_json_store
 from ct_video_creator.generators import ZonosTTSRecipe
 from ct_video_creator.environment_variables import DEFAULT_ASSETS_FOLDER
 
@@ -39,12 +39,12 @@ class NarratorRecipe:
     def _load_from_file(self, file_path: Path) -> None:
         """Load narrator recipe from a JSON file."""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                self.narrator_data = [self._create_recipe_from_dict(item) for item in data["narrator_data"]]
+            data = get_json_store().load(file_path)
+            self.narrator_data = [self._create_recipe_from_dict(item) for item in data["narrator_data"]]
 
-                logger.info(f"Successfully loaded {len(self.narrator_data)} narrator recipes")
-                self.save_current_state()
+            logger.info(f"Successfully loaded {len(self.narrator_data)} narrator recipes")
+            # Refreshes the available voices listed in the file; skipped by the store when nothing changed
+            self.save_current_state()
 
         except FileNotFoundError:
             logger.info(f"Narrator recipe file not found: {file_path.name} - starting with empty recipe")
@@ -104,8 +104,7 @@ class NarratorRecipe:
     def save_current_state(self) -> None:
         """Save the current state of the narrator recipe to a file."""
         try:
-            with open(self.recipe_path, "w", encoding="utf-8") as file:
-                json.dump(self.to_dict(), file, ensure_ascii=False, indent=4)
+            get_json_store().save(self.recipe_path, self.to_dict(), ensure_ascii=False)
         except IOError as e:
             logger.error(f"Error saving narrator recipe to {self.recipe_path.name}: {e}")
 
@@ -1,8 +1,14 @@
 """AI Video Creator - Narrator and Image Module"""
 
-# Updated asset manager that uses separate components
-from .narrator_and_image_asset_manager import NarratorAndImageAssetManager
+from ct_video_creator.utils.lazy_imports import lazy_attributes
 
+# Updated asset manager that uses separate components
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".narrator_and_image_asset_manager": ["NarratorAndImageAssetManager"],
+    },
+)
 
 __all__ = [
     # Main asset manager (now using separate components)
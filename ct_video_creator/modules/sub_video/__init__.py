@@ -2,11 +2,18 @@
 Module for sub-video related functionalities.
 """
 
-from .sub_video_recipe import SubVideoRecipe, SubVideoRecipeDefaultSettings
-from .sub_video_recipe_builder import SubVideoI2VRecipeBuilder
-from .sub_video_t2v_recipe_builder import SubVideoT2VRecipeBuilder
-from .sub_video_asset_manager import SubVideoAssetManager
-from .sub_video_assets import SubVideoAssets
+from ct_video_creator.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".sub_video_recipe": ["SubVideoRecipe", "SubVideoRecipeDefaultSettings"],
+        ".sub_video_recipe_builder": ["SubVideoI2VRecipeBuilder"],
+        ".sub_video_t2v_recipe_builder": ["SubVideoT2VRecipeBuilder"],
+        ".sub_video_asset_manager": ["SubVideoAssetManager"],
+        ".sub_video_assets": ["SubVideoAssets"],
+    },
+)
 
 __all__ = [
     "SubVideoRecipeDefaultSettings",
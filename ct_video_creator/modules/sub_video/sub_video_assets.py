@@ -5,7 +5,7 @@ from pathlib import Path
 
 from ct_logging import logger
 from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
-from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old
+from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old, get_json_store
 
 
 class SubVideoAssets:
@@ -26,32 +26,31 @@ class SubVideoAssets:
         """Load assets from JSON file with security validation."""
         try:
             logger.debug(f"Loading video assets from: {self.asset_file_path.name}")
-            with open(self.asset_file_path, "r", encoding="utf-8") as file:
-                data: dict = json.load(file)
+            data: dict = get_json_store().load(self.asset_file_path)
+
+            assets = data.get("assets", [])
+            ensure_collection_index_exists(self.assembled_sub_videos, len(assets) - 1)
+            ensure_collection_index_exists(self.sub_video_assets, len(assets) - 1, [])
+
+            # Load assets from the "assets" array format
+            for index, asset in enumerate(assets):
+
+                # Load video asset with security validation
+                video_value = asset.get("video_asset")
+                assembled_video_path = Path(video_value) if video_value else None
+                self.assembled_sub_videos[index] = (
+                    self._paths.unmask_asset_path(assembled_video_path) if assembled_video_path else None
+                )
+
+                sub_video_assets = asset.get("sub_video_assets", [])
+                for sub_video in sub_video_assets:
+                    if sub_video is not None and sub_video != "":
+                        sub_video_path = Path(sub_video)
+                        self.sub_video_assets[index].append(
+                            self._paths.unmask_asset_path(sub_video_path) if sub_video_path else None
+                        )
 
-                assets = data.get("assets", [])
-                ensure_collection_index_exists(self.assembled_sub_videos, len(assets) - 1)
-                ensure_collection_index_exists(self.sub_video_assets, len(assets) - 1, [])
-
-                # Load assets from the "assets" array format
-                for index, asset in enumerate(assets):
-
-                    # Load video asset with security validation
-                    video_value = asset.get("video_asset")
-                    assembled_video_path = Path(video_value) if video_value else None
-                    self.assembled_sub_videos[index] = (
-                        self._paths.unmask_asset_path(assembled_video_path) if assembled_video_path else None
-                    )
-
-                    sub_video_assets = asset.get("sub_video_assets", [])
-                    for sub_video in sub_video_assets:
-                        if sub_video is not None and sub_video != "":
-                            sub_video_path = Path(sub_video)
-                            self.sub_video_assets[index].append(
-                                self._paths.unmask_asset_path(sub_video_path) if sub_video_path else None
-                            )
-
-                self.save_assets_to_file()
+            self.save_assets_to_file()
 
         except json.JSONDecodeError:
             logger.error(
@@ -75,37 +74,36 @@ class SubVideoAssets:
     def save_assets_to_file(self) -> None:
         """Save the current state of the video assets to a file with relative paths."""
         try:
-            with open(self.asset_file_path, "w", encoding="utf-8") as file:
-                assets = []
-                # Ensure both lists have the same length
-                max_length = max(len(self.assembled_sub_videos), len(self.sub_video_assets))
-
-                for i in range(max_length):
-                    video_asset = self.assembled_sub_videos[i] if i < len(self.assembled_sub_videos) else None
-                    sub_video_assets = self.sub_video_assets[i] if i < len(self.sub_video_assets) else []
-
-                    # Convert paths to relative paths for storage
-                    video_asset_relative = None
-                    if video_asset is not None:
-                        video_asset_relative = str(self._paths.mask_asset_path(video_asset))
-
-                    sub_video_assets_relative = []
-                    for sub_video_asset in sub_video_assets:
-                        if sub_video_asset is not None:
-                            sub_video_assets_relative.append(str(self._paths.mask_asset_path(sub_video_asset)))
-                        else:
-                            sub_video_assets_relative.append(None)
-
-                    videos = {
-                        "index": i + 1,
-                        "video_asset": video_asset_relative,
-                        "sub_video_assets": sub_video_assets_relative,
-                    }
-
-                    assets.append(videos)
-
-                data = {"assets": assets}
-                json.dump(data, file, indent=4)
+            assets = []
+            # Ensure both lists have the same length
+            max_length = max(len(self.assembled_sub_videos), len(self.sub_video_assets))
+
+            for i in range(max_length):
+                video_asset = self.assembled_sub_videos[i] if i < len(self.assembled_sub_videos) else None
+                sub_video_assets = self.sub_video_assets[i] if i < len(self.sub_video_assets) else []
+
+                # Convert paths to relative paths for storage
+                video_asset_relative = None
+                if video_asset is not None:
+                    video_asset_relative = str(self._paths.mask_asset_path(video_asset))
+
+                sub_video_assets_relative = []
+                for sub_video_asset in sub_video_assets:
+                    if sub_video_asset is not None:
+                        sub_video_assets_relative.append(str(self._paths.mask_asset_path(sub_video_asset)))
+                    else:
+                        sub_video_assets_relative.append(None)
+
+                videos = {
+                    "index": i + 1,
+                    "video_asset": video_asset_relative,
+                    "sub_video_assets": sub_video_assets_relative,
+                }
+
+                assets.append(videos)
+
+            data = {"assets": assets}
+            get_json_store().save(self.asset_file_path, data)
             logger.trace(f"Assets saved with {len(assets)} scene assets")
         except IOError as e:
             logger.error(f"Error saving video assets to {self.asset_file_path.name}: {e}")
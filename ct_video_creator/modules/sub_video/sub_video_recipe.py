@@ -12,7 +12,7 @@ from ct_video_creator.generators import (
     WanT2VRecipe,
 )
 
-from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old
+from ct_video_creator.utils import VideoCreatorPaths, backup_file_to_old, get_json_store
 from ct_video_creator.environment_variables import DEFAULT_ASSETS_FOLDER
 
 
@@ -48,18 +48,17 @@ class SubVideoRecipe:
     def _from_dict(self, file_path: Path) -> None:
         """Load video recipe from a JSON file."""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                video_data = data.get("video_data", [])
+            data = get_json_store().load(file_path)
+            video_data = data.get("video_data", [])
 
-                for item in video_data:
-                    recipe_list = item.get("recipe_list", [])
-                    self.video_data.append([self._create_recipe_from_dict(recipe) for recipe in recipe_list])
-                    extra_data = item.get("extra_data", {})
-                    self.extra_data.append(extra_data)
+            for item in video_data:
+                recipe_list = item.get("recipe_list", [])
+                self.video_data.append([self._create_recipe_from_dict(recipe) for recipe in recipe_list])
+                extra_data = item.get("extra_data", {})
+                self.extra_data.append(extra_data)
 
-                logger.info(f"Successfully loaded {len(self.video_data)} video recipes")
-                self.save_current_state()
+            logger.info(f"Successfully loaded {len(self.video_data)} video recipes")
+            self.save_current_state()
 
         except FileNotFoundError:
             logger.info(f"Recipe file not found: {file_path.name} - starting with empty recipe")
@@ -181,12 +180,10 @@ class SubVideoRecipe:
             # Ensure parent directory exists
             self.recipe_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.recipe_path, "w", encoding="utf-8") as file:
-                json.dump(self.to_dict(), file, ensure_ascii=False, indent=4)
+            get_json_store().save(self.recipe_path, self.to_dict(), ensure_ascii=False)
 
             helper_file_path = self.recipe_path.with_name(self.recipe_path.stem + "_copy_paste_helper.json")
-            with open(helper_file_path, "w", encoding="utf-8") as helper_file:
-                json.dump(self._create_temp_copy_paste_helper_file(), helper_file, ensure_ascii=False, indent=4)
+            get_json_store().save(helper_file_path, self._create_temp_copy_paste_helper_file(), ensure_ascii=False)
         except IOError as e:
             logger.error(f"Error saving video recipe to {self.recipe_path.name}: {e}")
 
@@ -2,10 +2,17 @@
 Module for video assembly functionalities.
 """
 
-from .video_assembler_recipe import VideoAssemblerRecipe
-from .video_assembler_recipe_builder import VideoAssemblerRecipeBuilder
-from .video_assembler import VideoAssembler
-from .video_assembler_assets import VideoAssemblerAssets
+from ct_video_creator.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".video_assembler_recipe": ["VideoAssemblerRecipe"],
+        ".video_assembler_recipe_builder": ["VideoAssemblerRecipeBuilder"],
+        ".video_assembler": ["VideoAssembler"],
+        ".video_assembler_assets": ["VideoAssemblerAssets"],
+    },
+)
 
 __all__ = [
     "VideoAssemblerRecipeBuilder",
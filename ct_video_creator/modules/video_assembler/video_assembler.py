@@ -12,11 +12,11 @@ from ct_logging import logger
 from ct_video_creator.comfyui import ComfyUIRequests
 from ct_video_creator.modules.background_music import BackgroundMusicAssets, BackgroundMusicAsset
 from ct_video_creator.modules.sub_video import SubVideoAssets
-from ct_video_creator.modules.narrator import NarratorAssets
+from ct_video_creator.modules.narrator import NarratorAssets, NarratorRecipe
 from ct_video_creator.modules.image import ImageAssets
-from ct_video_creator.generators import ZonosTTSRecipe
+from ct_video_creator.generators import TTSCache, ZonosTTSRecipe
 from ct_video_creator.comfyui import VideoUpscaleFrameInterpWorkflow
-from ct_video_creator.generators import SubtitleGenerator
+from ct_video_creator.generators import SubtitleGenerator, TranscriptionCache
 from ct_video_creator.utils import (  # pylint: disable=unused-import
     burn_subtitles_to_video,
     create_video_segment_from_sub_video_and_audio_freeze_last_frame,
@@ -29,14 +29,19 @@ from ct_video_creator.utils import (  # pylint: disable=unused-import
     concatenate_videos_no_reencoding,
     add_background_music_to_video,
     reencode_to_reference_basic,
+    render_video_single_pass,
     get_media_resolution,
     get_media_duration,
     safe_move,
+    RenderCache,
     VideoCreatorPaths,
     VideoBlitPosition,
+    RenderSegment,
 )
+from ct_video_creator.utils.encoder_profiles import DEFAULT_ENCODER_PROFILE
+from ct_video_creator.utils.render_cache import encoder_fingerprint
 
-from .video_assembler_recipe import VideoAssemblerRecipe, VideoEndingRecipe
+from .video_assembler_recipe import SubtitleRecipe, VideoAssemblerRecipe, VideoEndingRecipe
 from .video_assembler_assets import VideoAssemblerAssets
 
 
@@ -49,11 +54,15 @@ class VideoAssembler:
     DEFAULT_WIDTH = 1920
     DEFAULT_HEIGHT = 1080
 
-    def __init__(self, video_creator_paths: VideoCreatorPaths):
+    def __init__(self, video_creator_paths: VideoCreatorPaths, single_render: bool = False):
         """
         Initialize VideoCreator with the required generators.
+
+        :param single_render: Render segments, fades, background music, overlay and subtitles
+            with a single ffmpeg encode instead of one encode per stage.
         """
         self._paths = video_creator_paths
+        self.single_render = single_render
 
         self._subtitle_generator = SubtitleGenerator()
 
@@ -72,11 +81,19 @@ class VideoAssembler:
 
         self.output_path = self._paths.video_output_file
         self.subtitle_file: Path | None = None
+        # Narrator (after effects) of each scene segment, transcribed instead of the segment when the subtitle
+        # recipe transcribes narrators, and the scene index of each narrator after effects
+        self._segment_narrators: dict[Path, Path] = {}
+        self._narrator_indexes: dict[Path, int] = {}
 
         self._temp_folder = self._paths.video_assembler_asset_folder / "temp_files"
         self._temp_folder.mkdir(parents=True, exist_ok=True)
         self._temp_files = []
 
+        # Segment, narrator effect and fade renders are kept between runs, so re-assembling after a small edit only
+        # re-encodes what changed
+        self._render_cache = RenderCache(self._paths.render_cache_folder)
+
     def _cleanup(self):
         """
         Clean up temporary files.
@@ -84,6 +101,8 @@ class VideoAssembler:
         logger.info(f"Cleaning up {len(self._temp_files)} temporary files")
         for f in self._temp_files:
             file_path = Path(f)
+            if self._render_cache.contains(file_path):
+                continue
             if file_path.exists():
                 logger.debug(f"Removing temporary file: {file_path.name}")
                 file_path.unlink()
@@ -125,21 +144,22 @@ class VideoAssembler:
     def _combine_sub_video_with_audio(self, video_path: Path, audio_path: Path) -> Path:
         """
         Generate a video segment from a video and audio file.
-        """
-        temp_file_base = f"{video_path.stem}_with_audio"
-        temp_file = self._temp_folder / f"{temp_file_base}.mp4"
-        index = 1
-        while temp_file.exists():
-            temp_file = temp_file.with_stem(f"{temp_file_base}_{index}")
-            index += 1
 
+        The segment is a render cache entry, reused while the video, the audio and the resolution are unchanged.
+        """
         width, height = self._get_desired_video_resolution(video_path)
 
-        output_path = create_video_segment_from_sub_video_and_audio_freeze_last_frame(
-            sub_video_path=video_path, audio_path=audio_path, output_path=temp_file, width=width, height=height
-        )
+        def render(output_path: Path) -> Path:
+            return create_video_segment_from_sub_video_and_audio_freeze_last_frame(
+                sub_video_path=video_path, audio_path=audio_path, output_path=output_path, width=width, height=height
+            )
 
-        return output_path
+        return self._render_cache.get_or_render(
+            "freeze_last_frame_segment",
+            [video_path, audio_path],
+            {"width": width, "height": height, "encoder": encoder_fingerprint(DEFAULT_ENCODER_PROFILE)},
+            render,
+        )
 
     def _compose(self, video_segments: list[Path]):
         """
@@ -154,7 +174,11 @@ class VideoAssembler:
         width, height = self._get_desired_video_resolution(video_segments[0])
 
         return concatenate_videos_with_fade_in_out(
-            video_segments=video_segments, output_path=output_video_path, width=width, height=height
+            video_segments=video_segments,
+            output_path=output_video_path,
+            width=width,
+            height=height,
+            render_cache=self._render_cache,
         )
 
     def _apply_narrator_effects(self, narrator_file_paths: list[Path]) -> list[Path]:
@@ -167,9 +191,16 @@ class VideoAssembler:
             processed_narrator_path = audio_path
             for effect in audio_effects:
                 if effect:
-                    processed_narrator_path = effect.apply(processed_narrator_path, self._temp_folder)
-                    self._temp_files.append(processed_narrator_path)
+                    source_path = processed_narrator_path
+                    processed_narrator_path = self._render_cache.get_or_render(
+                        "narrator_effect",
+                        [source_path],
+                        effect.to_dict(),
+                        lambda _, effect=effect, source_path=source_path: effect.apply(source_path, self._temp_folder),
+                        suffix=source_path.suffix,
+                    )
             processed_narrators.append(processed_narrator_path)
+            self._narrator_indexes[processed_narrator_path] = index
 
         return processed_narrators
 
@@ -201,7 +232,7 @@ class VideoAssembler:
 
             comfyui_video_path = requests.upload_file(video_path)
 
-            output_file_name = f"{comfyui_video_path.stem}_upscaled"
+            output_file_name = f"{Path(video_path).stem}_upscaled"
 
             workflow = VideoUpscaleFrameInterpWorkflow()
             workflow.set_video_path(comfyui_video_path.name)
@@ -229,7 +260,7 @@ class VideoAssembler:
             logger.info(f"Processing segment {i}/{len(audio_segments)}: {Path(video_path).name}")
 
             video_segment = self._combine_sub_video_with_audio(video_path, audio_path)
-            self._temp_files.append(video_segment)
+            self._segment_narrators[video_segment] = audio_path
             results.append(video_segment)
 
         logger.info(f"Created {len(results)} video segments")
@@ -269,15 +300,25 @@ class VideoAssembler:
         base_name = "video_assembler_ending_narrator"
         output_path_base = self._temp_folder / f"{base_name}.mp3"
 
-        generated_audio_paths = []
-        for index, narrator_text in enumerate(narrator_text_list):
-            recipe = ZonosTTSRecipe(prompt=narrator_text, seed=seed, clone_voice_path=clone_voice_path)
-            output_name = output_path_base.with_stem(f"{base_name}_{index + 1}")
-            tts_generator = ZonosTTSRecipe.GENERATOR_TYPE()
-            generated_audio = tts_generator.clone_text_to_speech(recipe=recipe, output_file_path=output_name)
+        tts_generator = ZonosTTSRecipe.GENERATOR_TYPE()
+        tts_generator.cache = TTSCache(self._paths.tts_cache_folder)
+
+        # All ending lines share the reference voice, so they are sent as a single batch
+        recipes = [
+            ZonosTTSRecipe(prompt=narrator_text, seed=seed, clone_voice_path=clone_voice_path)
+            for narrator_text in narrator_text_list
+        ]
+        output_names = [
+            output_path_base.with_stem(f"{base_name}_{index + 1}") for index in range(len(narrator_text_list))
+        ]
+        generated_audio_paths = tts_generator.clone_text_to_speech_batch(
+            recipes=recipes, output_file_paths=output_names
+        )
 
-            self._temp_files.append(generated_audio)
-            generated_audio_paths.append(generated_audio)
+        failed = [name.name for name, audio in zip(output_names, generated_audio_paths) if audio is None]
+        if failed:
+            raise RuntimeError(f"Failed to generate ending narrators: {', '.join(failed)}")
+        self._temp_files.extend(generated_audio_paths)
 
         logger.info("Finished generating ending narrators")
 
@@ -356,7 +397,7 @@ class VideoAssembler:
                 allow_extend_duration=True,
             )
         else:
-            ending_sub_video = ending_sub_video.rename(output_path)
+            ending_sub_video = self._render_cache.copy_out(ending_sub_video, output_path)
 
         self.video_assembler_assets.set_video_ending(ending_sub_video)
 
@@ -381,6 +422,8 @@ class VideoAssembler:
 
         logger.info(f"Adding outro video segment: {overlay_asset_path.name}")
 
+        # Not a render cache entry: the input is the background music render of the whole chapter, which is
+        # rendered again on every run, so the entry would only hit on a byte-identical re-encode
         output_video_path = self._temp_folder / f"{self.output_path.stem}_with_overlay{self.output_path.suffix}"
         self._temp_files.append(video_path)
 
@@ -394,10 +437,17 @@ class VideoAssembler:
 
         return output_path
 
-    def _generate_background_music_duration_dict(self, video_segments: list[Path]) -> list[dict]:
+    def _generate_background_music_duration_dict(
+        self, video_segments: list[Path], segment_durations: list[float] | None = None
+    ) -> list[dict]:
         """
         Get a dictionary of background music asset paths and their durations.
+
+        Segment durations are probed from video_segments unless segment_durations is given.
         """
+        if segment_durations is None:
+            segment_durations = [get_media_duration(video_segment) for video_segment in video_segments]
+
         background_music_assets = self.background_music_assets.background_music_assets
 
         if video_segments[0] == self.video_assembler_recipe.get_video_intro_recipe().intro_asset:
@@ -413,7 +463,7 @@ class VideoAssembler:
 
         duration_dict: list[tuple[BackgroundMusicAsset, float]] = []
         previous_bgm_asset = None
-        for bgm_asset, video_segment in zip(background_music_assets, video_segments):
+        for bgm_asset, segment_duration in zip(background_music_assets, segment_durations):
 
             if bgm_asset.skip:
                 active_bgm_asset = None
@@ -424,9 +474,9 @@ class VideoAssembler:
                 active_bgm_asset = ""
 
             if previous_bgm_asset == active_bgm_asset:
-                duration_dict[-1] = (duration_dict[-1][0], duration_dict[-1][1] + get_media_duration(video_segment))
+                duration_dict[-1] = (duration_dict[-1][0], duration_dict[-1][1] + segment_duration)
             else:
-                duration_dict.append((bgm_asset, get_media_duration(video_segment)))
+                duration_dict.append((bgm_asset, segment_duration))
                 previous_bgm_asset = active_bgm_asset
 
         result = []
@@ -513,7 +563,73 @@ class VideoAssembler:
 
         return output_path
 
-    def _subtitle_process(self, video_path: Path) -> Path:
+    def _segment_texts(self, segment_sources: list[Path]) -> list[str | None]:
+        """
+        Return the narrator text spoken in each segment, None for the segments without a known text.
+
+        Scene narrators take the text of their narrator recipe and the ending takes its narrator lines.
+        """
+        narrator_data = NarratorRecipe(self._paths).narrator_data
+        ending_recipe = self.video_assembler_recipe.get_video_ending_recipe()
+
+        texts: list[str | None] = []
+        for source in segment_sources:
+            index = self._narrator_indexes.get(source)
+            if index is not None and index < len(narrator_data):
+                texts.append(narrator_data[index].prompt)
+            elif source == self.video_assembler_assets.video_ending and ending_recipe.narrator_text_list:
+                texts.append(" ".join(ending_recipe.narrator_text_list))
+            else:
+                texts.append(None)
+
+        return texts
+
+    def _generate_subtitle_files(
+        self,
+        subtitle_recipe: SubtitleRecipe,
+        media_path: Path,
+        segment_sources: list[Path],
+        segment_durations: list[float],
+    ) -> Path:
+        """
+        Generate the ASS and SRT subtitles of the final video and return the ASS file.
+
+        :param media_path: Final video or audio track, transcribed unless the recipe transcribes narrators. The
+            subtitle files are named after it
+        :param segment_sources: Audio of each segment of the final video, transcribed separately when the recipe
+            transcribes narrators (unused otherwise)
+        :param segment_durations: Duration of each segment of the final video (unused unless narrators are
+            transcribed)
+        """
+        style = {
+            "word_level": subtitle_recipe.word_level_timestamps,
+            "segment_level": subtitle_recipe.segment_level_timestamps,
+            "font_size": subtitle_recipe.font_size,
+            "position": subtitle_recipe.position,
+            "margin": subtitle_recipe.subtitle_margin,
+            "alignment": subtitle_recipe.alignment,
+        }
+
+        if subtitle_recipe.transcribe_narrators:
+            offsets = [sum(segment_durations[:index]) for index in range(len(segment_durations))]
+            texts = self._segment_texts(segment_sources) if subtitle_recipe.align_narrator_text else None
+            ass_subtitle, self.subtitle_file = self._subtitle_generator.generate_subtitles_from_segments(
+                media_paths=segment_sources,
+                offsets=offsets,
+                output_path=media_path,
+                cache=TranscriptionCache(self._paths.transcription_cache_folder),
+                texts=texts,
+                **style,
+            )
+        else:
+            ass_subtitle, self.subtitle_file = self._subtitle_generator.generate_subtitles_from_audio(
+                video_path=media_path, **style
+            )
+
+        self._temp_files.append(ass_subtitle)
+        return ass_subtitle
+
+    def _subtitle_process(self, video_path: Path, video_segments: list[Path]) -> Path:
         """
         Generate and burn subtitles into the final video.
         """
@@ -527,16 +643,13 @@ class VideoAssembler:
             logger.info("Subtitle generation is skipped as per the recipe.")
             return video_path
 
-        ass_subtitle, self.subtitle_file = self._subtitle_generator.generate_subtitles_from_audio(
-            video_path=video_path,
-            word_level=subtitle_recipe.word_level_timestamps,
-            segment_level=subtitle_recipe.segment_level_timestamps,
-            font_size=subtitle_recipe.font_size,
-            position=subtitle_recipe.position,
-            margin=subtitle_recipe.subtitle_margin,
-            alignment=subtitle_recipe.alignment,
-        )
-        self._temp_files.append(ass_subtitle)
+        segment_sources: list[Path] = []
+        segment_durations: list[float] = []
+        if subtitle_recipe.transcribe_narrators:
+            segment_sources = [self._segment_narrators.get(segment, segment) for segment in video_segments]
+            segment_durations = [get_media_duration(segment) for segment in video_segments]
+
+        ass_subtitle = self._generate_subtitle_files(subtitle_recipe, video_path, segment_sources, segment_durations)
 
         output_file = video_path
         if subtitle_recipe.burn_subtitles_into_video:
@@ -551,11 +664,113 @@ class VideoAssembler:
 
         return output_file
 
+    def _pre_process_render_segments(self) -> list[RenderSegment]:
+        """
+        Collect the segments of a single-pass render without combining them with their narrators.
+        """
+        logger.info("Collecting render segments for single-pass render")
+
+        video_segments: list[Path] = self.video_assets.assembled_sub_videos
+        audio_segments: list[Path] = self.narrator_assets.narrator_assets
+
+        video_segments = self._upscale_and_frame_interp_video_list(video_segments)
+        processed_narrators = self._apply_narrator_effects(audio_segments)
+
+        render_segments = [
+            RenderSegment(video_path, audio_path) for video_path, audio_path in zip(video_segments, processed_narrators)
+        ]
+
+        if not self.video_assembler_recipe.get_video_ending_recipe().skip:
+            ending_segments = self._add_ending_video_segment([], video_segments)
+            render_segments = [*render_segments, *(RenderSegment(segment) for segment in ending_segments)]
+
+        if not self.video_assembler_recipe.get_video_intro_recipe().skip:
+            intro_segments = self._add_intro_video_segment([])
+            render_segments = [*(RenderSegment(segment) for segment in intro_segments), *render_segments]
+
+        return render_segments
+
+    def _render_single_pass(self, render_segments: list[RenderSegment]) -> Path:
+        """
+        Render the final video with one ffmpeg encode.
+
+        When subtitles are enabled the mixed audio track is rendered first so it can be transcribed,
+        then reused unchanged by the final render.
+        """
+        assert len(render_segments) > 0, "No segments to render."
+
+        width, height = self._get_desired_video_resolution(render_segments[0].video_path)
+        render_kwargs = {"segments": render_segments, "width": width, "height": height}
+
+        if self.background_music_assets.background_music_assets:
+            music_duration_dict = self._generate_background_music_duration_dict(
+                [segment.video_path for segment in render_segments],
+                [segment.duration() for segment in render_segments],
+            )
+            render_kwargs.update(
+                {
+                    "music_assets": [segment["asset"] for segment in music_duration_dict],
+                    "music_start_times": [segment["start_time"] for segment in music_duration_dict],
+                    "music_durations": [segment["duration"] for segment in music_duration_dict],
+                    "music_volumes": [segment["volume"] for segment in music_duration_dict],
+                }
+            )
+        else:
+            logger.info("No background music recipe defined, skipping background music addition.")
+
+        overlay_recipe = self.video_assembler_recipe.get_video_overlay_recipe()
+        if overlay_recipe and not overlay_recipe.skip:
+            overlay_asset_path = overlay_recipe.overlay_asset
+            if overlay_asset_path and overlay_asset_path.exists():
+                render_kwargs.update(
+                    {
+                        "overlay_video": overlay_asset_path,
+                        "overlay_start_time_seconds": overlay_recipe.start_time_seconds,
+                        "overlay_repeat_every_seconds": overlay_recipe.interval_seconds,
+                    }
+                )
+            else:
+                logger.warning("Overlay video path is invalid or does not exist.")
+
+        subtitle_recipe = self.video_assembler_recipe.get_subtitle_recipe()
+        if subtitle_recipe and not subtitle_recipe.skip:
+            segment_sources: list[Path] = []
+            segment_durations: list[float] = []
+            if subtitle_recipe.transcribe_narrators:
+                segment_sources = [segment.audio_path or segment.video_path for segment in render_segments]
+                segment_durations = [segment.duration() for segment in render_segments]
+                # The narrators are transcribed directly, so the mixed audio track is not rendered first and this
+                # path only names the subtitle files
+                subtitle_media = self._temp_folder / self.output_path.name
+            else:
+                subtitle_media = render_video_single_pass(
+                    output_path=self._temp_folder / f"{self.output_path.stem}_audio.m4a",
+                    audio_only=True,
+                    **render_kwargs,
+                )
+                self._temp_files.append(subtitle_media)
+                render_kwargs["audio_track"] = subtitle_media
+
+            ass_subtitle = self._generate_subtitle_files(
+                subtitle_recipe, subtitle_media, segment_sources, segment_durations
+            )
+
+            if subtitle_recipe.burn_subtitles_into_video:
+                render_kwargs["subtitle_path"] = ass_subtitle
+        else:
+            logger.info("Subtitle generation is skipped.")
+
+        output_path = self._temp_folder / f"{self.output_path.stem}_single_pass{self.output_path.suffix}"
+        return render_video_single_pass(output_path=output_path, **render_kwargs)
+
     def _rename_outputs(self, video_path: Path) -> Path:
         """
         Rename the final output video and subtitle files to match the desired output path.
         """
-        output_file = video_path.rename(self.output_path)
+        if self._render_cache.contains(video_path):
+            output_file = self._render_cache.copy_out(video_path, self.output_path)
+        else:
+            output_file = video_path.rename(self.output_path)
 
         if self.subtitle_file:
             subtitle_target = output_file.with_suffix(self.subtitle_file.suffix)
@@ -574,16 +789,25 @@ class VideoAssembler:
 
         logger.info("Starting video assembly process")
 
-        video_segments = self._pre_process()
+        if self.single_render:
+            render_segments = self._pre_process_render_segments()
+
+            output_file = self._render_single_pass(render_segments)
+        else:
+            video_segments = self._pre_process()
 
-        output_file = self._compose(video_segments)
+            output_file = self._compose(video_segments)
 
-        output_file = self._post_process(output_file, video_segments)
+            output_file = self._post_process(output_file, video_segments)
 
-        output_file = self._subtitle_process(output_file)
+            output_file = self._subtitle_process(output_file, video_segments)
 
         output_file = self._rename_outputs(output_file)
 
         self._cleanup()
 
+        # The single-render pass also caches its narrator effects, so both modes prune
+        logger.info(f"Render cache: {self._render_cache.hits} renders reused, {self._render_cache.misses} rendered")
+        self._render_cache.prune()
+
         logger.info(f"Video assembly completed successfully: {output_file.name}")
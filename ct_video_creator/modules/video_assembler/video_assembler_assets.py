@@ -5,7 +5,7 @@ from pathlib import Path
 
 from ct_logging import logger
 from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
-from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old
+from ct_video_creator.utils import ensure_collection_index_exists, backup_file_to_old, get_json_store
 
 
 class VideoAssemblerAssets:
@@ -26,8 +26,7 @@ class VideoAssemblerAssets:
         """Load assets from JSON file with security validation."""
         try:
             logger.debug(f"Loading video assets from: {self.asset_file_path.name}")
-            with open(self.asset_file_path, "r", encoding="utf-8") as file:
-                data: dict = json.load(file)
+            data: dict = get_json_store().load(self.asset_file_path)
 
             assets = data.get("assets", [])
             ensure_collection_index_exists(self.final_sub_videos, len(assets) - 1)
@@ -68,33 +67,30 @@ class VideoAssemblerAssets:
     def save_assets_to_file(self) -> None:
         """Save the current state of the video assets to a file with relative paths."""
         try:
-            with open(self.asset_file_path, "w", encoding="utf-8") as file:
-                assets = []
-                # Ensure both lists have the same length
-                max_length = len(self.final_sub_videos)
-
-                for i in range(max_length):
-                    video_asset = self.final_sub_videos[i] if i < len(self.final_sub_videos) else None
-
-                    # Convert paths to relative paths for storage
-                    video_asset_relative = None
-                    if video_asset:
-                        video_asset_relative = str(self._paths.mask_asset_path(video_asset))
-
-                    videos = {
-                        "index": i + 1,
-                        "video_asset": video_asset_relative,
-                    }
-
-                    assets.append(videos)
-
-                data = {
-                    "video_ending": (
-                        str(self._paths.mask_asset_path(self.video_ending)) if self.video_ending else None
-                    ),
-                    "assets": assets,
+            assets = []
+            # Ensure both lists have the same length
+            max_length = len(self.final_sub_videos)
+
+            for i in range(max_length):
+                video_asset = self.final_sub_videos[i] if i < len(self.final_sub_videos) else None
+
+                # Convert paths to relative paths for storage
+                video_asset_relative = None
+                if video_asset:
+                    video_asset_relative = str(self._paths.mask_asset_path(video_asset))
+
+                videos = {
+                    "index": i + 1,
+                    "video_asset": video_asset_relative,
                 }
-                json.dump(data, file, indent=4)
+
+                assets.append(videos)
+
+            data = {
+                "video_ending": (str(self._paths.mask_asset_path(self.video_ending)) if self.video_ending else None),
+                "assets": assets,
+            }
+            get_json_store().save(self.asset_file_path, data)
             logger.trace(f"Assets saved with {len(assets)} scene assets")
         except IOError as e:
             logger.error(f"Error saving video assets to {self.asset_file_path.name}: {e}")
@@ -12,6 +12,7 @@ from ct_video_creator.utils import (
     SubtitleAlignment,
     SubtitlePosition,
     ensure_collection_index_exists,
+    get_json_store,
 )
 from ct_video_creator.media_effects.effect_base import EffectBase
 from ct_video_creator.media_effects.effects_map import create_effect_from_data
@@ -281,6 +282,10 @@ class SubtitleRecipe:
         self.word_level_timestamps: bool = False
         self.segment_level_timestamps: bool = True
         self.karaoke: bool = True
+        # Transcribe the narrator of each scene instead of the final video mixed with background music
+        self.transcribe_narrators: bool = False
+        # With transcribe_narrators, align the known narrator text with each narrator instead of transcribing it
+        self.align_narrator_text: bool = False
         self.subtitle_margin: int = 25
         self.font_size: int = 12
         self.position: SubtitlePosition = SubtitlePosition.BOTTOM
@@ -297,6 +302,8 @@ class SubtitleRecipe:
             "word_level_timestamps": self.word_level_timestamps,
             "segment_level_timestamps": self.segment_level_timestamps,
             "karaoke": self.karaoke,
+            "transcribe_narrators": self.transcribe_narrators,
+            "align_narrator_text": self.align_narrator_text,
             "margin": self.subtitle_margin,
             "font_size": self.font_size,
             "position": self.position.value,
@@ -314,6 +321,8 @@ class SubtitleRecipe:
         self.subtitle_margin = data.get("margin", 25)
         self.font_size = data.get("font_size", 12)
         self.karaoke = data.get("karaoke", True)
+        self.transcribe_narrators = data.get("transcribe_narrators", False)
+        self.align_narrator_text = data.get("align_narrator_text", False)
 
         position_value = data.get("position", "bottom")
         try:
@@ -349,8 +358,7 @@ class VideoAssemblerRecipe:
         """Load video assembler recipe from the video assembler recipe file."""
         try:
             logger.debug(f"Loading video assembler recipe from: {self.effects_file_path.name}")
-            with open(self.effects_file_path, "r", encoding="utf-8") as file_handler:
-                data: dict = json.load(file_handler)
+            data: dict = get_json_store().load(self.effects_file_path)
 
             self._narrator_asset_effects.from_dict(data.get("narrator_asset_effects", {}))
             self._video_ending_recipe.from_dict(data.get("video_ending_recipe", {}))
@@ -383,8 +391,7 @@ class VideoAssemblerRecipe:
                 "subtitle_recipe": self._subtitle_recipe.to_dict(),
                 "narrator_asset_effects": self._narrator_asset_effects.to_dict(),
             }
-            with open(self.effects_file_path, "w", encoding="utf-8") as file_handler:
-                json.dump(result, file_handler, indent=4)
+            get_json_store().save(self.effects_file_path, result)
             logger.trace("Video assembler recipe saved.")
 
         except IOError as e:
@@ -2,10 +2,11 @@
 Test suite for ComfyUIRequests class with complete mocking of ComfyUI responses.
 """
 
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
-from requests.exceptions import RequestException
+from requests.exceptions import ChunkedEncodingError, RequestException
 
 from ct_video_creator.comfyui import ComfyUIRequests
 from ct_video_creator.comfyui.comfyui_workflow import IComfyUIWorkflow
@@ -16,6 +17,7 @@ def comfyui_requests():
     """Fixture to create a ComfyUIRequests instance with a mocked HTTP session."""
     client = ComfyUIRequests(retries=3, retry_delay=0)
     client.session = Mock()
+    client.use_websocket = False
     client._delay_between_requests = 0
     client._cleanup_delay_seconds = 0
     return client
@@ -117,6 +119,37 @@ class TestComfyUIRequests:
         assert result == {}  # Function returns empty dict on failure
         comfyui_requests.session.get.side_effect = None
 
+    def test_get_history_entry_fetches_single_prompt(self, comfyui_requests):
+        """Test that only the history of the requested prompt is fetched."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {"12345": {"status": {"status_str": "success", "completed": True}}}
+        comfyui_requests.session.get.return_value = mock_response
+
+        entry = comfyui_requests.get_history_entry("12345")
+
+        assert entry == {"status": {"status_str": "success", "completed": True}}
+        assert comfyui_requests.session.get.call_args.kwargs["url"].endswith("/history/12345")
+
+    def test_get_history_entry_not_finished(self, comfyui_requests):
+        """Test that an unfinished prompt returns an empty entry."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {}
+        comfyui_requests.session.get.return_value = mock_response
+
+        assert comfyui_requests.get_history_entry("12345") == {}
+
+    def test_send_prompt_includes_client_id(self, comfyui_requests):
+        """Test that prompts are sent with the client id used for WebSocket events."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        comfyui_requests.session.post.return_value = mock_response
+
+        comfyui_requests.comfyui_send_prompt({"1": {}})
+
+        assert comfyui_requests.session.post.call_args.kwargs["json"]["client_id"] == comfyui_requests.client_id
+
     def test_get_last_history_entry_success(self, comfyui_requests):
         """Test successful last history entry retrieval - tests the 'last key' selection logic."""
         # Arrange
@@ -216,10 +249,10 @@ class TestComfyUIRequests:
         mock_datetime.now.side_effect = [start_time, end_time]
 
         # Mock history responses - first call empty, second call has our prompt
-        with patch.object(comfyui_requests, "get_history") as mock_get_history:
+        with patch.object(comfyui_requests, "get_history_entry") as mock_get_history:
             mock_get_history.side_effect = [
                 {},  # First call - prompt not ready yet
-                {prompt_id: {"status": "completed"}},  # Second call - prompt found
+                {"status": "completed"},  # Second call - prompt found
             ]
 
             # Act
@@ -247,11 +280,11 @@ class TestComfyUIRequests:
 
         mock_datetime.now.side_effect = [start_time, end_time]
 
-        with patch.object(comfyui_requests, "get_history") as mock_get_history:
+        with patch.object(comfyui_requests, "get_history_entry") as mock_get_history:
             mock_get_history.side_effect = [
                 {},
                 {},
-                {prompt_id: {"status": "completed"}},
+                {"status": "completed"},
             ]
 
             # Act
@@ -264,6 +297,25 @@ class TestComfyUIRequests:
             # Verify custom interval is used
             mock_sleep.assert_called_with(3)
 
+    @patch("ct_video_creator.comfyui.comfyui_requests.time.sleep")
+    def test_wait_for_completion_falls_back_to_polling(self, mock_sleep, comfyui_requests):
+        """Test that a failed WebSocket connection falls back to polling the prompt history."""
+        comfyui_requests.use_websocket = True
+
+        with patch(
+            "ct_video_creator.comfyui.comfyui_requests.websocket_available", return_value=True
+        ), patch.object(
+            comfyui_requests, "_wait_for_completion_async", Mock(side_effect=OSError("connection refused"))
+        ), patch.object(
+            comfyui_requests, "get_history_entry"
+        ) as mock_get_history:
+            mock_get_history.side_effect = [{}, {"status": "completed"}]
+
+            comfyui_requests._wait_for_completion("prompt_789")
+
+        assert mock_get_history.call_count == 2
+        assert mock_sleep.call_count == 1
+
     def test_check_for_output_success_valid_response(self, comfyui_requests):
         """Test output success validation with valid successful response."""
         # Arrange
@@ -413,7 +465,7 @@ class TestComfyUIRequests:
 
         with patch.object(comfyui_requests, "_submit_single_prompt") as mock_submit, patch.object(
             comfyui_requests, "_wait_for_completion"
-        ) as mock_wait, patch.object(comfyui_requests, "get_last_history_entry") as mock_get_history, patch.object(
+        ) as mock_wait, patch.object(comfyui_requests, "get_history_entry") as mock_get_history, patch.object(
             comfyui_requests, "_check_for_output_success"
         ) as mock_check_success, patch.object(
             comfyui_requests, "_get_output_paths"
@@ -434,7 +486,7 @@ class TestComfyUIRequests:
             assert result == ["/output/result.png"]
             mock_submit.assert_called_once_with(mock_workflow)
             mock_wait.assert_called_once_with("prompt_123")
-            mock_get_history.assert_called_once()
+            mock_get_history.assert_called_once_with("prompt_123")
             mock_check_success.assert_called_once()
             mock_get_paths.assert_called_once()
 
@@ -446,7 +498,7 @@ class TestComfyUIRequests:
 
         with patch.object(comfyui_requests, "_submit_single_prompt") as mock_submit, patch.object(
             comfyui_requests, "_wait_for_completion"
-        ) as mock_wait, patch.object(comfyui_requests, "get_last_history_entry") as mock_get_history, patch.object(
+        ) as mock_wait, patch.object(comfyui_requests, "get_history_entry") as mock_get_history, patch.object(
             comfyui_requests, "_check_for_output_success"
         ) as mock_check_success, patch.object(
             comfyui_requests, "_get_output_paths"
@@ -481,7 +533,7 @@ class TestComfyUIRequests:
 
         with patch.object(comfyui_requests, "_submit_single_prompt") as mock_submit, patch.object(
             comfyui_requests, "_wait_for_completion"
-        ) as mock_wait, patch.object(comfyui_requests, "get_last_history_entry") as mock_get_history, patch.object(
+        ) as mock_wait, patch.object(comfyui_requests, "get_history_entry") as mock_get_history, patch.object(
             comfyui_requests, "_check_for_output_success"
         ) as mock_check_success, patch.object(
             comfyui_requests, "_get_output_paths"
@@ -533,7 +585,7 @@ class TestComfyUIRequests:
 
         with patch.object(comfyui_requests, "_submit_single_prompt") as mock_submit, patch.object(
             comfyui_requests, "_wait_for_completion"
-        ) as mock_wait, patch.object(comfyui_requests, "get_last_history_entry") as mock_get_history:
+        ) as mock_wait, patch.object(comfyui_requests, "get_history_entry") as mock_get_history:
 
             mock_response = Mock()
             mock_response.json.return_value = {"prompt_id": "prompt_123"}
@@ -551,3 +603,220 @@ class TestComfyUIRequests:
         assert mock_wait.call_count == comfyui_requests.retries
         assert mock_get_history.call_count == comfyui_requests.retries
         assert mock_sleep.call_count == comfyui_requests.retries
+
+
+class TestPipelinedPrompts:
+    """Test the pipelined mode of ensure_send_all_prompts."""
+
+    def _workflow(self, family: str, summary: str) -> Mock:
+        """Create a mock workflow of a model family."""
+        workflow = Mock(spec=IComfyUIWorkflow)
+        workflow.get_workflow_summary.return_value = summary
+        workflow.get_json.return_value = {"summary": summary}
+        workflow.get_model_family.return_value = family
+        return workflow
+
+    @pytest.fixture
+    def pipelined_client(self, comfyui_requests):
+        """Client whose ComfyUI calls are recorded in a shared event list."""
+        events = []
+        prompt_ids = iter(f"prompt_{index}" for index in range(100))
+
+        def submit(workflow):
+            prompt_id = next(prompt_ids)
+            events.append(("submit", workflow.get_workflow_summary()))
+            response = Mock()
+            response.json.return_value = {"prompt_id": prompt_id}
+            return response
+
+        def download(files, output_folder):
+            events.append(("download", files[0].name))
+            return [output_folder / file.name for file in files]
+
+        comfyui_requests._submit_single_prompt = Mock(side_effect=submit)
+        comfyui_requests._wait_for_completion = Mock(side_effect=lambda prompt_id: events.append(("wait", prompt_id)))
+        comfyui_requests.get_history_entry = Mock(
+            side_effect=lambda prompt_id: {
+                "status": {"status_str": "success", "completed": True},
+                "outputs": {"9": {"images": [{"filename": f"{prompt_id}.png"}]}},
+            }
+        )
+        comfyui_requests._send_clean_memory_request = Mock(side_effect=lambda: events.append(("free", None)))
+        comfyui_requests.download_all_files = Mock(side_effect=download)
+        return comfyui_requests, events
+
+    def test_prompts_are_queued_ahead(self, pipelined_client, tmp_path):
+        """Several prompts are queued before the first one is waited for."""
+        client, events = pipelined_client
+        workflows = [self._workflow("flux", f"image_{index}") for index in range(3)]
+
+        result = client.ensure_send_all_prompts(workflows, tmp_path, pipelined=True, max_queued=2)
+
+        assert [path.name for path in result] == ["prompt_0.png", "prompt_1.png", "prompt_2.png"]
+        assert events[:3] == [("submit", "image_0"), ("submit", "image_1"), ("wait", "prompt_0")]
+        assert events.count(("free", None)) == 1
+
+    def test_memory_is_freed_only_on_family_change(self, pipelined_client, tmp_path):
+        """The queue is drained and memory freed once when the model family changes."""
+        client, events = pipelined_client
+        workflows = [
+            self._workflow("flux", "image_0"),
+            self._workflow("flux", "image_1"),
+            self._workflow("wan", "video_0"),
+        ]
+
+        client.ensure_send_all_prompts(workflows, tmp_path, pipelined=True, max_queued=4)
+
+        free_index = events.index(("free", None))
+        assert events[:free_index] == [
+            ("submit", "image_0"),
+            ("submit", "image_1"),
+            ("wait", "prompt_0"),
+            ("download", "prompt_0.png"),
+            ("wait", "prompt_1"),
+            ("download", "prompt_1.png"),
+        ]
+        assert events[free_index + 1] == ("submit", "video_0")
+        assert events.count(("free", None)) == 2
+
+    def test_failed_prompt_is_resubmitted(self, pipelined_client, tmp_path):
+        """A prompt that fails is queued again and its output kept in workflow order."""
+        client, events = pipelined_client
+        success = {"status_str": "success", "completed": True}
+        entries = iter(
+            [
+                {"status": {"status_str": "error", "completed": False}},
+                {"status": success, "outputs": {"9": {"images": [{"filename": "b.png"}]}}},
+                {"status": success, "outputs": {"9": {"images": [{"filename": "a.png"}]}}},
+            ]
+        )
+        client.get_history_entry = Mock(side_effect=lambda prompt_id: next(entries))
+        workflows = [self._workflow("flux", "image_0"), self._workflow("flux", "image_1")]
+
+        result = client.ensure_send_all_prompts(workflows, tmp_path, pipelined=True, max_queued=2)
+
+        assert [path.name for path in result] == ["a.png", "b.png"]
+        assert [event for event in events if event[0] == "submit"] == [
+            ("submit", "image_0"),
+            ("submit", "image_1"),
+            ("submit", "image_0"),
+        ]
+
+
+class TestDownloadAllFiles:
+    """Test the local fast path and resumable downloads of download_all_files."""
+
+    def _response(self, chunks, status_code=200, content_length=None, error=None):
+        """Create a streaming response mock that may fail after its chunks."""
+
+        def iter_content(_chunk_size):
+            yield from chunks
+            if error is not None:
+                raise error
+
+        response = Mock()
+        response.status_code = status_code
+        response.headers = {"Content-Length": str(content_length)} if content_length is not None else {}
+        response.raise_for_status = Mock()
+        response.iter_content = iter_content
+        return response
+
+    def test_local_output_is_linked(self, comfyui_requests, tmp_path):
+        """Outputs reachable on the filesystem are hard-linked instead of downloaded."""
+        comfy_output = tmp_path / "comfy_output"
+        comfy_output.mkdir()
+        source = comfy_output / "image.png"
+        source.write_bytes(b"image data")
+
+        result = comfyui_requests.download_all_files([source], tmp_path / "assets")
+
+        assert result == [tmp_path / "assets" / "image.png"]
+        assert result[0].read_bytes() == b"image data"
+        assert result[0].stat().st_ino == source.stat().st_ino
+        comfyui_requests.session.get.assert_not_called()
+
+    def test_remote_outputs_keep_order(self, comfyui_requests, tmp_path):
+        """Remote outputs are downloaded and returned in request order."""
+        comfyui_requests.session.get.side_effect = lambda **kwargs: self._response(
+            [kwargs["params"]["filename"].encode()]
+        )
+        files = [Path(f"/not/local/video_{index}.mp4") for index in range(5)]
+
+        result = comfyui_requests.download_all_files(files, tmp_path)
+
+        assert [path.name for path in result] == [f"video_{index}.mp4" for index in range(5)]
+        assert result[3].read_bytes() == b"video_3.mp4"
+
+    def test_interrupted_download_resumes_with_range(self, comfyui_requests, tmp_path):
+        """An interrupted transfer continues from the bytes already written."""
+        comfyui_requests.session.get.side_effect = [
+            self._response([b"abc"], content_length=6, error=ChunkedEncodingError("connection reset")),
+            self._response([b"def"], status_code=206),
+        ]
+
+        result = comfyui_requests.download_all_files([Path("/not/local/video.mp4")], tmp_path)
+
+        assert result[0].read_bytes() == b"abcdef"
+        assert comfyui_requests.session.get.call_args.kwargs["headers"] == {"Range": "bytes=3-"}
+        assert not (tmp_path / "video.mp4.part").exists()
+
+    def test_failed_download_is_skipped(self, comfyui_requests, tmp_path):
+        """A file that cannot be downloaded is left out of the result."""
+        comfyui_requests.session.get.side_effect = RequestException("offline")
+
+        assert comfyui_requests.download_all_files([Path("/not/local/video.mp4")], tmp_path) == []
+
+
+class TestUploadFile:
+    """Test content-addressed upload deduplication."""
+
+    @pytest.fixture(autouse=True)
+    def clear_upload_index(self, monkeypatch):
+        """Start every test with an empty upload index."""
+        monkeypatch.setattr(ComfyUIRequests, "_uploaded_files", {})
+
+    @pytest.fixture
+    def remote_input(self, monkeypatch, tmp_path):
+        """Point the input folder at a path that does not exist locally."""
+        monkeypatch.setattr("ct_video_creator.comfyui.comfyui_requests.COMFYUI_INPUT_FOLDER", str(tmp_path / "remote"))
+
+    def test_same_content_is_uploaded_once(self, comfyui_requests, remote_input, tmp_path):
+        """A file with the same content is only sent once and keeps its content-addressed name."""
+        comfyui_requests.session.head.return_value = Mock(status_code=404)
+        first = tmp_path / "frame.png"
+        first.write_bytes(b"frame")
+        copy = tmp_path / "frame_copy.png"
+        copy.write_bytes(b"frame")
+
+        first_name = comfyui_requests.upload_file(first)
+        second_name = comfyui_requests.upload_file(copy)
+
+        assert first_name == second_name
+        assert first_name.name.startswith("frame_") and first_name.suffix == ".png"
+        assert comfyui_requests.session.post.call_count == 1
+        assert comfyui_requests.session.post.call_args.kwargs["files"]["image"][0] == first_name.name
+
+    def test_file_already_on_server_is_not_uploaded(self, comfyui_requests, remote_input, tmp_path):
+        """A file the server already has is detected through /view and skipped."""
+        comfyui_requests.session.head.return_value = Mock(status_code=200)
+        image = tmp_path / "scene.png"
+        image.write_bytes(b"scene")
+
+        comfyui_requests.upload_file(image)
+
+        comfyui_requests.session.post.assert_not_called()
+
+    def test_local_input_folder_uses_hard_link(self, comfyui_requests, monkeypatch, tmp_path):
+        """With a local input folder the file is linked into it instead of uploaded."""
+        input_folder = tmp_path / "input"
+        input_folder.mkdir()
+        monkeypatch.setattr("ct_video_creator.comfyui.comfyui_requests.COMFYUI_INPUT_FOLDER", str(input_folder))
+        video = tmp_path / "sub_video.mp4"
+        video.write_bytes(b"video")
+
+        name = comfyui_requests.upload_file(video)
+
+        placed = input_folder / name.name
+        assert placed.read_bytes() == b"video"
+        assert placed.stat().st_ino == video.stat().st_ino
+        comfyui_requests.session.post.assert_not_called()
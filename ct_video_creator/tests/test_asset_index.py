@@ -0,0 +1,143 @@
+"""
+Unit tests for the SQLite asset index.
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from ct_video_creator.utils import VideoCreatorPaths
+from ct_video_creator.utils.asset_index import AssetIndex
+
+
+def _write_json(path, data):
+    """Write a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _write_narrator_assets(paths, narrator_files):
+    """Write the narrator asset file of a chapter."""
+    assets = [{"index": index + 1, "narrator": f"assets/narrators/{name}"} for index, name in enumerate(narrator_files)]
+    _write_json(paths.narrator_asset_file, {"assets": assets})
+
+
+def _create_chapter(user_folder, story_name, scene_count, narrator_files):
+    """Create a chapter with narrator and image recipes and its narrator assets."""
+    paths = VideoCreatorPaths(user_folder, story_name, 0)
+
+    _write_json(
+        paths.narrator_recipe_file,
+        {
+            "narrator_data": [
+                {
+                    "prompt": f"Narrator {index}",
+                    "clone_voice_path": "default_assets/voices/voice_002.mp3",
+                    "recipe_type": "ZonosTTSRecipeType",
+                }
+                for index in range(scene_count)
+            ]
+        },
+    )
+    _write_narrator_assets(paths, narrator_files)
+    for name in narrator_files:
+        (paths.narrator_asset_folder / name).write_bytes(b"narrator")
+
+    return paths
+
+
+class TestAssetIndex:
+    """Test syncing and querying the asset index."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        """Create an index in the user cache folder."""
+        with AssetIndex(tmp_path / "cache" / "asset_index.sqlite3") as asset_index:
+            yield asset_index
+
+    def test_missing_and_complete_across_stories(self, tmp_path, index):
+        """Missing scenes and complete chapters are reported for every story."""
+        _create_chapter(tmp_path, "complete_story", 2, ["n1.mp3", "n2.mp3"])
+        _create_chapter(tmp_path, "partial_story", 3, ["n1.mp3"])
+
+        assert index.sync(tmp_path) == 2
+
+        assert index.missing_assets(tmp_path) == [
+            ("partial_story", 0, "narrator", 1),
+            ("partial_story", 0, "narrator", 2),
+        ]
+        assert index.complete_chapters(tmp_path) == [("complete_story", 0)]
+        assert index.missing_assets(tmp_path, "complete_story") == []
+
+    def test_unused_files(self, tmp_path, index):
+        """Files in asset folders that nothing refers to are reported with their size."""
+        paths = _create_chapter(tmp_path, "story", 1, ["n1.mp3"])
+        (paths.narrator_asset_folder / "old_narrator.mp3").write_bytes(b"12345")
+
+        index.sync(tmp_path)
+
+        assert index.unused_files(tmp_path) == [((paths.narrator_asset_folder / "old_narrator.mp3").resolve(), 5)]
+
+    def test_sync_is_incremental(self, tmp_path, index):
+        """Unchanged chapters are not parsed again, while deleted asset files are noticed."""
+        paths = _create_chapter(tmp_path, "story", 1, ["n1.mp3"])
+        assert index.sync(tmp_path) == 1
+        assert index.sync(tmp_path) == 0
+
+        (paths.narrator_asset_folder / "n1.mp3").unlink()
+        os.utime(paths.narrator_asset_folder, ns=(1, 1))
+
+        assert index.sync(tmp_path) == 0
+        assert index.missing_assets(tmp_path) == [("story", 0, "narrator", 0)]
+
+    def test_changed_json_is_parsed_again(self, tmp_path, index):
+        """Editing an asset file updates the index."""
+        paths = _create_chapter(tmp_path, "story", 2, ["n1.mp3"])
+        index.sync(tmp_path)
+
+        (paths.narrator_asset_folder / "n2.mp3").write_bytes(b"narrator")
+        _write_narrator_assets(paths, ["n1.mp3", "n2.mp3"])
+
+        assert index.sync(tmp_path) == 1
+        assert index.complete_chapters(tmp_path) == [("story", 0)]
+
+    def test_files_rewritten_in_place_are_stat_ed_again(self, tmp_path, index):
+        """A file rewritten under the same name updates its size even though its folder did not change."""
+        paths = _create_chapter(tmp_path, "story", 1, ["n1.mp3"])
+        old_narrator = paths.narrator_asset_folder / "old_narrator.mp3"
+        old_narrator.write_bytes(b"12345")
+        index.sync(tmp_path)
+        folder_times = paths.narrator_asset_folder.stat()
+
+        old_narrator.write_bytes(b"1234567890")
+        os.utime(paths.narrator_asset_folder, ns=(folder_times.st_atime_ns, folder_times.st_mtime_ns))
+
+        assert index.sync(tmp_path) == 0
+        assert index.unused_files(tmp_path) == [(old_narrator.resolve(), 10)]
+
+    def test_removed_chapters_are_dropped(self, tmp_path, index):
+        """Chapters whose folder was deleted disappear from the index."""
+        paths = _create_chapter(tmp_path, "story", 1, [])
+        index.sync(tmp_path)
+        assert index.missing_assets(tmp_path) == [("story", 0, "narrator", 0)]
+
+        shutil.rmtree(paths.video_chapter_folder)
+
+        index.sync(tmp_path)
+        assert index.missing_assets(tmp_path) == []
+
+    def test_sync_does_not_write_to_chapters(self, tmp_path, index):
+        """Syncing creates no folders or files and leaves corrupted JSON files in place."""
+        bare_chapter = tmp_path / "stories" / "bare_story" / "videos" / "chapter_001"
+        bare_chapter.mkdir(parents=True)
+        paths = _create_chapter(tmp_path, "story", 1, ["n1.mp3"])
+        paths.image_asset_file.write_text("{ not json", encoding="utf-8")
+        before = sorted(path for path in tmp_path.rglob("*") if "cache" not in path.parts)
+
+        index.sync(tmp_path)
+
+        assert sorted(path for path in tmp_path.rglob("*") if "cache" not in path.parts) == before
+        assert paths.image_asset_file.read_text(encoding="utf-8") == "{ not json"
+        assert index.missing_assets(tmp_path, "bare_story") == []
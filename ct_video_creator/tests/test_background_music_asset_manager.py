@@ -0,0 +1,155 @@
+"""
+Unit tests for background music generation with prompt deduplication and caching.
+"""
+
+import io
+import json
+import threading
+import time
+import zipfile
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ct_video_creator.generators import MusicGenGenerator, MusicGenRecipe, TTSCache
+from ct_video_creator.modules.background_music import BackgroundMusicAssetManager
+from ct_video_creator.utils import VideoCreatorPaths
+
+
+class FakeMusicGenerator:
+    """Music generator that writes the prompt to a file and tracks calls and concurrency."""
+
+    instances = 0
+    prompts = []
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        """Count created instances."""
+        with FakeMusicGenerator.lock:
+            FakeMusicGenerator.instances += 1
+
+    def text_to_music(self, recipe, output_folder):
+        """Write the recipe prompt as the generated music."""
+        with FakeMusicGenerator.lock:
+            FakeMusicGenerator.prompts.append(recipe.prompt)
+            FakeMusicGenerator.running += 1
+            FakeMusicGenerator.peak = max(FakeMusicGenerator.peak, FakeMusicGenerator.running)
+        try:
+            time.sleep(0.02)
+            if recipe.prompt == "fail":
+                raise RuntimeError("TTM failed")
+            output_file_path = output_folder / f"{recipe.prompt}_{recipe.seed}.wav"
+            output_file_path.write_text(recipe.prompt, encoding="utf-8")
+            return output_file_path
+        finally:
+            with FakeMusicGenerator.lock:
+                FakeMusicGenerator.running -= 1
+
+
+def _write_recipe(paths: VideoCreatorPaths, prompts: list[str]):
+    """Write a background music recipe with one scene per prompt."""
+    music_recipes = [MusicGenRecipe(prompt=prompt, mood="calm", seed=1).to_dict() for prompt in prompts]
+    paths.background_music_recipe_file.write_text(json.dumps({"music_recipes": music_recipes}), encoding="utf-8")
+
+
+class TestBackgroundMusicAssetManager:
+    """Test deduplicated concurrent generation."""
+
+    @pytest.fixture
+    def paths(self, tmp_path, monkeypatch):
+        """Create a chapter folder and patch the music generator."""
+        FakeMusicGenerator.instances = 0
+        FakeMusicGenerator.prompts = []
+        FakeMusicGenerator.running = 0
+        FakeMusicGenerator.peak = 0
+        monkeypatch.setattr(MusicGenRecipe, "GENERATOR_TYPE", FakeMusicGenerator)
+        (tmp_path / "stories" / "test_story" / "prompts").mkdir(parents=True)
+        return VideoCreatorPaths(tmp_path, "test_story", 0)
+
+    def test_prompts_are_generated_once(self, paths):
+        """Repeated prompts anywhere in the chapter share one generation."""
+        _write_recipe(paths, ["rain", "forest", "rain", "sea", "forest", "rain"])
+        manager = BackgroundMusicAssetManager(paths)
+
+        manager.generate_background_music_assets(max_workers=3)
+
+        assets = manager.background_music_assets.background_music_assets
+        assert sorted(FakeMusicGenerator.prompts) == ["forest", "rain", "sea"]
+        assert FakeMusicGenerator.instances == 1
+        assert 1 < FakeMusicGenerator.peak <= 3
+        assert assets[0].asset == assets[2].asset == assets[5].asset
+        assert manager.background_music_assets.is_complete()
+
+    def test_existing_assets_are_reused(self, paths):
+        """Missing scenes reuse the music of a finished scene with the same prompt and seed."""
+        _write_recipe(paths, ["rain", "sea"])
+        BackgroundMusicAssetManager(paths).generate_background_music_assets(max_workers=1)
+        _write_recipe(paths, ["rain", "sea", "sea", "rain"])
+        FakeMusicGenerator.prompts = []
+
+        manager = BackgroundMusicAssetManager(paths)
+        manager.generate_background_music_assets(max_workers=1)
+
+        assert FakeMusicGenerator.prompts == []
+        assert manager.background_music_assets.is_complete()
+
+    def test_failures_are_isolated(self, paths):
+        """A failed prompt leaves only its scenes missing."""
+        _write_recipe(paths, ["fail", "sea", "fail"])
+        manager = BackgroundMusicAssetManager(paths)
+
+        manager.generate_background_music_assets(max_workers=2)
+
+        assert manager.background_music_assets.get_missing_background_music() == [0, 2]
+
+
+def _zip_response(files: dict[str, bytes]) -> Mock:
+    """Build a successful TTM response holding a ZIP archive."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+    response = Mock(status_code=200)
+    response.iter_content.return_value = [archive.getvalue()]
+    return response
+
+
+class TestMusicGenGenerator:
+    """Test response extraction and the persistent cache."""
+
+    @patch.object(MusicGenGenerator, "_wait_for_service_ready")
+    @patch("ct_video_creator.generators.service_client.ServiceClient.post")
+    def test_response_is_extracted_under_unique_name(self, mock_post, _mock_ready, tmp_path):
+        """Files are named after the prompt fingerprint so concurrent prompts never collide."""
+        mock_post.return_value = _zip_response({"outputs/music.wav": b"music"})
+        generator = MusicGenGenerator()
+
+        first = generator.text_to_music(MusicGenRecipe(prompt="rain", mood="calm", seed=1), tmp_path)
+        mock_post.return_value = _zip_response({"outputs/music.wav": b"other music"})
+        second = generator.text_to_music(MusicGenRecipe(prompt="sea", mood="calm", seed=1), tmp_path)
+
+        assert first.parent == tmp_path and first.suffix == ".wav"
+        assert first != second
+        assert first.read_bytes() == b"music"
+        assert not list(tmp_path.glob(".*.part"))
+
+    @patch.object(MusicGenGenerator, "_wait_for_service_ready")
+    @patch("ct_video_creator.generators.service_client.ServiceClient.post")
+    def test_cache_is_shared_across_chapters(self, mock_post, _mock_ready, tmp_path):
+        """A prompt generated for one chapter is served from the cache for another."""
+        mock_post.return_value = _zip_response({"music.wav": b"music"})
+        generator = MusicGenGenerator(cache=TTSCache(tmp_path / "cache"))
+        chapters = [tmp_path / "chapter_001", tmp_path / "chapter_002"]
+        for chapter in chapters:
+            chapter.mkdir()
+
+        outputs = [
+            generator.text_to_music(MusicGenRecipe(prompt="rain", mood=mood, seed=1), chapter)
+            for chapter, mood in zip(chapters, ["calm", "dark"])
+        ]
+
+        assert mock_post.call_count == 1
+        assert outputs[1].read_bytes() == b"music"
+        assert outputs[1].parent == chapters[1]
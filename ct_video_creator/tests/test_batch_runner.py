@@ -0,0 +1,122 @@
+"""
+Unit tests for the multi-chapter batch runner.
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from ct_video_creator import video_creator
+from ct_video_creator.batch_runner import BatchChapter, load_batch_manifest, run_batch
+from ct_video_creator.utils import AspectRatios
+
+STAGE_FUNCTIONS = [
+    "create_narrator_recipe",
+    "create_narrator_assets",
+    "create_image_recipe",
+    "create_images_assets",
+    "create_background_music_recipe",
+    "create_background_music_assets",
+    "create_sub_video_recipes",
+    "create_sub_videos_assets",
+    "create_assemble_video_recipe",
+    "assemble_video",
+    "clean_unused_assets",
+]
+
+
+class StageRecorder:
+    """Replace the stage functions and record which chapter ran which stage."""
+
+    def __init__(self, failing: set[tuple[str, int]] | None = None):
+        """Initialize with the (function, chapter_index) pairs that should fail."""
+        self.calls: list[tuple[str, int]] = []
+        self.failing = failing or set()
+        self.lock = threading.Lock()
+
+    def stage(self, function: str):
+        """Return a replacement of a stage function."""
+
+        def run(_user_folder, _story_name, chapter_index, *args, **kwargs):
+            with self.lock:
+                self.calls.append((function, chapter_index))
+            if (function, chapter_index) in self.failing:
+                raise RuntimeError(f"{function} failed")
+
+        return run
+
+    def run(self, chapters, checkpoint_path):
+        """Run a batch with the stage functions replaced."""
+        patches = [patch.object(video_creator, function, self.stage(function)) for function in STAGE_FUNCTIONS]
+        for patcher in patches:
+            patcher.start()
+        try:
+            return run_batch(chapters, checkpoint_path)
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+
+class TestBatchManifest:
+    """Test manifest loading."""
+
+    def test_load_manifest(self, tmp_path):
+        """Chapters are read with defaults and user folders relative to the manifest."""
+        manifest = tmp_path / "batch.json"
+        manifest.write_text(
+            json.dumps(
+                {
+                    "user_folder": "users",
+                    "chapters": [
+                        {"story_name": "story", "chapter_index": 0},
+                        {"story_name": "story", "chapter_index": 1, "aspect_ratio": "RATIO_9_16"},
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        chapters = load_batch_manifest(manifest)
+
+        assert [chapter.chapter_id for chapter in chapters] == ["story/chapter_001", "story/chapter_002"]
+        assert chapters[0].user_folder == tmp_path / "users"
+        assert chapters[1].aspect_ratio == AspectRatios.RATIO_9_16
+
+    def test_duplicate_chapters_are_rejected(self, tmp_path):
+        """A chapter listed twice raises ValueError."""
+        manifest = tmp_path / "batch.json"
+        chapter = {"story_name": "story", "chapter_index": 0}
+        manifest.write_text(json.dumps({"chapters": [chapter, chapter]}), encoding="utf-8")
+
+        with pytest.raises(ValueError, match="more than once"):
+            load_batch_manifest(manifest)
+
+
+class TestRunBatch:
+    """Test interleaved runs, failure isolation and resuming."""
+
+    def test_failed_chapter_resumes_from_checkpoint(self, tmp_path):
+        """A failing chapter does not stop the others and a second run only repeats its unfinished stages."""
+        chapters = [BatchChapter(tmp_path, "story", index) for index in range(3)]
+        checkpoint_path = tmp_path / "batch.checkpoint.json"
+
+        recorder = StageRecorder(failing={("create_sub_videos_assets", 1)})
+        results = recorder.run(chapters, checkpoint_path)
+
+        assert set(results["story/chapter_001"].values()) == {"done"}
+        assert set(results["story/chapter_003"].values()) == {"done"}
+        assert results["story/chapter_002"]["sub_video_assets"] == "failed"
+        assert results["story/chapter_002"]["assemble_video"] == "skipped"
+        assert len(recorder.calls) == 3 * len(STAGE_FUNCTIONS) - 2
+
+        recorder = StageRecorder()
+        results = recorder.run(chapters, checkpoint_path)
+
+        assert sorted(recorder.calls) == [
+            ("assemble_video", 1),
+            ("clean_unused_assets", 1),
+            ("create_sub_videos_assets", 1),
+        ]
+        assert all(set(stages.values()) == {"done"} for stages in results.values())
@@ -0,0 +1,95 @@
+"""
+Unit tests for AsyncComfyUIClient against a local WebSocket server that emits ComfyUI events.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from ct_video_creator.comfyui.comfyui_async_client import AsyncComfyUIClient, _websocket_url
+
+
+class FakeRequests:
+    """Stand-in for ComfyUIRequests that serves history entries from a dict."""
+
+    def __init__(self):
+        """Initialize with an empty history."""
+        self.client_id = "test-client"
+        self.retry_delay = 0
+        self.history = {}
+        self.history_calls = []
+
+    def get_history_entry(self, prompt_id: str) -> dict:
+        """Return the history entry of a prompt, or an empty dict."""
+        self.history_calls.append(prompt_id)
+        return self.history.get(prompt_id, {})
+
+
+async def _run_with_server(handler, test):
+    """Start a WebSocket server with handler and run test(base_url)."""
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        return await test(f"http://127.0.0.1:{port}")
+
+
+class TestAsyncComfyUIClient:
+    """Test WebSocket based completion detection."""
+
+    def test_websocket_url(self):
+        """HTTP base URLs are converted to WebSocket URLs with the client id."""
+        assert _websocket_url("http://host:8188", "abc") == "ws://host:8188/ws?clientId=abc"
+        assert _websocket_url("https://host/", "abc") == "wss://host/ws?clientId=abc"
+
+    def test_wait_for_prompt_resolves_on_executing_event(self):
+        """The prompt history is fetched after the executing event with no node."""
+        requests = FakeRequests()
+
+        async def handler(connection):
+            await asyncio.sleep(0.05)
+            await connection.send(json.dumps({"type": "status", "data": {"status": {}}}))
+            await connection.send(b"preview image")
+            await connection.send(json.dumps({"type": "executing", "data": {"node": "3", "prompt_id": "p1"}}))
+            requests.history["p1"] = {"status": {"status_str": "success", "completed": True}}
+            await connection.send(json.dumps({"type": "executing", "data": {"node": None, "prompt_id": "p1"}}))
+            await asyncio.sleep(1)
+
+        async def test(base_url):
+            async with AsyncComfyUIClient(requests, base_url=base_url, history_check_interval=30) as client:
+                return await asyncio.wait_for(client.wait_for_prompt("p1"), timeout=5)
+
+        entry = asyncio.run(_run_with_server(handler, test))
+
+        assert entry["status"]["completed"] is True
+        assert set(requests.history_calls) == {"p1"}
+        assert len(requests.history_calls) == 2
+
+    def test_prompt_finished_before_connect(self):
+        """A prompt that already finished is returned from the history without waiting for events."""
+        requests = FakeRequests()
+        requests.history["p2"] = {"status": {"status_str": "success", "completed": True}}
+
+        async def handler(connection):
+            await asyncio.sleep(1)
+
+        async def test(base_url):
+            async with AsyncComfyUIClient(requests, base_url=base_url) as client:
+                return await asyncio.wait_for(client.wait_for_prompt("p2"), timeout=5)
+
+        assert asyncio.run(_run_with_server(handler, test))["status"]["completed"] is True
+
+    def test_wait_for_prompt_timeout(self):
+        """A prompt that never finishes raises TimeoutError."""
+        requests = FakeRequests()
+
+        async def handler(connection):
+            await asyncio.sleep(1)
+
+        async def test(base_url):
+            async with AsyncComfyUIClient(requests, base_url=base_url) as client:
+                await client.wait_for_prompt("p3", timeout=0.2)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(_run_with_server(handler, test))
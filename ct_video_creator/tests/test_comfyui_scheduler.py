@@ -0,0 +1,150 @@
+"""
+Unit tests for the model-family-aware ComfyUI job scheduler.
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from ct_video_creator.comfyui import ComfyUIJob, ComfyUIJobScheduler
+from ct_video_creator.comfyui.comfyui_workflow import IComfyUIWorkflow
+
+
+def _workflow(family: str, name: str) -> Mock:
+    """Create a mock workflow of a model family."""
+    workflow = Mock(spec=IComfyUIWorkflow)
+    workflow.get_model_family.return_value = family
+    workflow.get_workflow_summary.return_value = name
+    return workflow
+
+
+class FakeRequests:
+    """Record the batches sent to ComfyUI and return one output per workflow."""
+
+    def __init__(self, failing: set[str] | None = None):
+        """Initialize with the names of workflows that fail."""
+        self.calls = []
+        self.failing = failing or set()
+
+    def send_prompts_pipelined(self, req_list, output_dir, max_queued):
+        """Record the batch and return a file per successful workflow."""
+        names = [workflow.get_workflow_summary() for workflow in req_list]
+        self.calls.append(("batch", names))
+        return [[] if name in self.failing else [output_dir / f"{name}.out"] for name in names]
+
+    def free_memory(self):
+        """Record a memory release."""
+        self.calls.append(("free", None))
+
+
+class TestComfyUIJobScheduler:
+    """Test job ordering and execution."""
+
+    def _scene_jobs(self, scheduler: ComfyUIJobScheduler, scene_count: int) -> None:
+        """Add WAN -> Florence -> WAN chains for independent scenes, interleaved per scene."""
+        for scene in range(scene_count):
+            scheduler.add_job(ComfyUIJob(f"wan_{scene}_0", _workflow("wan", f"wan_{scene}_0"), Path("out")))
+            scheduler.add_job(
+                ComfyUIJob(
+                    f"florence_{scene}",
+                    lambda outputs, scene=scene: _workflow("florence", f"florence_{scene}"),
+                    Path("out"),
+                    depends_on=[f"wan_{scene}_0"],
+                    model_family="florence",
+                )
+            )
+            scheduler.add_job(
+                ComfyUIJob(
+                    f"wan_{scene}_1",
+                    _workflow("wan", f"wan_{scene}_1"),
+                    Path("out"),
+                    depends_on=[f"florence_{scene}"],
+                )
+            )
+
+    def test_plan_groups_families_and_respects_dependencies(self):
+        """Independent chains are grouped by family without breaking their order."""
+        scheduler = ComfyUIJobScheduler(requests=FakeRequests())
+        self._scene_jobs(scheduler, 3)
+
+        batches = [[job.job_id for job in batch] for batch in scheduler.plan()]
+
+        assert batches == [
+            ["wan_0_0", "wan_1_0", "wan_2_0"],
+            ["florence_0", "florence_1", "florence_2"],
+            ["wan_0_1", "wan_1_1", "wan_2_1"],
+        ]
+
+    def test_run_reports_swaps_avoided(self):
+        """Running the plan frees memory only between families and reports the avoided swaps."""
+        requests = FakeRequests()
+        scheduler = ComfyUIJobScheduler(requests=requests)
+        self._scene_jobs(scheduler, 3)
+
+        results = scheduler.run()
+
+        # The interleaved order swaps six times, the plan only twice
+        assert scheduler.swaps_avoided == 4
+        assert [call[0] for call in requests.calls] == ["batch", "free", "batch", "free", "batch", "free"]
+        assert results["wan_2_1"] == [Path("out") / "wan_2_1.out"]
+        assert not scheduler.failed_jobs
+
+    def test_lazy_workflow_receives_dependency_outputs(self):
+        """A workflow factory is called with the outputs of its dependencies."""
+        scheduler = ComfyUIJobScheduler(requests=FakeRequests())
+        factory = Mock(return_value=_workflow("florence", "describe"))
+        scheduler.add_job(ComfyUIJob("image", _workflow("flux", "image"), Path("out")))
+        scheduler.add_job(ComfyUIJob("describe", factory, Path("out"), depends_on=["image"], model_family="florence"))
+
+        scheduler.run()
+
+        factory.assert_called_once_with({"image": [Path("out") / "image.out"]})
+
+    def test_same_family_chain_runs_in_dependency_order(self):
+        """A job depending on a job of the same family is built after its dependency finished."""
+        requests = FakeRequests()
+        scheduler = ComfyUIJobScheduler(requests=requests)
+        factory = Mock(return_value=_workflow("flux", "b"))
+        scheduler.add_job(ComfyUIJob("a", _workflow("flux", "a"), Path("out")))
+        scheduler.add_job(ComfyUIJob("b", factory, Path("out"), depends_on=["a"], model_family="flux"))
+
+        assert [[job.job_id for job in batch] for batch in scheduler.plan()] == [["a"], ["b"]]
+
+        results = scheduler.run()
+
+        factory.assert_called_once_with({"a": [Path("out") / "a.out"]})
+        assert results["b"] == [Path("out") / "b.out"]
+        # Both batches use the same family, so memory is only freed at the end
+        assert [call[0] for call in requests.calls] == ["batch", "batch", "free"]
+        assert scheduler.swaps_avoided == 0
+
+    def test_failed_job_skips_dependents(self):
+        """Jobs depending on a failed job are not run and are reported as failed."""
+        requests = FakeRequests(failing={"wan_0_0"})
+        scheduler = ComfyUIJobScheduler(requests=requests)
+        self._scene_jobs(scheduler, 2)
+
+        results = scheduler.run()
+
+        assert set(scheduler.failed_jobs) == {"wan_0_0", "florence_0", "wan_0_1"}
+        assert "wan_1_1" in results
+        assert all("florence_0" not in call[1] for call in requests.calls if call[0] == "batch")
+
+    def test_invalid_dependencies(self):
+        """Unknown dependencies and cycles are rejected."""
+        scheduler = ComfyUIJobScheduler(requests=FakeRequests())
+        scheduler.add_job(ComfyUIJob("a", _workflow("flux", "a"), Path("out"), depends_on=["missing"]))
+        with pytest.raises(ValueError, match="unknown"):
+            scheduler.plan()
+
+        scheduler = ComfyUIJobScheduler(requests=FakeRequests())
+        scheduler.add_job(ComfyUIJob("a", _workflow("flux", "a"), Path("out"), depends_on=["b"]))
+        scheduler.add_job(ComfyUIJob("b", _workflow("flux", "b"), Path("out"), depends_on=["a"]))
+        with pytest.raises(ValueError, match="cycle"):
+            scheduler.plan()
+
+    def test_lazy_workflow_requires_model_family(self):
+        """A workflow factory without a model family is rejected."""
+        with pytest.raises(ValueError):
+            ComfyUIJob("a", lambda outputs: _workflow("flux", "a"), Path("out"))
@@ -0,0 +1,199 @@
+"""
+Unit tests for the stream-copy fast path of concatenate_videos_remove_last_frame_except_last.
+
+ffprobe and ffmpeg are replaced with fakes so the chosen commands can be inspected without an
+ffmpeg binary.
+"""
+
+import pytest
+
+from ct_video_creator.utils import encoder_profiles, ffmpeg_wrapper
+from ct_video_creator.utils.ffmpeg_wrapper import concatenate_videos_remove_last_frame_except_last
+
+
+def _fake_probe_result(
+    frames: int = 49,
+    width: int = 832,
+    cut_frames: int | None = None,
+    audio_duration: float | None = None,
+    has_b_frames: int = 0,
+) -> dict:
+    """Build a minimal ffprobe-like result for a 16 fps clip, with an AAC track when audio_duration is given."""
+    if cut_frames is not None:
+        frames = cut_frames
+    streams = [
+        {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "profile": "High",
+            "level": 40,
+            "refs": 1,
+            "width": width,
+            "height": 480,
+            "pix_fmt": "yuv420p",
+            "r_frame_rate": "16/1",
+            "time_base": "1/16384",
+            "has_b_frames": has_b_frames,
+            "nb_frames": str(frames),
+            "duration": str(frames / 16),
+        }
+    ]
+    if audio_duration is not None:
+        streams.append(
+            {
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "sample_rate": "44100",
+                "channels": 2,
+                "duration": str(audio_duration),
+            }
+        )
+    return {"streams": streams, "format": {"duration": str(frames / 16)}}
+
+
+class FakeFFmpeg:
+    """Record ffmpeg commands, the concat list contents and write placeholder outputs."""
+
+    def __init__(self):
+        """Initialize with empty records."""
+        self.commands = []
+        self.concat_list = []
+
+    def __call__(self, cmd):
+        """Record the command and create the output file."""
+        self.commands.append(cmd)
+        if "concat" in cmd:
+            list_file = cmd[cmd.index("-i") + 1]
+            with open(list_file, "r", encoding="utf-8") as file:
+                self.concat_list = file.read().splitlines()
+        with open(cmd[-1], "wb") as file:
+            file.write(b"0" * 20000)
+
+
+class TestConcatFastPath:
+    """Test the stream-copy fast path selection."""
+
+    @pytest.fixture
+    def fake_ffmpeg(self, monkeypatch):
+        """Replace the ffmpeg runner with a recorder."""
+        fake = FakeFFmpeg()
+        monkeypatch.setattr(ffmpeg_wrapper, "_run_ffmpeg_trace", fake)
+        monkeypatch.setattr(ffmpeg_wrapper, "_check_gpu_memory", lambda: None)
+        monkeypatch.setattr(encoder_profiles, "get_available_encoders", lambda: frozenset({"libx264"}))
+        return fake
+
+    def _make_segments(self, tmp_path, count=3):
+        """Create placeholder segment files."""
+        segments = []
+        for index in range(count):
+            segment = tmp_path / f"sub_video_{index}.mp4"
+            segment.write_bytes(b"0" * 2048)
+            segments.append(segment)
+        return segments
+
+    def test_homogeneous_segments_use_stream_copy(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """Matching segments drop their last frame with stream copy and the final segment is reused."""
+        segments = self._make_segments(tmp_path)
+        monkeypatch.setattr(
+            ffmpeg_wrapper,
+            "_probe",
+            lambda path: _fake_probe_result(cut_frames=48 if path.name.startswith("seg_") else None),
+        )
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        cut_commands = fake_ffmpeg.commands[:-1]
+        assert len(cut_commands) == 2
+        for cmd in cut_commands:
+            assert cmd[cmd.index("-c:v") + 1] == "copy"
+            assert cmd[cmd.index("-frames:v") + 1] == "48"
+            assert "libx264" not in cmd
+        assert str(segments[-1].resolve()) in fake_ffmpeg.concat_list[-1]
+        assert segments[-1].exists()
+
+    def test_mismatched_segments_are_reencoded(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """Segments with different parameters fall back to a full re-encode."""
+        segments = self._make_segments(tmp_path)
+        monkeypatch.setattr(
+            ffmpeg_wrapper,
+            "_probe",
+            lambda path: _fake_probe_result(width=1280 if path.name == "sub_video_1.mp4" else 832),
+        )
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        reencode_commands = fake_ffmpeg.commands[:-1]
+        assert len(reencode_commands) == 3
+        assert all("libx264" in cmd for cmd in reencode_commands)
+
+    def test_failed_cut_verification_falls_back_to_reencode(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """A stream-level cut that does not remove exactly one frame makes every segment be re-encoded."""
+        segments = self._make_segments(tmp_path, count=3)
+        monkeypatch.setattr(ffmpeg_wrapper, "_probe", lambda path: _fake_probe_result())
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        assert "-frames:v" in fake_ffmpeg.commands[0]
+        reencode_commands = fake_ffmpeg.commands[1:-1]
+        assert len(reencode_commands) == 3
+        assert all("libx264" in cmd for cmd in reencode_commands)
+        assert str(segments[-1].resolve()) not in "\n".join(fake_ffmpeg.concat_list)
+
+    def test_audio_is_trimmed_to_the_cut_video(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """The audio track is re-encoded and trimmed to the video duration instead of cut at packet level."""
+        segments = self._make_segments(tmp_path, count=2)
+        monkeypatch.setattr(
+            ffmpeg_wrapper,
+            "_probe",
+            lambda path: (
+                _fake_probe_result(cut_frames=48, audio_duration=3.0)
+                if path.name.startswith("seg_")
+                else _fake_probe_result(audio_duration=49 / 16)
+            ),
+        )
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        cut_command = fake_ffmpeg.commands[0]
+        assert "-shortest" not in cut_command
+        assert cut_command[cut_command.index("-c:v") + 1] == "copy"
+        assert cut_command[cut_command.index("-af") + 1].startswith("atrim=end=3.000000")
+        assert len(fake_ffmpeg.commands) == 2
+
+    def test_audio_duration_mismatch_falls_back_to_reencode(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """A cut whose audio does not end with the video is replaced by a re-encode."""
+        segments = self._make_segments(tmp_path, count=2)
+        monkeypatch.setattr(
+            ffmpeg_wrapper,
+            "_probe",
+            lambda path: (
+                _fake_probe_result(cut_frames=48, audio_duration=49 / 16)
+                if path.name.startswith("seg_")
+                else _fake_probe_result(audio_duration=49 / 16)
+            ),
+        )
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        assert "-frames:v" in fake_ffmpeg.commands[0]
+        assert all("libx264" in cmd for cmd in fake_ffmpeg.commands[1:-1])
+        assert len(fake_ffmpeg.commands) == 4
+
+    def test_smart_cut_tail_matches_source_parameters(self, tmp_path, fake_ffmpeg, monkeypatch):
+        """With B-frames the re-encoded tail uses the source codec, profile, level and references."""
+        segments = self._make_segments(tmp_path, count=2)
+        monkeypatch.setattr(
+            ffmpeg_wrapper,
+            "_probe",
+            lambda path: _fake_probe_result(cut_frames=48 if path.name.startswith("seg_") else None, has_b_frames=2),
+        )
+        monkeypatch.setattr(ffmpeg_wrapper, "_keyframe_times", lambda path: [0.0, 1.0, 2.0])
+
+        concatenate_videos_remove_last_frame_except_last(segments, tmp_path / "out" / "scene.mp4")
+
+        tail_command = fake_ffmpeg.commands[1]
+        assert tail_command[tail_command.index("-c:v") + 1] == "libx264"
+        assert tail_command[tail_command.index("-profile:v") + 1] == "high"
+        assert tail_command[tail_command.index("-level") + 1] == "4.0"
+        assert tail_command[tail_command.index("-refs") + 1] == "1"
+        assert "h264_nvenc" not in tail_command
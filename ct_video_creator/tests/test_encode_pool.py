@@ -0,0 +1,95 @@
+"""
+Unit tests for the bounded encode worker pool.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ct_video_creator.utils import encode_pool
+from ct_video_creator.utils.encode_pool import run_encode_jobs, set_max_nvenc_sessions
+
+
+class ConcurrencyTracker:
+    """Track how many jobs run at the same time."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def job(self, value, delay=0.02):
+        """Return a job that records concurrency and returns value."""
+
+        def run():
+            with self._lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            time.sleep(delay)
+            with self._lock:
+                self.running -= 1
+            return value
+
+        return run
+
+
+class TestRunEncodeJobs:
+    """Test run_encode_jobs behaviour."""
+
+    @pytest.fixture(autouse=True)
+    def restore_nvenc_sessions(self):
+        """Restore the default NVENC session limit after each test."""
+        yield
+        set_max_nvenc_sessions(encode_pool.DEFAULT_MAX_NVENC_SESSIONS)
+
+    def test_results_keep_job_order(self):
+        """Results are returned in job order even when jobs finish out of order."""
+        tracker = ConcurrencyTracker()
+        jobs = [tracker.job(index, delay=0.05 - index * 0.01) for index in range(5)]
+
+        assert run_encode_jobs(jobs, max_workers=5) == [0, 1, 2, 3, 4]
+
+    def test_max_workers_limits_concurrency(self):
+        """No more than max_workers jobs run at the same time."""
+        tracker = ConcurrencyTracker()
+
+        run_encode_jobs([tracker.job(index) for index in range(8)], max_workers=2)
+
+        assert tracker.peak <= 2
+
+    def test_nvenc_session_cap(self):
+        """GPU jobs never exceed the NVENC session limit, even with more workers."""
+        set_max_nvenc_sessions(2)
+        tracker = ConcurrencyTracker()
+
+        run_encode_jobs([tracker.job(index) for index in range(8)], max_workers=6, use_gpu=True)
+
+        assert tracker.peak <= 2
+
+    def test_first_failure_cancels_remaining_jobs(self):
+        """The first failure is raised and jobs that have not started are skipped."""
+        started = []
+
+        def failing_job():
+            raise RuntimeError("encode failed")
+
+        def slow_job(index):
+            def run():
+                started.append(index)
+                time.sleep(0.02)
+                return index
+
+            return run
+
+        jobs = [failing_job, *[slow_job(index) for index in range(10)]]
+
+        with pytest.raises(RuntimeError, match="encode failed"):
+            run_encode_jobs(jobs, max_workers=1)
+
+        assert not started
+
+    def test_empty_jobs(self):
+        """An empty job list returns an empty result."""
+        assert not run_encode_jobs([])
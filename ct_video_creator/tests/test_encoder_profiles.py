@@ -0,0 +1,108 @@
+"""
+Unit tests for the encoder profile registry.
+"""
+
+import subprocess
+
+import pytest
+
+from ct_video_creator.utils import encoder_profiles
+from ct_video_creator.utils.encoder_profiles import (
+    EncoderBackend,
+    encoder_args,
+    encoder_options,
+    register_encoder_profile,
+    resolve_encoder_profile,
+)
+
+FFMPEG_ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D libopenh264          OpenH264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+
+def _use_encoders(monkeypatch, encoders):
+    """Make the registry see only the given encoders."""
+    monkeypatch.setattr(encoder_profiles, "get_available_encoders", lambda: frozenset(encoders))
+
+
+class TestEncoderProfiles:
+    """Test encoder profile resolution and fallback."""
+
+    def test_prefers_nvenc_when_available(self, monkeypatch):
+        """The fastest backend of a profile is used when it is available."""
+        _use_encoders(monkeypatch, {"h264_nvenc", "libx264"})
+
+        assert resolve_encoder_profile("standard").encoder == "h264_nvenc"
+        assert resolve_encoder_profile("standard").uses_gpu
+
+    def test_falls_back_to_libx264(self, monkeypatch):
+        """Without NVENC the profile falls back to libx264 with CPU options."""
+        _use_encoders(monkeypatch, {"libx264", "libopenh264"})
+
+        options = encoder_options("standard")
+
+        assert options["c:v"] == "libx264"
+        assert options["crf"] == "23"
+        assert "cq" not in options
+
+    def test_falls_back_to_libopenh264(self, monkeypatch):
+        """Builds without libx264 fall back to libopenh264."""
+        _use_encoders(monkeypatch, {"libopenh264"})
+
+        assert encoder_args("standard")[:2] == ["-c:v", "libopenh264"]
+
+    def test_gop_is_converted_to_frames(self, monkeypatch):
+        """Profiles with a keyframe interval in seconds get -g based on the frame rate."""
+        _use_encoders(monkeypatch, {"h264_nvenc"})
+
+        assert encoder_options("delivery", fps=30)["g"] == "60"
+        assert "g" not in encoder_options("delivery")
+
+    def test_unknown_profile_raises(self, monkeypatch):
+        """Unknown profile names raise ValueError."""
+        _use_encoders(monkeypatch, {"libx264"})
+
+        with pytest.raises(ValueError):
+            resolve_encoder_profile("does_not_exist")
+
+    def test_no_available_backend_raises(self, monkeypatch):
+        """A profile with no available encoder raises RuntimeError."""
+        _use_encoders(monkeypatch, set())
+
+        with pytest.raises(RuntimeError):
+            resolve_encoder_profile("standard")
+
+    def test_register_profile(self, monkeypatch):
+        """Registered profiles can be resolved by name."""
+        _use_encoders(monkeypatch, {"libx264"})
+        monkeypatch.setitem(encoder_profiles.ENCODER_PROFILES, "test_profile", [])
+
+        register_encoder_profile("test_profile", [EncoderBackend("libx264", {"preset": "ultrafast"})])
+
+        assert encoder_options("test_profile") == {"c:v": "libx264", "preset": "ultrafast"}
+
+    @pytest.mark.parametrize("has_gpu, expected_nvenc", [(True, True), (False, False)])
+    def test_available_encoders_parsing(self, monkeypatch, has_gpu, expected_nvenc):
+        """Video encoders are parsed from ffmpeg output and NVENC is hidden without a GPU."""
+        encoder_profiles.get_available_encoders.cache_clear()
+        monkeypatch.setattr(encoder_profiles, "has_nvidia_gpu", lambda: has_gpu)
+        monkeypatch.setattr(
+            encoder_profiles.subprocess,
+            "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, stdout=FFMPEG_ENCODERS_OUTPUT, stderr=""),
+        )
+
+        try:
+            encoders = encoder_profiles.get_available_encoders()
+        finally:
+            encoder_profiles.get_available_encoders.cache_clear()
+
+        assert "libx264" in encoders
+        assert "libopenh264" in encoders
+        assert "aac" not in encoders
+        assert ("h264_nvenc" in encoders) == expected_nvenc
@@ -3,11 +3,13 @@ Unit tests for garbage_collector module.
 """
 
 import json
+import os
+import time
 
 import pytest
 
 from ct_video_creator.utils import VideoCreatorPaths
-from ct_video_creator.utils.garbage_collector import internal_clean_unused_assets
+from ct_video_creator.utils.garbage_collector import GarbageCollector, internal_clean_unused_assets
 
 
 class TestGarbageCollector:
@@ -476,3 +478,105 @@ class TestGarbageCollector:
         assert not image_file.exists()
         assert not sub_video_file.exists()
         assert not assembler_file.exists()
+
+
+def _create_chapter(user_folder, story_name, chapter_index, used_narrator, unused_narrator):
+    """Create a chapter whose narrator assets list one of its two narrator files."""
+    paths = VideoCreatorPaths(user_folder, story_name, chapter_index)
+    with open(paths.narrator_asset_file, "w", encoding="utf-8") as f:
+        json.dump({"assets": [{"index": 1, "narrator": f"assets/narrators/{used_narrator}"}]}, f)
+    (paths.narrator_asset_folder / used_narrator).write_bytes(b"used")
+    (paths.narrator_asset_folder / unused_narrator).write_bytes(b"unused narrator")
+    return paths
+
+
+def _make_temp_folder(parent, name, size, age):
+    """Create a temporary folder holding one file of the given size, last modified age seconds ago."""
+    folder = parent / name
+    folder.mkdir()
+    (folder / "segment.mp4").write_bytes(b"x" * size)
+    modified = time.time() - age
+    for path in (folder / "segment.mp4", folder):
+        os.utime(path, (modified, modified))
+    return folder
+
+
+class TestParallelGarbageCollector:
+    """Test collecting whole user folders, the dry-run report and the temporary folder policy."""
+
+    def test_dry_run_reports_without_deleting(self, tmp_path):
+        """A dry run reports the reclaimable bytes per module and keeps every file."""
+        paths = _create_chapter(tmp_path, "story", 0, "used.mp3", "unused.mp3")
+        (paths.image_asset_folder / "old_image.png").write_bytes(b"image")
+
+        report = GarbageCollector(dry_run=True).collect(tmp_path)
+
+        assert report.reclaimable_bytes == {"narrator": len(b"unused narrator"), "image": len(b"image")}
+        assert report.reclaimable_files == {"narrator": 1, "image": 1}
+        assert report.chapters == 1
+        assert (paths.narrator_asset_folder / "unused.mp3").exists()
+        assert (paths.image_asset_folder / "old_image.png").exists()
+
+    def test_dry_run_leaves_tree_unchanged(self, tmp_path):
+        """A dry run creates, rewrites and renames nothing, even on bare chapters or corrupted JSON files."""
+        paths = _create_chapter(tmp_path, "story", 0, "used.mp3", "unused.mp3")
+        paths.image_asset_file.write_text("{ not json", encoding="utf-8")
+        (tmp_path / "stories" / "bare_story" / "videos" / "chapter_001").mkdir(parents=True)
+
+        def snapshot():
+            return {
+                path.relative_to(tmp_path): (path.read_bytes() if path.is_file() else None, path.stat().st_mtime_ns)
+                for path in tmp_path.rglob("*")
+            }
+
+        before = snapshot()
+        report = GarbageCollector(dry_run=True).collect(tmp_path)
+
+        assert snapshot() == before
+        assert report.chapters == 2
+        assert report.reclaimable_files == {"narrator": 1}
+
+    def test_collects_every_story_and_chapter(self, tmp_path):
+        """Unused files of all chapters of all stories are deleted, used files are kept."""
+        chapters = [
+            _create_chapter(tmp_path, "first_story", 0, "a.mp3", "old_a.mp3"),
+            _create_chapter(tmp_path, "first_story", 1, "b.mp3", "old_b.mp3"),
+            _create_chapter(tmp_path, "second_story", 0, "c.mp3", "old_c.mp3"),
+        ]
+
+        report = GarbageCollector(max_workers=2).collect(tmp_path)
+
+        assert report.chapters == 3
+        assert report.reclaimable_files == {"narrator": 3}
+        assert [[path.name for path in paths.narrator_asset_folder.iterdir()] for paths in chapters] == [
+            ["a.mp3"],
+            ["b.mp3"],
+            ["c.mp3"],
+        ]
+
+    def test_story_filter(self, tmp_path):
+        """Only the chapters of the given story are collected."""
+        kept = _create_chapter(tmp_path, "other_story", 0, "a.mp3", "old_a.mp3")
+        _create_chapter(tmp_path, "story", 0, "b.mp3", "old_b.mp3")
+
+        report = GarbageCollector().collect(tmp_path, "story")
+
+        assert report.chapters == 1
+        assert (kept.narrator_asset_folder / "old_a.mp3").exists()
+
+    def test_temp_folder_policy(self, tmp_path):
+        """Old temporary folders and large idle ones are removed, recent ones are kept."""
+        paths = VideoCreatorPaths(tmp_path, "story", 0)
+        assembler_folder = paths.video_assembler_asset_folder
+        old = _make_temp_folder(assembler_folder, "temp_files", 10, age=7200)
+        large = _make_temp_folder(assembler_folder, "temp_fade_segments", 1000, age=1200)
+        recent = _make_temp_folder(paths.sub_videos_asset_folder, "temp_concat_segments", 1000, age=10)
+        other = _make_temp_folder(assembler_folder, "render_cache", 10, age=7200)
+
+        report = GarbageCollector(temp_max_age=3600, temp_max_bytes=100).collect_chapter(tmp_path, "story", 0)
+
+        assert report.reclaimable_bytes == {"temp_files": 10, "temp_fade_segments": 1000}
+        assert not old.exists()
+        assert not large.exists()
+        assert recent.exists()
+        assert other.exists()
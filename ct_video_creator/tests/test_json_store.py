@@ -0,0 +1,99 @@
+"""
+Unit tests for JsonStore.
+"""
+
+import json
+import threading
+
+from ct_video_creator.utils import JsonStore
+
+
+class TestJsonStore:
+    """Test atomic, deduplicated and coalesced JSON writes."""
+
+    def test_save_and_load(self, tmp_path):
+        """Saved data is written with the repo's JSON formatting and loads back."""
+        store = JsonStore()
+        path = tmp_path / "assets.json"
+
+        store.save(path, {"assets": ["é"]}, ensure_ascii=False)
+
+        assert path.read_text(encoding="utf-8") == json.dumps({"assets": ["é"]}, indent=4, ensure_ascii=False)
+        assert store.load(path) == {"assets": ["é"]}
+        assert [item.name for item in tmp_path.iterdir()] == ["assets.json"]
+
+    def test_unchanged_save_is_skipped(self, tmp_path):
+        """Saving the content already on disk does not rewrite the file."""
+        store = JsonStore()
+        path = tmp_path / "assets.json"
+
+        store.save(path, {"assets": [1]})
+        store.save(path, {"assets": [1]})
+
+        assert (store.writes, store.skipped_writes) == (1, 1)
+
+    def test_saving_loaded_content_is_skipped(self, tmp_path):
+        """Saving back what was just loaded does not rewrite the file."""
+        path = tmp_path / "recipe.json"
+        path.write_text(json.dumps({"narrator_data": []}, indent=4), encoding="utf-8")
+        store = JsonStore()
+
+        store.save(path, store.load(path))
+
+        assert (store.writes, store.skipped_writes) == (0, 1)
+
+    def test_external_change_is_overwritten(self, tmp_path):
+        """A file changed by someone else is written again even if the content matches the last save."""
+        store = JsonStore()
+        path = tmp_path / "assets.json"
+        store.save(path, {"assets": [1]})
+
+        path.write_text("{}", encoding="utf-8")
+        store.save(path, {"assets": [1]})
+
+        assert store.load(path) == {"assets": [1]}
+        assert store.writes == 2
+
+    def test_delayed_saves_are_coalesced(self, tmp_path):
+        """Saves within the write delay result in one write of the latest content."""
+        store = JsonStore(write_delay=60)
+        path = tmp_path / "assets.json"
+
+        for index in range(5):
+            store.save(path, {"assets": list(range(index + 1))})
+
+        assert not path.exists()
+        assert store.load(path) == {"assets": [0, 1, 2, 3, 4]}
+        assert store.writes == 1
+
+    def test_coalesced_writes_flushes_on_exit(self, tmp_path):
+        """Leaving the context writes pending content and restores the write delay."""
+        store = JsonStore()
+        path = tmp_path / "assets.json"
+
+        with store.coalesced_writes(60):
+            store.save(path, {"assets": [1]})
+            store.save(path, {"assets": [2]})
+            assert not path.exists()
+
+        assert store.write_delay == 0
+        assert json.loads(path.read_text(encoding="utf-8")) == {"assets": [2]}
+        assert store.writes == 1
+
+    def test_concurrent_saves_leave_valid_json(self, tmp_path):
+        """Saves from many threads never leave a partial file."""
+        store = JsonStore()
+        path = tmp_path / "assets.json"
+
+        def save_many(worker: int) -> None:
+            for index in range(20):
+                store.save(path, {"worker": worker, "assets": list(range(index * 50))})
+
+        threads = [threading.Thread(target=save_many, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store.load(path)["assets"]) == 19 * 50
+        assert [item.name for item in tmp_path.iterdir()] == ["assets.json"]
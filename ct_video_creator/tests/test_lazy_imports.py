@@ -0,0 +1,75 @@
+"""
+Regression tests for the lazy package imports.
+
+The imports run in a fresh interpreter, since the test session has already imported most of the package.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import ct_video_creator
+from ct_video_creator import generators
+
+# Dependencies that must only be imported by the stages using them
+HEAVY_MODULES = ["stable_whisper", "ct_llm", "torch"]
+
+# Cold import budget, far below the seconds taken by importing Whisper and torch
+MAX_IMPORT_SECONDS = 2.0
+
+
+def _run_cold(code: str) -> dict:
+    """Run code in a new interpreter and return the heavy modules it imported and its duration."""
+    script = f"""
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules], "elapsed": elapsed}}))
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestLazyImports:
+    """Test that importing the package and running light stages does not import heavy dependencies."""
+
+    def test_package_import_is_light(self):
+        """Importing the package imports none of the heavy dependencies."""
+        result = _run_cold("import ct_video_creator")
+
+        assert result["modules"] == []
+        assert result["elapsed"] < MAX_IMPORT_SECONDS
+
+    def test_light_stages_do_not_import_generators(self):
+        """The narrator recipe and garbage collection stages do not import Whisper or the LLM client."""
+        result = _run_cold(
+            "import ct_video_creator\n"
+            "ct_video_creator.create_narrator_recipe\n"
+            "ct_video_creator.clean_unused_assets\n"
+            "from ct_video_creator.modules.narrator import NarratorRecipeBuilder, NarratorAssetManager\n"
+            "from ct_video_creator.environment_variables import DEFAULT_ASSETS_FOLDER\n"
+        )
+
+        assert result["modules"] == []
+
+    def test_subtitle_generator_defers_whisper(self):
+        """Whisper is imported when a model is loaded, not when the generator is imported."""
+        result = _run_cold("from ct_video_creator.generators import SubtitleGenerator\nSubtitleGenerator()")
+
+        assert "stable_whisper" not in result["modules"]
+
+    def test_lazy_attributes_resolve(self):
+        """Lazy attributes resolve to the objects of their submodule and are listed by dir()."""
+        from ct_video_creator.video_creator import run_chapter  # pylint: disable=import-outside-toplevel
+
+        assert ct_video_creator.run_chapter is run_chapter
+        assert "SubtitleGenerator" in dir(generators)
+        assert set(ct_video_creator.__all__) <= set(dir(ct_video_creator))
+
+    def test_unknown_attribute_raises(self):
+        """Unknown attributes raise AttributeError."""
+        with pytest.raises(AttributeError):
+            _ = generators.NotAGenerator
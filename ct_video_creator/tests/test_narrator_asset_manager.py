@@ -0,0 +1,120 @@
+"""
+Unit tests for parallel narrator generation in NarratorAssetManager.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from ct_video_creator.generators.audio_generator import ZonosTTSRecipe
+from ct_video_creator.modules.narrator import NarratorAssetManager, NarratorAssets
+from ct_video_creator.utils import VideoCreatorPaths
+
+SCENE_COUNT = 6
+
+
+class FakeTTSGenerator:
+    """Audio generator that writes the prompt to the output file and tracks concurrency."""
+
+    instances = 0
+    batches = []
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, cache=None):
+        """Count created instances."""
+        with FakeTTSGenerator.lock:
+            FakeTTSGenerator.instances += 1
+
+    def clone_text_to_speech(self, recipe, output_file_path):
+        """Write the recipe prompt as the generated audio."""
+        with FakeTTSGenerator.lock:
+            FakeTTSGenerator.running += 1
+            FakeTTSGenerator.peak = max(FakeTTSGenerator.peak, FakeTTSGenerator.running)
+        try:
+            time.sleep(0.02)
+            if recipe.prompt == "fail":
+                raise RuntimeError("TTS failed")
+            output_file_path.write_text(recipe.prompt, encoding="utf-8")
+            return output_file_path
+        finally:
+            with FakeTTSGenerator.lock:
+                FakeTTSGenerator.running -= 1
+
+    def clone_text_to_speech_batch(self, recipes, output_file_paths):
+        """Record the batch and generate each recipe, returning None for failures."""
+        FakeTTSGenerator.batches.append([recipe.prompt for recipe in recipes])
+        outputs = []
+        for recipe, output_file_path in zip(recipes, output_file_paths):
+            try:
+                outputs.append(self.clone_text_to_speech(recipe, output_file_path))
+            except RuntimeError:
+                outputs.append(None)
+        return outputs
+
+
+class TestNarratorAssetManager:
+    """Test narrator generation modes."""
+
+    @pytest.fixture
+    def paths(self, tmp_path, monkeypatch):
+        """Create a chapter with a narrator recipe and a fake TTS generator."""
+        FakeTTSGenerator.instances = 0
+        FakeTTSGenerator.batches = []
+        FakeTTSGenerator.running = 0
+        FakeTTSGenerator.peak = 0
+        monkeypatch.setattr(ZonosTTSRecipe, "GENERATOR_TYPE", FakeTTSGenerator)
+
+        prompts_folder = tmp_path / "stories" / "test_story" / "prompts"
+        prompts_folder.mkdir(parents=True)
+        prompts = [
+            {"narrator": f"Narrator {index}", "visual_description": "", "visual_prompt": ""}
+            for index in range(SCENE_COUNT)
+        ]
+        (prompts_folder / "chapter_001.json").write_text(json.dumps({"prompts": prompts}), encoding="utf-8")
+
+        paths = VideoCreatorPaths(tmp_path, "test_story", 0)
+        narrator_data = [
+            {
+                "prompt": "fail" if index == 2 else f"Narrator {index}",
+                "clone_voice_path": "default_assets/voices/voice_002.mp3",
+                "recipe_type": "ZonosTTSRecipeType",
+            }
+            for index in range(SCENE_COUNT)
+        ]
+        paths.narrator_recipe_file.write_text(json.dumps({"narrator_data": narrator_data}), encoding="utf-8")
+        return paths
+
+    def test_parallel_generation(self, paths):
+        """Scenes run concurrently with one shared generator and failures are isolated."""
+        manager = NarratorAssetManager(paths)
+
+        manager.generate_narrator_assets(max_workers=3)
+
+        assert FakeTTSGenerator.instances == 1
+        assert 1 < FakeTTSGenerator.peak <= 3
+        assert manager.narrator_assets.get_missing_narrator_assets() == [2]
+        assert NarratorAssets(paths).get_missing_narrator_assets() == [2]
+
+    def test_sequential_generation_reuses_generator(self, paths):
+        """The sequential mode also creates a single generator."""
+        manager = NarratorAssetManager(paths)
+
+        manager.generate_narrator_assets(max_workers=1)
+
+        assert FakeTTSGenerator.instances == 1
+        assert FakeTTSGenerator.peak == 1
+        assert manager.narrator_assets.get_missing_narrator_assets() == [2]
+
+    def test_batched_generation(self, paths):
+        """Scenes are sent in batches and a failed line does not fail its batch."""
+        manager = NarratorAssetManager(paths)
+
+        manager.generate_narrator_assets(max_workers=1, batch_size=4)
+
+        assert [len(batch) for batch in FakeTTSGenerator.batches] == [4, 2]
+        assert manager.narrator_assets.get_missing_narrator_assets() == [2]
+        assert NarratorAssets(paths).get_missing_narrator_assets() == [2]
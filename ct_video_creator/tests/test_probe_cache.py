@@ -0,0 +1,176 @@
+"""
+Unit tests for the shared ffprobe cache.
+"""
+
+import json
+import os
+
+import pytest
+
+from ct_video_creator.utils.probe_cache import ProbeCache
+
+
+class CountingProbe:
+    """Fake probe function that records which files were probed."""
+
+    def __init__(self):
+        """Initialize with an empty call list."""
+        self.calls = []
+
+    def __call__(self, path):
+        """Return a minimal ffprobe-like result for the given path."""
+        self.calls.append(path)
+        return {"format": {"duration": "1.5", "filename": str(path)}, "streams": []}
+
+
+class TestProbeCache:
+    """Test ProbeCache behaviour."""
+
+    @pytest.fixture
+    def counting_probe(self):
+        """Create a counting fake probe function."""
+        return CountingProbe()
+
+    @pytest.fixture
+    def media_file(self, tmp_path):
+        """Create a small media placeholder file."""
+        media = tmp_path / "clip.mp4"
+        media.write_bytes(b"0" * 128)
+        return media
+
+    def test_second_probe_is_a_hit(self, counting_probe, media_file):
+        """Probing the same unchanged file twice runs the probe function once."""
+        cache = ProbeCache(probe_function=counting_probe)
+
+        first = cache.probe(media_file)
+        second = cache.probe(str(media_file))
+
+        assert first == second
+        assert len(counting_probe.calls) == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_returned_result_is_a_copy(self, counting_probe, media_file):
+        """Mutating a returned result does not corrupt the cached entry."""
+        cache = ProbeCache(probe_function=counting_probe)
+
+        cache.probe(media_file)["format"]["duration"] = "999"
+
+        assert cache.probe(media_file)["format"]["duration"] == "1.5"
+
+    def test_modified_file_is_probed_again(self, counting_probe, media_file):
+        """A change in size or mtime produces a new key and a new probe."""
+        cache = ProbeCache(probe_function=counting_probe)
+        cache.probe(media_file)
+
+        media_file.write_bytes(b"1" * 256)
+        stat_result = media_file.stat()
+        os.utime(media_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+        cache.probe(media_file)
+
+        assert len(counting_probe.calls) == 2
+        assert cache.misses == 2
+
+    def test_lru_eviction(self, counting_probe, tmp_path):
+        """The least recently used entry is evicted once max_entries is exceeded."""
+        cache = ProbeCache(max_entries=2, probe_function=counting_probe)
+        files = []
+        for index in range(3):
+            media = tmp_path / f"clip_{index}.mp4"
+            media.write_bytes(b"0" * (index + 1))
+            files.append(media)
+
+        cache.probe(files[0])
+        cache.probe(files[1])
+        cache.probe(files[0])
+        cache.probe(files[2])
+
+        assert cache.stats()["entries"] == 2
+        cache.probe(files[0])
+        assert cache.hits == 2
+        cache.probe(files[1])
+        assert len(counting_probe.calls) == 4
+
+    def test_missing_file_raises(self, counting_probe, tmp_path):
+        """Probing a missing file raises and is not cached."""
+        cache = ProbeCache(probe_function=counting_probe)
+
+        with pytest.raises(FileNotFoundError):
+            cache.probe(tmp_path / "missing.mp4")
+
+        assert cache.stats()["entries"] == 0
+        assert not counting_probe.calls
+
+    def test_sidecar_round_trip(self, counting_probe, media_file, tmp_path):
+        """Results written to the sidecar are reused by a new cache instance."""
+        sidecar = tmp_path / "probe_cache.json"
+
+        writer = ProbeCache(probe_function=counting_probe)
+        with writer.sidecar(sidecar):
+            writer.probe(media_file)
+
+        assert sidecar.exists()
+
+        reader_probe = CountingProbe()
+        reader = ProbeCache(probe_function=reader_probe)
+        with reader.sidecar(sidecar):
+            result = reader.probe(media_file)
+
+        assert result["format"]["duration"] == "1.5"
+        assert not reader_probe.calls
+        assert reader.hits == 1
+
+    def test_corrupted_sidecar_is_ignored(self, counting_probe, media_file, tmp_path):
+        """A corrupted sidecar does not prevent probing and is replaced on exit."""
+        sidecar = tmp_path / "probe_cache.json"
+        sidecar.write_text("{ not json", encoding="utf-8")
+
+        cache = ProbeCache(probe_function=counting_probe)
+        with cache.sidecar(sidecar):
+            cache.probe(media_file)
+
+        with open(sidecar, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        assert len(data["entries"]) == 1
+
+    def test_sidecar_saved_when_body_raises(self, counting_probe, media_file, tmp_path):
+        """The entries probed before a failure are still saved."""
+        sidecar = tmp_path / "probe_cache.json"
+        cache = ProbeCache(probe_function=counting_probe)
+
+        with pytest.raises(RuntimeError):
+            with cache.sidecar(sidecar):
+                cache.probe(media_file)
+                raise RuntimeError("stage failed")
+
+        with open(sidecar, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        assert len(data["entries"]) == 1
+
+    def test_overlapping_sidecars_keep_their_own_entries(self, counting_probe, tmp_path):
+        """Two chapters open at the same time only save the entries of their own files."""
+        chapter_a = tmp_path / "chapter_001"
+        chapter_b = tmp_path / "chapter_002"
+        for folder in (chapter_a, chapter_b):
+            folder.mkdir()
+            (folder / "clip.mp4").write_bytes(b"0" * 64)
+
+        cache = ProbeCache(probe_function=counting_probe)
+        with cache.sidecar(chapter_a / "probe_cache.json"):
+            with cache.sidecar(chapter_b / "probe_cache.json"):
+                cache.probe(chapter_a / "clip.mp4")
+                cache.probe(chapter_b / "clip.mp4")
+
+        for folder in (chapter_a, chapter_b):
+            with open(folder / "probe_cache.json", "r", encoding="utf-8") as file:
+                data = json.load(file)
+            assert [entry["path"] for entry in data["entries"]] == [str((folder / "clip.mp4").resolve())]
+
+    def test_invalidate_path(self, counting_probe, media_file):
+        """Invalidating a path forces the next probe to run again."""
+        cache = ProbeCache(probe_function=counting_probe)
+        cache.probe(media_file)
+
+        cache.invalidate(media_file)
+        cache.probe(media_file)
+
+        assert len(counting_probe.calls) == 2
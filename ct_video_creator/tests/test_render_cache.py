@@ -0,0 +1,216 @@
+"""
+Unit tests for RenderCache and the cached faded segments of concatenate_videos_with_fade_in_out.
+
+ffprobe and ffmpeg are replaced with fakes so the encodes can be counted without an ffmpeg binary.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from ct_video_creator.modules.video_assembler.video_assembler import VideoAssembler
+from ct_video_creator.utils import RenderCache, encoder_profiles, ffmpeg_wrapper
+from ct_video_creator.utils.ffmpeg_wrapper import concatenate_videos_with_fade_in_out
+
+
+def _fake_probe_result(path) -> dict:
+    """Build a minimal ffprobe-like result for a 2 second 16 fps clip."""
+    return {
+        "streams": [{"codec_type": "video", "r_frame_rate": "16/1", "duration": "2.0"}],
+        "format": {"duration": "2.0"},
+    }
+
+
+class FakeFFmpeg:
+    """Record ffmpeg commands and write outputs derived from the inputs."""
+
+    def __init__(self):
+        """Initialize with no recorded command."""
+        self.commands = []
+
+    def __call__(self, cmd):
+        """Record the command and create the output file."""
+        self.commands.append(cmd)
+        output = cmd[-2] if cmd[-1] == "-y" else cmd[-1]
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(" ".join(cmd))
+
+    @property
+    def encodes(self) -> list:
+        """Commands other than the final stream-copy concat."""
+        return [cmd for cmd in self.commands if "concat" not in cmd]
+
+
+class TestRenderCache:
+    """Test cache keys, hits and pruning."""
+
+    def _render(self, content: str):
+        """Return a render callable writing content and counting its calls."""
+        calls = []
+
+        def render(output_path):
+            calls.append(output_path)
+            output_path.write_text(content, encoding="utf-8")
+            return output_path
+
+        return render, calls
+
+    def test_second_lookup_reuses_render(self, tmp_path):
+        """A render is only run once for the same inputs and parameters."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+        render, calls = self._render("rendered")
+
+        first = cache.get_or_render("scale", [source], {"width": 1920}, render)
+        second = RenderCache(tmp_path / "cache").get_or_render("scale", [source], {"width": 1920}, render)
+
+        assert first == second
+        assert first.read_text(encoding="utf-8") == "rendered"
+        assert len(calls) == 1
+        assert not any(path.name.startswith(".") for path in (tmp_path / "cache").iterdir())
+
+    def test_key_depends_on_content_and_params(self, tmp_path):
+        """Changing an input file or a parameter changes the key."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+
+        key = cache.key("scale", [source], {"width": 1920})
+        assert cache.key("scale", [source], {"width": 1080}) != key
+        assert cache.key("fade", [source], {"width": 1920}) != key
+
+        source.write_text("edited video", encoding="utf-8")
+        assert cache.key("scale", [source], {"width": 1920}) != key
+
+    def test_entries_are_identified_by_their_key(self, tmp_path, monkeypatch):
+        """Inputs that are cache entries are not hashed again."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+        entry = cache.get_or_render("scale", [source], {}, self._render("rendered")[0])
+
+        def fail_digest(path):
+            raise AssertionError(f"Unexpected digest of {path}")
+
+        monkeypatch.setattr("ct_video_creator.utils.render_cache.file_digest", fail_digest)
+        assert cache.key("fade", [entry], {}) != cache.key("fade", [entry], {"width": 1})
+
+    def test_failed_render_leaves_no_entry(self, tmp_path):
+        """A failing render stores nothing and removes its partial output."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+
+        def render(output_path):
+            output_path.write_text("partial", encoding="utf-8")
+            raise RuntimeError("ffmpeg failed")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_render("scale", [source], {}, render)
+
+        assert list((tmp_path / "cache").iterdir()) == []
+
+    def test_prune_keeps_used_entries(self, tmp_path):
+        """Pruning removes the entries not used by the current cache object."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        old_cache = RenderCache(tmp_path / "cache")
+        stale = old_cache.get_or_render("scale", [source], {"width": 1080}, self._render("old")[0])
+
+        cache = RenderCache(tmp_path / "cache")
+        kept = cache.get_or_render("scale", [source], {"width": 1920}, self._render("new")[0])
+
+        assert cache.prune() == 1
+        assert kept.exists()
+        assert not stale.exists()
+
+    def test_copy_out_keeps_entry(self, tmp_path):
+        """Exporting an entry leaves it in the cache."""
+        source = tmp_path / "source.mp4"
+        source.write_text("video", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+        entry = cache.get_or_render("scale", [source], {}, self._render("rendered")[0])
+
+        output = cache.copy_out(entry, tmp_path / "output.mp4")
+
+        assert output.read_text(encoding="utf-8") == "rendered"
+        assert entry.exists()
+        assert cache.contains(entry)
+        assert not cache.contains(output)
+
+
+class TestCachedFadeSegments:
+    """Test that re-assembly only re-encodes the segments that changed."""
+
+    @pytest.fixture
+    def fake_ffmpeg(self, monkeypatch):
+        """Replace ffmpeg and ffprobe with fakes."""
+        fake = FakeFFmpeg()
+        monkeypatch.setattr(ffmpeg_wrapper, "_run_ffmpeg_trace", fake)
+        monkeypatch.setattr(ffmpeg_wrapper, "_probe", _fake_probe_result)
+        monkeypatch.setattr(encoder_profiles, "get_available_encoders", lambda: frozenset({"libx264"}))
+        return fake
+
+    def test_only_changed_segments_are_reencoded(self, tmp_path, fake_ffmpeg):
+        """A second run with one edited segment encodes that segment only."""
+        segments = []
+        for index in range(3):
+            segment = tmp_path / f"segment_{index}.mp4"
+            segment.write_text(f"segment {index}", encoding="utf-8")
+            segments.append(segment)
+        output_path = tmp_path / "out" / "composed.mp4"
+        output_path.parent.mkdir()
+
+        concatenate_videos_with_fade_in_out(segments, output_path, render_cache=RenderCache(tmp_path / "cache"))
+        assert len(fake_ffmpeg.encodes) == 3
+
+        fake_ffmpeg.commands.clear()
+        segments[1].write_text("edited segment", encoding="utf-8")
+        cache = RenderCache(tmp_path / "cache")
+        concatenate_videos_with_fade_in_out(segments, output_path, render_cache=cache)
+
+        assert len(fake_ffmpeg.encodes) == 1
+        assert str(segments[1]) in fake_ffmpeg.encodes[0]
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert len(fake_ffmpeg.commands) == 2
+
+    def test_changed_fade_duration_reencodes_all(self, tmp_path, fake_ffmpeg):
+        """Render parameters are part of the key."""
+        segment = tmp_path / "segment.mp4"
+        segment.write_text("segment", encoding="utf-8")
+        output_path = tmp_path / "composed.mp4"
+
+        concatenate_videos_with_fade_in_out([segment], output_path, render_cache=RenderCache(tmp_path / "cache"))
+        concatenate_videos_with_fade_in_out(
+            [segment], output_path, fade_duration=0.8, render_cache=RenderCache(tmp_path / "cache")
+        )
+
+        assert len(fake_ffmpeg.encodes) == 2
+
+
+class TestAssemblerPrunesRenderCache:
+    """Test that every assembly mode prunes the render cache."""
+
+    @pytest.mark.parametrize("single_render", [True, False])
+    def test_assembly_prunes_cache(self, tmp_path, single_render):
+        """Narrator effects cached by the single-render pass do not accumulate."""
+        assembler = VideoAssembler.__new__(VideoAssembler)
+        assembler.single_render = single_render
+        assembler._render_cache = Mock(hits=0, misses=1)  # pylint: disable=protected-access
+        output = tmp_path / "video.mp4"
+        for method in (
+            "_pre_process_render_segments",
+            "_render_single_pass",
+            "_pre_process",
+            "_compose",
+            "_post_process",
+            "_subtitle_process",
+            "_rename_outputs",
+            "_cleanup",
+        ):
+            setattr(assembler, method, Mock(return_value=output))
+
+        assembler.assemble_video()
+
+        assembler._render_cache.prune.assert_called_once()  # pylint: disable=protected-access
@@ -0,0 +1,82 @@
+"""
+Unit tests for the shared generation service clients.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from ct_video_creator.generators import service_client
+from ct_video_creator.generators.audio_generator import ZonosTTSAudioGenerator, load_reference_audio
+from ct_video_creator.generators.background_music_generator import MusicGenGenerator
+from ct_video_creator.generators.service_client import ServiceClient, get_service_client
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Start every test with an empty client registry."""
+    service_client._clients.clear()
+    yield
+    service_client._clients.clear()
+
+
+class TestServiceClient:
+    """Test the readiness cache and the client registry."""
+
+    def test_registry_returns_same_client(self):
+        """The same URL, with or without a trailing slash, maps to one client."""
+        assert get_service_client("http://tts:8000") is get_service_client("http://tts:8000/")
+        assert get_service_client("http://tts:8000") is not get_service_client("http://ttm:8001")
+
+    def test_health_check_is_cached(self):
+        """A successful health check is reused until it expires."""
+        client = ServiceClient("http://tts:8000", ready_ttl=60)
+        client.session.get = Mock(return_value=Mock(ok=True))
+
+        assert client.wait_until_ready()
+        assert client.wait_until_ready()
+        assert client.session.get.call_count == 1
+
+        client.mark_unready()
+        assert client.wait_until_ready()
+        assert client.session.get.call_count == 2
+
+    @patch("ct_video_creator.generators.service_client.time.sleep")
+    def test_health_check_retries_until_ready(self, mock_sleep):
+        """Failed checks are retried with a pause in between."""
+        client = ServiceClient("http://tts:8000")
+        client.session.get = Mock(side_effect=[requests.ConnectionError(), Mock(ok=False), Mock(ok=True)])
+
+        assert client.wait_until_ready(check_interval=1)
+        assert mock_sleep.call_count == 2
+
+    @patch("ct_video_creator.generators.service_client.time.sleep")
+    def test_health_check_times_out(self, _mock_sleep):
+        """An unreachable service returns False once the timeout is reached."""
+        client = ServiceClient("http://tts:8000")
+        client.session.get = Mock(side_effect=requests.ConnectionError())
+
+        assert not client.wait_until_ready(timeout=0, check_interval=1)
+        assert not client.is_ready_cached()
+
+    def test_generators_share_session(self):
+        """Generators of the same service reuse one session and one health check."""
+        with patch.object(requests.Session, "get", return_value=Mock(ok=True)) as mock_get:
+            first = ZonosTTSAudioGenerator()
+            second = ZonosTTSAudioGenerator()
+            music = MusicGenGenerator()
+
+        assert first._client is second._client
+        assert first._client.session is second._client.session
+        assert music._client is not first._client
+        assert mock_get.call_count == 2
+
+    def test_reference_audio_is_read_again_after_change(self, tmp_path):
+        """Reference audio is cached until the file changes."""
+        voice = tmp_path / "voice.mp3"
+        voice.write_bytes(b"first")
+        assert load_reference_audio(voice) == b"first"
+
+        voice.write_bytes(b"second take")
+        assert load_reference_audio(voice) == b"second take"
@@ -0,0 +1,153 @@
+"""
+Unit tests for the single-pass render filter graph.
+
+ffprobe and ffmpeg are replaced with fakes so the generated command can be inspected without an
+ffmpeg binary.
+"""
+
+import pytest
+
+from ct_video_creator.utils import encoder_profiles, ffmpeg_wrapper
+from ct_video_creator.utils.ffmpeg_wrapper import RenderSegment, render_video_single_pass
+
+
+def _fake_probe_result(duration: float, video: bool = True, audio: bool = True) -> dict:
+    """Build a minimal ffprobe-like result."""
+    streams = []
+    if video:
+        streams.append(
+            {
+                "codec_type": "video",
+                "width": 640,
+                "height": 360,
+                "r_frame_rate": "30/1",
+                "duration": str(duration),
+                "pix_fmt": "yuv420p",
+            }
+        )
+    if audio:
+        streams.append({"codec_type": "audio", "duration": str(duration)})
+    return {"streams": streams, "format": {"duration": str(duration)}}
+
+
+class FakeFFmpeg:
+    """Record ffmpeg commands and write a placeholder output file."""
+
+    def __init__(self):
+        """Initialize with an empty command list."""
+        self.commands = []
+
+    def __call__(self, cmd):
+        """Record the command and create the output file."""
+        self.commands.append(cmd)
+        with open(cmd[-1], "wb") as file:
+            file.write(b"0" * 2048)
+
+    @property
+    def filter_complex(self) -> str:
+        """Return the filter graph of the last command."""
+        cmd = self.commands[-1]
+        return cmd[cmd.index("-filter_complex") + 1]
+
+
+class TestRenderVideoSinglePass:
+    """Test render_video_single_pass graph construction."""
+
+    @pytest.fixture
+    def media(self, tmp_path, monkeypatch):
+        """Create placeholder media files with fake probe results."""
+        probes = {
+            "intro.mp4": _fake_probe_result(3.0),
+            "scene_1.mp4": _fake_probe_result(4.0, audio=False),
+            "scene_2.mp4": _fake_probe_result(6.0, audio=False),
+            "narrator_1.mp3": _fake_probe_result(5.0, video=False),
+            "narrator_2.mp3": _fake_probe_result(2.0, video=False),
+            "music.mp3": _fake_probe_result(60.0, video=False),
+            "overlay.mp4": _fake_probe_result(2.0),
+        }
+        files = {}
+        for name in probes:
+            files[name] = tmp_path / name
+            files[name].write_bytes(b"0" * 16)
+
+        monkeypatch.setattr(ffmpeg_wrapper, "_probe", lambda path: probes[path.name])
+        return files
+
+    @pytest.fixture
+    def fake_ffmpeg(self, monkeypatch):
+        """Replace the ffmpeg runner with a recorder."""
+        fake = FakeFFmpeg()
+        monkeypatch.setattr(ffmpeg_wrapper, "_run_ffmpeg_trace", fake)
+        monkeypatch.setattr(encoder_profiles, "get_available_encoders", lambda: frozenset({"libx264"}))
+        return fake
+
+    def test_segments_are_encoded_once(self, media, fake_ffmpeg, tmp_path):
+        """All segments are normalized, faded and concatenated in one command."""
+        segments = [
+            RenderSegment(media["intro.mp4"]),
+            RenderSegment(media["scene_1.mp4"], media["narrator_1.mp3"]),
+            RenderSegment(media["scene_2.mp4"], media["narrator_2.mp3"]),
+        ]
+
+        render_video_single_pass(segments, tmp_path / "out.mp4", width=1280, height=720)
+
+        assert len(fake_ffmpeg.commands) == 1
+        graph = fake_ffmpeg.filter_complex
+        assert "concat=n=3:v=1:a=1[cat_v][cat_a]" in graph
+        # Scene 1 audio is longer than the video, so the last frame is frozen
+        assert "tpad=stop_mode=clone:stop_duration=1.0" in graph
+        # Scene 2 video is longer than the audio, so it is cut
+        assert "trim=duration=2.0" in graph
+        # Intro keeps its own audio track
+        assert "[0:a]aresample=48000" in graph
+        assert "scale=1280:720" in graph
+
+    def test_background_music_and_overlay(self, media, fake_ffmpeg, tmp_path):
+        """Background music and overlay repeats are added to the same graph."""
+        segments = [
+            RenderSegment(media["scene_1.mp4"], media["narrator_1.mp3"]),
+            RenderSegment(media["scene_2.mp4"], media["narrator_2.mp3"]),
+        ]
+
+        render_video_single_pass(
+            segments,
+            tmp_path / "out.mp4",
+            music_assets=[media["music.mp3"]],
+            music_start_times=[0.0],
+            music_durations=[7.0],
+            music_volumes=[0.2],
+            overlay_video=media["overlay.mp4"],
+            overlay_start_time_seconds=1,
+            overlay_repeat_every_seconds=3,
+        )
+
+        graph = fake_ffmpeg.filter_complex
+        assert "[cat_a][bgm_mixed]amix=inputs=2" in graph
+        assert "split=2[ov_b0][ov_b1]" in graph
+        assert "setpts=PTS+1/TB" in graph
+        assert "setpts=PTS+4/TB" in graph
+        assert "[bgm_a][ov_a0][ov_a1]amix=inputs=3" in graph
+        assert fake_ffmpeg.commands[-1][fake_ffmpeg.commands[-1].index("-map") + 1] == "[ov_main1]"
+
+    def test_audio_only_then_reuse_audio_track(self, media, fake_ffmpeg, tmp_path):
+        """An audio-only render can be reused as the audio track of the final render."""
+        segments = [RenderSegment(media["scene_1.mp4"], media["narrator_1.mp3"])]
+        subtitle = tmp_path / "subs.ass"
+        subtitle.write_text("[Script Info]", encoding="utf-8")
+
+        audio_track = render_video_single_pass(segments, tmp_path / "audio.m4a", audio_only=True)
+        assert "[seg_v0]" not in fake_ffmpeg.filter_complex
+        assert "-c:v" not in fake_ffmpeg.commands[-1]
+
+        render_video_single_pass(segments, tmp_path / "out.mp4", subtitle_path=subtitle, audio_track=audio_track)
+
+        cmd = fake_ffmpeg.commands[-1]
+        assert f"ass={subtitle}" in fake_ffmpeg.filter_complex
+        assert "[seg_a0]" not in fake_ffmpeg.filter_complex
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert cmd.index(str(audio_track)) < cmd.index("-filter_complex")
+
+    def test_empty_segments_raise(self, fake_ffmpeg, tmp_path):
+        """Rendering without segments is rejected."""
+        with pytest.raises(ValueError):
+            render_video_single_pass([], tmp_path / "out.mp4")
@@ -0,0 +1,200 @@
+"""
+Unit tests for the per-segment subtitles of SubtitleGenerator and the transcription cache.
+
+The Whisper model and results are replaced with fakes, so no model is loaded.
+"""
+
+import pytest
+
+from ct_video_creator.generators import SubtitleGenerator, TranscriptionCache, whisper_service
+
+
+class FakeWhisperResult:
+    """Result of the fake model, and of the fake stable_whisper.WhisperResult built from a dictionary."""
+
+    def __init__(self, data: dict):
+        """Initialize with the result dictionary."""
+        self.data = data
+
+    def to_dict(self) -> dict:
+        """Return the result dictionary."""
+        return self.data
+
+    def to_ass(self, path, **kwargs):
+        """Write one line per segment with its times."""
+        lines = [f"{segment['start']:.1f}-{segment['end']:.1f} {segment['text']}" for segment in self.data["segments"]]
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines))
+
+    def to_srt_vtt(self, path, **kwargs):
+        """Write the text."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.data["text"])
+
+
+def _one_segment_result(text: str, probability: float = 0.9) -> FakeWhisperResult:
+    """Return a 1 second segment holding the text."""
+    words = [{"word": text, "start": 0.2, "end": 0.8, "probability": probability}]
+    return FakeWhisperResult(
+        {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text, "words": words}], "language": "en"}
+    )
+
+
+class FakeModel:
+    """Whisper model transcribing a file into one segment holding its content."""
+
+    def __init__(self):
+        """Initialize with no transcription or alignment."""
+        self.transcribed = []
+        self.aligned = []
+        self.align_probability = 0.9
+
+    def transcribe(self, audio_path, **options):
+        """Return a 1 second segment with the file content as text."""
+        self.transcribed.append(audio_path)
+        with open(audio_path, "r", encoding="utf-8") as file:
+            return _one_segment_result(file.read())
+
+    def align(self, audio_path, text, **options):
+        """Return a 1 second segment with the given text, failing on the text "unalignable"."""
+        self.aligned.append(audio_path)
+        if text == "unalignable":
+            raise ValueError("no alignment found")
+        return _one_segment_result(text, self.align_probability)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Replace the Whisper model of the generators and the stable_whisper result class."""
+    whisper_service._services.clear()
+    model = FakeModel()
+    monkeypatch.setattr(whisper_service.WhisperService, "_load_model", lambda self: model)
+    monkeypatch.setattr(SubtitleGenerator, "_result_from_dict", staticmethod(FakeWhisperResult))
+    yield model
+    whisper_service._services.clear()
+
+
+def _write_clips(folder, texts: list[str]) -> list:
+    """Write one fake narrator clip per text."""
+    clips = []
+    for index, text in enumerate(texts):
+        clip = folder / f"narrator_{index + 1}.mp3"
+        clip.write_text(text, encoding="utf-8")
+        clips.append(clip)
+    return clips
+
+
+class TestMergeTimelines:
+    """Test placing clip transcriptions on the video timeline."""
+
+    def test_segments_and_words_are_shifted(self):
+        """Segment and word times are offset by the start of their clip."""
+        first = {"text": " Hello", "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": " Hello"}]}
+        second = {
+            "text": " World",
+            "segments": [{"id": 0, "start": 0.5, "end": 1.5, "text": " World", "words": [{"start": 0.5, "end": 1.0}]}],
+            "language": "en",
+        }
+
+        merged = SubtitleGenerator.merge_timelines([first, second], [2.0, 10.0])
+
+        assert [(segment["id"], segment["start"], segment["end"]) for segment in merged["segments"]] == [
+            (0, 2.0, 3.0),
+            (1, 10.5, 11.5),
+        ]
+        assert merged["segments"][1]["words"] == [{"start": 10.5, "end": 11.0}]
+        assert merged["text"] == " Hello World"
+        assert merged["language"] == "en"
+        assert second["segments"][0]["start"] == 0.5
+
+
+class TestSegmentSubtitles:
+    """Test the per-segment transcription with the transcription cache."""
+
+    def test_subtitles_follow_segment_offsets(self, tmp_path, fake_model):
+        """Each clip is transcribed and placed at its offset in the subtitle files."""
+        clips = _write_clips(tmp_path, ["first", "second"])
+
+        ass_path, srt_path = SubtitleGenerator("tiny").generate_subtitles_from_segments(
+            clips, [0.0, 4.0], tmp_path / "video.mp4"
+        )
+
+        assert ass_path.read_text(encoding="utf-8") == "0.0-1.0 first\n4.0-5.0 second"
+        assert srt_path == tmp_path / "video.srt"
+
+    def test_only_changed_clips_are_transcribed_again(self, tmp_path, fake_model):
+        """Unchanged clips reuse their cached transcription."""
+        clips = _write_clips(tmp_path, ["first", "second", "third"])
+        generator = SubtitleGenerator("tiny")
+        generator.generate_subtitles_from_segments(
+            clips, [0.0, 2.0, 4.0], tmp_path / "video.mp4", cache=TranscriptionCache(tmp_path / "cache")
+        )
+
+        fake_model.transcribed.clear()
+        clips[1].write_text("edited", encoding="utf-8")
+        cache = TranscriptionCache(tmp_path / "cache")
+        ass_path, _ = generator.generate_subtitles_from_segments(
+            clips, [0.0, 2.0, 4.0], tmp_path / "video.mp4", cache=cache
+        )
+
+        assert fake_model.transcribed == [str(clips[1])]
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert ass_path.read_text(encoding="utf-8") == "0.0-1.0 first\n2.0-3.0 edited\n4.0-5.0 third"
+
+    def test_cache_key_depends_on_settings(self, tmp_path):
+        """Transcriptions of another model are not reused."""
+        clip = _write_clips(tmp_path, ["first"])[0]
+
+        assert TranscriptionCache.key(clip, {"model_size": "tiny"}) != TranscriptionCache.key(
+            clip, {"model_size": "medium"}
+        )
+
+
+class TestNarratorTextAlignment:
+    """Test aligning the known narrator text instead of transcribing it."""
+
+    def test_known_texts_are_aligned(self, tmp_path, fake_model):
+        """Segments with a text are aligned, the others are transcribed."""
+        clips = _write_clips(tmp_path, ["misheard", "ending"])
+
+        ass_path, _ = SubtitleGenerator("tiny").generate_subtitles_from_segments(
+            clips, [0.0, 4.0], tmp_path / "video.mp4", texts=["Narrator line", None]
+        )
+
+        assert fake_model.aligned == [str(clips[0])]
+        assert fake_model.transcribed == [str(clips[1])]
+        assert ass_path.read_text(encoding="utf-8") == "0.0-1.0 Narrator line\n4.0-5.0 ending"
+
+    def test_low_confidence_alignment_falls_back(self, tmp_path, fake_model):
+        """An alignment below the confidence threshold is replaced by a transcription."""
+        clips = _write_clips(tmp_path, ["spoken"])
+        fake_model.align_probability = 0.1
+
+        ass_path, _ = SubtitleGenerator("tiny").generate_subtitles_from_segments(
+            clips, [0.0], tmp_path / "video.mp4", texts=["Another line"]
+        )
+
+        assert fake_model.transcribed == [str(clips[0])]
+        assert ass_path.read_text(encoding="utf-8") == "0.0-1.0 spoken"
+
+    def test_failed_alignment_falls_back(self, tmp_path, fake_model):
+        """An alignment raising an error is replaced by a transcription."""
+        clips = _write_clips(tmp_path, ["spoken"])
+
+        ass_path, _ = SubtitleGenerator("tiny").generate_subtitles_from_segments(
+            clips, [0.0], tmp_path / "video.mp4", texts=["unalignable"]
+        )
+
+        assert fake_model.aligned == [str(clips[0])]
+        assert ass_path.read_text(encoding="utf-8") == "0.0-1.0 spoken"
+
+    def test_alignments_are_cached_by_text(self, tmp_path, fake_model):
+        """The same clip is aligned again only when its text changes."""
+        clips = _write_clips(tmp_path, ["spoken"])
+        generator = SubtitleGenerator("tiny")
+        for text in ["First line", "First line", "Edited line"]:
+            generator.generate_subtitles_from_segments(
+                clips, [0.0], tmp_path / "video.mp4", cache=TranscriptionCache(tmp_path / "cache"), texts=[text]
+            )
+
+        assert len(fake_model.aligned) == 2
@@ -0,0 +1,177 @@
+"""
+Unit tests for TaskGraph and the run_chapter stage graph.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ct_video_creator import video_creator
+from ct_video_creator.utils.task_graph import TaskGraph
+
+
+class Recorder:
+    """Record task start and end order and the peak number of tasks running per backend."""
+
+    def __init__(self):
+        """Initialize empty records."""
+        self.events = []
+        self.running = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def task(self, name: str, backend: str = "local", duration: float = 0.05, fail: bool = False):
+        """Return a callable recording its run."""
+
+        def run():
+            with self.lock:
+                self.events.append(("start", name))
+                self.running[backend] = self.running.get(backend, 0) + 1
+                self.peak[backend] = max(self.peak.get(backend, 0), self.running[backend])
+            time.sleep(duration)
+            with self.lock:
+                self.running[backend] -= 1
+                self.events.append(("end", name))
+            if fail:
+                raise RuntimeError(f"{name} failed")
+
+        return run
+
+    def index(self, event: str, name: str) -> int:
+        """Return the position of an event."""
+        return self.events.index((event, name))
+
+
+class TestTaskGraph:
+    """Test dependency ordering, backend limits and failure handling."""
+
+    def test_independent_backends_overlap(self):
+        """Tasks on different backends run at the same time while a backend limit is respected."""
+        recorder = Recorder()
+        graph = TaskGraph({"tts": 1, "comfyui": 1})
+        graph.add_task("narrator", recorder.task("narrator", "tts", duration=0.1), backend="tts")
+        graph.add_task("image_1", recorder.task("image_1", "comfyui", duration=0.1), backend="comfyui")
+        graph.add_task("image_2", recorder.task("image_2", "comfyui", duration=0.1), backend="comfyui")
+
+        start = time.monotonic()
+        statuses = graph.run()
+
+        # Sequential runs would take 0.3s
+        assert time.monotonic() - start < 0.28
+        assert recorder.peak == {"tts": 1, "comfyui": 1}
+        assert set(statuses.values()) == {TaskGraph.DONE}
+
+    def test_dependencies_run_first(self):
+        """A task starts only after all of its dependencies ended."""
+        recorder = Recorder()
+        graph = TaskGraph(default_limit=4)
+        graph.add_task("a", recorder.task("a"))
+        graph.add_task("b", recorder.task("b", duration=0.1))
+        graph.add_task("c", recorder.task("c"), ["a", "b"])
+
+        graph.run()
+
+        assert recorder.index("start", "c") > recorder.index("end", "b")
+
+    def test_failure_skips_dependents(self):
+        """Dependents of a failed task are skipped, independent tasks finish and the error is raised."""
+        recorder = Recorder()
+        graph = TaskGraph(default_limit=2)
+        graph.add_task("a", recorder.task("a", fail=True))
+        graph.add_task("b", recorder.task("b"), ["a"])
+        graph.add_task("c", recorder.task("c"), ["b"])
+        graph.add_task("d", recorder.task("d", duration=0.1))
+
+        with pytest.raises(RuntimeError, match="a failed"):
+            graph.run()
+
+        assert graph.statuses == {"a": "failed", "b": "skipped", "c": "skipped", "d": "done"}
+
+    def test_task_holds_every_backend_it_uses(self):
+        """A task using several backends does not overlap tasks of any of them."""
+        recorder = Recorder()
+        graph = TaskGraph({"ffmpeg": 1, "comfyui": 1, "tts": 1})
+        graph.add_task("assemble", recorder.task("assemble", duration=0.1), backend=["ffmpeg", "comfyui", "tts"])
+        graph.add_task("images", recorder.task("images", duration=0.1), backend="comfyui")
+        graph.add_task("narrator", recorder.task("narrator", duration=0.1), backend="tts")
+
+        graph.run()
+
+        assert recorder.index("start", "images") > recorder.index("end", "assemble")
+        assert recorder.index("start", "narrator") > recorder.index("end", "assemble")
+
+    def test_invalid_graphs(self):
+        """Unknown dependencies, cycles and duplicate names are rejected."""
+        graph = TaskGraph()
+        graph.add_task("a", lambda: None, ["missing"])
+        with pytest.raises(ValueError, match="unknown"):
+            graph.run()
+
+        graph = TaskGraph()
+        graph.add_task("a", lambda: None, ["b"])
+        graph.add_task("b", lambda: None, ["a"])
+        with pytest.raises(ValueError, match="cycle"):
+            graph.run()
+        with pytest.raises(ValueError, match="Duplicate"):
+            graph.add_task("a", lambda: None)
+
+
+class TestRunChapter:
+    """Test the chapter stage graph."""
+
+    def test_stage_order(self, tmp_path):
+        """Every stage runs once, after the stages it reads from."""
+        recorder = Recorder()
+        stages = {
+            "create_narrator_recipe": "narrator_recipe",
+            "create_narrator_assets": "narrator_assets",
+            "create_image_recipe": "image_recipe",
+            "create_images_assets": "image_assets",
+            "create_background_music_recipe": "background_music_recipe",
+            "create_background_music_assets": "background_music_assets",
+            "create_sub_video_recipes": "sub_video_recipes",
+            "create_sub_videos_assets": "sub_video_assets",
+            "create_assemble_video_recipe": "assemble_video_recipe",
+            "assemble_video": "assemble_video",
+            "clean_unused_assets": "clean_unused_assets",
+        }
+        patches = [
+            patch.object(video_creator, function, side_effect=lambda *_, name=name, **__: recorder.task(name)())
+            for function, name in stages.items()
+        ]
+        for patcher in patches:
+            patcher.start()
+        try:
+            statuses = video_creator.run_chapter(tmp_path, "story", 0)
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+        assert set(statuses) == set(stages.values())
+        assert recorder.index("start", "sub_video_recipes") > recorder.index("end", "image_assets")
+        assert recorder.index("start", "sub_video_recipes") > recorder.index("end", "narrator_assets")
+        assert recorder.index("start", "background_music_recipe") > recorder.index("end", "narrator_assets")
+        assert recorder.index("start", "assemble_video") > recorder.index("end", "background_music_assets")
+        assert recorder.events[-1] == ("end", "clean_unused_assets")
+
+    def test_failed_stage_removes_its_log_sinks(self, tmp_path):
+        """The console and file sinks of a stage are removed even when the stage fails."""
+        with (
+            patch.object(video_creator, "setup_console_logging", return_value=1),
+            patch.object(video_creator, "cleanup_logging") as cleanup_logging,
+            patch.object(video_creator, "logger") as logger,
+            patch("ct_video_creator.modules.narrator.NarratorRecipeBuilder", side_effect=RuntimeError("boom")),
+        ):
+            logger.add.return_value = 2
+            with pytest.raises(RuntimeError, match="boom"):
+                video_creator.create_narrator_recipe(tmp_path, "story", 0)
+
+        cleanup_logging.assert_called_once_with(1)
+        logger.remove.assert_called_once_with(2)
+        stage_filter = logger.add.call_args.kwargs["filter"]
+        chapter = str(tmp_path / "stories" / "story" / "videos" / "chapter_001")
+        assert stage_filter({"extra": {"chapter": chapter}})
+        assert stage_filter({"extra": {}})
+        assert not stage_filter({"extra": {"chapter": chapter.replace("001", "002")}})
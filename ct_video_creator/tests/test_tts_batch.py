@@ -0,0 +1,173 @@
+"""
+Unit tests for batch TTS requests against a local stub server.
+"""
+
+import email.parser
+import email.policy
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ct_video_creator.generators import audio_generator
+from ct_video_creator.generators.audio_generator import ZonosTTSAudioGenerator, ZonosTTSRecipe
+from ct_video_creator.generators.tts_cache import TTSCache
+
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    """Zonos-like server answering /tts and /tts/batch with the texts as audio content."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence request logging."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer the health check."""
+        self.send_response(200 if self.path == "/health" else 404)
+        self.end_headers()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Synthesize one text or a batch of texts."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+        form = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+        fields = {part.get_param("name", header="content-disposition"): part for part in form.iter_parts()}
+        voice = fields["reference_audio_file"].get_payload(decode=True)
+
+        server = self.server
+        server.requests.append((self.path, voice))
+
+        if self.path == "/tts":
+            text = fields["text"].get_payload(decode=True).decode()
+            self._send(200, "audio/mpeg", f"audio {text}".encode())
+        elif self.path == "/tts/batch" and server.mode == "no-batch":
+            self._send(404, "text/plain", b"Not Found")
+        elif self.path == "/tts/batch" and server.mode == "fail-voice-b" and voice == b"voice_b":
+            self._send(500, "text/plain", b"Internal Server Error")
+        elif self.path == "/tts/batch":
+            texts = [item["text"] for item in json.loads(fields["items"].get_payload(decode=True))]
+            if server.mode == "multipart":
+                self._send_multipart(texts)
+            else:
+                archive = io.BytesIO()
+                with zipfile.ZipFile(archive, "w") as zip_file:
+                    for index, text in enumerate(texts):
+                        zip_file.writestr(f"{index:03}.mp3", f"audio {text}")
+                self._send(200, "application/zip", archive.getvalue())
+        else:
+            self._send(404, "text/plain", b"Not Found")
+
+    def _send(self, status: int, content_type: str, content: bytes):
+        """Send a complete response."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_multipart(self, texts: list[str]):
+        """Send one multipart part per text."""
+        boundary = "stub-boundary"
+        content = b"".join(
+            f"--{boundary}\r\nContent-Type: audio/mpeg\r\n\r\naudio {text}\r\n".encode() for text in texts
+        )
+        self._send(200, f"multipart/mixed; boundary={boundary}", content + f"--{boundary}--\r\n".encode())
+
+
+@pytest.fixture
+def tts_server(monkeypatch):
+    """Start a stub TTS server and point the generator at it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTTSHandler)
+    server.mode = "zip"
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(audio_generator, "TTS_SERVER_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def voices(tmp_path):
+    """Create two reference voices."""
+    paths = []
+    for name in ("voice_a", "voice_b"):
+        path = tmp_path / f"{name}.mp3"
+        path.write_bytes(name.encode())
+        paths.append(path)
+    return paths
+
+
+def _recipes(texts: list[str], voice) -> list[ZonosTTSRecipe]:
+    """Build recipes for texts using one voice."""
+    return [ZonosTTSRecipe(prompt=text, clone_voice_path=str(voice), seed=1) for text in texts]
+
+
+class TestZonosTTSBatch:
+    """Test the batch API of ZonosTTSAudioGenerator."""
+
+    @pytest.mark.parametrize("mode", ["zip", "multipart"])
+    def test_batch_sends_voice_once(self, tts_server, voices, tmp_path, mode):
+        """One request per voice returns every file in order."""
+        tts_server.mode = mode
+        recipes = _recipes(["one", "two", "three"], voices[0])
+        outputs = [tmp_path / f"out_{index}.mp3" for index in range(3)]
+
+        results = ZonosTTSAudioGenerator().clone_text_to_speech_batch(recipes, outputs)
+
+        assert results == outputs
+        assert [path.read_bytes() for path in outputs] == [b"audio one", b"audio two", b"audio three"]
+        assert tts_server.requests == [("/tts/batch", b"voice_a")]
+
+    def test_batch_groups_by_voice(self, tts_server, voices, tmp_path):
+        """Recipes using different voices are sent in separate requests."""
+        recipes = _recipes(["a1", "a2"], voices[0]) + _recipes(["b1", "b2"], voices[1])
+        outputs = [tmp_path / f"out_{index}.mp3" for index in range(4)]
+
+        ZonosTTSAudioGenerator().clone_text_to_speech_batch(recipes, outputs)
+
+        assert outputs[2].read_bytes() == b"audio b1"
+        assert sorted(tts_server.requests) == [("/tts/batch", b"voice_a"), ("/tts/batch", b"voice_b")]
+
+    def test_falls_back_without_batch_endpoint(self, tts_server, voices, tmp_path):
+        """Servers without /tts/batch are detected once and then called per text."""
+        tts_server.mode = "no-batch"
+        generator = ZonosTTSAudioGenerator()
+        outputs = [tmp_path / f"out_{index}.mp3" for index in range(4)]
+
+        generator.clone_text_to_speech_batch(_recipes(["one", "two"], voices[0]), outputs[:2])
+        generator.clone_text_to_speech_batch(_recipes(["three", "four"], voices[0]), outputs[2:])
+
+        assert outputs[3].read_bytes() == b"audio four"
+        assert [path for path, _ in tts_server.requests] == ["/tts/batch", "/tts", "/tts", "/tts", "/tts"]
+
+    def test_cached_recipes_are_not_sent(self, tts_server, voices, tmp_path):
+        """Only cache misses are part of the batch request."""
+        generator = ZonosTTSAudioGenerator(cache=TTSCache(tmp_path / "cache"))
+        generator.clone_text_to_speech(_recipes(["one"], voices[0])[0], tmp_path / "single.mp3")
+        outputs = [tmp_path / f"out_{index}.mp3" for index in range(3)]
+
+        generator.clone_text_to_speech_batch(_recipes(["one", "two", "three"], voices[0]), outputs)
+
+        assert outputs[0].read_bytes() == b"audio one"
+        assert [path for path, _ in tts_server.requests] == ["/tts", "/tts/batch"]
+
+    def test_failed_batch_keeps_other_voice_groups(self, tts_server, voices, tmp_path):
+        """A voice group whose batch request fails is sent one by one and the other groups are kept."""
+        tts_server.mode = "fail-voice-b"
+        recipes = _recipes(["a1", "a2"], voices[0]) + _recipes(["b1", "b2"], voices[1])
+        outputs = [tmp_path / f"out_{index}.mp3" for index in range(4)]
+
+        results = ZonosTTSAudioGenerator().clone_text_to_speech_batch(recipes, outputs)
+
+        assert results == outputs
+        assert [path.read_bytes() for path in outputs] == [b"audio a1", b"audio a2", b"audio b1", b"audio b2"]
+        assert sorted(tts_server.requests) == [
+            ("/tts", b"voice_b"),
+            ("/tts", b"voice_b"),
+            ("/tts/batch", b"voice_a"),
+            ("/tts/batch", b"voice_b"),
+        ]
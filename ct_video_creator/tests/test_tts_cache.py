@@ -0,0 +1,98 @@
+"""
+Unit tests for the persistent TTS result cache.
+"""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ct_video_creator.generators import TTSCache, ZonosTTSAudioGenerator, ZonosTTSRecipe
+
+
+@pytest.fixture
+def voice(tmp_path):
+    """Create a reference voice file."""
+    voice_path = tmp_path / "voices" / "voice.mp3"
+    voice_path.parent.mkdir()
+    voice_path.write_bytes(b"voice sample")
+    return voice_path
+
+
+class TestTTSCache:
+    """Test fingerprints, lookups and eviction."""
+
+    def test_fingerprint_ignores_voice_location(self, tmp_path, voice):
+        """Moving the voice file keeps the key, changing a parameter changes it."""
+        recipe = ZonosTTSRecipe(prompt="Hello", clone_voice_path=str(voice), seed=1)
+        key = TTSCache.fingerprint(recipe.to_dict(), voice)
+
+        moved_voice = tmp_path / "moved.mp3"
+        os.replace(voice, moved_voice)
+        moved_recipe = ZonosTTSRecipe(prompt="Hello", clone_voice_path=str(moved_voice), seed=1)
+
+        assert TTSCache.fingerprint(moved_recipe.to_dict(), moved_voice) == key
+        assert TTSCache.fingerprint({**moved_recipe.to_dict(), "seed": 2}, moved_voice) != key
+
+    def test_put_and_get(self, tmp_path):
+        """A stored result is placed at the requested output path."""
+        cache = TTSCache(tmp_path / "cache")
+        audio = tmp_path / "narrator.mp3"
+        audio.write_bytes(b"audio")
+
+        assert cache.get("key", tmp_path / "out.mp3") is None
+        cache.put("key", audio)
+
+        assert cache.get("key", tmp_path / "out.mp3") == tmp_path / "out.mp3"
+        assert (tmp_path / "out.mp3").read_bytes() == b"audio"
+
+    def test_rewriting_output_in_place_keeps_entry(self, tmp_path):
+        """Regenerating a scene into the same file does not change the cached result of the old recipe."""
+        cache = TTSCache(tmp_path / "cache")
+        audio = tmp_path / "narrator.mp3"
+        audio.write_bytes(b"audio A")
+        cache.put("keyA", audio)
+
+        with open(audio, "wb") as file:
+            file.write(b"audio B")
+        assert cache.get("keyA", tmp_path / "out.mp3") is not None
+        assert (tmp_path / "out.mp3").read_bytes() == b"audio A"
+
+        with open(tmp_path / "out.mp3", "wb") as file:
+            file.write(b"audio C")
+        cache.get("keyA", audio)
+        assert audio.read_bytes() == b"audio A"
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Entries not used recently are removed once the cache is over its size limit."""
+        cache = TTSCache(tmp_path / "cache", max_bytes=10)
+        for index, key in enumerate(["old", "used", "new"]):
+            audio = tmp_path / f"{key}.mp3"
+            audio.write_bytes(b"12345")
+            cache.put(key, audio)
+            entry = tmp_path / "cache" / f"{key}.mp3"
+            os.utime(entry, ns=(index * 10**9, index * 10**9))
+            if key == "used":
+                cache.get("old", tmp_path / "hit.mp3")
+
+        assert sorted(path.name for path in (tmp_path / "cache").iterdir()) == ["new.mp3", "old.mp3"]
+
+
+class TestZonosTTSCache:
+    """Test that the generator consults the cache before calling the server."""
+
+    @patch.object(ZonosTTSAudioGenerator, "_wait_for_service_ready")
+    @patch("ct_video_creator.generators.service_client.ServiceClient.post")
+    def test_second_generation_uses_cache(self, mock_post, _mock_ready, tmp_path, voice):
+        """The same recipe is only synthesized once."""
+        response = Mock(status_code=200)
+        response.iter_content.return_value = [b"generated audio"]
+        mock_post.return_value = response
+        generator = ZonosTTSAudioGenerator(cache=TTSCache(tmp_path / "cache"))
+        recipe = ZonosTTSRecipe(prompt="Hello", clone_voice_path=str(voice), seed=7)
+
+        generator.clone_text_to_speech(recipe, tmp_path / "first.mp3")
+        second = generator.clone_text_to_speech(recipe, tmp_path / "second.mp3")
+
+        assert mock_post.call_count == 1
+        assert second.read_bytes() == b"generated audio"
@@ -0,0 +1,165 @@
+"""
+Unit tests for the shared Whisper service and SubtitleGenerator batching.
+
+The Whisper model is replaced with a fake, so no model is downloaded or loaded.
+"""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from ct_video_creator.generators import SubtitleGenerator, whisper_service
+from ct_video_creator.generators.whisper_service import WhisperService, get_whisper_service
+
+
+class FakeResult:
+    """Transcription result writing its text to the subtitle files."""
+
+    def __init__(self, text: str):
+        """Initialize with the transcribed text."""
+        self.text = text
+
+    def to_ass(self, path, **kwargs):
+        """Write the ASS file."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"{self.text} {kwargs['Alignment']}")
+
+    def to_srt_vtt(self, path, **kwargs):
+        """Write the SRT file."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.text)
+
+
+class FakeModel:
+    """Whisper model recording the transcribed files, optionally blocking until released."""
+
+    def __init__(self, gate: threading.Event | None = None):
+        """Initialize with no transcription."""
+        self.gate = gate
+        self.transcribed = []
+
+    def transcribe(self, audio_path, **options):
+        """Return a result naming the file."""
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.transcribed.append(audio_path)
+        return FakeResult(f"text of {audio_path}")
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Start every test with an empty service registry."""
+    whisper_service._services.clear()
+    yield
+    whisper_service._services.clear()
+
+
+def _service(monkeypatch, model: FakeModel, idle_timeout: float = 60) -> WhisperService:
+    """Create a service loading the fake model."""
+    service = WhisperService("tiny", idle_timeout=idle_timeout)
+    monkeypatch.setattr(service, "_load_model", lambda: model)
+    return service
+
+
+def _wait_for(condition, timeout: float = 5) -> bool:
+    """Poll a condition until it holds or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestWhisperService:
+    """Test the warm model, batching and idle eviction."""
+
+    def test_model_stays_loaded_between_calls(self, monkeypatch):
+        """Consecutive transcriptions reuse the loaded model."""
+        model = FakeModel()
+        service = _service(monkeypatch, model)
+
+        assert service.transcribe("a.wav").text == "text of a.wav"
+        assert service.transcribe("b.wav").text == "text of b.wav"
+
+        assert service.model_loads == 1
+        assert service.is_loaded
+
+    def test_queued_jobs_run_as_one_batch(self, monkeypatch):
+        """Jobs queued while the worker is busy are run together, in order."""
+        model = FakeModel(gate=threading.Event())
+        service = _service(monkeypatch, model)
+
+        first = service.submit(lambda m: m.transcribe("first.wav"))
+        assert _wait_for(lambda: first.running())
+        names = ["b.wav", "c.wav", "d.wav"]
+        queued = [service.submit(lambda m, name=name: m.transcribe(name)) for name in names]
+        model.gate.set()
+
+        assert [future.result(timeout=5).text for future in queued] == [f"text of {name}" for name in names]
+        assert first.result(timeout=5).text == "text of first.wav"
+        assert service.batches == 2
+
+    def test_idle_model_is_unloaded(self, monkeypatch):
+        """The model is unloaded after the idle timeout and loaded again by the next job."""
+        service = _service(monkeypatch, FakeModel(), idle_timeout=0.05)
+
+        service.transcribe("a.wav")
+        assert _wait_for(lambda: not service.is_loaded)
+
+        service.transcribe("b.wav")
+        assert service.model_loads == 2
+
+    def test_job_errors_are_raised_to_the_caller(self, monkeypatch):
+        """A failing job fails its own future only."""
+        service = _service(monkeypatch, FakeModel())
+
+        def fail(_model):
+            raise RuntimeError("bad audio")
+
+        with pytest.raises(RuntimeError, match="bad audio"):
+            service.submit(fail).result(timeout=5)
+        assert service.transcribe("a.wav").text == "text of a.wav"
+
+    def test_compute_type_uses_faster_whisper(self, monkeypatch):
+        """A compute type loads the model through faster-whisper."""
+        calls = []
+        fake_module = types.SimpleNamespace(
+            load_model=lambda *args, **kwargs: calls.append(("load_model", args, kwargs)),
+            load_faster_whisper=lambda *args, **kwargs: calls.append(("load_faster_whisper", args, kwargs)),
+        )
+        monkeypatch.setitem(sys.modules, "stable_whisper", fake_module)
+
+        WhisperService("small", device="cpu", compute_type="int8")._load_model()
+        WhisperService("small")._load_model()
+
+        assert calls == [
+            ("load_faster_whisper", ("small",), {"device": "cpu", "compute_type": "int8"}),
+            ("load_model", ("small",), {"device": None}),
+        ]
+
+    def test_registry_shares_services(self):
+        """Generators with the same model settings share one service."""
+        assert get_whisper_service("tiny") is get_whisper_service("tiny")
+        assert get_whisper_service("tiny") is not get_whisper_service("tiny", compute_type="int8")
+
+
+class TestSubtitleGeneratorBatch:
+    """Test that SubtitleGenerator writes the subtitles of a batch."""
+
+    def test_subtitle_files_of_a_batch(self, tmp_path, monkeypatch):
+        """Each input gets its ASS and SRT files from one model load."""
+        model = FakeModel()
+        generator = SubtitleGenerator("tiny")
+        monkeypatch.setattr(generator._whisper_service, "_load_model", lambda: model)
+        media_paths = [tmp_path / "scene_1.mp3", tmp_path / "scene_2.mp3"]
+
+        outputs = generator.generate_subtitles_from_audio_files(media_paths)
+
+        assert outputs == [(path.with_suffix(".ass"), path.with_suffix(".srt")) for path in media_paths]
+        assert outputs[1][0].read_text(encoding="utf-8") == f"text of {media_paths[1]} 2"
+        assert outputs[1][1].read_text(encoding="utf-8") == f"text of {media_paths[1]}"
+        assert generator._whisper_service.model_loads == 1
@@ -1,35 +1,51 @@
 """AI Video Creator - Utils Module"""
 
-from .utils import (
-    ensure_collection_index_exists,
-    get_next_available_filename,
-    backup_file_to_old,
-    safe_copy,
-    safe_move,
-)
-from .ffmpeg_wrapper import (
-    create_video_segment_from_sub_video_and_audio_freeze_last_frame,
-    create_video_segment_from_sub_video_and_audio_reverse_video,
-    concatenate_videos_remove_last_frame_except_last,
-    create_video_segment_from_image_and_audio,
-    concatenate_audio_with_silence_inbetween,
-    concatenate_videos_with_fade_in_out,
-    concatenate_videos_with_reencoding,
-    blit_overlay_video_onto_main_video,
-    concatenate_videos_no_reencoding,
-    add_background_music_to_video,
-    reencode_to_reference_basic,
-    extract_video_last_frame,
-    extend_audio_to_duration,
-    burn_subtitles_to_video,
-    get_media_resolution,
-    get_media_duration,
-    VideoBlitPosition,
-    SubtitleAlignment,
-    SubtitlePosition,
+from .lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        ".utils": [
+            "ensure_collection_index_exists",
+            "get_next_available_filename",
+            "backup_file_to_old",
+            "file_digest",
+            "link_file",
+            "safe_copy",
+            "safe_move",
+        ],
+        ".ffmpeg_wrapper": [
+            "create_video_segment_from_sub_video_and_audio_freeze_last_frame",
+            "create_video_segment_from_sub_video_and_audio_reverse_video",
+            "concatenate_videos_remove_last_frame_except_last",
+            "create_video_segment_from_image_and_audio",
+            "concatenate_audio_with_silence_inbetween",
+            "concatenate_videos_with_fade_in_out",
+            "concatenate_videos_with_reencoding",
+            "blit_overlay_video_onto_main_video",
+            "concatenate_videos_no_reencoding",
+            "add_background_music_to_video",
+            "reencode_to_reference_basic",
+            "render_video_single_pass",
+            "extract_video_last_frame",
+            "extend_audio_to_duration",
+            "burn_subtitles_to_video",
+            "get_media_resolution",
+            "get_media_duration",
+            "VideoBlitPosition",
+            "SubtitleAlignment",
+            "RenderSegment",
+            "SubtitlePosition",
+        ],
+        ".encode_pool": ["run_encode_jobs", "set_max_nvenc_sessions"],
+        ".encoder_profiles": ["EncoderBackend", "register_encoder_profile", "resolve_encoder_profile"],
+        ".json_store": ["JsonStore", "get_json_store"],
+        ".probe_cache": ["ProbeCache", "get_probe_cache"],
+        ".render_cache": ["RenderCache"],
+        ".video_creator_paths": ["VideoCreatorPaths"],
+        ".aspect_ratios": ["AspectRatios"],
+    },
 )
-from .video_creator_paths import VideoCreatorPaths
-from .aspect_ratios import AspectRatios
 
 __all__ = [
     "concatenate_videos_remove_last_frame_except_last",
@@ -44,18 +60,32 @@ __all__ = [
     "add_background_music_to_video",
     "ensure_collection_index_exists",
     "get_next_available_filename",
+    "register_encoder_profile",
+    "resolve_encoder_profile",
     "reencode_to_reference_basic",
+    "render_video_single_pass",
+    "set_max_nvenc_sessions",
     "extend_audio_to_duration",
     "extract_video_last_frame",
     "burn_subtitles_to_video",
     "get_media_resolution",
     "get_media_duration",
+    "run_encode_jobs",
     "backup_file_to_old",
+    "get_probe_cache",
+    "get_json_store",
     "VideoCreatorPaths",
     "VideoBlitPosition",
+    "EncoderBackend",
+    "JsonStore",
+    "ProbeCache",
+    "RenderCache",
+    "RenderSegment",
     "SubtitleAlignment",
     "SubtitlePosition",
     "AspectRatios",
+    "file_digest",
+    "link_file",
     "safe_copy",
     "safe_move",
 ]
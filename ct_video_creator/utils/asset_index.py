@@ -0,0 +1,470 @@
+"""
+SQLite index of the recipes and assets of every chapter in a user folder.
+
+The index mirrors, per chapter, the asset slots listed in the asset files, the scene counts of the recipes and
+the files found in the asset folders with their size and modification time. Questions such as "which scenes
+are missing an asset" or "which files are unused" are then answered for all stories with one query instead of
+loading every JSON file and stat-ing every asset.
+
+sync() is incremental: a chapter is parsed again only when one of its JSON files changed, and an asset folder is
+listed again only when its modification time or the JSON files changed. The files already indexed are stat-ed
+again on every sync, as regenerated assets are often rewritten in place under the same name.
+
+The index only reads the chapters: the JSON files are parsed directly instead of through the recipe and asset
+classes, which create folders, save the files back and rename corrupted files while a pipeline may be running.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from ct_logging import logger
+
+from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
+
+DEFAULT_INDEX_FILE_NAME = "asset_index.sqlite3"
+
+# Asset slot roles: a required slot is missing when its file does not exist, a skipped slot needs no file
+# and a kept path only protects its file from being reported as unused
+ROLE_REQUIRED = "required"
+ROLE_SKIPPED = "skipped"
+ROLE_KEPT = "kept"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapters (
+    chapter_id INTEGER PRIMARY KEY,
+    user_folder TEXT NOT NULL,
+    story_name TEXT NOT NULL,
+    chapter_index INTEGER NOT NULL,
+    scene_count INTEGER NOT NULL DEFAULT 0,
+    json_signature TEXT,
+    UNIQUE (user_folder, story_name, chapter_index)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    chapter_id INTEGER NOT NULL REFERENCES chapters (chapter_id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    scene_index INTEGER,
+    path TEXT,
+    role TEXT NOT NULL,
+    -- Existence of paths outside the chapter asset folders, checked when the chapter is parsed
+    external_exists INTEGER
+);
+CREATE INDEX IF NOT EXISTS assets_by_path ON assets (chapter_id, path);
+CREATE TABLE IF NOT EXISTS folders (
+    chapter_id INTEGER NOT NULL REFERENCES chapters (chapter_id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER,
+    PRIMARY KEY (chapter_id, module)
+);
+CREATE TABLE IF NOT EXISTS files (
+    chapter_id INTEGER NOT NULL REFERENCES chapters (chapter_id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_path ON files (chapter_id, path);
+CREATE VIEW IF NOT EXISTS missing_assets AS
+    SELECT DISTINCT a.chapter_id, a.module, a.scene_index
+    FROM assets a
+    WHERE a.role = 'required'
+        AND (
+            a.path IS NULL
+            OR (a.external_exists IS NULL AND NOT EXISTS (
+                SELECT 1 FROM files f WHERE f.chapter_id = a.chapter_id AND f.path = a.path
+            ))
+            OR a.external_exists = 0
+        );
+"""
+
+
+def chapter_asset_folders(paths: VideoCreatorPaths) -> dict[str, Path]:
+    """Return the asset folder of each module of a chapter."""
+    return {
+        "narrator": paths.narrator_asset_folder,
+        "image": paths.image_asset_folder,
+        "sub_video": paths.sub_videos_asset_folder,
+        "background_music": paths.background_music_asset_folder,
+        "video_assembler": paths.video_assembler_asset_folder,
+    }
+
+
+def find_chapters(user_folder: Path, story_name: str | None = None) -> list[tuple[str, int]]:
+    """List the (story_name, chapter_index) of the chapter folders of a user folder."""
+    stories_folder = user_folder / "stories"
+    story_names = [story_name] if story_name else []
+    if not story_name:
+        try:
+            with os.scandir(stories_folder) as entries:
+                story_names = sorted(entry.name for entry in entries if entry.is_dir())
+        except OSError:
+            return []
+
+    chapters = []
+    for name in story_names:
+        try:
+            with os.scandir(stories_folder / name / "videos") as entries:
+                chapter_folders = [entry.name for entry in entries if entry.is_dir()]
+        except OSError:
+            continue
+
+        for folder_name in chapter_folders:
+            number = folder_name.removeprefix("chapter_")
+            if number != folder_name and number.isdigit() and int(number) > 0:
+                chapters.append((name, int(number) - 1))
+
+    return sorted(chapters)
+
+
+def _json_files(paths: VideoCreatorPaths) -> list[Path]:
+    """Return the recipe and asset files of a chapter."""
+    return [
+        paths.narrator_recipe_file,
+        paths.image_recipe_file,
+        paths.sub_video_recipe_file,
+        paths.video_assembler_recipe_file,
+        paths.background_music_recipe_file,
+        paths.narrator_asset_file,
+        paths.image_asset_file,
+        paths.sub_video_asset_file,
+        paths.video_assembler_asset_file,
+        paths.background_music_asset_file,
+    ]
+
+
+def _json_signature(paths: VideoCreatorPaths) -> str:
+    """Return a signature changing whenever one of the JSON files of a chapter changes."""
+    signature = []
+    for file_path in _json_files(paths):
+        try:
+            stat = file_path.stat()
+            signature.append([stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            signature.append(None)
+    return json.dumps(signature)
+
+
+def _load_json(file_path: Path) -> dict:
+    """Read a recipe or asset file, or return an empty dict when it is missing or corrupted."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Indexing {file_path.name} as empty: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _unmask(paths: VideoCreatorPaths, masked_path: str | None) -> Path | None:
+    """Return the absolute path of a masked asset path, without creating missing assets."""
+    if not masked_path:
+        return None
+    if Path(masked_path).is_absolute():
+        return Path(masked_path)
+    try:
+        return paths.unmask_asset_path(Path(masked_path), create_missing=False)
+    except ValueError as e:
+        logger.warning(f"Indexing invalid asset path {masked_path} as missing: {e}")
+        return None
+
+
+def _list_items(data: dict, key: str) -> list:
+    """Return the list stored under key, or an empty list."""
+    items = data.get(key)
+    return items if isinstance(items, list) else []
+
+
+def _chapter_asset_slots(paths: VideoCreatorPaths) -> tuple[int, list[tuple[str, int | None, Path | None, str]]]:
+    """
+    Parse the recipes and assets of a chapter.
+
+    Scenes listed in a recipe but missing from the matching asset file are reported as required slots without
+    a path, so a chapter whose assets were never generated is not considered complete.
+
+    :return: The number of scenes of the narrator recipe and the (module, scene_index, path, role) slots
+    """
+    narrator_scene_count = len(_list_items(_load_json(paths.narrator_recipe_file), "narrator_data"))
+    image_scene_count = len(_list_items(_load_json(paths.image_recipe_file), "image_data"))
+    sub_video_recipe = _list_items(_load_json(paths.sub_video_recipe_file), "video_data")
+    video_assembler_recipe = _load_json(paths.video_assembler_recipe_file)
+
+    def asset_paths(items: list, key: str) -> list[Path | None]:
+        return [_unmask(paths, item.get(key)) if isinstance(item, dict) else None for item in items]
+
+    narrator_assets = asset_paths(_list_items(_load_json(paths.narrator_asset_file), "assets"), "narrator")
+    image_assets = asset_paths(_list_items(_load_json(paths.image_asset_file), "assets"), "image")
+    sub_video_asset_items = _list_items(_load_json(paths.sub_video_asset_file), "assets")
+    background_music_items = _list_items(_load_json(paths.background_music_asset_file), "background_music_assets")
+    video_assembler_asset_data = _load_json(paths.video_assembler_asset_file)
+    final_sub_videos = asset_paths(_list_items(video_assembler_asset_data, "assets"), "video_asset")
+
+    def required_slots(module: str, assets: list, recipe_length: int) -> list[tuple[str, int, Path | None, str]]:
+        padded = list(assets) + [None] * max(0, recipe_length - len(assets))
+        return [(module, index, asset, ROLE_REQUIRED) for index, asset in enumerate(padded)]
+
+    slots = []
+    slots += required_slots("narrator", narrator_assets, narrator_scene_count)
+    slots += required_slots("image", image_assets, image_scene_count)
+    slots += required_slots("sub_video", asset_paths(sub_video_asset_items, "video_asset"), len(sub_video_recipe))
+    slots += required_slots("video_assembler", final_sub_videos, 0)
+
+    for index, music_item in enumerate(background_music_items):
+        music_item = music_item if isinstance(music_item, dict) else {}
+        role = ROLE_SKIPPED if music_item.get("skip", False) else ROLE_REQUIRED
+        slots.append(("background_music", index, _unmask(paths, music_item.get("asset")), role))
+
+    for index, item in enumerate(sub_video_asset_items):
+        sub_videos = _list_items(item, "sub_video_assets") if isinstance(item, dict) else []
+        slots += [("sub_video", index, path, ROLE_KEPT) for path in (_unmask(paths, sub) for sub in sub_videos) if path]
+
+    for item in sub_video_recipe:
+        recipes = _list_items(item, "recipe_list") if isinstance(item, dict) else []
+        for recipe in recipes:
+            if not isinstance(recipe, dict):
+                continue
+            for key in ("media_path", "color_match_media_path"):
+                path = _unmask(paths, recipe.get(key))
+                if path:
+                    slots.append(("sub_video", None, path, ROLE_KEPT))
+
+    video_ending_recipe = video_assembler_recipe.get("video_ending_recipe")
+    if isinstance(video_ending_recipe, dict):
+        ending_sub_video = _unmask(paths, video_ending_recipe.get("subvideo"))
+        if ending_sub_video:
+            slots.append(("video_assembler", None, ending_sub_video, ROLE_KEPT))
+    video_ending = _unmask(paths, video_assembler_asset_data.get("video_ending"))
+    if video_ending:
+        slots.append(("video_assembler", None, video_ending, ROLE_KEPT))
+
+    return narrator_scene_count, slots
+
+
+class AssetIndex:
+    """SQLite mirror of the recipes, assets and asset files of the chapters of user folders."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open or create an index.
+
+        :param db_path: SQLite database file, e.g. <user_folder>/cache/asset_index.sqlite3
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "AssetIndex":
+        """Use the index as a context manager closing the connection on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the database connection."""
+        self.close()
+
+    def sync(self, user_folder: Path, story_name: str | None = None) -> int:
+        """
+        Bring the index up to date with the chapters of a user folder, or of one of its stories.
+
+        Chapters whose folder no longer exists are removed from the index.
+
+        :return: Number of chapters parsed again
+        """
+        user_folder = Path(user_folder).resolve()
+        chapters = find_chapters(user_folder, story_name)
+
+        parsed = 0
+        for chapter_story, chapter_index in chapters:
+            if self.sync_chapter(user_folder, chapter_story, chapter_index):
+                parsed += 1
+
+        with self._lock, self._connection:
+            query = "SELECT chapter_id, story_name, chapter_index FROM chapters WHERE user_folder = ?"
+            params: list = [str(user_folder)]
+            if story_name:
+                query += " AND story_name = ?"
+                params.append(story_name)
+            present = set(chapters)
+            removed = [row[0] for row in self._connection.execute(query, params) if tuple(row[1:]) not in present]
+            self._connection.executemany("DELETE FROM chapters WHERE chapter_id = ?", [(row,) for row in removed])
+
+        logger.info(f"Asset index synced: {len(chapters)} chapters, {parsed} parsed again, {len(removed)} removed")
+        return parsed
+
+    def sync_chapter(self, user_folder: Path, story_name: str, chapter_index: int, force: bool = False) -> bool:
+        """
+        Bring the index of one chapter up to date.
+
+        :param force: Parse the JSON files and scan the asset folders even if they did not change
+        :return: True if the JSON files of the chapter were parsed again
+        """
+        user_folder = Path(user_folder).resolve()
+        paths = VideoCreatorPaths(user_folder, story_name, chapter_index, create_folders=False)
+        signature = _json_signature(paths)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO chapters (user_folder, story_name, chapter_index) VALUES (?, ?, ?)",
+                (str(user_folder), story_name, chapter_index),
+            )
+            chapter_id, stored_signature = self._connection.execute(
+                "SELECT chapter_id, json_signature FROM chapters "
+                "WHERE user_folder = ? AND story_name = ? AND chapter_index = ?",
+                (str(user_folder), story_name, chapter_index),
+            ).fetchone()
+
+        # Changed JSON files usually mean regenerated assets, so the folders are listed again as well
+        json_changed = signature != stored_signature
+        self._sync_folders(chapter_id, paths, force or json_changed)
+
+        if not json_changed and not force:
+            return False
+
+        logger.debug(f"Indexing {story_name} chapter {chapter_index + 1}")
+        scene_count, slots = _chapter_asset_slots(paths)
+        asset_folders = {str(folder.resolve()) for folder in chapter_asset_folders(paths).values()}
+
+        rows = []
+        for module, scene_index, asset_path, role in slots:
+            resolved = str(Path(asset_path).resolve()) if asset_path else None
+            external_exists = None
+            if resolved and str(Path(resolved).parent) not in asset_folders:
+                external_exists = int(Path(resolved).is_file())
+            rows.append((chapter_id, module, scene_index, resolved, role, external_exists))
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM assets WHERE chapter_id = ?", (chapter_id,))
+            self._connection.executemany(
+                "INSERT INTO assets (chapter_id, module, scene_index, path, role, external_exists) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.execute(
+                "UPDATE chapters SET scene_count = ?, json_signature = ? WHERE chapter_id = ?",
+                (scene_count, signature, chapter_id),
+            )
+
+        return True
+
+    def _sync_folders(self, chapter_id: int, paths: VideoCreatorPaths, force: bool) -> None:
+        """
+        Scan the asset folders of a chapter whose modification time changed.
+
+        The indexed files of unchanged folders are stat-ed again instead, since a file rewritten in place under
+        the same name leaves the folder modification time unchanged.
+        """
+        with self._lock:
+            stored = dict(
+                self._connection.execute(
+                    "SELECT module, mtime_ns FROM folders WHERE chapter_id = ?", (chapter_id,)
+                ).fetchall()
+            )
+
+        for module, folder in chapter_asset_folders(paths).items():
+            try:
+                mtime_ns = folder.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if module in stored and stored[module] == mtime_ns and not force:
+                self._restat_files(chapter_id, module)
+                continue
+
+            files = []
+            if mtime_ns is not None:
+                folder_path = folder.resolve()
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            file_path = str(folder_path / entry.name)
+                            files.append((chapter_id, module, file_path, stat.st_size, stat.st_mtime_ns))
+
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM files WHERE chapter_id = ? AND module = ?", (chapter_id, module))
+                self._connection.executemany(
+                    "INSERT INTO files (chapter_id, module, path, size, mtime_ns) VALUES (?, ?, ?, ?, ?)", files
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO folders (chapter_id, module, path, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (chapter_id, module, str(folder), mtime_ns),
+                )
+
+    def _restat_files(self, chapter_id: int, module: str) -> None:
+        """Update the size and modification time of the indexed files of a module."""
+        with self._lock:
+            indexed = self._connection.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE chapter_id = ? AND module = ?", (chapter_id, module)
+            ).fetchall()
+
+        updated, removed = [], []
+        for file_path, size, mtime_ns in indexed:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                removed.append((chapter_id, file_path))
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                updated.append((stat.st_size, stat.st_mtime_ns, chapter_id, file_path))
+
+        if updated or removed:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "UPDATE files SET size = ?, mtime_ns = ? WHERE chapter_id = ? AND path = ?", updated
+                )
+                self._connection.executemany("DELETE FROM files WHERE chapter_id = ? AND path = ?", removed)
+
+    def _query(self, sql: str, user_folder: Path, story_name: str | None) -> list[tuple]:
+        """Run a query filtered by the user folder and optionally the story of the chapters (alias c)."""
+        params: list = [str(Path(user_folder).resolve())]
+        sql = sql.replace("{filter}", "c.user_folder = ?" + (" AND c.story_name = ?" if story_name else ""))
+        if story_name:
+            params.append(story_name)
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def missing_assets(self, user_folder: Path, story_name: str | None = None) -> list[tuple[str, int, str, int]]:
+        """Return the (story_name, chapter_index, module, scene_index) of the missing assets."""
+        return self._query(
+            "SELECT c.story_name, c.chapter_index, m.module, m.scene_index "
+            "FROM missing_assets m JOIN chapters c ON c.chapter_id = m.chapter_id "
+            "WHERE {filter} ORDER BY c.story_name, c.chapter_index, m.module, m.scene_index",
+            user_folder,
+            story_name,
+        )
+
+    def complete_chapters(self, user_folder: Path, story_name: str | None = None) -> list[tuple[str, int]]:
+        """Return the (story_name, chapter_index) of the chapters with a narrator recipe and no missing asset."""
+        return self._query(
+            "SELECT c.story_name, c.chapter_index FROM chapters c "
+            "WHERE {filter} AND c.scene_count > 0 "
+            "AND NOT EXISTS (SELECT 1 FROM missing_assets m WHERE m.chapter_id = c.chapter_id) "
+            "ORDER BY c.story_name, c.chapter_index",
+            user_folder,
+            story_name,
+        )
+
+    def unused_files(self, user_folder: Path, story_name: str | None = None) -> list[tuple[Path, int]]:
+        """Return the path and size of the files in asset folders that no recipe or asset refers to."""
+        rows = self._query(
+            "SELECT f.path, f.size FROM files f JOIN chapters c ON c.chapter_id = f.chapter_id "
+            "WHERE {filter} "
+            "AND NOT EXISTS (SELECT 1 FROM assets a WHERE a.chapter_id = f.chapter_id AND a.path = f.path) "
+            "ORDER BY f.path",
+            user_folder,
+            story_name,
+        )
+        return [(Path(path), size) for path, size in rows]
@@ -0,0 +1,114 @@
+"""Bounded worker pool for independent FFmpeg encodes."""
+
+import os
+import subprocess
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+from ct_logging import logger
+
+T = TypeVar("T")
+
+# Consumer NVIDIA GPUs only allow a few simultaneous NVENC sessions; extra sessions fail to open.
+DEFAULT_MAX_NVENC_SESSIONS = 3
+
+_nvenc_sessions_lock = threading.Lock()
+_nvenc_sessions = threading.BoundedSemaphore(DEFAULT_MAX_NVENC_SESSIONS)
+_max_nvenc_sessions = DEFAULT_MAX_NVENC_SESSIONS
+
+
+@lru_cache(maxsize=1)
+def has_nvidia_gpu() -> bool:
+    """Return True if an NVIDIA GPU is visible to this process. The result is cached per process."""
+    try:
+        result = subprocess.run(["nvidia-smi", "-L"], capture_output=True, text=True, check=False)
+    except (FileNotFoundError, OSError):
+        logger.debug("nvidia-smi not found, assuming no NVIDIA GPU")
+        return False
+
+    available = result.returncode == 0 and "GPU" in result.stdout
+    logger.debug(f"NVIDIA GPU available: {available}")
+    return available
+
+
+def set_max_nvenc_sessions(max_sessions: int) -> None:
+    """
+    Set the process-wide limit of simultaneous NVENC encodes.
+
+    Only encodes started after the call use the new limit.
+    """
+    global _nvenc_sessions, _max_nvenc_sessions  # pylint: disable=global-statement
+    with _nvenc_sessions_lock:
+        _max_nvenc_sessions = max(1, max_sessions)
+        _nvenc_sessions = threading.BoundedSemaphore(_max_nvenc_sessions)
+    logger.debug(f"Max simultaneous NVENC sessions set to {_max_nvenc_sessions}")
+
+
+def get_max_nvenc_sessions() -> int:
+    """Return the process-wide limit of simultaneous NVENC encodes."""
+    return _max_nvenc_sessions
+
+
+def default_encode_workers(job_count: int, use_gpu: bool) -> int:
+    """Return the default number of encode workers for a batch of jobs."""
+    if use_gpu:
+        workers = get_max_nvenc_sessions()
+    else:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, job_count))
+
+
+def run_encode_jobs(
+    jobs: list[Callable[[], T]],
+    max_workers: int | None = None,
+    use_gpu: bool = False,
+) -> list[T]:
+    """
+    Run independent encode jobs on a bounded thread pool and return their results in job order.
+
+    GPU jobs also hold one of the process-wide NVENC sessions while they run, so several pools
+    running at the same time never exceed the GPU session limit.
+    The first failure cancels every job that has not started yet and is re-raised.
+
+    :param jobs: Callables that each run one encode
+    :param max_workers: Maximum number of jobs running at the same time (default: based on the backend)
+    :param use_gpu: Whether the jobs use NVENC
+    :return: Job results in the same order as jobs
+    """
+    if not jobs:
+        return []
+
+    if max_workers is None:
+        max_workers = default_encode_workers(len(jobs), use_gpu)
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    cancelled = threading.Event()
+
+    def run_job(job: Callable[[], T]) -> T:
+        if cancelled.is_set():
+            raise RuntimeError("Encode job cancelled after an earlier failure")
+        if not use_gpu:
+            return job()
+        semaphore = _nvenc_sessions
+        with semaphore:
+            if cancelled.is_set():
+                raise RuntimeError("Encode job cancelled after an earlier failure")
+            return job()
+
+    logger.debug(f"Running {len(jobs)} encode jobs with {max_workers} workers (gpu={use_gpu})")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="encode") as executor:
+        futures = [executor.submit(run_job, job) for job in jobs]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+
+        failed = next((future for future in futures if future in done and future.exception()), None)
+        if failed is not None:
+            cancelled.set()
+            for future in not_done:
+                future.cancel()
+            logger.error(f"Encode job {futures.index(failed) + 1}/{len(jobs)} failed, cancelling remaining jobs")
+            raise failed.exception()
+
+    return [future.result() for future in futures]
@@ -0,0 +1,164 @@
+"""Central registry of video encoder profiles with automatic backend fallback."""
+
+import subprocess
+import threading
+from functools import lru_cache
+
+from ct_logging import logger
+
+from .encode_pool import has_nvidia_gpu
+
+
+class EncoderBackend:
+    """One concrete encoder and its options, e.g. h264_nvenc with its rate control settings."""
+
+    def __init__(self, encoder: str, options: dict[str, str] | None = None, gop_seconds: float | None = None):
+        """
+        Initialize an encoder backend.
+
+        :param encoder: FFmpeg encoder name passed to -c:v
+        :param options: Encoder options without the leading dash (e.g. {"preset": "p5"})
+        :param gop_seconds: Keyframe interval in seconds, converted to -g using the output frame rate
+        """
+        self.encoder = encoder
+        self.options = options or {}
+        self.gop_seconds = gop_seconds
+
+    @property
+    def uses_gpu(self) -> bool:
+        """Whether this backend encodes on an NVIDIA GPU."""
+        return self.encoder.endswith("_nvenc")
+
+    def __repr__(self) -> str:
+        return f"EncoderBackend({self.encoder}, {self.options})"
+
+
+# Backends are listed fastest first; the first one available in this ffmpeg build is used.
+ENCODER_PROFILES: dict[str, list[EncoderBackend]] = {
+    # Intermediate and segment encodes
+    "standard": [
+        EncoderBackend("h264_nvenc", {"preset": "p5", "rc": "vbr", "cq": "23", "b:v": "0"}),
+        EncoderBackend("libx264", {"preset": "veryfast", "crf": "23"}),
+        EncoderBackend("libopenh264", {"b:v": "6M"}),
+    ],
+    # Re-encodes that must keep as much quality as possible
+    "high_quality": [
+        EncoderBackend("h264_nvenc", {"preset": "p5", "rc": "vbr_hq", "cq": "19", "b:v": "0"}),
+        EncoderBackend("libx264", {"preset": "medium", "crf": "19"}),
+        EncoderBackend("libopenh264", {"b:v": "10M"}),
+    ],
+    # Final delivery encode with bounded bitrate
+    "delivery": [
+        EncoderBackend(
+            "h264_nvenc",
+            {"preset": "p5", "rc": "vbr_hq", "cq": "28", "b:v": "0", "maxrate": "2200k", "bufsize": "4400k", "bf": "3"},
+            gop_seconds=2.0,
+        ),
+        EncoderBackend(
+            "libx264",
+            {"preset": "veryfast", "crf": "26", "maxrate": "2200k", "bufsize": "4400k", "bf": "3"},
+            gop_seconds=2.0,
+        ),
+        EncoderBackend("libopenh264", {"b:v": "2200k"}, gop_seconds=2.0),
+    ],
+    "standard_hevc": [
+        EncoderBackend("hevc_nvenc", {"preset": "p5", "rc": "vbr", "cq": "23", "b:v": "0"}),
+        EncoderBackend("libx265", {"preset": "fast", "crf": "26"}),
+    ],
+    "standard_av1": [
+        EncoderBackend("av1_nvenc", {"preset": "p5", "rc": "vbr", "cq": "30", "b:v": "0"}),
+        EncoderBackend("libsvtav1", {"preset": "8", "crf": "32"}),
+        EncoderBackend("libaom-av1", {"cpu-used": "6", "crf": "32", "b:v": "0"}),
+    ],
+}
+
+DEFAULT_ENCODER_PROFILE = "standard"
+
+_fallback_logged: set[str] = set()
+_fallback_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_available_encoders() -> frozenset[str]:
+    """
+    Return the video encoders usable in this process. The result is cached per process.
+
+    NVENC encoders are only reported when an NVIDIA GPU is present, because most ffmpeg builds
+    list them even on machines without one.
+    """
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, check=True)
+    except (FileNotFoundError, OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Could not list ffmpeg encoders: {e}")
+        return frozenset()
+
+    encoders = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        # Encoder lines look like " V....D h264_nvenc   NVIDIA NVENC H.264 encoder"
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0].startswith("V"):
+            encoders.add(parts[1])
+
+    if not has_nvidia_gpu():
+        encoders = {encoder for encoder in encoders if not encoder.endswith("_nvenc")}
+
+    logger.debug(f"Found {len(encoders)} usable video encoders")
+    return frozenset(encoders)
+
+
+def register_encoder_profile(name: str, backends: list[EncoderBackend]) -> None:
+    """Add or replace an encoder profile. Backends must be listed fastest first."""
+    if not backends:
+        raise ValueError(f"Encoder profile '{name}' needs at least one backend")
+    ENCODER_PROFILES[name] = backends
+    with _fallback_lock:
+        _fallback_logged.discard(name)
+
+
+def resolve_encoder_profile(name: str = DEFAULT_ENCODER_PROFILE) -> EncoderBackend:
+    """
+    Return the fastest backend of a profile that is available in this process.
+
+    :raises ValueError: If the profile is unknown
+    :raises RuntimeError: If none of the profile's encoders are available
+    """
+    backends = ENCODER_PROFILES.get(name)
+    if backends is None:
+        raise ValueError(f"Unknown encoder profile: {name}. Available: {', '.join(ENCODER_PROFILES)}")
+
+    available = get_available_encoders()
+    for index, backend in enumerate(backends):
+        if backend.encoder in available:
+            if index > 0:
+                with _fallback_lock:
+                    if name not in _fallback_logged:
+                        _fallback_logged.add(name)
+                        logger.warning(
+                            f"Encoder {backends[0].encoder} not available, profile '{name}' falls back to "
+                            f"{backend.encoder}"
+                        )
+            return backend
+
+    raise RuntimeError(f"No encoder available for profile '{name}' (tried {', '.join(b.encoder for b in backends)})")
+
+
+def encoder_options(name: str = DEFAULT_ENCODER_PROFILE, fps: float | None = None) -> dict[str, str]:
+    """
+    Return the video encoder options of a profile as ffmpeg-python output keyword arguments.
+
+    :param name: Encoder profile name
+    :param fps: Output frame rate, used to convert the profile's keyframe interval to frames
+    """
+    backend = resolve_encoder_profile(name)
+    options = {"c:v": backend.encoder, **backend.options}
+    if backend.gop_seconds and fps:
+        options["g"] = str(max(1, int(fps * backend.gop_seconds)))
+    return options
+
+
+def encoder_args(name: str = DEFAULT_ENCODER_PROFILE, fps: float | None = None) -> list[str]:
+    """Return the video encoder options of a profile as ffmpeg command line arguments."""
+    args = []
+    for key, value in encoder_options(name, fps).items():
+        args.extend([f"-{key}", str(value)])
+    return args
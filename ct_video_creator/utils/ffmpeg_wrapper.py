@@ -1,15 +1,21 @@
 """FFmpeg operations for video and audio processing."""
 
-import json
+import os
 import shutil
 import subprocess
 import time
 from enum import Enum
+from functools import partial
 from pathlib import Path
 
 import ffmpeg
 from ct_logging import logger
 
+from .encode_pool import default_encode_workers, run_encode_jobs
+from .encoder_profiles import DEFAULT_ENCODER_PROFILE, encoder_args, encoder_options, resolve_encoder_profile
+from .probe_cache import get_probe_cache
+from .render_cache import RenderCache, encoder_fingerprint
+
 
 class SubtitlePosition(str, Enum):
     """Subtitle vertical position options."""
@@ -84,22 +90,8 @@ def _run_ffmpeg_trace(ffmpeg_compiled: str | list[str]):
 
 
 def _probe(path: Path) -> dict:
-    r = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "error",
-            "-print_format",
-            "json",
-            "-show_streams",
-            "-show_format",
-            str(path),
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-    return json.loads(r.stdout)
+    """Probe a media file through the shared probe cache."""
+    return get_probe_cache().probe(path)
 
 
 def _fps_and_duration(probe: dict) -> tuple[float, float]:
@@ -114,18 +106,15 @@ def _fps_and_duration(probe: dict) -> tuple[float, float]:
     return fps, duration
 
 
-def _reencode_with_optional_trim(src: Path, dst: Path, trim_seconds: float | None):
+def _reencode_with_optional_trim(
+    src: Path, dst: Path, trim_seconds: float | None, encoder_profile: str = DEFAULT_ENCODER_PROFILE
+):
     """Re-encode video with optional trimming."""
     cmd = ["ffmpeg", "-y", "-i", str(src)]
     if trim_seconds is not None:
         cmd += ["-t", f"{trim_seconds:.6f}"]
     cmd += [
-        "-c:v",
-        "h264_nvenc",
-        "-preset",
-        "p5",
-        "-crf",
-        "23",
+        *encoder_args(encoder_profile),
         "-c:a",
         "aac",
         "-movflags",
@@ -146,10 +135,10 @@ def _reencode_with_optional_trim(src: Path, dst: Path, trim_seconds: float | Non
         raise
 
 
-def get_media_duration(path: str) -> float:
-    """Get media file duration in seconds using ffmpeg.probe."""
+def get_media_duration(path: str | Path) -> float:
+    """Get media file duration in seconds from the cached probe."""
     try:
-        probe = ffmpeg.probe(path)
+        probe = _probe(Path(path))
         duration = float(probe["format"]["duration"])
         return duration
     except Exception as e:
@@ -157,9 +146,9 @@ def get_media_duration(path: str) -> float:
 
 
 def get_media_resolution(path: Path | str) -> tuple[int, int]:
-    """Get media file resolution (width, height) using ffmpeg.probe."""
+    """Get media file resolution (width, height) from the cached probe."""
     try:
-        probe = ffmpeg.probe(str(path))
+        probe = _probe(Path(path))
         video_streams = [stream for stream in probe["streams"] if stream["codec_type"] == "video"]
         if not video_streams:
             raise RuntimeError(f"No video stream found in {path}")
@@ -240,6 +229,7 @@ def create_video_segment_from_image_and_audio(
     output_path: str | Path,
     width: int = 1920,
     height: int = 1080,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> Path:
     """Generate a video segment from an image and audio file."""
     image_path = Path(image_path)
@@ -263,10 +253,8 @@ def create_video_segment_from_image_and_audio(
                 vf=f"scale={target_resolution}",
                 format="mp4",
                 shortest=None,
+                **encoder_options(encoder_profile),
                 **{
-                    "c:v": "h264_nvenc",
-                    "preset": "p5",
-                    "crf": "23",
                     "c:a": "aac",
                     "pix_fmt": "yuv420p",
                     "movflags": "+faststart",
@@ -289,6 +277,7 @@ def create_video_segment_from_sub_video_and_audio_reverse_video(
     output_path: str | Path,
     width: int = 1920,
     height: int = 1080,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> Path:
     """
     Generate a video segment from a sub-video and audio file.
@@ -346,10 +335,8 @@ def create_video_segment_from_sub_video_and_audio_reverse_video(
                 vf=video_filter,
                 format="mp4",
                 t=audio_duration,
+                **encoder_options(encoder_profile),
                 **{
-                    "c:v": "h264_nvenc",
-                    "preset": "p5",
-                    "crf": "23",
                     "c:a": "aac",
                     "pix_fmt": "yuv420p",
                     "movflags": "+faststart",
@@ -372,6 +359,7 @@ def create_video_segment_from_sub_video_and_audio_freeze_last_frame(
     output_path: str | Path,
     width: int = 1920,
     height: int = 1080,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> Path:
     """
     Generate a video segment from a sub-video and audio file.
@@ -421,10 +409,8 @@ def create_video_segment_from_sub_video_and_audio_freeze_last_frame(
                 vf=video_filter,
                 format="mp4",
                 t=audio_duration,
+                **encoder_options(encoder_profile),
                 **{
-                    "c:v": "h264_nvenc",
-                    "preset": "p5",
-                    "crf": "23",
                     "c:a": "aac",
                     "b:a": "192k",
                     "ar": "48000",
@@ -448,6 +434,7 @@ def burn_subtitles_to_video(
     video_path: str | Path,
     subtitle_path: str | Path,
     output_path: str | Path,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> Path:
     """
     Burn subtitle file into a video file.
@@ -456,6 +443,7 @@ def burn_subtitles_to_video(
         video_path: Path to the input video
         subtitle_path: Path to the subtitle file (ASS or SRT format)
         output_path: Path for the output video
+        encoder_profile: Name of the encoder profile used for the video stream
 
     Returns:
         Path to the output video file
@@ -493,10 +481,8 @@ def burn_subtitles_to_video(
         .output(
             str(output_path),
             vf=subtitle_filter,
+            **encoder_options(encoder_profile),
             **{
-                "c:v": "h264_nvenc",
-                "preset": "p5",
-                "crf": "23",
                 "c:a": "copy",
                 "movflags": "+faststart",
                 "pix_fmt": "yuv420p",
@@ -544,6 +530,7 @@ def concatenate_videos_with_reencoding(
     output_path: str | Path,
     width: int = 1920,
     height: int = 1080,
+    encoder_profile: str = "high_quality",
 ) -> Path:
     """Concatenate video segments with re-encoding to specified resolution."""
     video_segments = [Path(segment) for segment in video_segments]
@@ -567,12 +554,8 @@ def concatenate_videos_with_reencoding(
                 "primaries=bt709:transfer=bt709:matrix=bt709,"
                 "format=yuv420p"
             ),
+            **encoder_options(encoder_profile),
             **{
-                "c:v": "h264_nvenc",
-                "rc": "vbr_hq",
-                "cq": "19",  # ~CRF 19-ish; tweak 18–23
-                "b:v": "0",  # enable cq-based quality targeting
-                "preset": "p5",  # fine
                 "pix_fmt": "yuv420p",
                 "movflags": "+faststart",
                 "c:a": "aac",
@@ -596,9 +579,16 @@ def concatenate_videos_with_fade_in_out(
     width: int = 1920,
     height: int = 1080,
     fade_duration: float = 0.4,
+    max_workers: int | None = None,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+    render_cache: RenderCache | None = None,
 ) -> Path:
     """
     Concatenate video segments with fade-in/fade-out effects.
+    Segments are encoded in parallel: on NVENC up to the process-wide session limit,
+    otherwise with CPU encoder workers sized to the CPU count.
+    With a render cache, faded segments are reused from previous runs and only the segments that
+    changed are encoded before the stream-copy concat.
     Note: If fade_duration is too long, it can appear sluggish.
     """
     video_segments = [Path(segment) for segment in video_segments]
@@ -609,52 +599,84 @@ def concatenate_videos_with_fade_in_out(
     temp_dir = output_path.parent / "temp_fade_segments"
     temp_dir.mkdir(exist_ok=True)
 
-    try:
-        processed_segments = []
+    use_gpu = resolve_encoder_profile(encoder_profile).uses_gpu
+    worker_count = max_workers or default_encode_workers(len(video_segments), use_gpu)
 
-        for i, segment in enumerate(video_segments):
-            logger.debug(f"Processing segment {i+1}/{len(video_segments)}: {segment.name}")
+    video_codec_args = encoder_options(encoder_profile)
+    if not use_gpu:
+        cpu_threads = max(1, (os.cpu_count() or 1) // worker_count)
+        video_codec_args["threads"] = str(cpu_threads)
+        logger.debug(f"Encoding segments with {video_codec_args['c:v']} ({cpu_threads} threads per worker)")
 
-            probe = _probe(segment)
-            fps, duration = _fps_and_duration(probe)
+    def fade_segment(i: int, segment: Path, temp_output: Path) -> Path:
+        logger.debug(f"Processing segment {i+1}/{len(video_segments)}: {segment.name}")
 
-            actual_fade_duration = min(fade_duration, duration / 3.0)
+        probe = _probe(segment)
+        fps, duration = _fps_and_duration(probe)
 
-            temp_output = temp_dir / f"fade_segment_{i:03d}.mp4"
+        actual_fade_duration = min(fade_duration, duration / 3.0)
 
-            fade_start = max(0, duration - actual_fade_duration)
+        fade_start = max(0, duration - actual_fade_duration)
 
-            video_filter = (
-                f"scale={width}:{height},"
-                f"fade=t=in:st=0:d={actual_fade_duration},"
-                f"fade=t=out:st={fade_start}:d={actual_fade_duration}"
-            )
+        video_filter = (
+            f"scale={width}:{height},"
+            f"fade=t=in:st=0:d={actual_fade_duration},"
+            f"fade=t=out:st={fade_start}:d={actual_fade_duration}"
+        )
 
-            cmd = (
-                ffmpeg.input(str(segment))
-                .output(
-                    str(temp_output),
-                    r=fps,
-                    vf=video_filter,
-                    **{
-                        "c:v": "h264_nvenc",
-                        "preset": "p5",
-                        "crf": "23",
-                        "c:a": "aac",
-                        "b:a": "192k",
-                        "ar": "48000",
-                        "ac": "2",
-                        "pix_fmt": "yuv420p",
-                        "movflags": "+faststart",
-                    },
-                )
-                .overwrite_output()
-                .compile()
+        cmd = (
+            ffmpeg.input(str(segment))
+            .output(
+                str(temp_output),
+                r=fps,
+                vf=video_filter,
+                **video_codec_args,
+                **{
+                    "c:a": "aac",
+                    "b:a": "192k",
+                    "ar": "48000",
+                    "ac": "2",
+                    "pix_fmt": "yuv420p",
+                    "movflags": "+faststart",
+                },
             )
+            .overwrite_output()
+            .compile()
+        )
 
-            _run_ffmpeg_trace(cmd)
-            processed_segments.append(temp_output)
-            logger.debug(f"Successfully processed segment {i+1} with fade effects")
+        _run_ffmpeg_trace(cmd)
+        logger.debug(f"Successfully processed segment {i+1} with fade effects")
+        return temp_output
+
+    # Per-worker thread counts do not change the encoded frames, so they are left out of the cache key
+    fade_params = {
+        "width": width,
+        "height": height,
+        "fade_duration": fade_duration,
+        "encoder": encoder_fingerprint(encoder_profile),
+    }
+
+    try:
+        processed_segments: list[Path | None] = [None] * len(video_segments)
+        jobs = []
+        job_indexes = []
+        for i, segment in enumerate(video_segments):
+            if render_cache is None:
+                jobs.append(partial(fade_segment, i, segment, temp_dir / f"fade_segment_{i:03d}.mp4"))
+                job_indexes.append(i)
+                continue
+
+            key = render_cache.key("fade_segment", [segment], fade_params)
+            processed_segments[i] = render_cache.get(key, ".mp4")
+            if processed_segments[i] is None:
+                jobs.append(partial(render_cache.render, key, ".mp4", partial(fade_segment, i, segment)))
+                job_indexes.append(i)
+
+        if render_cache is not None:
+            logger.info(f"Reusing {len(video_segments) - len(jobs)} cached faded segments, encoding {len(jobs)}")
+
+        for i, processed_segment in zip(job_indexes, run_encode_jobs(jobs, max_workers=worker_count, use_gpu=use_gpu)):
+            processed_segments[i] = processed_segment
 
         concat_list_path = output_path.parent / "concat_list_fade.txt"
         with open(concat_list_path, "w", encoding="utf-8") as f:
@@ -696,15 +718,271 @@ def concatenate_videos_with_fade_in_out(
     return output_path
 
 
+def _segment_signature(probe: dict) -> tuple:
+    """Return the stream parameters that must match for segments to be concatenated without re-encoding."""
+    video = next(s for s in probe["streams"] if s["codec_type"] == "video")
+    audio = next((s for s in probe["streams"] if s["codec_type"] == "audio"), None)
+    return (
+        video.get("codec_name"),
+        video.get("profile"),
+        video.get("width"),
+        video.get("height"),
+        video.get("pix_fmt"),
+        video.get("r_frame_rate"),
+        video.get("time_base"),
+        audio.get("codec_name") if audio else None,
+        audio.get("sample_rate") if audio else None,
+        audio.get("channels") if audio else None,
+    )
+
+
+def _video_frame_count(probe: dict) -> int:
+    """Return the number of video frames from the container, or estimate it from duration and fps."""
+    video = next(s for s in probe["streams"] if s["codec_type"] == "video")
+    if str(video.get("nb_frames", "")).isdigit():
+        return int(video["nb_frames"])
+    fps, duration = _fps_and_duration(probe)
+    return int(round(duration * fps))
+
+
+def _keyframe_times(path: Path) -> list[float]:
+    """Return the presentation times of the video keyframes, decoding keyframes only."""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-skip_frame",
+            "nokey",
+            "-show_entries",
+            "frame=best_effort_timestamp_time",
+            "-of",
+            "csv=p=0",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stdout.splitlines():
+        try:
+            times.append(float(line.strip().strip(",")))
+        except ValueError:
+            continue
+    return sorted(times)
+
+
+def _audio_duration(probe: dict) -> float | None:
+    """Return the duration of the first audio stream, or None when there is no audio or it is unknown."""
+    audio = next((s for s in probe["streams"] if s["codec_type"] == "audio"), None)
+    if audio is None or not audio.get("duration"):
+        return None
+    return float(audio["duration"])
+
+
+def _smart_cut_tail_args(video: dict) -> list[str]:
+    """
+    Return encoder arguments for the re-encoded tail of a smart cut, matching the source stream parameters.
+
+    The head keeps the original parameter sets, and the MP4 stores a single set, so the tail is encoded with
+    the software encoder of the same codec, profile, level and reference count instead of an encoder profile
+    that may fall back to NVENC or openh264.
+
+    :raises RuntimeError: If the codec or its parameters cannot be matched
+    """
+    codec = video.get("codec_name")
+    profile = str(video.get("profile", "")).lower().replace(" ", "")
+    level = int(video.get("level", 0) or 0)
+    if codec == "h264":
+        encoder = "libx264"
+        profiles = {"baseline": "baseline", "constrainedbaseline": "baseline", "main": "main", "high": "high"}
+        level_arg = f"{level / 10:.1f}" if level > 0 else None
+    elif codec == "hevc":
+        encoder = "libx265"
+        profiles = {"main": "main", "main10": "main10"}
+        level_arg = f"{level / 30:.1f}" if level > 0 else None
+    else:
+        raise RuntimeError(f"Smart cut is not supported for codec {codec}")
+
+    if profile not in profiles or level_arg is None:
+        raise RuntimeError(f"Smart cut cannot match {codec} profile {video.get('profile')} level {level}")
+
+    args = ["-c:v", encoder, "-preset", "veryfast", "-crf", "18", "-profile:v", profiles[profile], "-level", level_arg]
+    refs = int(video.get("refs", 0) or 0)
+    if codec == "h264" and refs > 0:
+        args += ["-refs", str(refs)]
+    return args
+
+
+def _drop_last_frame_stream_copy(src: Path, dst: Path) -> None:
+    """
+    Drop the last video frame of a segment without re-encoding the whole segment.
+
+    Without B-frames the last packet is the last displayed frame, so it is simply not copied.
+    With B-frames only the final GOP is re-encoded (smart cut) and joined to the stream-copied head;
+    the tail uses the source codec, profile, level and reference count.
+    Audio is re-encoded from the source in one piece and trimmed to the new video duration,
+    so it neither overlaps nor drifts at the join.
+
+    :raises RuntimeError: If the cut fails, does not produce exactly one frame less, changes the stream
+        parameters or leaves the audio longer or shorter than the video
+    """
+    probe = _probe(src)
+    video = next(s for s in probe["streams"] if s["codec_type"] == "video")
+    has_audio = any(s["codec_type"] == "audio" for s in probe["streams"])
+    fps, duration = _fps_and_duration(probe)
+    frame_count = _video_frame_count(probe)
+    target = duration - (1.0 / fps)
+
+    if frame_count < 2:
+        raise RuntimeError(f"Segment {src.name} has too few frames for a stream-level cut")
+
+    def audio_args(input_index: int) -> list[str]:
+        if not has_audio:
+            return []
+        return ["-map", f"{input_index}:a", "-c:a", "aac", "-af", f"atrim=end={target:.6f},asetpts=PTS-STARTPTS"]
+
+    if int(video.get("has_b_frames", 0) or 0) == 0:
+        logger.debug(f"Dropping last frame of {src.name} with stream copy ({frame_count} -> {frame_count - 1} frames)")
+        _run_ffmpeg_trace(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(src),
+                "-map",
+                "0:v",
+                "-c:v",
+                "copy",
+                "-frames:v",
+                str(frame_count - 1),
+                *audio_args(0),
+                str(dst),
+            ]
+        )
+    else:
+        annexb_filters = {"h264": "h264_mp4toannexb", "hevc": "hevc_mp4toannexb"}
+        codec = video.get("codec_name")
+        if codec not in annexb_filters:
+            raise RuntimeError(f"Smart cut is not supported for codec {codec}")
+        tail_args = _smart_cut_tail_args(video)
+
+        keyframes = [t for t in _keyframe_times(src) if 0 < t < target]
+        if not keyframes:
+            raise RuntimeError(f"Segment {src.name} has a single GOP, nothing to stream copy")
+
+        last_keyframe = keyframes[-1]
+        head_frames = int(round(last_keyframe * fps))
+        tail_frames = frame_count - 1 - head_frames
+        head = dst.with_name(f"{dst.stem}_head.ts")
+        tail = dst.with_name(f"{dst.stem}_tail.ts")
+
+        logger.debug(
+            f"Smart cut of {src.name}: copying {head_frames} frames, re-encoding {tail_frames} frames "
+            f"from keyframe at {last_keyframe:.3f}s"
+        )
+
+        try:
+            _run_ffmpeg_trace(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(src),
+                    "-map",
+                    "0:v",
+                    "-c:v",
+                    "copy",
+                    "-frames:v",
+                    str(head_frames),
+                    "-bsf:v",
+                    annexb_filters[codec],
+                    "-f",
+                    "mpegts",
+                    str(head),
+                ]
+            )
+            _run_ffmpeg_trace(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-ss",
+                    f"{last_keyframe:.6f}",
+                    "-i",
+                    str(src),
+                    "-map",
+                    "0:v",
+                    "-frames:v",
+                    str(tail_frames),
+                    *tail_args,
+                    "-pix_fmt",
+                    video.get("pix_fmt", "yuv420p"),
+                    "-f",
+                    "mpegts",
+                    str(tail),
+                ]
+            )
+            _run_ffmpeg_trace(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    f"concat:{head}|{tail}",
+                    "-i",
+                    str(src),
+                    "-map",
+                    "0:v",
+                    "-c:v",
+                    "copy",
+                    *audio_args(1),
+                    "-movflags",
+                    "+faststart",
+                    str(dst),
+                ]
+            )
+        finally:
+            head.unlink(missing_ok=True)
+            tail.unlink(missing_ok=True)
+
+    if not dst.exists():
+        raise RuntimeError(f"Stream-level cut did not produce {dst.name}")
+
+    cut_probe = _probe(dst)
+    cut_frames = _video_frame_count(cut_probe)
+    if cut_frames != frame_count - 1:
+        raise RuntimeError(f"Stream-level cut of {src.name} produced {cut_frames} frames, expected {frame_count - 1}")
+
+    cut_video = next(s for s in cut_probe["streams"] if s["codec_type"] == "video")
+    if _segment_signature(cut_probe) != _segment_signature(probe) or any(
+        cut_video.get(key) != video.get(key) for key in ("level", "refs")
+    ):
+        raise RuntimeError(f"Stream-level cut of {src.name} changed the stream parameters")
+
+    if has_audio:
+        audio_duration = _audio_duration(cut_probe)
+        if audio_duration is None or abs(audio_duration - target) > 0.5 / fps:
+            raise RuntimeError(
+                f"Stream-level cut of {src.name} produced {audio_duration}s of audio, expected {target:.3f}s"
+            )
+
+
 def concatenate_videos_remove_last_frame_except_last(
     video_segments: list[str | Path],
     output_path: str | Path,
     max_retries: int = 3,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> Path:
     """
     Remove exactly one frame from the end of every segment except the final one,
     re-encode to uniform settings, then concatenate via concat demuxer (copy).
 
+    When all segments share codec, resolution, frame rate and audio layout, the frame is dropped at
+    stream level instead (see _drop_last_frame_stream_copy) and the final segment is used as-is.
+    A segment whose stream-level cut fails is re-encoded as before.
+
     Common reasons FFmpeg can get stuck:
     1. GPU Memory Issues: h264_nvenc can hang if GPU memory is exhausted
     2. Input File Corruption: Corrupted input files can cause infinite loops
@@ -721,6 +999,7 @@ def concatenate_videos_remove_last_frame_except_last(
         video_segments: List of video segment paths
         output_path: Output path for concatenated video
         max_retries: Maximum number of retry attempts if processing fails
+        encoder_profile: Encoder profile used for segments that must be re-encoded
 
     Returns:
         Path to the concatenated video file
@@ -746,6 +1025,13 @@ def concatenate_videos_remove_last_frame_except_last(
 
     temp_dir = output_path.parent / "temp_concat_segments"
 
+    signatures = {_segment_signature(_probe(seg)) for seg in video_segments}
+    homogeneous = len(signatures) == 1
+    if homogeneous:
+        logger.debug(f"All {len(video_segments)} segments share stream parameters, using stream-copy fast path")
+    else:
+        logger.debug(f"Segments have {len(signatures)} different stream parameter sets, re-encoding all segments")
+
     gpu_info = _check_gpu_memory()
     if gpu_info:
         logger.debug(f"GPU memory status: {', '.join(gpu_info)}")
@@ -764,55 +1050,74 @@ def concatenate_videos_remove_last_frame_except_last(
                     pass
 
             temp_dir.mkdir(exist_ok=True)
-            processed: list[Path] = []
+            while True:
+                processed: list[Path] = []
 
-            for i, seg in enumerate(video_segments):
-                logger.debug(f"Processing segment {i+1}/{len(video_segments)}: {seg.name}")
+                for i, seg in enumerate(video_segments):
+                    logger.debug(f"Processing segment {i+1}/{len(video_segments)}: {seg.name}")
 
-                try:
-                    probe = _probe(seg)
-                    fps, duration = _fps_and_duration(probe)
-
-                    video_stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
-                    logger.debug(
-                        f"Segment {i+1} info: codec={video_stream.get('codec_name')}, "
-                        f"fps={fps:.2f}, duration={duration:.3f}s, "
-                        f"resolution={video_stream.get('width')}x{video_stream.get('height')}"
-                    )
-
-                    is_last = i == len(video_segments) - 1
-                    if not is_last:
-                        target = max(0.001, duration - (1.0 / fps))
+                    try:
+                        probe = _probe(seg)
+                        fps, duration = _fps_and_duration(probe)
+
+                        video_stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
                         logger.debug(
-                            f"Trimming {seg.name}: {duration:.3f}s -> {target:.3f}s (removing 1 frame at {fps:.2f} fps)"
+                            f"Segment {i+1} info: codec={video_stream.get('codec_name')}, "
+                            f"fps={fps:.2f}, duration={duration:.3f}s, "
+                            f"resolution={video_stream.get('width')}x{video_stream.get('height')}"
                         )
-                    else:
-                        target = None
-                        logger.debug(f"Keeping last segment {seg.name} intact: {duration:.3f}s")
 
-                    out = temp_dir / f"seg_{i:03d}.mp4"
-                    _reencode_with_optional_trim(seg, out, target)
-
-                    if not out.exists() or out.stat().st_size < 1000:
-                        raise RuntimeError(
-                            f"Output segment {out.name} is missing or too small ({out.stat().st_size if out.exists() else 0} bytes)"
-                        )
+                        is_last = i == len(video_segments) - 1
+                        if not is_last:
+                            target = max(0.001, duration - (1.0 / fps))
+                            logger.debug(
+                                f"Trimming {seg.name}: {duration:.3f}s -> {target:.3f}s (removing 1 frame at {fps:.2f} fps)"
+                            )
+                        else:
+                            target = None
+                            logger.debug(f"Keeping last segment {seg.name} intact: {duration:.3f}s")
+
+                        out = temp_dir / f"seg_{i:03d}.mp4"
+                        if homogeneous and is_last:
+                            # Already matches the other segments, concatenate the original file
+                            out = seg
+                        elif homogeneous:
+                            try:
+                                _drop_last_frame_stream_copy(seg, out)
+                            except (subprocess.CalledProcessError, RuntimeError, OSError) as e:
+                                logger.warning(f"Stream-level cut failed for {seg.name}, re-encoding all segments: {e}")
+                                homogeneous = False
+                                break
+                        else:
+                            _reencode_with_optional_trim(seg, out, target, encoder_profile)
+
+                        if not out.exists() or out.stat().st_size < 1000:
+                            raise RuntimeError(
+                                f"Output segment {out.name} is missing or too small ({out.stat().st_size if out.exists() else 0} bytes)"
+                            )
+
+                        processed.append(out)
+                        logger.debug(f"Successfully processed segment {i+1}: {out.name} ({out.stat().st_size} bytes)")
+
+                    except (
+                        subprocess.CalledProcessError,
+                        RuntimeError,
+                        OSError,
+                    ) as e:
+                        logger.error(f"Failed to process segment {i+1} ({seg.name}): {e}")
+                        logger.error(f"Segment {i+1} path: {seg}")
+                        logger.error(f"Segment {i+1} size: {seg.stat().st_size if seg.exists() else 'N/A'} bytes")
+                        logger.error(f"Temp output path: {temp_dir / f'seg_{i:03d}.mp4'}")
+                        if (temp_dir / f"seg_{i:03d}.mp4").exists():
+                            logger.error(f"Partial output size: {(temp_dir / f'seg_{i:03d}.mp4').stat().st_size} bytes")
+                        raise
+                else:
+                    break
 
-                    processed.append(out)
-                    logger.debug(f"Successfully processed segment {i+1}: {out.name} ({out.stat().st_size} bytes)")
-
-                except (
-                    subprocess.CalledProcessError,
-                    RuntimeError,
-                    OSError,
-                ) as e:
-                    logger.error(f"Failed to process segment {i+1} ({seg.name}): {e}")
-                    logger.error(f"Segment {i+1} path: {seg}")
-                    logger.error(f"Segment {i+1} size: {seg.stat().st_size if seg.exists() else 'N/A'} bytes")
-                    logger.error(f"Temp output path: {temp_dir / f'seg_{i:03d}.mp4'}")
-                    if (temp_dir / f"seg_{i:03d}.mp4").exists():
-                        logger.error(f"Partial output size: {(temp_dir / f'seg_{i:03d}.mp4').stat().st_size} bytes")
-                    raise
+                # A stream-level cut failed: re-encode every segment, the last one included, so all of them
+                # share the encoder parameters again before the stream-copy concatenation
+                for temp_file in temp_dir.glob("*"):
+                    temp_file.unlink(missing_ok=True)
 
             list_file = output_path.parent / "concat_list.txt"
             with open(list_file, "w", encoding="utf-8") as f:
@@ -854,7 +1159,8 @@ def concatenate_videos_remove_last_frame_except_last(
 
             list_file.unlink(missing_ok=True)
             for p in processed:
-                p.unlink(missing_ok=True)
+                if p.parent == temp_dir:
+                    p.unlink(missing_ok=True)
             try:
                 temp_dir.rmdir()
             except OSError:
@@ -971,6 +1277,146 @@ class VideoBlitPosition(str, Enum):
     CENTER = "center"
 
 
+def _overlay_position_expressions(
+    position: "VideoBlitPosition", margin_x: int = 20, margin_y: int = 20
+) -> tuple[str, str]:
+    """Return the overlay filter x/y expressions for a blit position."""
+    if position == VideoBlitPosition.CENTER:
+        x_pos = "(W-w)/2"
+        y_pos = "(H-h)/2"
+    elif position == VideoBlitPosition.TOP_LEFT:
+        x_pos = str(margin_x)
+        y_pos = str(margin_y)
+    elif position == VideoBlitPosition.TOP_RIGHT:
+        x_pos = f"W-w-{margin_x}"
+        y_pos = str(margin_y)
+    elif position == VideoBlitPosition.BOTTOM_LEFT:
+        x_pos = str(margin_x)
+        y_pos = f"H-h-{margin_y}"
+    else:  # BOTTOM_RIGHT
+        x_pos = f"W-w-{margin_x}"
+        y_pos = f"H-h-{margin_y}"
+
+    return x_pos, y_pos
+
+
+def _overlay_start_times(
+    start_time_seconds: float,
+    repeat_every_seconds: float,
+    main_duration: float,
+    overlay_duration: float,
+    max_repeats: int | None,
+    allow_extend_duration: bool,
+) -> list[float]:
+    """Compute the times at which an overlay appears on the main video."""
+    starts = []
+    if repeat_every_seconds < 0:
+        # Single overlay placement
+        if start_time_seconds >= main_duration:
+            logger.warning(
+                f"Start time {start_time_seconds}s >= main duration {main_duration:.2f}s, overlay won't appear"
+            )
+        elif not allow_extend_duration and (start_time_seconds + overlay_duration) > main_duration:
+            logger.warning(
+                f"Start time {start_time_seconds}s would extend overlay beyond main video "
+                f"({start_time_seconds + overlay_duration:.2f}s > {main_duration:.2f}s), skipping overlay. "
+                f"Use allow_extend_duration=True to allow extending video duration."
+            )
+        else:
+            starts = [start_time_seconds]
+            if (start_time_seconds + overlay_duration) > main_duration:
+                logger.debug(
+                    f"Single overlay at t={start_time_seconds}s (duration: {overlay_duration:.2f}s) "
+                    f"will extend video to {start_time_seconds + overlay_duration:.2f}s"
+                )
+            else:
+                logger.debug(f"Single overlay at t={start_time_seconds}s (duration: {overlay_duration:.2f}s)")
+    else:
+        # Repeated overlay placement
+        repeat_count = 0
+        while True:
+            t_start = start_time_seconds + (repeat_count * repeat_every_seconds)
+
+            # When not allowing extension, stop if overlay would start at or beyond main duration
+            # When allowing extension, continue generating overlays (max_repeats or reasonable limit controls this)
+            if not allow_extend_duration and t_start >= main_duration:
+                break  # Stop generating windows
+            if max_repeats is not None and repeat_count >= max_repeats:
+                break  # Capped by max_repeats
+
+            # Safety limit: don't generate overlays that start more than 2x the main duration
+            # (this prevents infinite loops when allow_extend_duration=True and max_repeats=None)
+            if t_start > main_duration * 2:
+                logger.warning(
+                    f"Stopping overlay generation at t={t_start:.2f}s "
+                    f"(exceeds 2x main duration {main_duration * 2:.2f}s)"
+                )
+                break
+
+            # Check if overlay would extend beyond main video
+            if not allow_extend_duration and (t_start + overlay_duration) > main_duration:
+                logger.debug(
+                    f"Skipping overlay at t={t_start:.2f}s (would extend to {t_start + overlay_duration:.2f}s, "
+                    f"beyond main duration {main_duration:.2f}s)"
+                )
+            else:
+                starts.append(t_start)
+                if (t_start + overlay_duration) > main_duration:
+                    logger.debug(f"Overlay at t={t_start:.2f}s will extend video to {t_start + overlay_duration:.2f}s")
+            repeat_count += 1
+
+        logger.debug(f"Repeated overlay: {len(starts)} appearances at times: {starts}")
+
+    return starts
+
+
+def _overlay_base_chain(
+    overlay_fps: float,
+    main_fps: float,
+    overlay_sar: str,
+    has_alpha: bool,
+    match_fps: bool,
+    chroma_color: str,
+    similarity: float,
+    blend: float,
+    target_width: int,
+    target_height: int,
+    overlay_duration: float,
+) -> str:
+    """Build the filter chain that keys, scales and trims the overlay video before it is placed."""
+    overlay_base_chain = []
+
+    # Match FPS if needed to avoid stutter
+    if match_fps and abs(overlay_fps - main_fps) > 0.01:
+        overlay_base_chain.append(f"fps={main_fps}")
+        logger.debug(f"Matching FPS: overlay {overlay_fps:.2f} → main {main_fps:.2f}")
+
+    # Normalize SAR BEFORE scaling to ensure correct proportions
+    # If SAR != 1:1, the video has non-square pixels which will cause stretching
+    if overlay_sar != "1:1" and overlay_sar != "0:1":
+        overlay_base_chain.append("setsar=1")
+        logger.debug(f"Normalizing overlay SAR from {overlay_sar} to 1:1 before scaling")
+
+    # Handle transparency (alpha channel or chromakey)
+    if has_alpha:
+        overlay_base_chain.append("format=yuva420p")
+        logger.debug("Using alpha compositing (overlay has alpha channel)")
+    else:
+        overlay_base_chain.append(f"chromakey={chroma_color}:{similarity}:{blend},format=yuva420p")
+        logger.debug(f"Using chromakey: color={chroma_color}, similarity={similarity}, blend={blend}")
+
+    # Step 3: Scale to target dimensions
+    # Use flags=bicubic for quality and eval=frame to force exact dimensions without auto-adjustment
+    overlay_base_chain.append(f"scale={target_width}:{target_height}:flags=bicubic:eval=frame")
+    logger.debug(f"Scaling overlay to exact {target_width}x{target_height}")
+
+    # Trim and reset timestamps for proper overlay timing
+    overlay_base_chain.append(f"trim=0:{overlay_duration},setpts=PTS-STARTPTS")
+    logger.debug(f"Trimming overlay to {overlay_duration:.2f}s")
+
+    return ",".join(overlay_base_chain)
+
+
 def blit_overlay_video_onto_main_video(
     overlay_video: Path,
     main_video: Path,
@@ -987,6 +1433,7 @@ def blit_overlay_video_onto_main_video(
     outro_gain: float = 1.0,
     main_gain: float = 1.0,
     allow_extend_duration: bool = False,
+    encoder_profile: str = "delivery",
 ) -> Path:
     """
     Overlay a video with green screen or alpha transparency onto a main video.
@@ -997,7 +1444,7 @@ def blit_overlay_video_onto_main_video(
     - FPS matching to avoid stutter
     - Enhanced audio mixing with gain controls
     - SAR (Sample Aspect Ratio) handling
-    - Encoder fallback (h264_nvenc → libx264)
+    - Encoder fallback through the encoder profile registry (h264_nvenc → libx264 → libopenh264)
     - Robust repeat logic without stream_loop
 
     Args:
@@ -1016,6 +1463,7 @@ def blit_overlay_video_onto_main_video(
         outro_gain: Audio gain for overlay (0.0-2.0, default: 1.0)
         main_gain: Audio gain for main (0.0-2.0, default: 1.0)
         allow_extend_duration: Allow overlay to extend beyond main video duration (default: False)
+        encoder_profile: Name of the encoder profile used for the video stream (default: delivery)
 
     Returns:
         Path to the output video file
@@ -1117,81 +1565,18 @@ def blit_overlay_video_onto_main_video(
     )
 
     # Step 2: Calculate position with margins
-    if position == VideoBlitPosition.CENTER:
-        x_pos = "(W-w)/2"
-        y_pos = "(H-h)/2"
-    elif position == VideoBlitPosition.TOP_LEFT:
-        x_pos = str(CORNER_MARGIN_X)
-        y_pos = str(CORNER_MARGIN_Y)
-    elif position == VideoBlitPosition.TOP_RIGHT:
-        x_pos = f"W-w-{CORNER_MARGIN_X}"
-        y_pos = str(CORNER_MARGIN_Y)
-    elif position == VideoBlitPosition.BOTTOM_LEFT:
-        x_pos = str(CORNER_MARGIN_X)
-        y_pos = f"H-h-{CORNER_MARGIN_Y}"
-    else:  # BOTTOM_RIGHT
-        x_pos = f"W-w-{CORNER_MARGIN_X}"
-        y_pos = f"H-h-{CORNER_MARGIN_Y}"
+    x_pos, y_pos = _overlay_position_expressions(position, CORNER_MARGIN_X, CORNER_MARGIN_Y)
 
     logger.debug(f"Position: {position.value} at ({x_pos}, {y_pos})")
 
-    starts = []
-    if repeat_every_seconds < 0:
-        # Single overlay placement
-        if start_time_seconds >= main_duration:
-            logger.warning(
-                f"Start time {start_time_seconds}s >= main duration {main_duration:.2f}s, overlay won't appear"
-            )
-        elif not allow_extend_duration and (start_time_seconds + overlay_duration) > main_duration:
-            logger.warning(
-                f"Start time {start_time_seconds}s would extend overlay beyond main video "
-                f"({start_time_seconds + overlay_duration:.2f}s > {main_duration:.2f}s), skipping overlay. "
-                f"Use allow_extend_duration=True to allow extending video duration."
-            )
-        else:
-            starts = [start_time_seconds]
-            if (start_time_seconds + overlay_duration) > main_duration:
-                logger.debug(
-                    f"Single overlay at t={start_time_seconds}s (duration: {overlay_duration:.2f}s) "
-                    f"will extend video to {start_time_seconds + overlay_duration:.2f}s"
-                )
-            else:
-                logger.debug(f"Single overlay at t={start_time_seconds}s (duration: {overlay_duration:.2f}s)")
-    else:
-        # Repeated overlay placement
-        repeat_count = 0
-        while True:
-            t_start = start_time_seconds + (repeat_count * repeat_every_seconds)
-
-            # When not allowing extension, stop if overlay would start at or beyond main duration
-            # When allowing extension, continue generating overlays (max_repeats or reasonable limit controls this)
-            if not allow_extend_duration and t_start >= main_duration:
-                break  # Stop generating windows
-            if max_repeats is not None and repeat_count >= max_repeats:
-                break  # Capped by max_repeats
-
-            # Safety limit: don't generate overlays that start more than 2x the main duration
-            # (this prevents infinite loops when allow_extend_duration=True and max_repeats=None)
-            if t_start > main_duration * 2:
-                logger.warning(
-                    f"Stopping overlay generation at t={t_start:.2f}s "
-                    f"(exceeds 2x main duration {main_duration * 2:.2f}s)"
-                )
-                break
-
-            # Check if overlay would extend beyond main video
-            if not allow_extend_duration and (t_start + overlay_duration) > main_duration:
-                logger.debug(
-                    f"Skipping overlay at t={t_start:.2f}s (would extend to {t_start + overlay_duration:.2f}s, "
-                    f"beyond main duration {main_duration:.2f}s)"
-                )
-            else:
-                starts.append(t_start)
-                if (t_start + overlay_duration) > main_duration:
-                    logger.debug(f"Overlay at t={t_start:.2f}s will extend video to {t_start + overlay_duration:.2f}s")
-            repeat_count += 1
-
-        logger.debug(f"Repeated overlay: {len(starts)} appearances at times: {starts}")
+    starts = _overlay_start_times(
+        start_time_seconds=start_time_seconds,
+        repeat_every_seconds=repeat_every_seconds,
+        main_duration=main_duration,
+        overlay_duration=overlay_duration,
+        max_repeats=max_repeats,
+        allow_extend_duration=allow_extend_duration,
+    )
 
     if not starts:
         logger.info("No valid overlay times, copying main video to output")
@@ -1209,37 +1594,19 @@ def blit_overlay_video_onto_main_video(
         logger.info(f"Successfully copied main video: {output_path.name}")
         return output_path
 
-    overlay_base_chain = []
-
-    # Match FPS if needed to avoid stutter
-    if match_fps and abs(overlay_fps - main_fps) > 0.01:
-        overlay_base_chain.append(f"fps={main_fps}")
-        logger.debug(f"Matching FPS: overlay {overlay_fps:.2f} → main {main_fps:.2f}")
-
-    # Normalize SAR BEFORE scaling to ensure correct proportions
-    # If SAR != 1:1, the video has non-square pixels which will cause stretching
-    if overlay_sar != "1:1" and overlay_sar != "0:1":
-        overlay_base_chain.append("setsar=1")
-        logger.debug(f"Normalizing overlay SAR from {overlay_sar} to 1:1 before scaling")
-
-    # Handle transparency (alpha channel or chromakey)
-    if has_alpha:
-        overlay_base_chain.append("format=yuva420p")
-        logger.debug("Using alpha compositing (overlay has alpha channel)")
-    else:
-        overlay_base_chain.append(f"chromakey={chroma_color}:{similarity}:{blend},format=yuva420p")
-        logger.debug(f"Using chromakey: color={chroma_color}, similarity={similarity}, blend={blend}")
-
-    # Step 3: Scale to target dimensions
-    # Use flags=bicubic for quality and eval=frame to force exact dimensions without auto-adjustment
-    overlay_base_chain.append(f"scale={target_width}:{target_height}:flags=bicubic:eval=frame")
-    logger.debug(f"Scaling overlay to exact {target_width}x{target_height}")
-
-    # Trim and reset timestamps for proper overlay timing
-    overlay_base_chain.append(f"trim=0:{overlay_duration},setpts=PTS-STARTPTS")
-    logger.debug(f"Trimming overlay to {overlay_duration:.2f}s")
-
-    overlay_base_str = ",".join(overlay_base_chain)
+    overlay_base_str = _overlay_base_chain(
+        overlay_fps=overlay_fps,
+        main_fps=main_fps,
+        overlay_sar=overlay_sar,
+        has_alpha=has_alpha,
+        match_fps=match_fps,
+        chroma_color=chroma_color,
+        similarity=similarity,
+        blend=blend,
+        target_width=target_width,
+        target_height=target_height,
+        overlay_duration=overlay_duration,
+    )
 
     filter_parts = []
 
@@ -1282,23 +1649,13 @@ def blit_overlay_video_onto_main_video(
     video_filter = ";".join(filter_parts)
     logger.debug(f"Video filter with {len(starts)} time-shifted overlays: {video_filter}")
 
-    gop_size = int(main_fps * 2)
-
     output_args = {
         "pix_fmt": "yuv420p",
         "movflags": "+faststart",
-        "c:v": "h264_nvenc",
-        "preset": "p5",
-        "rc": "vbr_hq",
-        "cq": "28",
-        "b:v": "0",
-        "maxrate": "2200k",
-        "bufsize": "4400k",
-        "g": str(gop_size),
-        "bf": "3",
+        **encoder_options(encoder_profile, fps=main_fps),
     }
 
-    logger.debug(f"Using h264_nvenc encoder (vbr_hq, cq=28, maxrate=2200k, gop={gop_size})")
+    logger.debug(f"Using encoder profile '{encoder_profile}': {output_args['c:v']}")
 
     cmd = ["ffmpeg", "-y"]
 
@@ -1312,7 +1669,7 @@ def blit_overlay_video_onto_main_video(
 
         if len(starts) > 1:
             split_outputs = "".join([f"[iab{i}]" for i in range(len(starts))])
-            audio_parts.append("[ia_base]asplit={len(starts)}{split_outputs}")
+            audio_parts.append(f"[ia_base]asplit={len(starts)}{split_outputs}")
         else:
             audio_parts.append("[ia_base]anull[iab0]")
 
@@ -1420,32 +1777,7 @@ def blit_overlay_video_onto_main_video(
         logger.debug("No audio streams")
 
     for key, value in output_args.items():
-        if key == "c:v" or key == "c:a":
-            cmd.extend([f"-{key}", value])
-        elif key == "b:a" or key == "b:v":
-            cmd.extend([f"-{key}", value])
-        elif key == "ar":
-            cmd.extend(["-ar", value])
-        elif key == "preset":
-            cmd.extend(["-preset", value])
-        elif key == "crf":
-            cmd.extend(["-crf", value])
-        elif key == "cq":
-            cmd.extend(["-cq", value])
-        elif key == "rc":
-            cmd.extend(["-rc", value])
-        elif key == "maxrate":
-            cmd.extend(["-maxrate", value])
-        elif key == "bufsize":
-            cmd.extend(["-bufsize", value])
-        elif key == "g":
-            cmd.extend(["-g", value])
-        elif key == "bf":
-            cmd.extend(["-bf", value])
-        elif key == "pix_fmt":
-            cmd.extend(["-pix_fmt", value])
-        elif key == "movflags":
-            cmd.extend(["-movflags", value])
+        cmd.extend([f"-{key}", value])
 
     cmd.append(str(output_path))
 
@@ -1472,10 +1804,12 @@ def reencode_to_reference_basic(
     input_video: Path,
     reference_video: Path,
     output_video: Path,
+    encoder_profile: str | None = None,
 ) -> Path:
     """
     Re-encode input_video to match basic settings from reference_video.
     Matches resolution, FPS, codec family, and audio settings.
+    Unless encoder_profile is given, the standard profile of the reference codec family is used.
     """
     input_video = Path(input_video)
     reference_video = Path(reference_video)
@@ -1513,8 +1847,8 @@ def reencode_to_reference_basic(
             return "av1"
         return "h264"
 
-    def _encoder_for_family(fam: str) -> str:
-        return {"h264": "h264_nvenc", "hevc": "hevc_nvenc", "av1": "av1_nvenc"}.get(fam, "h264_nvenc")
+    def _profile_for_family(fam: str) -> str:
+        return {"hevc": "standard_hevc", "av1": "standard_av1"}.get(fam, DEFAULT_ENCODER_PROFILE)
 
     refp = _probe(reference_video)
     inp = _probe(input_video)
@@ -1531,7 +1865,7 @@ def reencode_to_reference_basic(
     rw, rh = int(rv["width"]), int(rv["height"])
     ref_fps = _rounded_fps(rv)
     fam = _codec_family(rv.get("codec_name") or "")
-    venc = _encoder_for_family(fam)
+    profile = encoder_profile or _profile_for_family(fam)
     container = output_video.suffix.lower().lstrip(".")
     cont_args = ["-movflags", "+faststart"] if container in {"mp4", "mov"} else []
 
@@ -1546,14 +1880,7 @@ def reencode_to_reference_basic(
         vsync = "cfr"
 
     v_args = [
-        "-c:v",
-        venc,
-        "-preset",
-        "p5",
-        "-rc",
-        "vbr",
-        "-cq",
-        "23",
+        *encoder_args(profile, fps=ref_fps),
         "-pix_fmt",
         "yuv420p",
     ]
@@ -1604,6 +1931,82 @@ def reencode_to_reference_basic(
     return output_video
 
 
+def _background_music_filter_parts(
+    music_assets: list[Path],
+    start_times: list[float],
+    durations: list[float],
+    volumes: list[float],
+    first_input_index: int,
+    fade_duration: float,
+) -> list[str]:
+    """
+    Build the filter graph parts that loop, fade, delay and mix background music tracks into [bgm_mixed].
+
+    The music files must already be added as ffmpeg inputs starting at first_input_index.
+    """
+    filter_parts = []
+
+    for i, asset in enumerate(music_assets):
+        music_idx = first_input_index + i
+        duration = durations[i]
+        start_time = start_times[i]
+        volume = volumes[i]
+
+        music_duration = get_media_duration(str(asset))
+
+        # Trim/loop music to required duration
+        if music_duration < duration:
+            loop_count = int(duration / music_duration) + 1
+            filter_parts.append(
+                f"[{music_idx}:a]aloop=loop={loop_count}:size={int(music_duration * 48000)},"
+                f"atrim=0:{duration},asetpts=PTS-STARTPTS[music_trimmed_{i}]"
+            )
+        else:
+            filter_parts.append(f"[{music_idx}:a]atrim=0:{duration},asetpts=PTS-STARTPTS[music_trimmed_{i}]")
+
+        # Apply fade in/out effects
+        actual_fade_duration = min(fade_duration, duration / 2)
+        is_first = i == 0
+        is_last = i == len(music_assets) - 1
+
+        fade_filter = f"[music_trimmed_{i}]"
+
+        if is_first and is_last:
+            fade_out_start = max(0, duration - actual_fade_duration)
+            fade_filter += (
+                f"afade=t=in:st=0:d={actual_fade_duration},afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
+            )
+        elif is_first:
+            fade_out_start = max(0, duration - actual_fade_duration)
+            fade_filter += f"afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
+        elif is_last:
+            fade_filter += f"afade=t=in:st=0:d={actual_fade_duration}"
+        else:
+            fade_out_start = max(0, duration - actual_fade_duration)
+            fade_filter += (
+                f"afade=t=in:st=0:d={actual_fade_duration},afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
+            )
+
+        fade_filter += f"[music_faded_{i}]"
+        filter_parts.append(fade_filter)
+
+        # Add delay and volume
+        filter_parts.append(
+            f"[music_faded_{i}]adelay={int(start_time * 1000)}|{int(start_time * 1000)}," f"volume={volume}[music_{i}]"
+        )
+
+    # Mix all music tracks
+    if len(music_assets) == 1:
+        filter_parts.append("[music_0]anull[bgm_mixed]")
+    else:
+        music_inputs = "".join([f"[music_{i}]" for i in range(len(music_assets))])
+        filter_parts.append(
+            f"{music_inputs}amix=inputs={len(music_assets)}:duration=longest:dropout_transition=2[bgm_mixed]"
+        )
+
+    return filter_parts
+
+
 def add_background_music_to_video(
     video_path: Path,
     music_assets: list[Path],
@@ -1660,66 +2063,14 @@ def add_background_music_to_video(
     for idx in valid_indices:
         cmd.extend(["-i", str(music_assets[idx])])
 
-    filter_parts = []
-
-    for i, original_idx in enumerate(valid_indices):
-        music_idx = i + 1
-        duration = durations[original_idx]
-        start_time = start_times[original_idx]
-        volume = volumes[original_idx]
-        asset = music_assets[original_idx]
-
-        music_duration = get_media_duration(str(asset))
-
-        # Trim/loop music to required duration
-        if music_duration < duration:
-            loop_count = int(duration / music_duration) + 1
-            filter_parts.append(
-                f"[{music_idx}:a]aloop=loop={loop_count}:size={int(music_duration * 48000)},"
-                f"atrim=0:{duration},asetpts=PTS-STARTPTS[music_trimmed_{i}]"
-            )
-        else:
-            filter_parts.append(f"[{music_idx}:a]atrim=0:{duration},asetpts=PTS-STARTPTS[music_trimmed_{i}]")
-
-        # Apply fade in/out effects
-        actual_fade_duration = min(fade_duration, duration / 2)
-        is_first = i == 0
-        is_last = i == len(valid_indices) - 1
-
-        fade_filter = f"[music_trimmed_{i}]"
-
-        if is_first and is_last:
-            fade_out_start = max(0, duration - actual_fade_duration)
-            fade_filter += (
-                f"afade=t=in:st=0:d={actual_fade_duration},afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
-            )
-        elif is_first:
-            fade_out_start = max(0, duration - actual_fade_duration)
-            fade_filter += f"afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
-        elif is_last:
-            fade_filter += f"afade=t=in:st=0:d={actual_fade_duration}"
-        else:
-            fade_out_start = max(0, duration - actual_fade_duration)
-            fade_filter += (
-                f"afade=t=in:st=0:d={actual_fade_duration},afade=t=out:st={fade_out_start}:d={actual_fade_duration}"
-            )
-
-        fade_filter += f"[music_faded_{i}]"
-        filter_parts.append(fade_filter)
-
-        # Add delay and volume
-        filter_parts.append(
-            f"[music_faded_{i}]adelay={int(start_time * 1000)}|{int(start_time * 1000)}," f"volume={volume}[music_{i}]"
-        )
-
-    # Mix all music tracks
-    if len(valid_indices) == 1:
-        filter_parts.append("[music_0]anull[bgm_mixed]")
-    else:
-        music_inputs = "".join([f"[music_{i}]" for i in range(len(valid_indices))])
-        filter_parts.append(
-            f"{music_inputs}amix=inputs={len(valid_indices)}:duration=longest:dropout_transition=2[bgm_mixed]"
-        )
+    filter_parts = _background_music_filter_parts(
+        music_assets=[music_assets[idx] for idx in valid_indices],
+        start_times=[start_times[idx] for idx in valid_indices],
+        durations=[durations[idx] for idx in valid_indices],
+        volumes=[volumes[idx] for idx in valid_indices],
+        first_input_index=1,
+        fade_duration=fade_duration,
+    )
 
     # Apply volume to video audio
     if main_audio_volume != 1.0:
@@ -1774,3 +2125,319 @@ def add_background_music_to_video(
 
     logger.info(f"Successfully added background music to video: {output_path.name}")
     return output_path
+
+
+class RenderSegment:
+    """
+    One segment of a single-pass render.
+
+    When audio_path is set the segment lasts as long as the audio and the video is frozen on its last
+    frame or cut to match. Otherwise the segment lasts as long as the video and uses its own audio track.
+    """
+
+    def __init__(self, video_path: str | Path, audio_path: str | Path | None = None):
+        """
+        Initialize a render segment.
+
+        :param video_path: Path to the segment video
+        :param audio_path: Optional path to an audio file that replaces the video's own audio
+        """
+        self.video_path = Path(video_path)
+        self.audio_path = Path(audio_path) if audio_path else None
+
+    def duration(self) -> float:
+        """Return the duration of the segment in the final render."""
+        if self.audio_path:
+            return get_media_duration(self.audio_path)
+        return get_media_duration(self.video_path)
+
+    def __repr__(self) -> str:
+        audio_name = self.audio_path.name if self.audio_path else None
+        return f"RenderSegment(video={self.video_path.name}, audio={audio_name})"
+
+
+def render_video_single_pass(
+    segments: list[RenderSegment],
+    output_path: str | Path,
+    width: int = 1920,
+    height: int = 1080,
+    fps: float | None = None,
+    fade_duration: float = 0.4,
+    music_assets: list[Path] | None = None,
+    music_start_times: list[float] | None = None,
+    music_durations: list[float] | None = None,
+    music_volumes: list[float] | None = None,
+    music_fade_duration: float = 3.0,
+    overlay_video: Path | None = None,
+    overlay_start_time_seconds: float = 10,
+    overlay_repeat_every_seconds: float = 60,
+    overlay_position: VideoBlitPosition = VideoBlitPosition.TOP_RIGHT,
+    overlay_scale_percent: float = 0.30,
+    subtitle_path: Path | None = None,
+    audio_track: Path | None = None,
+    audio_only: bool = False,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+) -> Path:
+    """
+    Render segments, fades, background music, overlay repeats and subtitles with a single ffmpeg encode.
+
+    This produces the same result as combining each segment with its narrator, then calling
+    concatenate_videos_with_fade_in_out, add_background_music_to_video, blit_overlay_video_onto_main_video
+    and burn_subtitles_to_video, without writing a full-length intermediate between the stages.
+
+    Args:
+        segments: Segments in playback order
+        output_path: Path for the output file
+        width: Output width
+        height: Output height
+        fps: Output frame rate (default: frame rate of the first segment with a separate audio file)
+        fade_duration: Fade in/out duration applied to every segment
+        music_assets: Background music files
+        music_start_times: Start time of each background music track
+        music_durations: Duration of each background music track
+        music_volumes: Volume of each background music track
+        music_fade_duration: Fade duration between background music tracks
+        overlay_video: Optional green screen or alpha overlay video
+        overlay_start_time_seconds: Time in seconds when the overlay first appears
+        overlay_repeat_every_seconds: Overlay repeat interval in seconds (< 0 = never repeat)
+        overlay_position: Where to place the overlay
+        overlay_scale_percent: Scale factor applied to the overlay
+        subtitle_path: Optional ASS or SRT file burned into the video
+        audio_track: Optional pre-rendered audio track used as-is instead of building the audio graph
+        audio_only: Only render the mixed audio track (useful to transcribe subtitles before the final render)
+        encoder_profile: Name of the encoder profile used for the video stream
+
+    Returns:
+        Path to the output file
+    """
+    output_path = Path(output_path)
+    music_assets = music_assets or []
+    music_start_times = music_start_times or []
+    music_durations = music_durations or []
+    music_volumes = music_volumes or []
+
+    if not segments:
+        raise ValueError("No segments to render.")
+    if audio_only and audio_track:
+        raise ValueError("audio_only and audio_track cannot be used together.")
+    if not (len(music_assets) == len(music_start_times) == len(music_durations) == len(music_volumes)):
+        raise ValueError(
+            f"Parameter lists must have same length: "
+            f"music_assets={len(music_assets)}, start_times={len(music_start_times)}, "
+            f"durations={len(music_durations)}, volumes={len(music_volumes)}"
+        )
+
+    for segment in segments:
+        if not segment.video_path.exists():
+            raise FileNotFoundError(f"Video file does not exist: {segment.video_path}")
+        if segment.audio_path and not segment.audio_path.exists():
+            raise FileNotFoundError(f"Audio file does not exist: {segment.audio_path}")
+
+    if overlay_video and not Path(overlay_video).exists():
+        logger.warning(f"Overlay video not found: {overlay_video}, rendering without overlay")
+        overlay_video = None
+
+    logger.info(f"Rendering {len(segments)} segments in a single pass: {output_path.name}")
+
+    if fps is None:
+        # Intro and ending clips keep their own audio; the scenes carry the chapter frame rate
+        reference_segment = next((segment for segment in segments if segment.audio_path), segments[0])
+        fps, _ = _fps_and_duration(_probe(reference_segment.video_path))
+
+    cmd = ["ffmpeg", "-y"]
+    input_count = 0
+
+    def add_input(path: Path) -> int:
+        nonlocal input_count
+        cmd.extend(["-i", str(path)])
+        input_count += 1
+        return input_count - 1
+
+    filter_parts = []
+    total_duration = 0.0
+    concat_inputs = []
+
+    # Step 1: Normalize every segment and apply its fades
+    for i, segment in enumerate(segments):
+        video_probe = _probe(segment.video_path)
+        _, video_duration = _fps_and_duration(video_probe)
+        duration = segment.duration()
+        total_duration += duration
+        actual_fade_duration = min(fade_duration, duration / 3.0)
+        fade_start = max(0, duration - actual_fade_duration)
+
+        video_index = add_input(segment.video_path)
+        audio_index = add_input(segment.audio_path) if segment.audio_path else None
+
+        logger.debug(
+            f"Segment {i+1}/{len(segments)}: {segment.video_path.name}, "
+            f"duration={duration:.2f}s, video_duration={video_duration:.2f}s"
+        )
+
+        if not audio_only:
+            video_chain = [f"scale={width}:{height}", "setsar=1", f"fps={fps}"]
+            if duration > video_duration:
+                video_chain.append(f"tpad=stop_mode=clone:stop_duration={duration - video_duration}")
+            video_chain.extend(
+                [
+                    f"trim=duration={duration}",
+                    "setpts=PTS-STARTPTS",
+                    f"fade=t=in:st=0:d={actual_fade_duration}",
+                    f"fade=t=out:st={fade_start}:d={actual_fade_duration}",
+                    "format=yuv420p",
+                ]
+            )
+            filter_parts.append(f"[{video_index}:v]{','.join(video_chain)}[seg_v{i}]")
+            concat_inputs.append(f"[seg_v{i}]")
+
+        if not audio_track:
+            if audio_index is not None:
+                audio_source = f"[{audio_index}:a]"
+            elif any(s["codec_type"] == "audio" for s in video_probe["streams"]):
+                audio_source = f"[{video_index}:a]"
+            else:
+                audio_source = "anullsrc=r=48000:cl=stereo,"
+
+            filter_parts.append(
+                f"{audio_source}aresample=48000,aformat=sample_fmts=fltp:channel_layouts=stereo,"
+                f"apad,atrim=duration={duration},asetpts=PTS-STARTPTS[seg_a{i}]"
+            )
+            concat_inputs.append(f"[seg_a{i}]")
+
+    # Step 2: Concatenate segments
+    has_video = not audio_only
+    has_audio = not audio_track
+    filter_parts.append(
+        f"{''.join(concat_inputs)}concat=n={len(segments)}:v={int(has_video)}:a={int(has_audio)}"
+        f"{'[cat_v]' if has_video else ''}{'[cat_a]' if has_audio else ''}"
+    )
+    video_label = "cat_v"
+    audio_label = "cat_a"
+
+    logger.debug(f"Total render duration: {total_duration:.2f}s")
+
+    # Step 3: Mix background music
+    valid_music = [
+        index for index, asset in enumerate(music_assets) if asset and asset != Path("") and Path(asset).exists()
+    ]
+    if has_audio and valid_music:
+        first_music_index = input_count
+        for index in valid_music:
+            add_input(Path(music_assets[index]))
+
+        filter_parts.extend(
+            _background_music_filter_parts(
+                music_assets=[music_assets[index] for index in valid_music],
+                start_times=[music_start_times[index] for index in valid_music],
+                durations=[music_durations[index] for index in valid_music],
+                volumes=[music_volumes[index] for index in valid_music],
+                first_input_index=first_music_index,
+                fade_duration=music_fade_duration,
+            )
+        )
+        filter_parts.append(f"[{audio_label}][bgm_mixed]amix=inputs=2:duration=first:dropout_transition=2[bgm_a]")
+        audio_label = "bgm_a"
+        logger.debug(f"Mixing {len(valid_music)} background music segments")
+
+    # Step 4: Place overlay repeats
+    if overlay_video:
+        overlay_probe = _probe(Path(overlay_video))
+        overlay_fps, overlay_duration = _fps_and_duration(overlay_probe)
+        starts = _overlay_start_times(
+            start_time_seconds=overlay_start_time_seconds,
+            repeat_every_seconds=overlay_repeat_every_seconds,
+            main_duration=total_duration,
+            overlay_duration=overlay_duration,
+            max_repeats=None,
+            allow_extend_duration=False,
+        )
+        overlay_has_audio = any(s["codec_type"] == "audio" for s in overlay_probe["streams"])
+    else:
+        starts = []
+
+    if starts and (has_video or overlay_has_audio):
+        overlay_index = add_input(Path(overlay_video))
+
+        if has_video:
+            overlay_stream = next(s for s in overlay_probe["streams"] if s["codec_type"] == "video")
+            overlay_pix_fmt = overlay_stream.get("pix_fmt", "")
+            overlay_base_str = _overlay_base_chain(
+                overlay_fps=overlay_fps,
+                main_fps=fps,
+                overlay_sar=overlay_stream.get("sample_aspect_ratio", "1:1"),
+                has_alpha="yuva" in overlay_pix_fmt or "rgba" in overlay_pix_fmt or "gbra" in overlay_pix_fmt,
+                match_fps=True,
+                chroma_color="0x00FF00",
+                similarity=0.25,
+                blend=0.05,
+                target_width=int(int(overlay_stream["width"]) * overlay_scale_percent),
+                target_height=int(int(overlay_stream["height"]) * overlay_scale_percent),
+                overlay_duration=overlay_duration,
+            )
+            x_pos, y_pos = _overlay_position_expressions(overlay_position)
+
+            split_outputs = "".join(f"[ov_b{i}]" for i in range(len(starts)))
+            filter_parts.append(f"[{overlay_index}:v]{overlay_base_str},split={len(starts)}{split_outputs}")
+            for i, start_time in enumerate(starts):
+                filter_parts.append(f"[ov_b{i}]setpts=PTS+{start_time}/TB[ov_v{i}]")
+                next_label = f"ov_main{i}"
+                filter_parts.append(f"[{video_label}][ov_v{i}]overlay={x_pos}:{y_pos}:format=yuv420[{next_label}]")
+                video_label = next_label
+
+        if has_audio and overlay_has_audio:
+            split_outputs = "".join(f"[ov_ab{i}]" for i in range(len(starts)))
+            filter_parts.append(
+                f"[{overlay_index}:a]atrim=0:{overlay_duration},asetpts=PTS-STARTPTS,"
+                f"asplit={len(starts)}{split_outputs}"
+            )
+            for i, start_time in enumerate(starts):
+                filter_parts.append(f"[ov_ab{i}]asetpts=PTS+{start_time}/TB[ov_a{i}]")
+            overlay_audio_inputs = "".join(f"[ov_a{i}]" for i in range(len(starts)))
+            filter_parts.append(
+                f"[{audio_label}]{overlay_audio_inputs}amix=inputs={len(starts)+1}:duration=first:"
+                "dropout_transition=2[ov_a]"
+            )
+            audio_label = "ov_a"
+
+        logger.debug(f"Placing overlay {Path(overlay_video).name} {len(starts)} times at: {starts}")
+
+    # Step 5: Burn subtitles
+    if has_video and subtitle_path:
+        subtitle_path = Path(subtitle_path)
+        if subtitle_path.suffix.lower() == ".ass":
+            subtitle_filter = f"ass={str(subtitle_path)}"
+        else:
+            subtitle_filter = f"subtitles={str(subtitle_path)}:original_size={width}x{height}"
+        filter_parts.append(f"[{video_label}]{subtitle_filter}[sub_v]")
+        video_label = "sub_v"
+        logger.debug(f"Burning subtitles from: {subtitle_path.name}")
+
+    # Inputs must come before the output options, so the pre-rendered audio track is added here
+    audio_track_index = add_input(Path(audio_track)) if audio_track else None
+
+    cmd.extend(["-filter_complex", ";".join(filter_parts)])
+
+    if has_video:
+        cmd.extend(["-map", f"[{video_label}]"])
+        cmd.extend([*encoder_args(encoder_profile, fps=fps), "-pix_fmt", "yuv420p"])
+
+    if audio_track_index is not None:
+        cmd.extend(["-map", f"{audio_track_index}:a", "-c:a", "copy"])
+    else:
+        cmd.extend(["-map", f"[{audio_label}]", "-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-ac", "2"])
+
+    cmd.extend(["-movflags", "+faststart", str(output_path)])
+
+    try:
+        _run_ffmpeg_trace(cmd)
+    except RuntimeError as e:
+        logger.error(f"Single-pass render failed: {e}")
+        if output_path.exists():
+            output_path.unlink()
+        raise
+
+    if not output_path.exists() or output_path.stat().st_size < 1000:
+        raise RuntimeError(f"Output file is missing or too small: {output_path}")
+
+    logger.info(f"Single-pass render completed successfully: {output_path.name}")
+    return output_path
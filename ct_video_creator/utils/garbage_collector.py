@@ -1,14 +1,209 @@
 """ "Garbage collector utilities for cleaning up generated assets."""
 
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from loguru import logger
 
+from ct_video_creator.environment_variables import GC_TEMP_MAX_AGE_SECONDS, GC_TEMP_MAX_BYTES
+from ct_video_creator.utils.asset_index import _chapter_asset_slots, chapter_asset_folders, find_chapters
 from ct_video_creator.utils.video_creator_paths import VideoCreatorPaths
-from ct_video_creator.modules.narrator import NarratorAssets
-from ct_video_creator.modules.image import ImageAssets
-from ct_video_creator.modules.background_music import BackgroundMusicAssets
-from ct_video_creator.modules.sub_video import SubVideoAssets, SubVideoRecipe
-from ct_video_creator.modules.video_assembler import VideoAssemblerAssets, VideoAssemblerRecipe
+
+# Folders of intermediate renders, normally emptied by the run creating them but left behind by crashed runs
+TEMP_FOLDER_NAMES = ("temp_files", "temp_fade_segments", "temp_concat_segments")
+
+# Folders over the size limit are still kept while written to more recently than this, e.g. by a running render
+TEMP_MIN_IDLE_SECONDS = 600.0
+
+
+class GarbageCollectionReport:
+    """Files and bytes reclaimed, or reclaimable on a dry run, per module."""
+
+    def __init__(self, dry_run: bool):
+        """Initialize an empty report."""
+        self.dry_run = dry_run
+        self.reclaimable_bytes: dict[str, int] = {}
+        self.reclaimable_files: dict[str, int] = {}
+        self.chapters = 0
+        self.errors = 0
+
+    def add(self, module: str, size: int, files: int = 1) -> None:
+        """Count files of a module."""
+        self.reclaimable_bytes[module] = self.reclaimable_bytes.get(module, 0) + size
+        self.reclaimable_files[module] = self.reclaimable_files.get(module, 0) + files
+
+    def merge(self, other: "GarbageCollectionReport") -> None:
+        """Add the counts of another report, e.g. of another chapter."""
+        for module, size in other.reclaimable_bytes.items():
+            self.add(module, size, other.reclaimable_files[module])
+        self.chapters += other.chapters
+        self.errors += other.errors
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of all modules."""
+        return sum(self.reclaimable_bytes.values())
+
+    def summary(self) -> str:
+        """Return one line per module, largest first."""
+        action = "reclaimable" if self.dry_run else "reclaimed"
+        lines = [f"{self.total_bytes / 1e6:.1f} MB {action} in {self.chapters} chapters"]
+        for module, size in sorted(self.reclaimable_bytes.items(), key=lambda item: -item[1]):
+            lines.append(f"  {module}: {size / 1e6:.1f} MB in {self.reclaimable_files[module]} files")
+        return "\n".join(lines)
+
+
+def _assets_to_keep(paths: VideoCreatorPaths) -> set[Path]:
+    """
+    Return the files referenced by the recipes and assets of a chapter, as listed and resolved.
+
+    The JSON files are parsed read-only like the asset index does: the recipe and asset classes create folders
+    and save the files back, which a dry run must not do and which races with a pipeline writing the chapter.
+    """
+    _, slots = _chapter_asset_slots(paths)
+    assets_to_keep = {path for _, _, path, _ in slots}
+
+    # Files are compared by the path of their folder, resolved once, so symlinked assets are compared by their
+    # own path and not by their target
+    return {Path(os.path.realpath(path.parent)) / path.name for path in assets_to_keep if path is not None}
+
+
+def _folder_usage(folder: str) -> tuple[int, int, float]:
+    """Return the total size, file count and newest modification time found under a folder."""
+    size, files, newest = 0, 0, 0.0
+    pending = [folder]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    stat = entry.stat(follow_symlinks=False)
+                    newest = max(newest, stat.st_mtime)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        size += stat.st_size
+                        files += 1
+        except OSError as e:
+            logger.debug(f"Skipping unreadable folder {folder}: {e}")
+    return size, files, newest
+
+
+class GarbageCollector:
+    """
+    Remove the asset files no recipe or asset refers to, and the temporary render folders left by crashed runs.
+
+    Chapters are collected in parallel on a thread pool: each one parses its recipes and assets once, lists its
+    asset folders with os.scandir (whose entries carry the file sizes without another stat per file), and only
+    deletes once the whole chapter is scanned. A dry run reports the bytes that would be reclaimed per module
+    without deleting anything.
+
+    A temporary folder is removed when nothing in it changed for temp_max_age seconds, or when it holds more
+    than temp_max_bytes and nothing changed for TEMP_MIN_IDLE_SECONDS.
+    """
+
+    def __init__(
+        self,
+        dry_run: bool = False,
+        max_workers: int | None = None,
+        temp_max_age: float = GC_TEMP_MAX_AGE_SECONDS,
+        temp_max_bytes: int = GC_TEMP_MAX_BYTES,
+    ):
+        """
+        Initialize the collector.
+
+        :param dry_run: Only report what would be deleted
+        :param max_workers: Chapters collected at the same time (None = ThreadPoolExecutor default)
+        :param temp_max_age: Seconds after which an unchanged temporary folder is removed
+        :param temp_max_bytes: Size over which a temporary folder is removed sooner (0 = no size limit)
+        """
+        self.dry_run = dry_run
+        self.max_workers = max_workers
+        self.temp_max_age = temp_max_age
+        self.temp_max_bytes = temp_max_bytes
+
+    def collect(self, user_folder: Path, story_name: str | None = None) -> GarbageCollectionReport:
+        """Collect every chapter of a user folder, or of one of its stories."""
+        chapters = find_chapters(Path(user_folder), story_name)
+        logger.info(f"Collecting garbage in {len(chapters)} chapters of {user_folder}")
+
+        report = GarbageCollectionReport(self.dry_run)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="garbage-collector") as executor:
+            futures = [
+                executor.submit(self.collect_chapter, user_folder, chapter_story, chapter_index)
+                for chapter_story, chapter_index in chapters
+            ]
+            for (chapter_story, chapter_index), future in zip(chapters, futures):
+                try:
+                    report.merge(future.result())
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error(f"Garbage collection of {chapter_story} chapter {chapter_index + 1} failed: {e}")
+                    report.errors += 1
+
+        logger.info(report.summary())
+        return report
+
+    def collect_chapter(self, user_folder: Path, story_name: str, chapter_index: int) -> GarbageCollectionReport:
+        """Collect the unused assets and stale temporary folders of one chapter."""
+        paths = VideoCreatorPaths(Path(user_folder), story_name, chapter_index, create_folders=False)
+        report = GarbageCollectionReport(self.dry_run)
+        report.chapters = 1
+
+        assets_to_keep = _assets_to_keep(paths)
+        unused_files: list[str] = []
+        for module, folder in chapter_asset_folders(paths).items():
+            folder_path = os.path.realpath(folder)
+            try:
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if entry.is_file() and Path(folder_path) / entry.name not in assets_to_keep:
+                            report.add(module, entry.stat().st_size)
+                            unused_files.append(entry.path)
+            except OSError:
+                continue
+
+        stale_folders = self._stale_temp_folders(paths.story_assets_folder, report)
+
+        if not self.dry_run:
+            for file_path in unused_files:
+                logger.debug(f"Deleting unused asset: {file_path}")
+                try:
+                    os.unlink(file_path)
+                except OSError as e:
+                    logger.warning(f"Failed to delete unused asset {file_path}: {e}")
+                    report.errors += 1
+            for folder in stale_folders:
+                logger.debug(f"Deleting temporary folder: {folder}")
+                shutil.rmtree(folder, ignore_errors=True)
+
+        return report
+
+    def _stale_temp_folders(self, assets_folder: Path, report: GarbageCollectionReport) -> list[str]:
+        """Find the temporary folders under the assets folder of a chapter that the policy removes."""
+        now = time.time()
+        stale: list[str] = []
+        pending = [str(assets_folder)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    folders = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+
+            for entry in folders:
+                if entry.name not in TEMP_FOLDER_NAMES:
+                    pending.append(entry.path)
+                    continue
+
+                size, files, newest = _folder_usage(entry.path)
+                idle = now - max(newest, entry.stat(follow_symlinks=False).st_mtime)
+                oversized = self.temp_max_bytes > 0 and size > self.temp_max_bytes
+                if idle >= self.temp_max_age or (oversized and idle >= TEMP_MIN_IDLE_SECONDS):
+                    report.add(entry.name, size, files)
+                    stale.append(entry.path)
+
+        return stale
 
 
 def internal_clean_unused_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
@@ -16,40 +211,6 @@ def internal_clean_unused_assets(user_folder: Path, story_name: str, chapter_ind
 
     logger.info(f"Cleaning unused assets for story: {story_name}, chapter: {chapter_index + 1}")
 
-    paths = VideoCreatorPaths(user_folder, story_name, chapter_index)
-
-    narrator_assets = NarratorAssets(paths)
-    image_assets = ImageAssets(paths)
-    background_music_assets = BackgroundMusicAssets(paths)
-    sub_video_assets = SubVideoAssets(paths)
-    sub_video_recipe = SubVideoRecipe(paths)
-    video_assembler_assets = VideoAssemblerAssets(paths)
-    video_assembler_recipe = VideoAssemblerRecipe(paths)
-
-    assets_to_keep = set()
-    assets_to_keep.update(narrator_assets.get_used_assets_list())
-    assets_to_keep.update(image_assets.get_used_assets_list())
-    assets_to_keep.update(background_music_assets.get_used_assets_list())
-    assets_to_keep.update(sub_video_assets.get_used_assets_list())
-    assets_to_keep.update(sub_video_recipe.get_used_assets_list())
-    assets_to_keep.update(video_assembler_assets.get_used_assets_list())
-    assets_to_keep.update(video_assembler_recipe.get_used_assets_list())
-
-    all_folders_to_clean = [
-        paths.narrator_asset_folder,
-        paths.image_asset_folder,
-        paths.background_music_asset_folder,
-        paths.sub_videos_asset_folder,
-        paths.video_assembler_asset_folder,
-    ]
-
-    for folder in all_folders_to_clean:
-        if not folder.exists() or not folder.is_dir():
-            continue
-
-        for item in folder.iterdir():
-            if item.is_file() and item not in assets_to_keep:
-                logger.debug(f"Deleting unused asset: {item}")
-                item.unlink()
-
-    logger.info("Unused asset cleanup completed.")
+    report = GarbageCollector().collect_chapter(user_folder, story_name, chapter_index)
+
+    logger.info(f"Unused asset cleanup completed: {report.total_bytes / 1e6:.1f} MB reclaimed.")
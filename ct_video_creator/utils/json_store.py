@@ -0,0 +1,191 @@
+"""Process-wide store for the JSON recipe and asset files."""
+
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from ct_logging import logger
+
+
+class _StoreEntry:
+    """Write state of one JSON file."""
+
+    def __init__(self):
+        """Initialize an entry with nothing written or pending."""
+        self.lock = threading.Lock()
+        self.pending_text: str | None = None
+        self.timer: threading.Timer | None = None
+        # (text, size, mtime_ns) of the file content known to be on disk
+        self.known: tuple[str, int, int] | None = None
+
+
+class JsonStore:
+    """
+    Serialized, atomic and deduplicated writes of JSON files.
+
+    Writes of a file are serialized with a per-file lock and go to a temporary file renamed over the target,
+    so readers never see a partially written file. A save whose content matches what is already on disk is
+    skipped. With a write delay, the saves of a file made within the delay are coalesced into a single write
+    of the latest content; load() writes the pending content of a file first, and flush() or process exit
+    writes everything.
+    """
+
+    DEFAULT_WRITE_DELAY_SECONDS = 0.0
+
+    def __init__(self, write_delay: float = DEFAULT_WRITE_DELAY_SECONDS):
+        """
+        Initialize the store.
+
+        :param write_delay: Seconds a save waits for newer saves of the same file (0 writes immediately)
+        """
+        self.write_delay = write_delay
+        self.writes = 0
+        self.skipped_writes = 0
+        self._entries: dict[Path, _StoreEntry] = {}
+        self._entries_lock = threading.Lock()
+
+    def _entry(self, path: Path) -> _StoreEntry:
+        """Return the state of a file, creating it on first use."""
+        key = Path(path).resolve()
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _StoreEntry()
+                self._entries[key] = entry
+            return entry
+
+    @staticmethod
+    def _stat_signature(path: Path) -> tuple[int, int] | None:
+        """Return the (size, mtime_ns) of a file, or None if it does not exist."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _is_on_disk(self, path: Path, entry: _StoreEntry, text: str) -> bool:
+        """Whether the file already holds text and was not changed by someone else since."""
+        if entry.known is None or entry.known[0] != text:
+            return False
+        return self._stat_signature(path) == entry.known[1:]
+
+    def _write(self, path: Path, entry: _StoreEntry, text: str) -> None:
+        """Write text to path atomically. The entry lock must be held."""
+        if self._is_on_disk(path, entry, text):
+            self.skipped_writes += 1
+            logger.trace(f"Skipping unchanged write of {path.name}")
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        self.writes += 1
+        signature = self._stat_signature(path)
+        entry.known = (text, *signature) if signature else None
+
+    def save(self, path: Path, data: Any, indent: int | None = 4, ensure_ascii: bool = True) -> None:
+        """
+        Save data as JSON to path.
+
+        The data is serialized when save() is called, so later changes of the caller's objects are not written.
+
+        :raises OSError: If an immediate write fails; failures of delayed writes are logged
+        :raises TypeError: If the data is not JSON-serializable
+        """
+        path = Path(path)
+        text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+        entry = self._entry(path)
+
+        with entry.lock:
+            if self.write_delay <= 0:
+                entry.pending_text = None
+                self._write(path, entry, text)
+                return
+
+            entry.pending_text = text
+            if entry.timer is None:
+                entry.timer = threading.Timer(self.write_delay, self._flush_entry, args=(path, entry))
+                entry.timer.daemon = True
+                entry.timer.start()
+
+    def _flush_entry(self, path: Path, entry: _StoreEntry) -> None:
+        """Write the pending content of a file, if any."""
+        with entry.lock:
+            if entry.timer is not None:
+                entry.timer.cancel()
+                entry.timer = None
+
+            text = entry.pending_text
+            entry.pending_text = None
+            if text is None:
+                return
+
+            try:
+                self._write(path, entry, text)
+            except OSError as e:
+                logger.error(f"Error writing {path.name}: {e}")
+
+    def flush(self, path: Path | None = None) -> None:
+        """Write the pending content of one file, or of every file when path is None."""
+        if path is not None:
+            self._flush_entry(Path(path), self._entry(path))
+            return
+
+        with self._entries_lock:
+            entries = list(self._entries.items())
+        for entry_path, entry in entries:
+            self._flush_entry(entry_path, entry)
+
+    @contextmanager
+    def coalesced_writes(self, write_delay: float):
+        """
+        Coalesce the saves made within write_delay seconds while the context is active.
+
+        Pending content is written and the previous write delay restored when the context exits.
+        """
+        previous_delay = self.write_delay
+        self.write_delay = write_delay
+        try:
+            yield self
+        finally:
+            self.write_delay = previous_delay
+            self.flush()
+
+    def load(self, path: Path) -> Any:
+        """
+        Load a JSON file, writing its pending content first.
+
+        :raises FileNotFoundError: If the file does not exist
+        :raises json.JSONDecodeError: If the file is not valid JSON
+        """
+        path = Path(path)
+        entry = self._entry(path)
+        self._flush_entry(path, entry)
+
+        with entry.lock:
+            signature = self._stat_signature(path)
+            with open(path, "r", encoding="utf-8") as file:
+                text = file.read()
+            # Remember the loaded content, so saving it back unchanged does not rewrite the file
+            entry.known = (text, *signature) if signature else None
+
+        return json.loads(text)
+
+
+_store = JsonStore()
+atexit.register(_store.flush)
+
+
+def get_json_store() -> JsonStore:
+    """Return the process-wide JSON store."""
+    return _store
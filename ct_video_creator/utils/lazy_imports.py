@@ -0,0 +1,41 @@
+"""
+PEP 562 lazy attributes for package __init__ modules.
+
+A package lists the attributes it exports and the submodule defining each of them; the submodule is imported the
+first time one of its attributes is accessed, so importing the package does not import Whisper, the LLM client or
+ffmpeg until they are needed.
+"""
+
+import importlib
+from typing import Any, Callable
+
+
+def lazy_attributes(
+    package_name: str, exports: dict[str, list[str]]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Build the module __getattr__ and __dir__ of a package exporting attributes of its submodules.
+
+    Usage in a package __init__:
+        __getattr__, __dir__ = lazy_attributes(__name__, {".submodule": ["Name"]})
+
+    :param package_name: __name__ of the package
+    :param exports: Names exported by the package, grouped by the (relative) module defining them
+    :return: The __getattr__ and __dir__ functions of the package
+    """
+    modules = {name: module_name for module_name, names in exports.items() for name in names}
+    package = importlib.import_module(package_name)
+
+    def __getattr__(name: str) -> Any:
+        module_name = modules.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package_name), name)
+        # Cache the attribute, so later accesses do not go through __getattr__
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(package)) | set(modules))
+
+    return __getattr__, __dir__
@@ -0,0 +1,208 @@
+"""Memoized ffprobe results shared by the FFmpeg helpers."""
+
+import copy
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from ct_logging import logger
+
+
+def run_ffprobe(path: Path) -> dict:
+    """Run ffprobe on a media file and return its streams and format as a dictionary."""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-print_format",
+            "json",
+            "-show_streams",
+            "-show_format",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+class ProbeCache:
+    """
+    LRU cache of ffprobe results keyed by (path, size, mtime_ns).
+
+    A file that is rewritten in place gets a new size or mtime and therefore a new key,
+    so stale entries are never returned; they simply age out of the LRU.
+    Per-chapter JSON sidecars keep results between separate stage runs.
+    """
+
+    DEFAULT_MAX_ENTRIES = 512
+    SIDECAR_VERSION = 1
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        probe_function: Callable[[Path], dict] = run_ffprobe,
+    ):
+        """
+        Initialize the probe cache.
+
+        :param max_entries: Maximum number of probe results kept in memory.
+        :param probe_function: Function used to probe a file on a cache miss.
+        """
+        self.max_entries = max(1, max_entries)
+        self._probe_function = probe_function
+        self._entries: OrderedDict[tuple[str, int, int], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented on every change, so a sidecar is only rewritten when the cache changed while it was open
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(path: Path) -> tuple[str, int, int]:
+        """Build the cache key for a file from its resolved path, size and modification time."""
+        resolved = Path(path).resolve()
+        stat_result = os.stat(resolved)
+        return str(resolved), stat_result.st_size, stat_result.st_mtime_ns
+
+    def probe(self, path: str | Path) -> dict:
+        """
+        Return the ffprobe result for a file, probing it only on a cache miss.
+
+        The returned dictionary is a copy and can be modified by the caller.
+        """
+        key = self._make_key(Path(path))
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(cached)
+            self.misses += 1
+
+        result = self._probe_function(Path(key[0]))
+
+        with self._lock:
+            self._store(key, result)
+
+        return copy.deepcopy(result)
+
+    def _store(self, key: tuple[str, int, int], result: dict) -> None:
+        """Store a probe result and evict the least recently used entries. Caller holds the lock."""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._generation += 1
+
+    def invalidate(self, path: str | Path | None = None) -> None:
+        """Drop every cached entry for a path, or the whole cache when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                resolved = str(Path(path).resolve())
+                for key in [k for k in self._entries if k[0] == resolved]:
+                    del self._entries[key]
+            self._generation += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    @contextmanager
+    def sidecar(self, sidecar_path: Path, root: Path | None = None) -> Iterator[None]:
+        """
+        Load the entries of a JSON sidecar file and save the entries under root back to it on exit.
+
+        Each chapter uses its own sidecar, and several can be open at the same time on the shared cache:
+        a sidecar only ever stores the entries of files under its root (default: the sidecar's folder),
+        so the entries of other chapters never leak into it. The entries are saved even when the body raises.
+        Entries whose file changed since they were stored are kept but never match again.
+        """
+        sidecar_path = Path(sidecar_path)
+        root = Path(root if root is not None else sidecar_path.parent).resolve()
+
+        self._load_sidecar(sidecar_path)
+        with self._lock:
+            generation = self._generation
+        try:
+            yield
+        finally:
+            with self._lock:
+                changed = self._generation != generation
+            if changed:
+                self._save_sidecar(sidecar_path, root)
+
+    def _load_sidecar(self, sidecar_path: Path) -> None:
+        """Add the entries stored in a sidecar file to the cache."""
+        try:
+            with open(sidecar_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            logger.debug(f"Probe cache sidecar not found: {sidecar_path.name} - starting empty")
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable probe cache sidecar {sidecar_path.name}: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != self.SIDECAR_VERSION:
+            logger.debug(f"Ignoring probe cache sidecar with unknown version: {sidecar_path.name}")
+            return
+
+        loaded = 0
+        with self._lock:
+            for entry in data.get("entries", []):
+                try:
+                    key = (str(entry["path"]), int(entry["size"]), int(entry["mtime_ns"]))
+                    result = entry["probe"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if key not in self._entries:
+                    self._entries[key] = result
+                    loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.debug(f"Loaded {loaded} probe results from sidecar: {sidecar_path.name}")
+
+    def _save_sidecar(self, sidecar_path: Path, root: Path) -> None:
+        """Write the cached entries of the files under root to a sidecar file."""
+        with self._lock:
+            entries = [
+                {"path": key[0], "size": key[1], "mtime_ns": key[2], "probe": result}
+                for key, result in self._entries.items()
+                if Path(key[0]).is_relative_to(root)
+            ]
+            hits, misses = self.hits, self.misses
+
+        data = {"version": self.SIDECAR_VERSION, "entries": entries}
+        temp_path = sidecar_path.with_name(f"{sidecar_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, sidecar_path)
+            logger.debug(
+                f"Probe cache saved to {sidecar_path.name}: {len(entries)} entries, {hits} hits, {misses} misses"
+            )
+        except OSError as e:
+            logger.warning(f"Failed to save probe cache sidecar {sidecar_path.name}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+
+_probe_cache = ProbeCache()
+
+
+def get_probe_cache() -> ProbeCache:
+    """Return the process-wide probe cache used by the FFmpeg helpers."""
+    return _probe_cache
@@ -0,0 +1,172 @@
+"""
+Cache of intermediate renders kept between video assembly runs.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable
+
+from ct_logging import logger
+
+from .encoder_profiles import encoder_options
+from .utils import file_digest, link_file
+
+
+def encoder_fingerprint(encoder_profile: str) -> dict[str, str]:
+    """
+    Return the encoder settings a profile resolves to in this process, for use in render keys.
+
+    The resolved backend is used rather than the profile name, so a render made with an NVENC fallback
+    is not reused once the preferred encoder is available again.
+    """
+    return encoder_options(encoder_profile)
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered media files.
+
+    Each entry is stored as <key><suffix> in the cache folder. The key hashes the operation name, the
+    content of the input files and the render parameters, so an entry is only reused when all of them
+    match. Inputs that are entries of the same cache are identified by their key instead of hashing
+    their content again.
+
+    Entries used since the cache object was created are tracked, so prune() can drop the renders that
+    the last assembly no longer needed.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_folder: Path):
+        """
+        Initialize the cache.
+
+        :param cache_folder: Folder where rendered files are stored
+        """
+        self.cache_folder = Path(cache_folder)
+        self.hits = 0
+        self.misses = 0
+        self._used: set[str] = set()
+        self._lock = threading.Lock()
+
+    def contains(self, path: Path) -> bool:
+        """Whether a path is an entry of this cache."""
+        return Path(path).resolve().parent == self.cache_folder.resolve()
+
+    def _input_digest(self, path: Path) -> str:
+        """Return the digest identifying the content of an input file."""
+        path = Path(path)
+        if self.contains(path):
+            return f"render:{path.stem}"
+        return file_digest(path)
+
+    def key(self, operation: str, inputs: list[Path], params: dict) -> str:
+        """
+        Build the key of a render.
+
+        :param operation: Name of the render operation
+        :param inputs: Input media files
+        :param params: Render parameters (effect settings, resolution, encoder settings, ...)
+        """
+        data = {
+            "version": self.VERSION,
+            "operation": operation,
+            "inputs": [self._input_digest(path) for path in inputs],
+            "params": params,
+        }
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        """Return the cache file path of an entry."""
+        return self.cache_folder / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str) -> Path | None:
+        """Return the entry of a key, or None on a miss."""
+        entry = self._entry_path(key, suffix)
+        if not entry.is_file():
+            return None
+
+        with self._lock:
+            self._used.add(key)
+            self.hits += 1
+        logger.debug(f"Render cache hit: {entry.name}")
+        return entry
+
+    def render(self, key: str, suffix: str, render: Callable[[Path], Path]) -> Path:
+        """
+        Render a missing entry.
+
+        :param key: Key of the entry
+        :param suffix: File suffix of the entry
+        :param render: Callable writing the result to the given path and returning the path it wrote;
+            the returned file is moved into the cache
+        :return: The path of the entry
+        """
+        entry = self._entry_path(key, suffix)
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        temp_path = entry.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}{suffix}")
+
+        try:
+            rendered = Path(render(temp_path))
+            os.replace(rendered, entry)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._used.add(key)
+            self.misses += 1
+        logger.debug(f"Render cache stored: {entry.name}")
+        return entry
+
+    def get_or_render(
+        self,
+        operation: str,
+        inputs: list[Path],
+        params: dict,
+        render: Callable[[Path], Path],
+        suffix: str = ".mp4",
+    ) -> Path:
+        """
+        Return the cached render of the inputs, rendering it on a miss.
+
+        :return: The path of the entry
+        """
+        key = self.key(operation, inputs, params)
+        return self.get(key, suffix) or self.render(key, suffix, render)
+
+    def copy_out(self, entry: Path, destination: Path) -> Path:
+        """Place an entry at destination, leaving the entry in the cache."""
+        if link_file(entry, destination) is None:
+            shutil.copyfile(entry, destination)
+        return Path(destination)
+
+    def prune(self) -> int:
+        """
+        Delete the entries not used since the cache object was created, and leftover partial renders.
+
+        :return: Number of deleted files
+        """
+        if not self.cache_folder.is_dir():
+            return 0
+
+        with self._lock:
+            used = set(self._used)
+
+        deleted = 0
+        for entry in self.cache_folder.iterdir():
+            if not entry.is_file() or entry.name.split(".")[0] in used:
+                continue
+            try:
+                entry.unlink()
+                deleted += 1
+            except OSError as e:
+                logger.warning(f"Failed to delete render cache entry {entry.name}: {e}")
+
+        if deleted:
+            logger.info(f"Removed {deleted} unused render cache entries")
+        return deleted
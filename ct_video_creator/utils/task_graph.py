@@ -0,0 +1,170 @@
+"""Dependency graph of tasks run concurrently with a concurrency limit per backend."""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from ct_logging import logger
+
+
+class GraphTask:
+    """A named callable, the tasks it depends on and the backends it runs on."""
+
+    def __init__(self, name: str, func: Callable[[], object], depends_on: list[str], backend: str | list[str]):
+        """
+        Initialize a task.
+
+        :param name: Unique task name
+        :param func: Callable running the task
+        :param depends_on: Tasks that must finish successfully before this one starts
+        :param backend: Backend used by the task, or every backend it uses; tasks of the same backend share
+            its concurrency limit, and a task using several backends holds a slot of each while it runs
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.backends = [backend] if isinstance(backend, str) else list(dict.fromkeys(backend))
+
+
+class TaskGraph:
+    """
+    Run tasks as soon as their dependencies are done, with at most backend_limits[backend] tasks of a
+    backend running at the same time.
+
+    When a task fails, the tasks depending on it are skipped while independent branches run to the end;
+    the first failure is then re-raised.
+    """
+
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __init__(self, backend_limits: dict[str, int] | None = None, default_limit: int = 1):
+        """
+        Initialize an empty graph.
+
+        :param backend_limits: Maximum number of running tasks per backend
+        :param default_limit: Limit of the backends missing from backend_limits
+        """
+        self.backend_limits = dict(backend_limits or {})
+        self.default_limit = max(1, default_limit)
+        self._tasks: dict[str, GraphTask] = {}
+
+        self.statuses: dict[str, str] = {}
+        self.durations: dict[str, float] = {}
+
+    def add_task(
+        self,
+        name: str,
+        func: Callable[[], object],
+        depends_on: list[str] | None = None,
+        backend: str | list[str] = "local",
+    ) -> None:
+        """
+        Add a task.
+
+        :raises ValueError: If a task with the same name was already added
+        """
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        self._tasks[name] = GraphTask(name, func, depends_on or [], backend)
+
+    def _limit(self, backend: str) -> int:
+        """Return the concurrency limit of a backend."""
+        return max(1, self.backend_limits.get(backend, self.default_limit))
+
+    def validate(self) -> None:
+        """
+        Check that every dependency exists and that the dependencies form no cycle.
+
+        :raises ValueError: If a dependency is unknown or the dependencies form a cycle
+        """
+        for task in self._tasks.values():
+            unknown = [dependency for dependency in task.depends_on if dependency not in self._tasks]
+            if unknown:
+                raise ValueError(f"Task {task.name} depends on unknown tasks: {', '.join(unknown)}")
+
+        done: set[str] = set()
+        remaining = list(self._tasks.values())
+        while remaining:
+            ready = [task for task in remaining if done.issuperset(task.depends_on)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks: {', '.join(task.name for task in remaining)}")
+            done.update(task.name for task in ready)
+            remaining = [task for task in remaining if task.name not in done]
+
+    def run(self, raise_on_failure: bool = True) -> dict[str, str]:
+        """
+        Run all tasks and return the status of each one.
+
+        :param raise_on_failure: Re-raise the first task failure; otherwise failures only show in the statuses
+        :raises ValueError: If the graph is invalid
+        :raises Exception: The first task failure, once every task that could still run has finished
+        """
+        self.validate()
+        self.statuses = {}
+        self.durations = {}
+
+        pending = list(self._tasks.values())
+        running: dict[Future, GraphTask] = {}
+        running_per_backend: dict[str, int] = {}
+        first_error: BaseException | None = None
+        lock = threading.Lock()
+        start = time.monotonic()
+
+        def run_task(task: GraphTask) -> None:
+            task_start = time.monotonic()
+            try:
+                task.func()
+            finally:
+                with lock:
+                    self.durations[task.name] = time.monotonic() - task_start
+
+        max_workers = max(1, len(self._tasks))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task_graph") as executor:
+            while pending or running:
+                still_pending = []
+                for task in pending:
+                    dependency_statuses = [self.statuses.get(dependency) for dependency in task.depends_on]
+                    if any(status in (self.FAILED, self.SKIPPED) for status in dependency_statuses):
+                        logger.warning(f"Skipping task {task.name}: a dependency did not finish")
+                        self.statuses[task.name] = self.SKIPPED
+                    elif all(status == self.DONE for status in dependency_statuses) and all(
+                        running_per_backend.get(backend, 0) < self._limit(backend) for backend in task.backends
+                    ):
+                        logger.info(f"Starting task {task.name} on {', '.join(task.backends)}")
+                        for backend in task.backends:
+                            running_per_backend[backend] = running_per_backend.get(backend, 0) + 1
+                        running[executor.submit(run_task, task)] = task
+                    else:
+                        still_pending.append(task)
+                pending = still_pending
+
+                if not running:
+                    # Skipping tasks can make more tasks skippable; loop again until only runnable tasks remain
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    for backend in task.backends:
+                        running_per_backend[backend] -= 1
+                    error = future.exception()
+                    if error is None:
+                        self.statuses[task.name] = self.DONE
+                        logger.info(f"Task {task.name} finished in {self.durations[task.name]:.1f}s")
+                    else:
+                        self.statuses[task.name] = self.FAILED
+                        logger.error(f"Task {task.name} failed: {error}")
+                        first_error = first_error or error
+
+        elapsed = time.monotonic() - start
+        logger.info(
+            f"Ran {len(self._tasks)} tasks in {elapsed:.1f}s ({sum(self.durations.values()):.1f}s of sequential work)"
+        )
+
+        if first_error is not None and raise_on_failure:
+            raise first_error
+
+        return self.statuses
@@ -2,10 +2,24 @@
 
 import os
 import copy
+import hashlib
 import shutil
+import threading
 
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Linux ioctl that makes dst share src's data blocks (btrfs, XFS, bcachefs)
+_FICLONE = 0x40049409
+
+_DIGEST_CHUNK_SIZE = 4 * 1024 * 1024
+_digest_cache: dict[tuple[str, int, int], str] = {}
+_digest_cache_lock = threading.Lock()
+
 
 def get_next_available_filename(file_path: str) -> str:
     """
@@ -109,6 +123,96 @@ def safe_copy(src, dst):
     return dst
 
 
+def file_digest(file_path) -> str:
+    """
+    Return the SHA-256 hex digest of a file.
+
+    Digests are cached by (path, size, mtime_ns), so a file is only read again after it changes.
+
+    :param file_path: File to hash.
+    :return: The hex digest.
+    """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+    key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    with _digest_cache_lock:
+        digest = _digest_cache.get(key)
+    if digest is not None:
+        return digest
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(_DIGEST_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    with _digest_cache_lock:
+        _digest_cache[key] = digest
+    return digest
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Create dst as a copy-on-write clone of src. Returns False if the filesystem does not support it."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def link_file(src, dst, allow_move: bool = False, allow_hardlink: bool = True) -> str | None:
+    """
+    Place src at dst without copying its data, replacing dst if it exists.
+
+    A hard link is tried first, then a reflink and, if allow_move is set, a rename.
+    Callers that may later rewrite src or dst in place must pass allow_hardlink=False,
+    since a hard link shares the data and the rewrite would change both files.
+
+    :param src: Existing file.
+    :param dst: Destination file path.
+    :param allow_move: Whether src may be moved when it cannot be linked.
+    :param allow_hardlink: Whether dst may share its inode with src.
+    :return: The method used ("hardlink", "reflink" or "move"), or None if the data would have to be copied.
+    """
+    src = Path(src)
+    dst = Path(dst)
+
+    if allow_hardlink and dst.exists() and src.exists() and os.path.samefile(src, dst):
+        return "hardlink"
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dst = dst.with_name(f".{dst.name}.{os.getpid()}.link")
+    tmp_dst.unlink(missing_ok=True)
+
+    method = None
+    if allow_hardlink:
+        try:
+            os.link(src, tmp_dst)
+            method = "hardlink"
+        except OSError:
+            pass
+
+    if method is None:
+        if _reflink(src, tmp_dst):
+            method = "reflink"
+        elif allow_move:
+            try:
+                os.replace(src, tmp_dst)
+                method = "move"
+            except OSError:
+                pass
+
+    if method is None:
+        return None
+
+    os.replace(tmp_dst, dst)
+    return method
+
+
 def backup_file_to_old(file_path: Path) -> None:
     """
     Back up a file by copying it to a .old version before it gets overwritten.
@@ -13,13 +13,14 @@ class VideoCreatorPaths:
     USER_ASSETS_MASK = "user_assets"
     STORY_ASSETS_MASK = "assets"
 
-    def __init__(self, user_folder: Path, story_name: str, chapter_index: int):
+    def __init__(self, user_folder: Path, story_name: str, chapter_index: int, create_folders: bool = True):
         """Initialize VideoRecipePaths with story folder and chapter prompt path.
 
         Args:
             user_folder: Path to the user folder
             story_name: Name of the story
             chapter_index: Index of the chapter
+            create_folders: Create the asset folders; readers that must not write anything pass False
         """
         self.user_folder = user_folder
         self.story_folder = user_folder / "stories" / story_name
@@ -40,11 +41,12 @@ class VideoCreatorPaths:
         self.background_music_asset_folder = self.story_assets_folder / "background_music"
 
         # Create directories if they don't exist
-        self.narrator_asset_folder.mkdir(parents=True, exist_ok=True)
-        self.image_asset_folder.mkdir(parents=True, exist_ok=True)
-        self.sub_videos_asset_folder.mkdir(parents=True, exist_ok=True)
-        self.video_assembler_asset_folder.mkdir(parents=True, exist_ok=True)
-        self.background_music_asset_folder.mkdir(parents=True, exist_ok=True)
+        if create_folders:
+            self.narrator_asset_folder.mkdir(parents=True, exist_ok=True)
+            self.image_asset_folder.mkdir(parents=True, exist_ok=True)
+            self.sub_videos_asset_folder.mkdir(parents=True, exist_ok=True)
+            self.video_assembler_asset_folder.mkdir(parents=True, exist_ok=True)
+            self.background_music_asset_folder.mkdir(parents=True, exist_ok=True)
 
         # Recipe file paths
         self.narrator_recipe_file = self.video_chapter_folder / "narrator_recipe.json"
@@ -60,6 +62,13 @@ class VideoCreatorPaths:
         self.video_assembler_asset_file = self.video_chapter_folder / "video_assembler_assets.json"
         self.background_music_asset_file = self.video_chapter_folder / "background_music_assets.json"
 
+        # Cache file paths
+        self.probe_cache_file = self.video_chapter_folder / "probe_cache.json"
+        self.tts_cache_folder = self.user_folder / "cache" / "tts"
+        self.ttm_cache_folder = self.user_folder / "cache" / "ttm"
+        self.transcription_cache_folder = self.user_folder / "cache" / "transcriptions"
+        self.render_cache_folder = self.video_assembler_asset_folder / "render_cache"
+
         # Output video file path
         self.video_output_file = self.video_chapter_folder / f"video_chapter_{chapter_index+1:03}.mp4"
 
@@ -93,14 +102,17 @@ class VideoCreatorPaths:
         else:
             raise ValueError(f"Asset path is not under known assets folders: {asset_path}")
 
-    def unmask_asset_path(self, asset_path: Path) -> Path:
-        """Get the unmasked asset path for this instance."""
+    def unmask_asset_path(self, asset_path: Path, create_missing: bool = True) -> Path:
+        """Get the unmasked asset path for this instance.
+
+        Missing user and default assets are created as empty files unless create_missing is False.
+        """
 
         if asset_path.is_dir():
             raise ValueError("Can not resolve folders.")
 
         user_folder = self.get_user_assets_folder()
-        default_assets_folder = self.get_default_assets_folder()
+        default_assets_folder = self.get_default_assets_folder(create=create_missing)
 
         # Extract relative path from masked path
         asset_path_str = str(asset_path)
@@ -113,7 +125,7 @@ class VideoCreatorPaths:
             if not result.is_relative_to(user_folder.resolve()):
                 raise ValueError(f"Asset path escapes user folder: {result}")
 
-            if not result.exists():
+            if create_missing and not result.exists():
                 result.parent.mkdir(parents=True, exist_ok=True)
                 result.touch()
 
@@ -127,7 +139,7 @@ class VideoCreatorPaths:
             if not result.is_relative_to(default_assets_folder.resolve()):
                 raise ValueError(f"Asset path escapes default folder: {result}")
 
-            if not result.exists():
+            if create_missing and not result.exists():
                 result.parent.mkdir(parents=True, exist_ok=True)
                 result.touch()
 
@@ -239,14 +251,17 @@ class VideoCreatorPaths:
         return base_path
 
     @classmethod
-    def get_default_assets_folder(cls) -> Path:
-        """Get the default assets folder path, falling back to a stub in test environments."""
+    def get_default_assets_folder(cls, create: bool = True) -> Path:
+        """Get the default assets folder path, falling back to a stub in test environments.
+
+        The folder (or stub) is only created when create is True.
+        """
         configured = DEFAULT_ASSETS_FOLDER.strip()
         if not configured or "your_default_assets_folder_here" in configured:
             base = Path.cwd() / "default_assets_stub"
-            return cls._ensure_default_stub_assets(base)
+            return cls._ensure_default_stub_assets(base) if create else base
         base = Path(configured).resolve()
-        if not base.exists():
+        if create and not base.exists():
             base.mkdir(parents=True, exist_ok=True)
         return base
 
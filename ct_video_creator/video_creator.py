@@ -2,18 +2,66 @@
 AI Video Generation Module
 """
 
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
+
+from ct_logging import logger, setup_console_logging, cleanup_logging
+
+from .environment_variables import JSON_WRITE_DELAY_SECONDS
+from .utils import VideoCreatorPaths, AspectRatios, get_json_store, get_probe_cache
+from .utils.garbage_collector import GarbageCollectionReport, GarbageCollector, internal_clean_unused_assets
+from .utils.task_graph import TaskGraph
+
+# The builders and asset managers are imported by the stage functions using them, so running one stage does not
+# import the generators (Whisper, LLM client, ComfyUI workflows) of the others
+
+# Number of chapter stages running at the same time on each backend
+DEFAULT_STAGE_LIMITS = {
+    "local": 2,
+    "llm": 1,
+    "tts": 1,
+    "ttm": 1,
+    "comfyui": 1,
+    "ffmpeg": 1,
+}
+
+# Backends used by each stage; assembly also upscales sub-videos on ComfyUI and voices the ending narrators
+STAGE_BACKENDS = {
+    "narrator_assets": ["tts"],
+    "image_assets": ["comfyui"],
+    "background_music_recipe": ["llm"],
+    "background_music_assets": ["ttm"],
+    "sub_video_recipes": ["llm"],
+    "sub_video_assets": ["comfyui"],
+    "assemble_video": ["ffmpeg", "comfyui", "tts"],
+}
+
+
+@contextmanager
+def _stage_logging(stage: str, paths: VideoCreatorPaths) -> Iterator[None]:
+    """
+    Log a stage to the console and to <chapter folder>/logs/<stage>.log, removing both sinks when it ends.
 
-from ct_logging import setup_console_logging, setup_file_logging, cleanup_logging
-
-from .modules.narrator import NarratorRecipeBuilder, NarratorAssetManager
-from .modules.image import ImageRecipeBuilder, ImageAssetManager
-from .modules.background_music import BackgroundMusicRecipeBuilder, BackgroundMusicAssetManager
-from .modules.sub_video import SubVideoI2VRecipeBuilder, SubVideoT2VRecipeBuilder, SubVideoAssetManager
-from .modules.video_assembler import VideoAssemblerRecipeBuilder, VideoAssembler
-
-from .utils import VideoCreatorPaths, AspectRatios
-from .utils.garbage_collector import internal_clean_unused_assets
+    Stages of several chapters can run at the same time, so the stage's records are tagged with its chapter
+    and the file sink skips the records tagged with another chapter. Records of helper threads started by
+    the stage carry no chapter and are kept.
+    """
+    chapter = str(paths.video_chapter_folder)
+    log_id = setup_console_logging(stage, log_level="TRACE")
+    file_log_id = None
+    try:
+        file_log_id = logger.add(
+            str(paths.video_chapter_folder / "logs" / f"{stage}.log"),
+            level="TRACE",
+            filter=lambda record: record["extra"].get("chapter", chapter) == chapter,
+        )
+        with logger.contextualize(chapter=chapter):
+            yield
+    finally:
+        if file_log_id is not None:
+            logger.remove(file_log_id)
+        cleanup_logging(log_id)
 
 
 def create_narrator_recipe(user_folder: Path, story_name: str, chapter_index: int) -> None:
@@ -27,47 +75,34 @@ def create_narrator_recipe(user_folder: Path, story_name: str, chapter_index: in
         None
     """
 
-    log_id = setup_console_logging("create_narrator_recipe", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_narrator_recipe",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    narrator_recipe_builder = NarratorRecipeBuilder(paths)
-    narrator_recipe_builder.create_narrator_recipes()
+    with _stage_logging("create_narrator_recipe", paths):
+        from .modules.narrator import NarratorRecipeBuilder  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        narrator_recipe_builder = NarratorRecipeBuilder(paths)
+        narrator_recipe_builder.create_narrator_recipes()
 
 
 def create_narrator_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create video assets from the recipe.
     """
-    log_id = setup_console_logging("create_narrator_assets", log_level="TRACE")
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_narrator_assets",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    narrator_asset_manager = NarratorAssetManager(paths)
-    narrator_asset_manager.generate_narrator_assets()
+    with _stage_logging("create_narrator_assets", paths):
+        from .modules.narrator import NarratorAssetManager  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        narrator_asset_manager = NarratorAssetManager(paths)
+        narrator_asset_manager.generate_narrator_assets()
 
 
 def create_image_recipe(user_folder: Path, story_name: str, chapter_index: int, aspect_ratio: AspectRatios) -> None:
@@ -75,48 +110,34 @@ def create_image_recipe(user_folder: Path, story_name: str, chapter_index: int,
     Create images from the recipe.
     """
 
-    log_id = setup_console_logging("create_image_recipe", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_image_recipe",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    image_recipe_builder = ImageRecipeBuilder(paths, aspect_ratio)
-    image_recipe_builder.create_image_recipes()
+    with _stage_logging("create_image_recipe", paths):
+        from .modules.image import ImageRecipeBuilder  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        image_recipe_builder = ImageRecipeBuilder(paths, aspect_ratio)
+        image_recipe_builder.create_image_recipes()
 
 
 def create_images_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create images from the recipe.
     """
-    log_id = setup_console_logging("create_images_assets", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_images_assets",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    image_asset_manager = ImageAssetManager(paths)
-    image_asset_manager.generate_image_assets()
+    with _stage_logging("create_images_assets", paths):
+        from .modules.image import ImageAssetManager  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        image_asset_manager = ImageAssetManager(paths)
+        image_asset_manager.generate_image_assets()
 
 
 def create_background_music_recipe(user_folder: Path, story_name: str, chapter_index: int) -> None:
@@ -124,152 +145,226 @@ def create_background_music_recipe(user_folder: Path, story_name: str, chapter_i
     Create background music from the recipe.
     """
 
-    log_id = setup_console_logging("create_background_music_recipe", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_background_music_recipe",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    recipe_builder = BackgroundMusicRecipeBuilder(paths)
-    recipe_builder.create_background_music_recipes()
+    with _stage_logging("create_background_music_recipe", paths):
+        from .modules.background_music import BackgroundMusicRecipeBuilder  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        recipe_builder = BackgroundMusicRecipeBuilder(paths)
+        recipe_builder.create_background_music_recipes()
 
 
 def create_background_music_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create background music from the recipe.
     """
-    log_id = setup_console_logging("create_background_music_assets", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_background_music_assets",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    asset_manager = BackgroundMusicAssetManager(paths)
-    asset_manager.generate_background_music_assets()
+    with _stage_logging("create_background_music_assets", paths):
+        from .modules.background_music import BackgroundMusicAssetManager  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        asset_manager = BackgroundMusicAssetManager(paths)
+        asset_manager.generate_background_music_assets()
 
 
 def create_sub_video_recipes(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create a video recipe from existing images and narrator audio files.
     """
-    log_id = setup_console_logging("create_sub_video_recipes", log_level="TRACE")
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_sub_video_recipes",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    video_recipe_builder = SubVideoI2VRecipeBuilder(paths)
-    video_recipe_builder.create_sub_video_recipe()
+    with _stage_logging("create_sub_video_recipes", paths):
+        from .modules.sub_video import SubVideoI2VRecipeBuilder  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        with get_probe_cache().sidecar(paths.probe_cache_file):
+            video_recipe_builder = SubVideoI2VRecipeBuilder(paths)
+            video_recipe_builder.create_sub_video_recipe()
 
 
 def create_sub_videos_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create videos from the images in the recipe.
     """
-    log_id = setup_console_logging("create_sub_videos_assets", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_sub_videos_assets",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    video_asset_manager = SubVideoAssetManager(paths)
-    video_asset_manager.generate_video_assets()
+    with _stage_logging("create_sub_videos_assets", paths):
+        from .modules.sub_video import SubVideoAssetManager  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        with get_probe_cache().sidecar(paths.probe_cache_file):
+            video_asset_manager = SubVideoAssetManager(paths)
+            video_asset_manager.generate_video_assets()
 
 
 def create_assemble_video_recipe(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """
     Create assemble video recipe from sub-videos.
     """
-    log_id = setup_console_logging("create_assemble_video_recipe", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "create_assemble_video_recipe",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    _ = VideoAssemblerRecipeBuilder(paths)
+    with _stage_logging("create_assemble_video_recipe", paths):
+        from .modules.video_assembler import VideoAssemblerRecipeBuilder  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        _ = VideoAssemblerRecipeBuilder(paths)
 
 
-def assemble_video(user_folder: Path, story_name: str, chapter_index: int) -> None:
+def assemble_video(user_folder: Path, story_name: str, chapter_index: int, single_render: bool = False) -> None:
     """
     Assemble a chapter video from the recipe.
 
     Args:
         story_path: Path to the story folder.
         chapter_index: Chapter index to assemble video for.
+        single_render: Build the whole chapter with one ffmpeg encode instead of one per stage.
 
     Returns:
         None
     """
-    log_id = setup_console_logging("assemble_video", log_level="TRACE")
-
     paths = VideoCreatorPaths(
         user_folder=user_folder,
         story_name=story_name,
         chapter_index=chapter_index,
     )
-    file_log_id = setup_file_logging(
-        "assemble_video",
-        log_level="TRACE",
-        base_folder=str(paths.video_chapter_folder),
-    )
 
-    video_assembler = VideoAssembler(paths)
-    video_assembler.assemble_video()
+    with _stage_logging("assemble_video", paths):
+        from .modules.video_assembler import VideoAssembler  # pylint: disable=import-outside-toplevel
 
-    cleanup_logging(log_id)
-    cleanup_logging(file_log_id)
+        with get_probe_cache().sidecar(paths.probe_cache_file):
+            video_assembler = VideoAssembler(paths, single_render=single_render)
+            video_assembler.assemble_video()
 
 
 def clean_unused_assets(user_folder: Path, story_name: str, chapter_index: int) -> None:
     """Clean up video assets for a specific story folder."""
 
     internal_clean_unused_assets(user_folder, story_name, chapter_index)
+
+
+def collect_garbage(
+    user_folder: Path, story_name: str | None = None, dry_run: bool = False, max_workers: int | None = None
+) -> GarbageCollectionReport:
+    """
+    Clean up the unused assets and stale temporary folders of every chapter of a user folder, or of one story.
+
+    With dry_run, nothing is deleted and the report lists the bytes that would be reclaimed per module.
+    """
+
+    return GarbageCollector(dry_run=dry_run, max_workers=max_workers).collect(user_folder, story_name)
+
+
+def run_chapter(
+    user_folder: Path,
+    story_name: str,
+    chapter_index: int,
+    aspect_ratio: AspectRatios = AspectRatios.RATIO_16_9,
+    single_render: bool = False,
+    clean_assets: bool = True,
+    stage_limits: dict[str, int] | None = None,
+) -> dict[str, str]:
+    """
+    Create a chapter video, running independent stages at the same time.
+
+    Each stage starts as soon as the stages whose outputs it reads are done, so narrator audio (TTS server),
+    images (ComfyUI) and background music (LLM, then TTM server) overlap, and the chapter takes about as
+    long as its longest chain: narrator, sub-video recipes, sub-videos, assembly.
+
+    Args:
+        user_folder: User folder holding the stories.
+        story_name: Story to create the chapter of.
+        chapter_index: Chapter index to create.
+        aspect_ratio: Aspect ratio of the images.
+        single_render: Build the whole chapter with one ffmpeg encode instead of one per stage.
+        clean_assets: Remove unused assets once the video is assembled.
+        stage_limits: Number of stages running at the same time per backend (default: DEFAULT_STAGE_LIMITS).
+
+    Returns:
+        The status of each stage.
+
+    Raises:
+        Exception: The first stage failure, once the stages not depending on it have finished.
+    """
+    graph = TaskGraph({**DEFAULT_STAGE_LIMITS, **(stage_limits or {})})
+    add_chapter_stages(graph, user_folder, story_name, chapter_index, aspect_ratio, single_render, clean_assets)
+    with get_json_store().coalesced_writes(JSON_WRITE_DELAY_SECONDS):
+        return graph.run()
+
+
+def add_chapter_stages(
+    graph: TaskGraph,
+    user_folder: Path,
+    story_name: str,
+    chapter_index: int,
+    aspect_ratio: AspectRatios = AspectRatios.RATIO_16_9,
+    single_render: bool = False,
+    clean_assets: bool = True,
+    prefix: str = "",
+    completed_stages: set[str] | None = None,
+    on_stage_done: Callable[[str], None] | None = None,
+) -> None:
+    """
+    Add the stages of a chapter to a task graph.
+
+    Args:
+        graph: Graph receiving the stages; several chapters can share one graph.
+        prefix: Prefix of the task names, keeping the stages of different chapters apart.
+        completed_stages: Stages known to be done; their tasks do nothing.
+        on_stage_done: Called with the stage name after a stage finished successfully.
+        Other arguments are the same as for run_chapter.
+    """
+    args = (user_folder, story_name, chapter_index)
+    completed_stages = completed_stages or set()
+
+    def add_stage(stage: str, func: Callable[[], None], depends_on: list[str]) -> None:
+        def run_stage() -> None:
+            if stage in completed_stages:
+                logger.debug(f"Stage {prefix}{stage} already done, skipping")
+                return
+            func()
+            # The outputs of a stage are on disk before the stages depending on it start or it is checkpointed
+            get_json_store().flush()
+            if on_stage_done is not None:
+                on_stage_done(stage)
+
+        graph.add_task(
+            f"{prefix}{stage}",
+            run_stage,
+            [f"{prefix}{dependency}" for dependency in depends_on],
+            STAGE_BACKENDS.get(stage, "local"),
+        )
+
+    add_stage("narrator_recipe", lambda: create_narrator_recipe(*args), [])
+    add_stage("narrator_assets", lambda: create_narrator_assets(*args), ["narrator_recipe"])
+    add_stage("image_recipe", lambda: create_image_recipe(*args, aspect_ratio), [])
+    add_stage("image_assets", lambda: create_images_assets(*args), ["image_recipe"])
+    # The background music recipe builder requires complete narrator assets
+    add_stage("background_music_recipe", lambda: create_background_music_recipe(*args), ["narrator_assets"])
+    add_stage("background_music_assets", lambda: create_background_music_assets(*args), ["background_music_recipe"])
+    add_stage("sub_video_recipes", lambda: create_sub_video_recipes(*args), ["narrator_assets", "image_assets"])
+    add_stage("sub_video_assets", lambda: create_sub_videos_assets(*args), ["sub_video_recipes"])
+    add_stage("assemble_video_recipe", lambda: create_assemble_video_recipe(*args), ["narrator_assets", "image_assets"])
+    add_stage(
+        "assemble_video",
+        lambda: assemble_video(*args, single_render=single_render),
+        ["assemble_video_recipe", "sub_video_assets", "background_music_assets"],
+    )
+    if clean_assets:
+        add_stage("clean_unused_assets", lambda: clean_unused_assets(*args), ["assemble_video"])